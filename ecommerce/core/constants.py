@@ -15,6 +15,21 @@ SEAT_PRODUCT_CLASS_NAME = 'Seat'
 # switch is used to disable/enable USER table list/change view in django admin
 USER_LIST_VIEW_SWITCH = 'enable_user_list_view'
 
+# .. toggle_name: enable_request_profiling
+# .. toggle_type: waffle_flag
+# .. toggle_default: False
+# .. toggle_description: Allows staff users to profile their requests by sending the X-Ecommerce-Profile header.
+# .. toggle_use_cases: open_edx
+# .. toggle_creation_date: 2026-10-19
+# .. toggle_status: supported
+ENABLE_REQUEST_PROFILING = 'enable_request_profiling'
+REQUEST_PROFILING_HEADER = 'HTTP_X_ECOMMERCE_PROFILE'
+
+# Alias of the read replica in settings.DATABASES, if there is one.
+READ_REPLICA_DATABASE = 'read_replica'
+# Cookie pinning a client's reads to the primary database after it wrote, so that it reads its own writes.
+READ_REPLICA_PIN_COOKIE_NAME = 'ecommerce_pin_primary'
+
 # Coupon constant
 COUPON_PRODUCT_CLASS_NAME = 'Coupon'
 
@@ -0,0 +1,122 @@
+"""
+Database router sending the reads of safe requests to opted-in views to the read replica.
+
+Routing is driven by ReadReplicaMiddleware, which decides for each request whether it may read from the replica.
+Outside of requests, such as in management commands, queries are routed as if there were no router.
+"""
+
+
+import logging
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from edx_django_utils.cache import TieredCache
+
+from ecommerce.core.constants import READ_REPLICA_DATABASE
+from ecommerce.core.utils import get_cache_key
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+class RoutingState:
+    """ Routing state of a request. """
+
+    def __init__(self):
+        # Whether the reads of the request may be sent to the read replica.
+        self.use_read_replica = False
+        # Whether the request wrote, or is about to write, to the primary.
+        self.wrote = False
+
+
+def get_routing_state():
+    return getattr(_local, 'state', None)
+
+
+@contextmanager
+def route_request():
+    """ Routes the queries made by the current thread within the block as those of a request. """
+    previous_state = get_routing_state()
+    _local.state = RoutingState()
+    try:
+        yield _local.state
+    finally:
+        _local.state = previous_state
+
+
+def is_read_replica_configured():
+    return READ_REPLICA_DATABASE in settings.DATABASES
+
+
+def get_read_replica_lag():
+    """
+    Returns the replication lag of the read replica, in seconds, or None if the replica is unavailable or not
+    replicating.
+
+    The lag is cached for settings.READ_REPLICA_LAG_CHECK_INTERVAL, so that the replica is checked at most once per
+    interval rather than on every request. The lag of replicas of databases other than MySQL is not checked.
+    """
+    cache_key = get_cache_key(resource='read_replica_lag')
+    cached_response = TieredCache.get_cached_response(cache_key)
+    if cached_response.is_found:
+        return cached_response.value
+
+    connection = connections[READ_REPLICA_DATABASE]
+    try:
+        if connection.vendor == 'mysql':
+            with connection.cursor() as cursor:
+                cursor.execute('SHOW SLAVE STATUS')
+                columns = [column[0] for column in cursor.description or ()]
+                row = cursor.fetchone()
+            lag = dict(zip(columns, row)).get('Seconds_Behind_Master') if row else None
+        else:
+            lag = 0
+    except DatabaseError:
+        logger.exception('Failed to check the replication lag of the read replica.')
+        lag = None
+
+    TieredCache.set_all_tiers(cache_key, lag, settings.READ_REPLICA_LAG_CHECK_INTERVAL)
+    return lag
+
+
+def is_read_replica_current():
+    """ Returns whether the read replica is available, and lags behind the primary by less than the allowed lag. """
+    lag = get_read_replica_lag()
+    return lag is not None and lag <= settings.READ_REPLICA_MAX_LAG
+
+
+class ReadReplicaRouter:
+    """
+    Sends the reads of a request to the read replica when ReadReplicaMiddleware allowed it, until the request writes.
+
+    Writes always go to the primary, including those of objects read from the replica.
+    """
+
+    def db_for_read(self, model, **hints):  # pylint: disable=unused-argument
+        state = get_routing_state()
+        if state is None:
+            return None
+
+        if state.wrote:
+            # Read the request's own writes.
+            return DEFAULT_DB_ALIAS
+
+        return READ_REPLICA_DATABASE if state.use_read_replica else None
+
+    def db_for_write(self, model, **hints):  # pylint: disable=unused-argument
+        state = get_routing_state()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):  # pylint: disable=unused-argument
+        databases = {DEFAULT_DB_ALIAS, READ_REPLICA_DATABASE}
+        if obj1._state.db in databases and obj2._state.db in databases:  # pylint: disable=protected-access
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):  # pylint: disable=unused-argument
+        return False if db == READ_REPLICA_DATABASE else None
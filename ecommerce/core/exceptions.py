@@ -8,3 +8,7 @@ class SiteConfigurationError(Exception):
 
 class MissingLmsUserIdException(Exception):
     """Exception indicating the user is missing an LMS user id. """
+
+
+class RequestBudgetExceeded(Exception):
+    """ Raised when a request makes more SQL queries, cache calls or HTTP calls than its view's budget allows. """
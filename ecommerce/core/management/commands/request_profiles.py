@@ -0,0 +1,57 @@
+""" Lists and summarizes the saved profiles of requests. """
+
+
+from django.core.management import BaseCommand, CommandError
+
+from ecommerce.core.profiling import get_profile_path, list_profiles, load_profile, summarize_profile
+
+
+class Command(BaseCommand):
+    help = 'List the saved profiles of requests, or summarize the profile of a request.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--request-id',
+                            action='store',
+                            dest='request_id',
+                            type=str,
+                            help='ID of the request whose profile to summarize.')
+        parser.add_argument('--limit',
+                            action='store',
+                            dest='limit',
+                            type=int,
+                            default=10,
+                            help='Number of profiles to list, or of entries in each section of a summary.')
+
+    def handle(self, *args, **options):
+        if options['request_id']:
+            self.summarize(options['request_id'], options['limit'])
+        else:
+            self.list(options['limit'])
+
+    def list(self, limit):
+        for path in list_profiles()[:limit]:
+            profile = load_profile(path)
+            self.stdout.write(
+                '{request_id}  {started_at}  {method} {path}  {status_code}  {duration_ms}ms  '
+                'sql={sql} cache={cache} http={http}'.format(**profile, **profile['counts'])
+            )
+
+    def summarize(self, request_id, limit):
+        try:
+            profile = load_profile(get_profile_path(request_id))
+        except FileNotFoundError as error:
+            raise CommandError('No profile of request [{}] was found.'.format(request_id)) from error
+
+        summary = summarize_profile(profile, limit=limit)
+        self.stdout.write('{method} {path} ({view_name}): {status_code} in {duration_ms}ms, {samples} samples'.format(
+            **profile
+        ))
+        for title, frames in (('Cumulative samples', summary['cumulative']), ('Own samples', summary['own'])):
+            self.stdout.write('\n{}:'.format(title))
+            for frame, count in frames:
+                self.stdout.write('  {:>6}  {}'.format(count, frame))
+
+        for kind, events in sorted(summary['slowest_calls'].items()):
+            self.stdout.write('\nSlowest {} calls:'.format(kind))
+            for event in events:
+                self.stdout.write('  {duration_ms:>10}ms  @{offset_ms}ms  {description}'.format(**event))
@@ -7,6 +7,7 @@ import json
 import logging
 import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from decimal import Decimal as D
 from urllib.parse import urljoin
@@ -14,14 +15,17 @@ from urllib.parse import urljoin
 import requests
 from django.contrib.auth import get_user_model
 from django.core.management.base import BaseCommand, CommandError
-from django.db.models import Q
+from django.db.models import Prefetch, Q
+from django.utils import timezone
 from oscar.core.loading import get_class, get_model
-from requests.exceptions import HTTPError, RequestException
+from requests.exceptions import ConnectionError as ReqConnectionError
+from requests.exceptions import HTTPError, RequestException, Timeout
 
 from ecommerce.extensions.fulfillment.status import ORDER
 
 Basket = get_model('basket', 'Basket')
 CartLine = get_model('basket', 'Line')
+HubspotSyncState = get_model('core', 'HubspotSyncState')
 Order = get_model('order', 'Order')
 OrderLine = get_model('order', 'Line')
 OrderNumberGenerator = get_class('order.utils', 'OrderNumberGenerator')
@@ -174,6 +178,10 @@ PRODUCT = "PRODUCT"
 LINE_ITEM = "LINE_ITEM"
 DEAL = "DEAL"
 BATCH_SIZE = 200
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_RETRY_BACKOFF_SECONDS = 1
+RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
 
 EXPECTED_METHODS = ["GET", "POST", "PUT"]
 
@@ -181,6 +189,10 @@ EXPECTED_METHODS = ["GET", "POST", "PUT"]
 class Command(BaseCommand):
     help = 'Sync Product, Orders and Lines to Hubspot server.'
     initial_sync_days = None
+    incremental = False
+    max_workers = DEFAULT_MAX_WORKERS
+    max_retries = DEFAULT_MAX_RETRIES
+    retry_backoff = DEFAULT_RETRY_BACKOFF_SECONDS
 
     def _get_hubspot_enable_sites(self):
         """
@@ -266,7 +278,8 @@ class Command(BaseCommand):
     def _get_carts_extra_properties(self, cart):
         total_price = D(0.0)
         description = ''
-        lines = cart.all_lines()
+        # Uses the lines prefetched by _prefetch_carts rather than issuing a query per cart.
+        lines = cart.lines.all()
         for line in lines:
             total_price += self._get_cart_line_prices(line, 'price_incl_tax')
             description += self._get_cart_line_information(line)
@@ -303,11 +316,22 @@ class Command(BaseCommand):
             })
         return hubspot_contacts
 
+    def _get_orders_by_basket(self, carts):
+        """
+        Returns a dict mapping basket id to its latest order, fetched in a single query.
+        """
+        orders_by_basket = {}
+        for order in Order.objects.filter(basket__in=carts).select_related('user'):
+            # Orders are sorted by -date_placed so the first one seen matches Order.objects.filter().first().
+            orders_by_basket.setdefault(order.basket_id, order)
+        return orders_by_basket
+
     def _get_hubspot_deal_structure(self, carts, partner):
         """
         Returns list of dicts, each dict represents hubspot DEAL.
         """
         hubspot_deals = []
+        orders_by_basket = self._get_orders_by_basket(carts)
         for cart in carts:
             deal = {
                 'integratorObjectId': str(cart.id),
@@ -317,7 +341,7 @@ class Command(BaseCommand):
             }
             total_price, description = self._get_carts_extra_properties(cart)
             if cart.status == Basket.SUBMITTED:
-                order = Order.objects.filter(basket=cart).first()
+                order = orders_by_basket.get(cart.id)
                 deal['propertyNameToValues'] = {
                     'deal_name': order.number,
                     'total_incl_tax': float(order.total_incl_tax),
@@ -350,10 +374,10 @@ class Command(BaseCommand):
                 'action': 'UPSERT',
                 'changeOccurredTimestamp': self._get_timestamp(),
                 'propertyNameToValues': {
-                    'order_id': str(line.basket.id),
+                    'order_id': str(line.basket_id),
                     'price_currency': str(line.price_currency),
                     'tax': float(line_price_incl_tax - line_price_excl_tax),
-                    'product_id': str(line.product.id),
+                    'product_id': str(line.product_id),
                     'price_incl_tax': float(line_price_incl_tax),
                     'price_excl_tax': float(line_price_excl_tax),
                     'quantity': line.quantity
@@ -382,47 +406,83 @@ class Command(BaseCommand):
             })
         return hubspot_products
 
-    def _upsert_hubspot_objects(self, object_type, objects, site_configuration):
+    def _sync_hubspot_batch(self, object_type, batch, site_configuration):
         """
-        Calls the sync message endpoint on given objects (PRODUCT, DEAL
-        and LINE_ITEM) and each request can has 200 (BATCH_SIZE) objects.
+        Calls the sync message endpoint for a single batch, retrying with exponential
+        backoff when HubSpot throttles the request or is temporarily unavailable.
         """
-        try:
-            total = len(objects)
-            for start in range(0, total, BATCH_SIZE):
-                batch = objects[start:start + BATCH_SIZE]
-                self.stdout.write(
-                    'Syncing {object_type}s batch from {start} to {end} of total: {total} for site {site}'.format(
-                        object_type=object_type,
-                        start=start,
-                        end=start + BATCH_SIZE,
-                        total=total,
-                        site=site_configuration.site.domain
-                    )
-                )
-                self._hubspot_endpoint(
+        attempt = 0
+        while True:
+            try:
+                return self._hubspot_endpoint(
                     object_type,
                     'extensions/ecomm/v1/sync-messages/',
                     'PUT',
                     body=batch,
                     hapikey=site_configuration.hubspot_secret_key
                 )
-                self.stdout.write(
-                    'Successfully synced {object_type}s batch from {start} to {end} of total: '
-                    '{total} for site {site}'.format(
-                        object_type=object_type,
-                        start=start,
-                        end=start + BATCH_SIZE,
-                        total=total,
-                        site=site_configuration.site.domain
-                    )
+            except (HTTPError, ReqConnectionError, Timeout) as ex:
+                response = getattr(ex, 'response', None)
+                if isinstance(ex, HTTPError) and (response is None or
+                                                  response.status_code not in RETRYABLE_STATUS_CODES):
+                    raise
+                if attempt >= self.max_retries:
+                    raise
+                delay = self.retry_backoff * (2 ** attempt)
+                if response is not None and response.headers.get('Retry-After', '').isdigit():
+                    delay = max(delay, int(response.headers['Retry-After']))
+                logger.warning(
+                    'Retrying %s batch for site %s in %s seconds after error: %s',
+                    object_type, site_configuration.site.domain, delay, ex
                 )
+                time.sleep(delay)
+                attempt += 1
+
+    def _upsert_hubspot_objects(self, object_type, objects, site_configuration):
+        """
+        Calls the sync message endpoint on given objects (PRODUCT, DEAL
+        and LINE_ITEM) and each request can has 200 (BATCH_SIZE) objects.
+        Batches are uploaded concurrently by at most max_workers threads.
+
+        Returns True if every batch was synced.
+        """
+        total = len(objects)
+
+        def _sync_batch(start):
+            batch = objects[start:start + BATCH_SIZE]
+            self.stdout.write(
+                'Syncing {object_type}s batch from {start} to {end} of total: {total} for site {site}'.format(
+                    object_type=object_type,
+                    start=start,
+                    end=start + BATCH_SIZE,
+                    total=total,
+                    site=site_configuration.site.domain
+                )
+            )
+            self._sync_hubspot_batch(object_type, batch, site_configuration)
+            self.stdout.write(
+                'Successfully synced {object_type}s batch from {start} to {end} of total: '
+                '{total} for site {site}'.format(
+                    object_type=object_type,
+                    start=start,
+                    end=start + BATCH_SIZE,
+                    total=total,
+                    site=site_configuration.site.domain
+                )
+            )
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                # Consuming the results re-raises the first error encountered by any worker.
+                list(executor.map(_sync_batch, range(0, total, BATCH_SIZE)))
         except (HTTPError, RequestException) as ex:
             self.stderr.write(
                 'An error occurred while upserting {object_type} for site {site}: {message}'.format(
                     object_type=object_type, site=site_configuration.site.domain, message=ex
                 )
             )
+            return False
+        return True
 
     def _call_sync_errors_messages_endpoint(self, site_configuration):
         """
@@ -451,53 +511,122 @@ class Command(BaseCommand):
                 )
             )
 
+    def _prefetch_carts(self, carts):
+        """
+        Attaches everything the HubSpot structures read from a cart so that
+        building them does not issue queries per cart or per line.
+        """
+        return carts.select_related('owner').prefetch_related(
+            Prefetch(
+                'lines',
+                queryset=CartLine.objects.select_related('product', 'product__course').order_by('pk')
+            )
+        )
+
     def _get_unsynced_carts(self, site_configuration):
         carts = Basket.objects.filter(site=site_configuration.site, lines__isnull=False)
         start_date = datetime.now().date() - timedelta(self.initial_sync_days)
         unsynced_carts = carts.filter(
             Q(date_created__date=start_date) | Q(date_submitted__date=start_date)
-        )
+        ).distinct()
         self.stdout.write(
             'Pulled unsynced carts for site {site} from {start_date} and total count is total: {count}'.format(
                 site=site_configuration.site.domain, start_date=start_date, count=unsynced_carts.count()
             )
         )
-        return unsynced_carts
+        return self._prefetch_carts(unsynced_carts)
+
+    def _get_sync_watermark(self, site_configuration):
+        """
+        Returns the time after which changes have not been synced yet for the given site.
+        Sites that were never synced incrementally start initial_sync_days before today.
+        """
+        sync_state = HubspotSyncState.objects.filter(site_configuration=site_configuration).first()
+        if sync_state and sync_state.last_synced_at:
+            return sync_state.last_synced_at
+        return timezone.now() - timedelta(self.initial_sync_days)
+
+    def _get_changed_carts(self, site_configuration, since):
+        """
+        Returns carts of the given site that were created, changed, merged, submitted
+        or whose order changed status after since.
+        """
+        changed_carts = Basket.objects.filter(
+            Q(date_created__gte=since) |
+            Q(date_submitted__gte=since) |
+            Q(date_merged__gte=since) |
+            Q(lines__date_updated__gte=since) |
+            Q(order__status_changes__date_created__gte=since),
+            site=site_configuration.site,
+            lines__isnull=False,
+        ).distinct()
+        self.stdout.write(
+            'Pulled changed carts for site {site} since {since} and total count is total: {count}'.format(
+                site=site_configuration.site.domain, since=since, count=changed_carts.count()
+            )
+        )
+        return self._prefetch_carts(changed_carts)
+
+    def _save_sync_watermark(self, site_configuration, synced_at):
+        HubspotSyncState.objects.update_or_create(
+            site_configuration=site_configuration,
+            defaults={'last_synced_at': synced_at},
+        )
 
     def _sync_data(self, site_configuration):
         """
         Create lists of Order, OrderLine and Product objects and
         call upsert(PUT) sync-messages endpoint for each objects.
+
+        In incremental mode only the changes made since the site's high-water mark
+        are synced, and the mark is moved forward once every object type is synced.
         """
-        unsynced_carts = self._get_unsynced_carts(site_configuration)
+        sync_started_at = timezone.now()
+        since = None
+        if self.incremental:
+            since = self._get_sync_watermark(site_configuration)
+            unsynced_carts = self._get_changed_carts(site_configuration, since)
+        else:
+            unsynced_carts = self._get_unsynced_carts(site_configuration)
         if unsynced_carts:
             # we need to exclude the CartLines without product
             # because product is required in hubspot for LINE_ITEM.
             unsynced_cart_lines = CartLine.objects.filter(basket__in=unsynced_carts).exclude(product=None)
             unsynced_products = Product.objects.filter(basket_lines__in=unsynced_cart_lines)
-            unsynced_users = User.objects.filter(baskets__in=unsynced_carts)
-            self._upsert_hubspot_objects(
-                CONTACT,
-                self._get_hubspot_contact_structure(unsynced_users),
-                site_configuration
-            )
-            self._upsert_hubspot_objects(
-                PRODUCT,
-                self._get_hubspot_product_structure(unsynced_products),
-                site_configuration
-            )
-            self._upsert_hubspot_objects(
-                DEAL,
-                self._get_hubspot_deal_structure(unsynced_carts, site_configuration.partner),
-                site_configuration
-            )
-            self._upsert_hubspot_objects(
-                LINE_ITEM,
-                self._get_hubspot_line_item_structure(unsynced_cart_lines),
-                site_configuration
-            )
+            if since:
+                unsynced_products |= Product.objects.filter(
+                    date_updated__gte=since, basket_lines__basket__site=site_configuration.site
+                )
+            unsynced_products = unsynced_products.select_related('course').distinct()
+            unsynced_users = User.objects.filter(baskets__in=unsynced_carts).distinct()
+            synced = [
+                self._upsert_hubspot_objects(
+                    CONTACT,
+                    self._get_hubspot_contact_structure(unsynced_users),
+                    site_configuration
+                ),
+                self._upsert_hubspot_objects(
+                    PRODUCT,
+                    self._get_hubspot_product_structure(unsynced_products),
+                    site_configuration
+                ),
+                self._upsert_hubspot_objects(
+                    DEAL,
+                    self._get_hubspot_deal_structure(unsynced_carts, site_configuration.partner),
+                    site_configuration
+                ),
+                self._upsert_hubspot_objects(
+                    LINE_ITEM,
+                    self._get_hubspot_line_item_structure(unsynced_cart_lines),
+                    site_configuration
+                ),
+            ]
+            if self.incremental and all(synced):
+                self._save_sync_watermark(site_configuration, sync_started_at)
         else:
             self.stdout.write('No data found to sync for site {site}'.format(site=site_configuration.site.domain))
+            if self.incremental:
+                self._save_sync_watermark(site_configuration, sync_started_at)
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -507,12 +636,35 @@ class Command(BaseCommand):
             type=int,
             help='Number of days before today to start initial sync',
         )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            dest='incremental',
+            help='Sync only the changes made since the last successful incremental sync of each site',
+        )
+        parser.add_argument(
+            '--max-workers',
+            default=DEFAULT_MAX_WORKERS,
+            dest='max_workers',
+            type=int,
+            help='Maximum number of batches uploaded to Hubspot concurrently',
+        )
+        parser.add_argument(
+            '--max-retries',
+            default=DEFAULT_MAX_RETRIES,
+            dest='max_retries',
+            type=int,
+            help='Number of times a throttled or failed batch upload is retried',
+        )
 
     def handle(self, *args, **options):
         """
         Main command handler.
         """
         self.initial_sync_days = options['initial_sync_days']
+        self.incremental = options['incremental']
+        self.max_workers = max(options['max_workers'], 1)
+        self.max_retries = options['max_retries']
         try:
             site_configurations = self._get_hubspot_enable_sites()
             if not site_configurations:
@@ -0,0 +1,66 @@
+"""
+Test the request_profiles management command
+"""
+
+
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import override_settings
+
+from ecommerce.core.profiling import save_profile
+from ecommerce.tests.testcases import TestCase
+
+
+class RequestProfilesCommandTests(TestCase):
+    def setUp(self):
+        super(RequestProfilesCommandTests, self).setUp()
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        settings_override = override_settings(REQUEST_PROFILES_STORAGE={
+            'BACKEND': 'django.core.files.storage.FileSystemStorage', 'OPTIONS': {'location': location}
+        })
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        for request_id in ('first', 'second'):
+            save_profile({
+                'request_id': request_id,
+                'method': 'GET',
+                'path': '/health/',
+                'view_name': 'health',
+                'status_code': 200,
+                'started_at': '2026-01-01T00:00:00',
+                'duration_ms': 12.5,
+                'sampling_interval_ms': 5,
+                'samples': 2,
+                'stacks': {'views.py:health:10;db.py:execute:20': 2},
+                'counts': {'sql': 1, 'cache': 0, 'http': 0},
+                'events': [{'kind': 'sql', 'description': 'SELECT 1', 'offset_ms': 1.0, 'duration_ms': 2.0}],
+            })
+
+    def call_command(self, *args):
+        out = StringIO()
+        call_command('request_profiles', *args, stdout=out)
+        return out.getvalue()
+
+    def test_list(self):
+        output = self.call_command()
+        self.assertIn('first', output)
+        self.assertIn('second', output)
+        self.assertIn('GET /health/  200  12.5ms  sql=1 cache=0 http=0', output)
+        self.assertEqual(len(self.call_command('--limit', '1').splitlines()), 1)
+
+    def test_summarize(self):
+        output = self.call_command('--request-id', 'first')
+        self.assertIn('GET /health/ (health): 200 in 12.5ms, 2 samples', output)
+        self.assertIn('2  db.py:execute:20', output)
+        self.assertIn('Slowest sql calls:', output)
+        self.assertIn('SELECT 1', output)
+
+    def test_summarize_missing(self):
+        with self.assertRaisesRegex(CommandError, 'No profile of request'):
+            self.call_command('--request-id', 'missing')
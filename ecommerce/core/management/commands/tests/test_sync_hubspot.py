@@ -8,8 +8,9 @@ from io import StringIO
 
 from django.core.management import call_command
 from django.core.management.base import CommandError
+from django.utils import timezone
 from factory.django import get_model
-from mock import patch
+from mock import Mock, patch
 from requests.exceptions import HTTPError
 
 from ecommerce.core.management.commands.sync_hubspot import EXPECTED_METHODS
@@ -19,6 +20,7 @@ from ecommerce.tests.factories import SiteConfigurationFactory, UserFactory
 from ecommerce.tests.testcases import TestCase
 
 SiteConfiguration = get_model('core', 'SiteConfiguration')
+HubspotSyncState = get_model('core', 'HubspotSyncState')
 Basket = get_model('basket', 'Basket')
 
 DEFAULT_INITIAL_DAYS = 1
@@ -83,18 +85,21 @@ class TestSyncHubspotCommand(TestCase):
             {'objectType': 'PRODUCT', 'integratorObjectId': '4321', 'details': 'dummy-details-product'},
         ]}
 
-    def _get_command_output(self, is_stderr=False):
+    def _get_command_output(self, *args, is_stderr=False):
         """
         Runs the command and returns the stdout or stderr output of command.
         """
         out = StringIO()
         initial_sync_days_param = '--initial-sync-day=' + str(DEFAULT_INITIAL_DAYS)
         if is_stderr:
-            call_command('sync_hubspot', initial_sync_days_param, stderr=out)
+            call_command('sync_hubspot', initial_sync_days_param, *args, stderr=out)
         else:
-            call_command('sync_hubspot', initial_sync_days_param, stdout=out)
+            call_command('sync_hubspot', initial_sync_days_param, *args, stdout=out)
         return out.getvalue()
 
+    def _get_http_error(self, status_code):
+        return HTTPError(response=Mock(status_code=status_code, headers={}))
+
     @patch.object(sync_command, '_hubspot_endpoint')
     def test_with_no_hubspot_secret_keys(self, mocked_hubspot):
         """
@@ -234,3 +239,66 @@ class TestSyncHubspotCommand(TestCase):
                 api_url="fake_url",
                 method=unsupported_method
             )
+
+    @patch.object(sync_command, '_hubspot_endpoint')
+    def test_incremental_sync_saves_watermark(self, mocked_hubspot):
+        """
+        Test the incremental sync stores the high-water mark and only picks up later changes.
+        """
+        output = self._get_command_output('--incremental')
+        self.assertIn('Pulled changed carts for site', output)
+        # Install, settings, CONTACT, PRODUCT, DEAL, LINE_ITEM and sync-errors.
+        self.assertEqual(mocked_hubspot.call_count, 7)
+        sync_state = HubspotSyncState.objects.get(site_configuration=self.hubspot_site_configuration)
+        self.assertIsNotNone(sync_state.last_synced_at)
+
+        mocked_hubspot.reset_mock()
+        output = self._get_command_output('--incremental')
+        self.assertIn(
+            'No data found to sync for site {site}'.format(site=self.hubspot_site_configuration.site.domain),
+            output
+        )
+        self.assertEqual(mocked_hubspot.call_count, 3)
+
+        sync_state.last_synced_at = timezone.now() - timedelta(days=3)
+        sync_state.save()
+        mocked_hubspot.reset_mock()
+        output = self._get_command_output('--incremental')
+        self.assertIn('total count is total: 2', output)
+
+    @patch.object(sync_command, '_hubspot_endpoint')
+    def test_incremental_sync_keeps_watermark_on_failure(self, mocked_hubspot):
+        """
+        Test the high-water mark is not moved forward when a batch fails to sync.
+        """
+        with patch.object(sync_command, '_install_hubspot_ecommerce_bridge', return_value=True), \
+                patch.object(sync_command, '_define_hubspot_ecommerce_settings', return_value=True):
+            mocked_hubspot.side_effect = HTTPError
+            output = self._get_command_output('--incremental', is_stderr=True)
+            self.assertIn('An error occurred while upserting', output)
+            self.assertFalse(HubspotSyncState.objects.exists())
+
+    @patch('ecommerce.core.management.commands.sync_hubspot.time.sleep')
+    @patch.object(sync_command, '_hubspot_endpoint')
+    def test_sync_batch_retries_throttled_requests(self, mocked_hubspot, mocked_sleep):
+        """
+        Test throttled batches are retried with exponential backoff.
+        """
+        mocked_hubspot.side_effect = [self._get_http_error(429), self._get_http_error(503), {}]
+        command = sync_command()
+        command._sync_hubspot_batch('DEAL', [], self.hubspot_site_configuration)  # pylint: disable=W0212
+        self.assertEqual(mocked_hubspot.call_count, 3)
+        self.assertEqual([call[0][0] for call in mocked_sleep.call_args_list], [1, 2])
+
+    @patch('ecommerce.core.management.commands.sync_hubspot.time.sleep')
+    @patch.object(sync_command, '_hubspot_endpoint')
+    def test_sync_batch_does_not_retry_client_errors(self, mocked_hubspot, mocked_sleep):
+        """
+        Test non retryable errors are raised immediately.
+        """
+        mocked_hubspot.side_effect = self._get_http_error(400)
+        command = sync_command()
+        with self.assertRaises(HTTPError):
+            command._sync_hubspot_batch('DEAL', [], self.hubspot_site_configuration)  # pylint: disable=W0212
+        self.assertEqual(mocked_hubspot.call_count, 1)
+        self.assertFalse(mocked_sleep.called)
@@ -0,0 +1,215 @@
+"""
+Middleware for recording the SQL queries, cache calls and outbound HTTP calls of each request, for profiling
+requests, for routing their reads to the read replica, and for setting their site.
+"""
+
+
+import datetime
+import logging
+import random
+import time
+import uuid
+
+import waffle
+from django.conf import settings
+from edx_django_utils import monitoring as monitoring_utils
+
+from ecommerce.core.constants import ENABLE_REQUEST_PROFILING, READ_REPLICA_PIN_COOKIE_NAME, REQUEST_PROFILING_HEADER
+from ecommerce.core.db_routers import (
+    get_routing_state,
+    is_read_replica_configured,
+    is_read_replica_current,
+    route_request
+)
+from ecommerce.core.exceptions import RequestBudgetExceeded
+from ecommerce.core.profiling import StackSampler, get_request_id, save_profile
+from ecommerce.core.request_metrics import install_instrumentation, record_request_metrics
+from ecommerce.core.site_registry import get_current_site
+
+logger = logging.getLogger(__name__)
+
+
+class RequestBudgetMiddleware:
+    """
+    Middleware that:
+        1) counts the SQL queries, cache calls and outbound HTTP calls of each request, and their durations
+        2) reports them as custom metrics
+        3) checks them against the budget of the view, configured in settings.REQUEST_BUDGETS by view name
+
+    Side effect:
+        If a budget is exceeded, logs a warning and writes a custom metric, or raises RequestBudgetExceeded
+        when settings.REQUEST_BUDGETS_ENFORCED is set, as it is in tests.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        install_instrumentation()
+
+    def __call__(self, request):
+        with record_request_metrics() as metrics:
+            response = self.get_response(request)
+
+        for name, value in metrics.as_custom_metrics().items():
+            monitoring_utils.set_custom_metric(name, value)
+
+        resolver_match = getattr(request, 'resolver_match', None)
+        view_name = resolver_match.view_name if resolver_match else None
+        budget = settings.REQUEST_BUDGETS.get(view_name) if view_name else None
+        exceeded = metrics.exceeded(budget) if budget else None
+        if exceeded:
+            message = 'Request to view [{view_name}] exceeded its budget: {exceeded}'.format(
+                view_name=view_name,
+                exceeded=', '.join(
+                    '{count} {kind} calls, allowed {limit}'.format(kind=kind, count=count, limit=limit)
+                    for kind, (count, limit) in sorted(exceeded.items())
+                )
+            )
+            if settings.REQUEST_BUDGETS_ENFORCED:
+                raise RequestBudgetExceeded(message)
+
+            logger.warning(message)
+            monitoring_utils.set_custom_metric('request_budget_exceeded', ','.join(sorted(exceeded)))
+
+        return response
+
+
+class RequestProfilingMiddleware:
+    """
+    Middleware that profiles requests, saving the profiles to the storage configured by
+    settings.REQUEST_PROFILES_STORAGE keyed by request ID.
+
+    A request is profiled when:
+        1) it is made by a staff user with the X-Ecommerce-Profile header, and the enable_request_profiling waffle
+           flag is active for it, or
+        2) it is sampled, at the rate set in settings.REQUEST_PROFILING_SAMPLE_RATE.
+
+    The user is only checked once the view returned, since API views authenticate their users themselves, e.g. with
+    JWTs. Requests with the header are profiled until then, and their profiles discarded when the check fails.
+
+    The request ID is taken from the X-Request-ID header, or generated, and returned in the X-Request-Profile header
+    of the response. See the request_profiles management command to list and summarize profiles.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        install_instrumentation()
+
+    @staticmethod
+    def is_profiling_allowed(request):
+        """ Returns whether the user of the request may profile it with the X-Ecommerce-Profile header. """
+        user = getattr(request, 'user', None)
+        return bool(user and user.is_staff and waffle.flag_is_active(request, ENABLE_REQUEST_PROFILING))
+
+    def __call__(self, request):
+        requested = bool(request.META.get(REQUEST_PROFILING_HEADER))
+        sampled = random.random() < settings.REQUEST_PROFILING_SAMPLE_RATE
+        if not requested and not sampled:
+            return self.get_response(request)
+
+        request_id = get_request_id(request) or uuid.uuid4().hex
+        sampler = StackSampler(settings.REQUEST_PROFILING_INTERVAL)
+        started_at = datetime.datetime.utcnow()
+        with record_request_metrics(capture_events=True) as metrics:
+            started = time.perf_counter()
+            sampler.start()
+            try:
+                response = self.get_response(request)
+            finally:
+                sampler.stop()
+                duration = time.perf_counter() - started
+
+        if not sampled and not self.is_profiling_allowed(request):
+            return response
+
+        resolver_match = getattr(request, 'resolver_match', None)
+        try:
+            save_profile({
+                'request_id': request_id,
+                'method': request.method,
+                'path': request.path,
+                'view_name': resolver_match.view_name if resolver_match else None,
+                'status_code': response.status_code,
+                'started_at': started_at.isoformat(),
+                'duration_ms': round(duration * 1000, 3),
+                'sampling_interval_ms': settings.REQUEST_PROFILING_INTERVAL * 1000,
+                'samples': sampler.samples,
+                'stacks': dict(sampler.stacks),
+                'counts': metrics.counts,
+                'events': metrics.events,
+            })
+        except Exception:  # pylint: disable=broad-except
+            logger.exception('Failed to save the profile of request [%s].', request_id)
+            return response
+
+        response['X-Request-Profile'] = request_id
+        return response
+
+
+class ReadReplicaMiddleware:
+    """
+    Middleware that sends the reads of safe requests to views opted in with a use_read_replica attribute to the
+    read replica, when one is configured. See ecommerce.core.db_routers.ReadReplicaRouter.
+
+    Reads stay on the primary when:
+        1) the client wrote within the last settings.READ_REPLICA_PIN_SECONDS, so that it reads its own writes.
+           Requests which write set a cookie pinning the client to the primary for that long.
+        2) the read replica is unavailable, or lags behind the primary by more than settings.READ_REPLICA_MAX_LAG.
+        3) the request itself wrote.
+    """
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not is_read_replica_configured():
+            return self.get_response(request)
+
+        with route_request() as state:
+            response = self.get_response(request)
+
+        if state.wrote or request.method not in self.SAFE_METHODS:
+            response.set_cookie(
+                READ_REPLICA_PIN_COOKIE_NAME,
+                '1',
+                max_age=settings.READ_REPLICA_PIN_SECONDS,
+                secure=settings.SESSION_COOKIE_SECURE,
+                httponly=True
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):  # pylint: disable=unused-argument
+        state = get_routing_state()
+        if state is None or request.method not in self.SAFE_METHODS or not self.is_opted_in(view_func):
+            return None
+
+        if request.COOKIES.get(READ_REPLICA_PIN_COOKIE_NAME):
+            database = 'pinned_primary'
+        elif not is_read_replica_current():
+            database = 'lagging_primary'
+        else:
+            database = 'read_replica'
+            state.use_read_replica = True
+
+        monitoring_utils.set_custom_metric('read_database', database)
+        return None
+
+    @staticmethod
+    def is_opted_in(view_func):
+        # Class-based views are opted in on the class, which Django and Django REST Framework attach to the view.
+        view_class = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+        return getattr(view_class or view_func, 'use_read_replica', False)
+
+
+class CurrentSiteMiddleware:
+    """
+    Middleware that sets request.site, like django.contrib.sites.middleware.CurrentSiteMiddleware, but from the
+    per-process site registry, with the configuration and partner of the site already loaded.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.site = get_current_site(request)
+        return self.get_response(request)
@@ -0,0 +1,29 @@
+# Generated by Django 3.2.25 on 2026-10-19 08:28
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django_extensions.db.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0066_remove_account_microfrontend_url_field_from_SiteConfiguration'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HubspotSyncState',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', django_extensions.db.fields.CreationDateTimeField(auto_now_add=True, verbose_name='created')),
+                ('modified', django_extensions.db.fields.ModificationDateTimeField(auto_now=True, verbose_name='modified')),
+                ('last_synced_at', models.DateTimeField(blank=True, help_text='Carts, orders and products changed after this time are picked up by the next sync.', null=True, verbose_name='Last synced at')),
+                ('site_configuration', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='hubspot_sync_state', to='core.siteconfiguration')),
+            ],
+            options={
+                'get_latest_by': 'modified',
+                'abstract': False,
+            },
+        ),
+    ]
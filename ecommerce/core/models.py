@@ -2,14 +2,16 @@ import logging
 from urllib.parse import urljoin, urlsplit
 
 import waffle
-from analytics import Client as SegmentClient
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.contrib.sites.models import Site
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils.functional import cached_property
 from django.utils.translation import ugettext_lazy as _
+from django_extensions.db.models import TimeStampedModel
 from edx_django_utils import monitoring as monitoring_utils
 from edx_rbac.models import UserRole, UserRoleAssignment
 from edx_rest_api_client.client import OAuthAPIClient
@@ -20,10 +22,12 @@ from simple_history.models import HistoricalRecords
 
 from ecommerce.core.constants import ALL_ACCESS_CONTEXT, ALLOW_MISSING_LMS_USER_ID
 from ecommerce.core.exceptions import MissingLmsUserIdException
+from ecommerce.core.site_registry import invalidate_site_registry
 from ecommerce.core.utils import log_message_and_raise_validation_error
+from ecommerce.extensions.analytics.clients import get_segment_client
 from ecommerce.extensions.basket.constants import ENABLE_STRIPE_PAYMENT_PROCESSOR
 from ecommerce.extensions.payment.exceptions import ProcessorNotFoundError
-from ecommerce.extensions.payment.helpers import get_processor_class, get_processor_class_by_name
+from ecommerce.extensions.payment.helpers import get_processor_class_by_name, get_processor_classes
 
 log = logging.getLogger(__name__)
 
@@ -250,7 +254,7 @@ class SiteConfiguration(models.Model):
 
     def _all_payment_processors(self):
         """ Returns all processor classes declared in settings. """
-        all_processors = [get_processor_class(path) for path in settings.PAYMENT_PROCESSORS]
+        all_processors = list(get_processor_classes())
         return all_processors
 
     def get_payment_processors(self):
@@ -307,9 +311,9 @@ class SiteConfiguration(models.Model):
         """
         return self.from_email or settings.OSCAR_FROM_EMAIL
 
-    @cached_property
+    @property
     def segment_client(self):
-        return SegmentClient(self.segment_key, debug=settings.DEBUG, send=settings.SEND_SEGMENT_EVENTS)
+        return get_segment_client(self.segment_key)
 
     def save(self, *args, **kwargs):  # pylint: disable=arguments-differ
         # Clear Site cache upon SiteConfiguration changed
@@ -435,6 +439,41 @@ class SiteConfiguration(models.Model):
         return self.build_lms_url('/api/entitlements/v1/entitlements/')
 
 
+@receiver(post_save, sender=Site)
+@receiver(post_delete, sender=Site)
+@receiver(post_save, sender=SiteConfiguration)
+@receiver(post_delete, sender=SiteConfiguration)
+@receiver(post_save, sender='partner.Partner')
+@receiver(post_delete, sender='partner.Partner')
+def invalidate_site_registry_on_change(sender, **kwargs):  # pylint: disable=unused-argument
+    """Reloads the site registries of all processes when a site, site configuration or partner changes."""
+    invalidate_site_registry()
+
+
+class HubspotSyncState(TimeStampedModel):
+    """
+    High-water mark of the last successful incremental HubSpot sync for a site.
+     .. no_pii:
+    """
+    site_configuration = models.OneToOneField(
+        SiteConfiguration,
+        related_name='hubspot_sync_state',
+        on_delete=models.CASCADE,
+    )
+    last_synced_at = models.DateTimeField(
+        verbose_name=_('Last synced at'),
+        help_text=_('Carts, orders and products changed after this time are picked up by the next sync.'),
+        null=True,
+        blank=True,
+    )
+
+    def __str__(self):
+        return '{site}: {last_synced_at}'.format(
+            site=self.site_configuration.site.domain,
+            last_synced_at=self.last_synced_at,
+        )
+
+
 class User(AbstractUser):
     """
     Custom user model for use with python-social-auth via edx-auth-backends.
@@ -0,0 +1,146 @@
+"""
+On-demand statistical profiling of requests.
+
+Profiles hold the sampled call stacks of the request thread, and its SQL queries, cache calls and outbound HTTP calls
+with their timings. They are saved as JSON to the storage configured by REQUEST_PROFILES_STORAGE, which must not be
+publicly served, keyed by request ID.
+"""
+
+
+import json
+import logging
+import os
+import re
+import sys
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import get_storage_class
+
+logger = logging.getLogger(__name__)
+
+REQUEST_ID_PATTERN = re.compile(r'^[A-Za-z0-9\-_.]{1,64}$')
+MAX_STACK_DEPTH = 100
+
+
+class StackSampler:
+    """
+    Samples the call stack of a thread at a fixed interval, from a background thread.
+
+    Stacks are counted in the collapsed format used by flame graph tools: frames from the outermost to the innermost,
+    separated by semicolons.
+    """
+
+    def __init__(self, interval, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.stacks = Counter()
+        self.samples = 0
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)  # pylint: disable=protected-access
+            if frame is None:
+                return
+            self.stacks[self.format_stack(frame)] += 1
+            self.samples += 1
+
+    @staticmethod
+    def format_stack(frame):
+        frames = []
+        while frame is not None and len(frames) < MAX_STACK_DEPTH:
+            code = frame.f_code
+            frames.append('{}:{}:{}'.format(
+                os.path.relpath(code.co_filename) if code.co_filename.startswith(os.getcwd()) else code.co_filename,
+                code.co_name,
+                frame.f_lineno
+            ))
+            frame = frame.f_back
+        return ';'.join(reversed(frames))
+
+
+def get_request_id(request):
+    """ Returns the ID of the request from its X-Request-ID header, if it is safe to use in a file name. """
+    request_id = request.META.get('HTTP_X_REQUEST_ID', '')
+    return request_id if REQUEST_ID_PATTERN.match(request_id) else None
+
+
+def get_profiles_storage():
+    """ Returns the storage of the profiles. """
+    storage_class = get_storage_class(settings.REQUEST_PROFILES_STORAGE['BACKEND'])
+    return storage_class(**settings.REQUEST_PROFILES_STORAGE.get('OPTIONS', {}))
+
+
+def get_profile_path(request_id):
+    return '{}.json'.format(request_id)
+
+
+def save_profile(profile):
+    """ Saves a profile, returning its path. """
+    storage = get_profiles_storage()
+    path = get_profile_path(profile['request_id'])
+    # A profile of a request sent with the same ID is replaced, as storages would otherwise save the new profile
+    # under another name, where it could not be found by its request ID.
+    storage.delete(path)
+    path = storage.save(path, ContentFile(json.dumps(profile, sort_keys=True).encode('utf-8')))
+    logger.info('Saved profile of request [%s] to [%s].', profile['request_id'], path)
+    return path
+
+
+def list_profiles():
+    """ Returns the paths of the saved profiles, most recent first. """
+    storage = get_profiles_storage()
+    try:
+        __, file_names = storage.listdir('')
+    except FileNotFoundError:
+        return []
+
+    paths = [name for name in file_names if name.endswith('.json')]
+    return sorted(paths, key=storage.get_modified_time, reverse=True)
+
+
+def load_profile(path):
+    with get_profiles_storage().open(path) as profile_file:
+        return json.loads(profile_file.read().decode('utf-8'))
+
+
+def summarize_profile(profile, limit=10):
+    """
+    Summarizes a profile.
+
+    Returns:
+        dict: The functions most often on the stack, by number of samples; the functions most often at the top of the
+            stack, where the time is spent; and the slowest calls of each kind.
+    """
+    cumulative = Counter()
+    own = Counter()
+    for stack, count in profile['stacks'].items():
+        frames = stack.split(';')
+        own[frames[-1]] += count
+        for frame in set(frames):
+            cumulative[frame] += count
+
+    slowest_calls = {}
+    for event in sorted(profile['events'], key=lambda event: event['duration_ms'], reverse=True):
+        calls = slowest_calls.setdefault(event['kind'], [])
+        if len(calls) < limit:
+            calls.append(event)
+
+    return {
+        'cumulative': cumulative.most_common(limit),
+        'own': own.most_common(limit),
+        'slowest_calls': slowest_calls,
+    }
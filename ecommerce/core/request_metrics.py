@@ -0,0 +1,187 @@
+"""
+Instrumentation counting the SQL queries, cache calls and outbound HTTP calls made while handling a request.
+
+Counts are only recorded inside record_request_metrics(), which RequestBudgetMiddleware wraps around every request.
+"""
+
+
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from functools import wraps
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+
+SQL = 'sql'
+CACHE = 'cache'
+HTTP = 'http'
+
+# Cache methods which make a round-trip to the cache. Methods implemented by calling these, such as get_or_set, are
+# not instrumented separately.
+INSTRUMENTED_CACHE_METHODS = (
+    'add', 'get', 'set', 'touch', 'delete', 'get_many', 'set_many', 'delete_many', 'incr', 'decr', 'clear',
+)
+
+_local = threading.local()
+_install_lock = threading.Lock()
+_installed = False
+
+
+class RequestMetrics:
+    """
+    Counts and total durations, in seconds, of the SQL queries, cache calls and HTTP calls of a request.
+
+    When capturing events, each call is also kept, with a description, its start relative to the creation of the
+    metrics and its duration.
+    """
+
+    KINDS = (SQL, CACHE, HTTP)
+    MAX_DESCRIPTION_LENGTH = 1000
+
+    def __init__(self, capture_events=False):
+        self.counts = dict.fromkeys(self.KINDS, 0)
+        self.durations = dict.fromkeys(self.KINDS, 0.0)
+        self.events = [] if capture_events else None
+        self.created = time.perf_counter()
+
+    def record(self, kind, duration, description=None):
+        self.counts[kind] += 1
+        self.durations[kind] += duration
+        if self.events is not None:
+            self.events.append({
+                'kind': kind,
+                'description': str(description)[:self.MAX_DESCRIPTION_LENGTH] if description else None,
+                'offset_ms': round((time.perf_counter() - duration - self.created) * 1000, 3),
+                'duration_ms': round(duration * 1000, 3),
+            })
+
+    def exceeded(self, budget):
+        """
+        Returns the kinds of calls made more often than allowed by the given budget, which maps kinds to counts.
+        """
+        return {
+            kind: (self.counts[kind], limit) for kind, limit in budget.items()
+            if limit is not None and self.counts[kind] > limit
+        }
+
+    def as_custom_metrics(self):
+        metrics = {}
+        for kind in self.KINDS:
+            metrics['request_{}_calls'.format(kind)] = self.counts[kind]
+            metrics['request_{}_duration_ms'.format(kind)] = round(self.durations[kind] * 1000, 3)
+        return metrics
+
+
+def _active_metrics():
+    return getattr(_local, 'metrics', [])
+
+
+def _record(kind, started, description):
+    duration = time.perf_counter() - started
+    for metrics in _active_metrics():
+        metrics.record(kind, duration, description)
+
+
+def _sql_execute_wrapper(execute, sql, params, many, context):
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        _record(SQL, started, sql)
+
+
+def _instrument_cache_method(method):
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        # Only count the outermost call, as backends implement some methods by calling others.
+        if getattr(_local, 'in_cache_call', False) or not _active_metrics():
+            return method(*args, **kwargs)
+
+        _local.in_cache_call = True
+        started = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            _local.in_cache_call = False
+            # The first argument after the backend is the key, or keys, of the call.
+            _record(CACHE, started, ' '.join([method.__name__] + [str(arg) for arg in args[1:2]]))
+
+    wrapper.request_metrics_instrumented = True
+    return wrapper
+
+
+def _instrument_http_send(send):
+    @wraps(send)
+    def wrapper(session, request, **kwargs):
+        if not _active_metrics():
+            return send(session, request, **kwargs)
+
+        started = time.perf_counter()
+        try:
+            return send(session, request, **kwargs)
+        finally:
+            # Query strings are left out of the description, as they may hold credentials or personal data.
+            url = urlsplit(request.url)._replace(query='', fragment='').geturl()
+            _record(HTTP, started, '{} {}'.format(request.method, url))
+
+    wrapper.request_metrics_instrumented = True
+    return wrapper
+
+
+def install_instrumentation():
+    """
+    Instruments the configured cache backends and outbound HTTP calls.
+
+    All HTTP calls made with requests are counted, including those of the OAuth API clients and of the payment
+    processor SDKs built on it. SQL queries are instrumented per connection by record_request_metrics().
+    """
+    global _installed  # pylint: disable=global-statement
+    if _installed:
+        return
+
+    with _install_lock:
+        if _installed:
+            return
+
+        backend_classes = {type(caches[alias]) for alias in settings.CACHES}
+        for backend_class in backend_classes:
+            for name in INSTRUMENTED_CACHE_METHODS:
+                method = getattr(backend_class, name)
+                if not getattr(method, 'request_metrics_instrumented', False):
+                    setattr(backend_class, name, _instrument_cache_method(method))
+
+        if not getattr(requests.Session.send, 'request_metrics_instrumented', False):
+            requests.Session.send = _instrument_http_send(requests.Session.send)
+
+        _installed = True
+
+
+@contextmanager
+def record_request_metrics(capture_events=False):
+    """
+    Records the SQL queries, cache calls and outbound HTTP calls made by the current thread within the block.
+
+    Arguments:
+        capture_events (bool): Whether to keep each call, in addition to the counts and durations.
+
+    Example:
+        with record_request_metrics() as metrics:
+            handle_request()
+        print(metrics.counts)
+    """
+    install_instrumentation()
+    metrics = RequestMetrics(capture_events=capture_events)
+    active_metrics = _active_metrics()
+    _local.metrics = active_metrics + [metrics]
+    try:
+        with ExitStack() as stack:
+            # Queries are recorded for every active block, so only the outermost block wraps the connections.
+            for connection in ([] if active_metrics else connections.all()):
+                stack.enter_context(connection.execute_wrapper(_sql_execute_wrapper))
+            yield metrics
+    finally:
+        _local.metrics = active_metrics
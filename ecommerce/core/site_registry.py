@@ -0,0 +1,64 @@
+"""
+Per-process registry of the sites served, loaded with their configuration and partner.
+
+Django caches sites per process, and only clears the cache of the process saving a site configuration. The registry
+instead versions its entries with a token in the shared cache, which is replaced whenever a site, site configuration
+or partner is saved or deleted, so that every process reloads them. Properties derived from a site configuration,
+such as its API URLs, are computed once per version.
+"""
+
+
+from django.conf import settings
+from django.contrib.sites.models import Site
+from django.http.request import split_domain_port
+
+from ecommerce.core.utils import get_cache_version, invalidate_cache_versions
+
+SITE_REGISTRY_VERSION_CACHE_KEY = 'site_registry_version'
+
+_sites = {}
+
+
+def get_site_registry_version():
+    """ Returns the current version of the site registry. """
+    return get_cache_version(SITE_REGISTRY_VERSION_CACHE_KEY)
+
+
+def invalidate_site_registry():
+    """ Makes every process reload the sites of its registry, see invalidate_cache_versions. """
+    invalidate_cache_versions([SITE_REGISTRY_VERSION_CACHE_KEY])
+
+
+def _load_site(**filters):
+    return Site.objects.select_related('siteconfiguration__partner').get(**filters)
+
+
+def get_current_site(request):
+    """
+    Returns the site of the request, with its configuration and partner.
+
+    Like Site.objects.get_current, the site is the one identified by the SITE_ID setting if it is set, and the one
+    matching the host of the request otherwise.
+
+    Raises:
+        Site.DoesNotExist: If no site matches.
+    """
+    version = get_site_registry_version()
+    site_id = getattr(settings, 'SITE_ID', '')
+    key = site_id or request.get_host()
+
+    entry = _sites.get(key)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+
+    if site_id:
+        site = _load_site(pk=site_id)
+    else:
+        try:
+            site = _load_site(domain__iexact=key)
+        except Site.DoesNotExist:
+            domain, __ = split_domain_port(key)
+            site = _load_site(domain__iexact=domain)
+
+    _sites[key] = (version, site)
+    return site
@@ -0,0 +1,31 @@
+
+
+from django.core.cache import cache
+
+from ecommerce.core.utils import get_cache_version, get_cache_versions, invalidate_cache_versions
+from ecommerce.tests.testcases import TestCase
+
+
+class CacheVersionTests(TestCase):
+    """ Tests for the versions of cached data. """
+
+    def test_get_cache_versions(self):
+        """ Verify versions are created for keys missing one, and kept until invalidated. """
+        versions = get_cache_versions(['first', 'second'])
+        self.assertNotEqual(versions['first'], versions['second'])
+        self.assertEqual(get_cache_versions(['first', 'second']), versions)
+        self.assertEqual(get_cache_version('first'), versions['first'])
+
+        invalidate_cache_versions(['first'])
+        self.assertNotEqual(get_cache_version('first'), versions['first'])
+        self.assertEqual(get_cache_version('second'), versions['second'])
+
+    def test_invalidate_cache_versions_on_commit(self):
+        """ Verify versions read before the transaction commits are invalidated once it does. """
+        version = get_cache_version('key')
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_cache_versions(['key'])
+            read_version = get_cache_version('key')
+            self.assertNotEqual(read_version, version)
+        self.assertIsNone(cache.get('key'))
+        self.assertNotEqual(get_cache_version('key'), read_version)
@@ -0,0 +1,88 @@
+from django.db import DEFAULT_DB_ALIAS, DatabaseError
+from django.test import override_settings
+from edx_django_utils.cache import TieredCache
+from mock import MagicMock, patch
+from oscar.core.loading import get_model
+
+from ecommerce.core.constants import READ_REPLICA_DATABASE
+from ecommerce.core.db_routers import (
+    ReadReplicaRouter,
+    get_read_replica_lag,
+    get_routing_state,
+    is_read_replica_current,
+    route_request
+)
+from ecommerce.tests.testcases import TestCase
+
+Order = get_model('order', 'Order')
+
+
+class ReadReplicaRouterTests(TestCase):
+    """ Tests for ReadReplicaRouter. """
+
+    def setUp(self):
+        super(ReadReplicaRouterTests, self).setUp()
+        self.router = ReadReplicaRouter()
+
+    def test_outside_requests(self):
+        """ Verify queries outside of requests are routed as if there were no router, except writes. """
+        self.assertIsNone(get_routing_state())
+        self.assertIsNone(self.router.db_for_read(Order))
+        self.assertEqual(self.router.db_for_write(Order), DEFAULT_DB_ALIAS)
+
+    def test_read_replica(self):
+        """ Verify reads go to the read replica when allowed, until the request writes. """
+        with route_request() as state:
+            self.assertIsNone(self.router.db_for_read(Order))
+
+            state.use_read_replica = True
+            self.assertEqual(self.router.db_for_read(Order), READ_REPLICA_DATABASE)
+
+            self.assertEqual(self.router.db_for_write(Order), DEFAULT_DB_ALIAS)
+            self.assertTrue(state.wrote)
+            self.assertEqual(self.router.db_for_read(Order), DEFAULT_DB_ALIAS)
+
+        self.assertIsNone(get_routing_state())
+
+    def test_allow_migrate(self):
+        self.assertFalse(self.router.allow_migrate(READ_REPLICA_DATABASE, 'order'))
+        self.assertIsNone(self.router.allow_migrate(DEFAULT_DB_ALIAS, 'order'))
+
+
+class ReadReplicaLagTests(TestCase):
+    """ Tests for the replication lag checks. """
+
+    def mock_connection(self, vendor='mysql', row=(3,), error=None):
+        connection = MagicMock(vendor=vendor)
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.description = (('Seconds_Behind_Master',),)
+        cursor.fetchone.return_value = row
+        cursor.execute.side_effect = error
+        return patch('ecommerce.core.db_routers.connections', {READ_REPLICA_DATABASE: connection})
+
+    def test_lag_cached(self):
+        """ Verify the lag is read from the replica, and cached. """
+        with self.mock_connection() as connections:
+            self.assertEqual(get_read_replica_lag(), 3)
+            self.assertEqual(get_read_replica_lag(), 3)
+        self.assertEqual(connections[READ_REPLICA_DATABASE].cursor.call_count, 1)
+
+    def test_lag_unknown(self):
+        """ Verify the lag is None when the replica is unavailable or not replicating. """
+        with self.mock_connection(row=(None,)):
+            self.assertIsNone(get_read_replica_lag())
+
+        TieredCache.dangerous_clear_all_tiers()
+        with self.mock_connection(error=DatabaseError):
+            self.assertIsNone(get_read_replica_lag())
+
+    def test_lag_not_checked(self):
+        with self.mock_connection(vendor='postgresql') as connections:
+            self.assertEqual(get_read_replica_lag(), 0)
+        connections[READ_REPLICA_DATABASE].cursor.assert_not_called()
+
+    @override_settings(READ_REPLICA_MAX_LAG=5)
+    def test_is_read_replica_current(self):
+        for lag, expected in ((None, False), (0, True), (5, True), (6, False)):
+            with patch('ecommerce.core.db_routers.get_read_replica_lag', return_value=lag):
+                self.assertEqual(is_read_replica_current(), expected)
@@ -0,0 +1,265 @@
+import shutil
+import tempfile
+import time
+
+import ddt
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sites.models import Site
+from django.db import DEFAULT_DB_ALIAS
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.urls import resolve, reverse
+from mock import Mock, patch
+from oscar.core.loading import get_model
+from testfixtures import LogCapture
+from waffle.testutils import override_flag
+
+from ecommerce.core.constants import ENABLE_REQUEST_PROFILING, READ_REPLICA_DATABASE, READ_REPLICA_PIN_COOKIE_NAME
+from ecommerce.core.db_routers import ReadReplicaRouter
+from ecommerce.core.exceptions import RequestBudgetExceeded
+from ecommerce.core.middleware import (
+    CurrentSiteMiddleware,
+    ReadReplicaMiddleware,
+    RequestBudgetMiddleware,
+    RequestProfilingMiddleware
+)
+from ecommerce.core.profiling import list_profiles, load_profile
+from ecommerce.tests.testcases import TestCase
+
+LOGGER_NAME = 'ecommerce.core.middleware'
+
+Order = get_model('order', 'Order')
+
+
+class RequestBudgetMiddlewareTests(TestCase):
+    """ Tests for RequestBudgetMiddleware. """
+    path = reverse('health')
+
+    def test_custom_metrics(self):
+        """ Verify the counts and durations of the calls of the request are reported as custom metrics. """
+        with patch('ecommerce.core.middleware.monitoring_utils.set_custom_metric') as mock_set_custom_metric:
+            self.client.get(self.path)
+
+        metrics = {call[0][0]: call[0][1] for call in mock_set_custom_metric.call_args_list}
+        self.assertGreater(metrics['request_sql_calls'], 0)
+        self.assertIn('request_sql_duration_ms', metrics)
+        self.assertEqual(metrics['request_http_calls'], 0)
+        self.assertNotIn('request_budget_exceeded', metrics)
+
+    @override_settings(REQUEST_BUDGETS={'health': {'sql': 0}}, REQUEST_BUDGETS_ENFORCED=False)
+    def test_budget_exceeded(self):
+        """ Verify requests exceeding their view's budget are logged and reported. """
+        with patch('ecommerce.core.middleware.monitoring_utils.set_custom_metric') as mock_set_custom_metric:
+            with LogCapture(LOGGER_NAME) as logger:
+                response = self.client.get(self.path)
+                self.assertEqual(logger.records[0].levelname, 'WARNING')
+                self.assertIn('Request to view [health] exceeded its budget', logger.records[0].getMessage())
+
+        self.assertEqual(response.status_code, 200)
+        mock_set_custom_metric.assert_any_call('request_budget_exceeded', 'sql')
+
+    @override_settings(REQUEST_BUDGETS={'health': {'sql': 0}}, REQUEST_BUDGETS_ENFORCED=True)
+    def test_budget_enforced(self):
+        """ Verify requests exceeding their view's budget fail when budgets are enforced. """
+        request = RequestFactory().get(self.path)
+        request.resolver_match = resolve(self.path)
+
+        def get_response(request):  # pylint: disable=unused-argument
+            list(Site.objects.all())
+            return HttpResponse()
+
+        with self.assertRaisesRegex(RequestBudgetExceeded, '1 sql calls, allowed 0'):
+            RequestBudgetMiddleware(get_response)(request)
+
+    @override_settings(REQUEST_BUDGETS={'health': {'sql': 1000, 'cache': 1000, 'http': 0}})
+    def test_within_budget(self):
+        self.assertEqual(self.client.get(self.path).status_code, 200)
+
+
+@ddt.ddt
+class RequestProfilingMiddlewareTests(TestCase):
+    """ Tests for RequestProfilingMiddleware. """
+    path = reverse('health')
+
+    def setUp(self):
+        super(RequestProfilingMiddlewareTests, self).setUp()
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        settings_override = override_settings(
+            REQUEST_PROFILES_STORAGE={
+                'BACKEND': 'django.core.files.storage.FileSystemStorage', 'OPTIONS': {'location': location}
+            },
+            REQUEST_PROFILING_INTERVAL=0.001
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def get_response(self, request):  # pylint: disable=unused-argument
+        list(Site.objects.all())
+        time.sleep(0.01)
+        return HttpResponse()
+
+    def profile_request(self, user, **headers):
+        request = RequestFactory().get(self.path, **headers)
+        request.user = user
+        request.resolver_match = resolve(self.path)
+        return RequestProfilingMiddleware(self.get_response)(request)
+
+    def test_staff_header(self):
+        """ Verify staff requests with the profiling header are profiled when the flag is active. """
+        user = self.create_user(is_staff=True)
+        with override_flag(ENABLE_REQUEST_PROFILING, active=True):
+            response = self.profile_request(user, HTTP_X_ECOMMERCE_PROFILE='1', HTTP_X_REQUEST_ID='abc-123')
+
+        self.assertEqual(response['X-Request-Profile'], 'abc-123')
+        self.assertEqual(list_profiles(), ['abc-123.json'])
+
+        profile = load_profile('abc-123.json')
+        self.assertEqual(profile['view_name'], 'health')
+        self.assertEqual(profile['status_code'], 200)
+        self.assertEqual(profile['counts']['sql'], 1)
+        self.assertEqual(profile['events'][0]['kind'], 'sql')
+        self.assertIn('django_site', profile['events'][0]['description'])
+        self.assertGreater(profile['samples'], 0)
+        self.assertTrue(any('get_response' in stack for stack in profile['stacks']))
+
+    def test_repeated_request_id(self):
+        """ Verify the profile of a request sent with the ID of a profiled request replaces its profile. """
+        user = self.create_user(is_staff=True)
+        with override_flag(ENABLE_REQUEST_PROFILING, active=True):
+            self.profile_request(user, HTTP_X_ECOMMERCE_PROFILE='1', HTTP_X_REQUEST_ID='abc-123')
+            started_at = load_profile('abc-123.json')['started_at']
+            self.profile_request(user, HTTP_X_ECOMMERCE_PROFILE='1', HTTP_X_REQUEST_ID='abc-123')
+
+        self.assertEqual(list_profiles(), ['abc-123.json'])
+        self.assertGreater(load_profile('abc-123.json')['started_at'], started_at)
+
+    def test_user_authenticated_by_view(self):
+        """ Verify requests are profiled when the view authenticates the staff user, as API views do. """
+        user = self.create_user(is_staff=True)
+
+        def get_response(request):
+            request.user = user
+            return HttpResponse()
+
+        request = RequestFactory().get(self.path, HTTP_X_ECOMMERCE_PROFILE='1', HTTP_X_REQUEST_ID='abc-123')
+        request.user = AnonymousUser()
+        with override_flag(ENABLE_REQUEST_PROFILING, active=True):
+            response = RequestProfilingMiddleware(get_response)(request)
+
+        self.assertEqual(response['X-Request-Profile'], 'abc-123')
+        self.assertEqual(list_profiles(), ['abc-123.json'])
+
+    def test_save_failure(self):
+        """ Verify the response is returned when the profile cannot be saved. """
+        user = self.create_user(is_staff=True)
+        with override_flag(ENABLE_REQUEST_PROFILING, active=True):
+            with patch('ecommerce.core.middleware.save_profile', side_effect=OSError):
+                with LogCapture(LOGGER_NAME) as log_capture:
+                    response = self.profile_request(user, HTTP_X_ECOMMERCE_PROFILE='1', HTTP_X_REQUEST_ID='abc-123')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Request-Profile', response)
+        log_capture.check((LOGGER_NAME, 'ERROR', 'Failed to save the profile of request [abc-123].'))
+
+    @ddt.data(
+        (True, False, True),
+        (True, True, False),
+        (False, True, True),
+    )
+    @ddt.unpack
+    def test_not_profiled(self, is_staff, header, flag_active):
+        """ Verify requests are not profiled unless made by staff with the header, and the flag is active. """
+        headers = {'HTTP_X_ECOMMERCE_PROFILE': '1'} if header else {}
+        with override_flag(ENABLE_REQUEST_PROFILING, active=flag_active):
+            response = self.profile_request(self.create_user(is_staff=is_staff), **headers)
+
+        self.assertNotIn('X-Request-Profile', response)
+        self.assertEqual(list_profiles(), [])
+
+    @override_settings(REQUEST_PROFILING_SAMPLE_RATE=1.0)
+    def test_sampled(self):
+        """ Verify sampled requests are profiled, with a generated request ID when none is sent. """
+        response = self.profile_request(AnonymousUser(), HTTP_X_REQUEST_ID='../invalid')
+
+        request_id = response['X-Request-Profile']
+        self.assertRegex(request_id, '^[0-9a-f]{32}$')
+        self.assertEqual(list_profiles(), ['{}.json'.format(request_id)])
+
+
+@patch('ecommerce.core.middleware.is_read_replica_configured', Mock(return_value=True))
+@patch('ecommerce.core.middleware.is_read_replica_current', Mock(return_value=True))
+class ReadReplicaMiddlewareTests(TestCase):
+    """ Tests for ReadReplicaMiddleware. """
+    path = reverse('api:v2:order-list')
+
+    def setUp(self):
+        super(ReadReplicaMiddlewareTests, self).setUp()
+        self.router = ReadReplicaRouter()
+        self.databases_read = []
+
+    def call_middleware(self, request, write=False):
+        def get_response(request):
+            middleware.process_view(request, request.resolver_match.func, (), {})
+            if write:
+                self.router.db_for_write(Order)
+            self.databases_read.append(self.router.db_for_read(Order))
+            return HttpResponse()
+
+        request.resolver_match = resolve(request.path)
+        middleware = ReadReplicaMiddleware(get_response)
+        return middleware(request)
+
+    def test_read_replica(self):
+        """ Verify safe requests to opted-in views read from the read replica. """
+        response = self.call_middleware(RequestFactory().get(self.path))
+        self.assertEqual(self.databases_read, [READ_REPLICA_DATABASE])
+        self.assertNotIn(READ_REPLICA_PIN_COOKIE_NAME, response.cookies)
+
+    def test_not_opted_in(self):
+        self.call_middleware(RequestFactory().get(reverse('health')))
+        self.assertEqual(self.databases_read, [None])
+
+    def test_write(self):
+        """ Verify requests which write read their writes from the primary, and pin the client to it. """
+        response = self.call_middleware(RequestFactory().get(self.path), write=True)
+        self.assertEqual(self.databases_read, [DEFAULT_DB_ALIAS])
+        self.assertEqual(response.cookies[READ_REPLICA_PIN_COOKIE_NAME]['max-age'], 15)
+
+        response = self.call_middleware(RequestFactory().post(self.path))
+        self.assertEqual(self.databases_read[-1], None)
+        self.assertIn(READ_REPLICA_PIN_COOKIE_NAME, response.cookies)
+
+    def test_pinned(self):
+        """ Verify clients which recently wrote read from the primary. """
+        request = RequestFactory().get(self.path)
+        request.COOKIES[READ_REPLICA_PIN_COOKIE_NAME] = '1'
+        self.call_middleware(request)
+        self.assertEqual(self.databases_read, [None])
+
+    def test_lagging(self):
+        """ Verify reads stay on the primary while the read replica lags. """
+        with patch('ecommerce.core.middleware.is_read_replica_current', return_value=False):
+            self.call_middleware(RequestFactory().get(self.path))
+        self.assertEqual(self.databases_read, [None])
+
+    def test_not_configured(self):
+        with patch('ecommerce.core.middleware.is_read_replica_configured', return_value=False):
+            response = self.call_middleware(RequestFactory().post(self.path))
+        self.assertEqual(self.databases_read, [None])
+        self.assertNotIn(READ_REPLICA_PIN_COOKIE_NAME, response.cookies)
+
+
+class CurrentSiteMiddlewareTests(TestCase):
+    """ Tests for CurrentSiteMiddleware. """
+
+    def test_site(self):
+        """ Verify the site of the request is set, with its configuration and partner. """
+        request = RequestFactory().get('/')
+        CurrentSiteMiddleware(lambda request: HttpResponse())(request)
+        self.assertEqual(request.site, self.site)
+
+        request = RequestFactory().get('/')
+        with self.assertNumQueries(0):
+            CurrentSiteMiddleware(lambda request: HttpResponse())(request)
+            self.assertEqual(request.site.siteconfiguration.partner, self.partner)
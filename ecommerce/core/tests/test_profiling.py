@@ -0,0 +1,54 @@
+import time
+
+from django.test import RequestFactory
+
+from ecommerce.core.profiling import StackSampler, get_request_id, summarize_profile
+from ecommerce.tests.testcases import TestCase
+
+
+def busy_wait(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class StackSamplerTests(TestCase):
+    def test_samples(self):
+        """ Verify the stacks of the sampled thread are counted in the collapsed format. """
+        sampler = StackSampler(0.001)
+        sampler.start()
+        busy_wait(0.05)
+        sampler.stop()
+
+        self.assertGreater(sampler.samples, 0)
+        self.assertEqual(sum(sampler.stacks.values()), sampler.samples)
+        stack = sampler.stacks.most_common(1)[0][0]
+        self.assertIn(':test_samples:', stack)
+        self.assertIn(':busy_wait:', stack.split(';')[-1])
+
+
+class ProfilingTests(TestCase):
+    def test_get_request_id(self):
+        """ Verify request IDs are only used when they are safe to use in a file name. """
+        factory = RequestFactory()
+        self.assertEqual(get_request_id(factory.get('/', HTTP_X_REQUEST_ID='abc-123')), 'abc-123')
+        self.assertIsNone(get_request_id(factory.get('/', HTTP_X_REQUEST_ID='../abc')))
+        self.assertIsNone(get_request_id(factory.get('/')))
+
+    def test_summarize_profile(self):
+        profile = {
+            'stacks': {'a;b': 3, 'a;c;a': 2, 'a': 1},
+            'events': [
+                {'kind': 'sql', 'description': 'SELECT 1', 'offset_ms': 0, 'duration_ms': 1},
+                {'kind': 'sql', 'description': 'SELECT 2', 'offset_ms': 1, 'duration_ms': 5},
+                {'kind': 'http', 'description': 'GET /', 'offset_ms': 6, 'duration_ms': 3},
+            ],
+        }
+
+        summary = summarize_profile(profile, limit=1)
+        self.assertEqual(summary['cumulative'], [('a', 6)])
+        self.assertEqual(summary['own'], [('b', 3)])
+        self.assertEqual(
+            {kind: [event['description'] for event in events] for kind, events in summary['slowest_calls'].items()},
+            {'sql': ['SELECT 2'], 'http': ['GET /']}
+        )
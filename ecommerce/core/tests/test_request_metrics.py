@@ -0,0 +1,68 @@
+import requests
+import responses
+from django.contrib.sites.models import Site
+from django.core.cache import cache
+
+from ecommerce.core.request_metrics import record_request_metrics
+from ecommerce.tests.mixins import RequestBudgetMixin
+from ecommerce.tests.testcases import TestCase
+
+
+class RecordRequestMetricsTests(RequestBudgetMixin, TestCase):
+    """ Tests for record_request_metrics. """
+
+    @responses.activate
+    def test_record_request_metrics(self):
+        """ Verify SQL queries, cache calls and HTTP calls made within the block are counted. """
+        responses.add(responses.GET, 'http://example.com/', json={})
+
+        with record_request_metrics() as metrics:
+            list(Site.objects.all())
+            cache.set('key', 'value')
+            cache.get_or_set('other-key', 'value')
+            requests.get('http://example.com/')
+
+        # get_or_set makes three round-trips: get, add and get.
+        self.assertEqual(metrics.counts, {'sql': 1, 'cache': 4, 'http': 1})
+        self.assertTrue(all(duration >= 0 for duration in metrics.durations.values()))
+
+        # Calls made outside of the block are not counted.
+        cache.get('key')
+        self.assertEqual(metrics.counts['cache'], 4)
+
+    @responses.activate
+    def test_http_event_description(self):
+        """ Verify query strings are left out of the descriptions of HTTP calls. """
+        responses.add(responses.GET, 'http://example.com/api/', json={})
+
+        with record_request_metrics(capture_events=True) as metrics:
+            requests.get('http://example.com/api/?username=edx&token=secret')
+
+        self.assertEqual(metrics.events[0]['description'], 'GET http://example.com/api/')
+
+    def test_nested_blocks(self):
+        """ Verify calls are counted by every enclosing block, once. """
+        with record_request_metrics() as outer:
+            list(Site.objects.all())
+            with record_request_metrics() as inner:
+                list(Site.objects.all())
+
+        self.assertEqual(outer.counts['sql'], 2)
+        self.assertEqual(inner.counts['sql'], 1)
+
+    def test_exceeded(self):
+        with record_request_metrics() as metrics:
+            list(Site.objects.all())
+            cache.get('key')
+
+        self.assertEqual(metrics.exceeded({'sql': 0, 'cache': 1, 'http': None}), {'sql': (1, 0)})
+        self.assertEqual(metrics.as_custom_metrics()['request_sql_calls'], 1)
+
+    def test_assert_within_budget(self):
+        with self.assertWithinBudget(sql=1, http=0):
+            list(Site.objects.all())
+
+        with self.assertRaisesRegex(AssertionError, '2 sql calls, allowed 1'):
+            with self.assertWithinBudget(sql=1):
+                list(Site.objects.all())
+                list(Site.objects.all())
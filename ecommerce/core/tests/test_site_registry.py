@@ -0,0 +1,47 @@
+from django.test import RequestFactory, override_settings
+
+from ecommerce.core.site_registry import get_current_site, get_site_registry_version
+from ecommerce.tests.factories import SiteConfigurationFactory
+from ecommerce.tests.testcases import TestCase
+
+
+class SiteRegistryTests(TestCase):
+    """ Tests for the site registry. """
+
+    def test_get_current_site(self):
+        """ Verify the site is loaded with its configuration and partner once per version of the registry. """
+        request = RequestFactory().get('/')
+        site = get_current_site(request)
+        self.assertEqual(site, self.site)
+
+        with self.assertNumQueries(0):
+            self.assertIs(get_current_site(request), site)
+            self.assertEqual(site.siteconfiguration.partner, self.partner)
+
+    def test_invalidated_on_change(self):
+        """ Verify the registry is reloaded when a site configuration or partner is saved. """
+        request = RequestFactory().get('/')
+        version = get_site_registry_version()
+        get_current_site(request)
+
+        self.site_configuration.utm_cookie_name = 'test.utm'
+        self.site_configuration.save()
+        self.assertNotEqual(get_site_registry_version(), version)
+        self.assertEqual(get_current_site(request).siteconfiguration.utm_cookie_name, 'test.utm')
+
+        version = get_site_registry_version()
+        self.partner.name = 'Test partner'
+        self.partner.save()
+        self.assertNotEqual(get_site_registry_version(), version)
+        self.assertEqual(get_current_site(request).siteconfiguration.partner.name, 'Test partner')
+
+    @override_settings(SITE_ID='')
+    def test_get_current_site_by_host(self):
+        """ Verify sites are matched by the host of the request, with or without its port, without SITE_ID. """
+        other_site = SiteConfigurationFactory(site__domain='other.fake', partner__short_code='other').site
+
+        self.assertEqual(get_current_site(RequestFactory(SERVER_NAME=self.site.domain).get('/')), self.site)
+        self.assertEqual(get_current_site(RequestFactory(SERVER_NAME='other.fake').get('/')), other_site)
+        self.assertEqual(
+            get_current_site(RequestFactory(SERVER_NAME='other.fake', SERVER_PORT='8002').get('/')), other_site
+        )
@@ -1,13 +1,19 @@
 
 
 import logging
+import uuid
+from functools import partial
 from urllib.parse import parse_qs, urlparse
 
 import waffle
 from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
+from django.db import transaction
 from edx_django_utils.cache import get_cache_key as get_django_cache_key
 
+from ecommerce.core.constants import READ_REPLICA_DATABASE
+
 logger = logging.getLogger(__name__)
 
 
@@ -32,6 +38,40 @@ def get_cache_key(**kwargs):
     return get_django_cache_key(**kwargs)
 
 
+def get_cache_versions(cache_keys):
+    """
+    Returns the versions stored under the given cache keys, by key, storing a new version under keys missing one.
+
+    Data cached along with a version is current as long as the version stored under its key is unchanged. Versions
+    are random tokens rather than counters, so that a version evicted from the cache can never match the version
+    data was cached with.
+    """
+    versions = cache.get_many(list(cache_keys))
+    for cache_key in cache_keys:
+        if cache_key not in versions:
+            version = uuid.uuid4().hex
+            if not cache.add(cache_key, version, None):
+                version = cache.get(cache_key, version)
+            versions[cache_key] = version
+    return versions
+
+
+def get_cache_version(cache_key):
+    """ Returns the version stored under the given cache key, see get_cache_versions. """
+    return get_cache_versions([cache_key])[cache_key]
+
+
+def invalidate_cache_versions(cache_keys):
+    """
+    Replaces the versions stored under the given cache keys, right away for reads within the current transaction,
+    and again once it commits, so that data cached meanwhile by other requests, from the data it changed, is replaced
+    as well.
+    """
+    cache_keys = list(cache_keys)
+    cache.delete_many(cache_keys)
+    transaction.on_commit(partial(cache.delete_many, cache_keys))
+
+
 def deprecated_traverse_pagination(response, client, api_url):
     """
     Traverse a paginated API response.
@@ -71,4 +111,4 @@ def use_read_replica_if_available(queryset):
     """
     If there is a database called 'read_replica', use that database for the queryset.
     """
-    return queryset.using("read_replica") if "read_replica" in settings.DATABASES else queryset
+    return queryset.using(READ_REPLICA_DATABASE) if READ_REPLICA_DATABASE in settings.DATABASES else queryset
@@ -0,0 +1,27 @@
+# Generated by Django 3.2.25 on 2026-10-19 12:24
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0012_auto_20191115_2151'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseSeatSkuMapping',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('seat_type', models.CharField(max_length=255)),
+                ('seat_sku', models.CharField(blank=True, max_length=128, null=True)),
+                ('enrollment_code_sku', models.CharField(blank=True, max_length=128, null=True)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seat_sku_mappings', to='courses.course')),
+            ],
+            options={
+                'unique_together': {('course', 'seat_type')},
+            },
+        ),
+    ]
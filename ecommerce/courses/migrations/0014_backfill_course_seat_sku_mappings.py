@@ -0,0 +1,63 @@
+# Generated by Django 3.2.25 on 2026-10-19 14:40
+
+from django.db import migrations
+from django.db.models import Q
+
+# Mobile seats share the certificate type of the web seat they were created from, so they are not mapped.
+MOBILE_SKU_PREFIXES = ('mobile.android.', 'mobile.ios.')
+
+
+def backfill_course_seat_sku_mappings(apps, schema_editor):
+    """ Creates the missing mappings of existing courses from their stock records, mapping the oldest SKUs. """
+    CourseSeatSkuMapping = apps.get_model('courses', 'CourseSeatSkuMapping')
+    ProductAttributeValue = apps.get_model('catalogue', 'ProductAttributeValue')
+    StockRecord = apps.get_model('partner', 'StockRecord')
+
+    # Seats have a certificate_type attribute, and enrollment codes a seat_type attribute.
+    seat_types = {
+        (product_id, code): value
+        for product_id, code, value in ProductAttributeValue.objects.filter(
+            product__course__isnull=False, attribute__code__in=('certificate_type', 'seat_type')
+        ).values_list('product_id', 'attribute__code', 'value_text').iterator()
+    }
+
+    mobile_skus = Q()
+    for prefix in MOBILE_SKU_PREFIXES:
+        mobile_skus |= Q(partner_sku__startswith=prefix)
+    stock_records = StockRecord.objects.filter(
+        product__course__isnull=False, product__structure__in=('child', 'standalone')
+    ).exclude(mobile_skus).order_by('id').values_list(
+        'product_id', 'product__course_id', 'product__structure', 'partner_sku'
+    )
+
+    skus = {}
+    for product_id, course_id, structure, partner_sku in stock_records.iterator():
+        if structure == 'child':
+            seat_type, field = seat_types.get((product_id, 'certificate_type')), 'seat_sku'
+        else:
+            seat_type, field = seat_types.get((product_id, 'seat_type')), 'enrollment_code_sku'
+        if seat_type:
+            skus.setdefault((course_id, seat_type), {}).setdefault(field, partner_sku)
+
+    existing = set(CourseSeatSkuMapping.objects.values_list('course_id', 'seat_type'))
+    CourseSeatSkuMapping.objects.bulk_create(
+        [
+            CourseSeatSkuMapping(course_id=course_id, seat_type=seat_type, **mapping_skus)
+            for (course_id, seat_type), mapping_skus in skus.items()
+            if (course_id, seat_type) not in existing
+        ],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalogue', '0058_product_attribute_snapshot'),
+        ('courses', '0013_course_seat_sku_mapping'),
+        ('partner', '0018_remove_partner_enable_sailthru'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_course_seat_sku_mappings, migrations.RunPython.noop),
+    ]
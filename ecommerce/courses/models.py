@@ -18,6 +18,7 @@ from ecommerce.core.constants import (
 from ecommerce.courses.constants import CertificateType
 from ecommerce.courses.publishers import LMSPublisher
 from ecommerce.extensions.catalogue.utils import generate_sku
+from ecommerce.extensions.iap.constants import ANDROID_SKU_PREFIX, IOS_SKU_PREFIX
 
 logger = logging.getLogger(__name__)
 Category = get_model('catalogue', 'Category')
@@ -256,6 +257,10 @@ class Course(models.Model):
         stock_record.price_currency = settings.OSCAR_DEFAULT_CURRENCY
         stock_record.save()
 
+        CourseSeatSkuMapping.objects.update_or_create(
+            course=self, seat_type=certificate_type, defaults={'seat_sku': stock_record.partner_sku}
+        )
+
         if remove_stale_modes and self.certificate_type_for_mode(certificate_type) == 'professional':
             id_verification_required_query = Q(
                 attributes__name='id_verification_required',
@@ -333,6 +338,14 @@ class Course(models.Model):
         stock_record.price_currency = settings.OSCAR_DEFAULT_CURRENCY
         stock_record.save()
 
+        # The enrollment code may have been for another seat type before.
+        CourseSeatSkuMapping.objects.filter(course=self, enrollment_code_sku=stock_record.partner_sku).exclude(
+            seat_type=seat_type
+        ).update(enrollment_code_sku=None)
+        CourseSeatSkuMapping.objects.update_or_create(
+            course=self, seat_type=seat_type, defaults={'enrollment_code_sku': stock_record.partner_sku}
+        )
+
         return enrollment_code
 
     def toggle_enrollment_code_status(self, is_active):
@@ -357,3 +370,52 @@ class Course(models.Model):
             else:
                 enrollment_code.expires = now() - timedelta(days=365)
             enrollment_code.save()
+
+
+class CourseSeatSkuMapping(models.Model):
+    """
+    SKUs of the seat and of the enrollment code of a seat type of a course, which the basket summary links between.
+
+    Mappings are maintained when seats and enrollment codes are created or updated, see
+    Course.create_or_update_seat, and were backfilled from the stock records of existing courses by a data migration.
+    """
+    course = models.ForeignKey('courses.Course', related_name='seat_sku_mappings', on_delete=models.CASCADE)
+    seat_type = models.CharField(max_length=255)
+    seat_sku = models.CharField(max_length=128, null=True, blank=True)
+    enrollment_code_sku = models.CharField(max_length=128, null=True, blank=True)
+
+    class Meta:
+        unique_together = ('course', 'seat_type')
+
+    def __str__(self):
+        return '{course_id} {seat_type}'.format(course_id=self.course_id, seat_type=self.seat_type)
+
+    @classmethod
+    def get_mapping(cls, course_id, seat_type):
+        """
+        Returns the mapping of a seat type of a course. Missing mappings are built from the stock records of the
+        course, but not saved, since mappings are looked up while reading baskets.
+        """
+        try:
+            return cls.objects.get(course_id=course_id, seat_type=seat_type)
+        except cls.DoesNotExist:
+            pass
+
+        skus = {}
+        # Mobile seats share the certificate type of the web seat they were created from, so they are skipped.
+        stock_records = StockRecord.objects.filter(
+            product__course_id=course_id,
+            product__structure__in=(Product.CHILD, Product.STANDALONE)
+        ).exclude(
+            Q(partner_sku__startswith='mobile.{}.'.format(ANDROID_SKU_PREFIX))
+            | Q(partner_sku__startswith='mobile.{}.'.format(IOS_SKU_PREFIX))
+        ).select_related('product').order_by('id')
+        for stock_record in stock_records:
+            # Seats have a certificate_type attribute, and enrollment codes a seat_type attribute.
+            if stock_record.product.structure == Product.CHILD:
+                if getattr(stock_record.product.attr, 'certificate_type', None) == seat_type:
+                    skus.setdefault('seat_sku', stock_record.partner_sku)
+            elif getattr(stock_record.product.attr, 'seat_type', None) == seat_type:
+                skus.setdefault('enrollment_code_sku', stock_record.partner_sku)
+
+        return cls(course_id=course_id, seat_type=seat_type, **skus)
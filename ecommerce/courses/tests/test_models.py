@@ -9,10 +9,12 @@ from oscar.core.loading import get_model
 from oscar.test.factories import BasketFactory
 
 from ecommerce.core.constants import ENROLLMENT_CODE_PRODUCT_CLASS_NAME
-from ecommerce.courses.models import Course
+from ecommerce.courses.models import Course, CourseSeatSkuMapping
 from ecommerce.courses.publishers import LMSPublisher
 from ecommerce.courses.tests.factories import CourseFactory
 from ecommerce.extensions.catalogue.tests.mixins import DiscoveryTestMixin
+from ecommerce.extensions.iap.constants import ANDROID_SKU_PREFIX, IOS_SKU_PREFIX
+from ecommerce.extensions.iap.utils import create_mobile_seat
 from ecommerce.extensions.test.factories import create_order
 from ecommerce.tests.testcases import TestCase
 
@@ -396,3 +398,58 @@ class CourseTests(DiscoveryTestMixin, TestCase):
 
         self.assertEqual(course.get_enrollment_code().expires, ec_expires)
         self.assertEqual(course.enrollment_code_product, enrollment_code)
+
+
+class CourseSeatSkuMappingTests(DiscoveryTestMixin, TestCase):
+    def get_sku(self, product):
+        return StockRecord.objects.get(product=product).partner_sku
+
+    def test_maintained(self):
+        """ Verify mappings are maintained when seats and enrollment codes are created or updated. """
+        course, seat, enrollment_code = self.create_course_seat_and_enrollment_code(seat_type='verified')
+        honor_seat = course.create_or_update_seat('honor', False, 0)
+
+        self.assertEqual(
+            sorted(course.seat_sku_mappings.values_list('seat_type', 'seat_sku', 'enrollment_code_sku')),
+            [
+                ('honor', self.get_sku(honor_seat), None),
+                ('verified', self.get_sku(seat), self.get_sku(enrollment_code)),
+            ]
+        )
+
+        # The enrollment code moves along with its seat type.
+        professional_seat = course.create_or_update_seat('professional', False, 100, create_enrollment_code=True)
+        self.assertIsNone(CourseSeatSkuMapping.objects.get(course=course, seat_type='verified').enrollment_code_sku)
+        mapping = CourseSeatSkuMapping.objects.get(course=course, seat_type='professional')
+        self.assertEqual(mapping.seat_sku, self.get_sku(professional_seat))
+        self.assertEqual(mapping.enrollment_code_sku, self.get_sku(enrollment_code))
+
+    def test_get_mapping(self):
+        """ Verify missing mappings are built from the stock records of the course, without being saved. """
+        course, seat, enrollment_code = self.create_course_seat_and_enrollment_code(seat_type='verified')
+        mapping = CourseSeatSkuMapping.objects.get(course=course, seat_type='verified')
+
+        with self.assertNumQueries(1):
+            self.assertEqual(CourseSeatSkuMapping.get_mapping(course.id, 'verified'), mapping)
+
+        CourseSeatSkuMapping.objects.all().delete()
+        mapping = CourseSeatSkuMapping.get_mapping(course.id, 'verified')
+        self.assertEqual(mapping.seat_sku, self.get_sku(seat))
+        self.assertEqual(mapping.enrollment_code_sku, self.get_sku(enrollment_code))
+        self.assertFalse(CourseSeatSkuMapping.objects.exists())
+
+        mapping = CourseSeatSkuMapping.get_mapping(course.id, 'honor')
+        self.assertIsNone(mapping.seat_sku)
+        self.assertIsNone(mapping.enrollment_code_sku)
+
+    def test_get_mapping_with_mobile_seats(self):
+        """ Verify mobile seats, which share the certificate type of their web seat, are not mapped. """
+        course, seat, __ = self.create_course_seat_and_enrollment_code(seat_type='verified')
+        for sku_prefix in (ANDROID_SKU_PREFIX, IOS_SKU_PREFIX):
+            create_mobile_seat(sku_prefix, seat)
+        CourseSeatSkuMapping.objects.all().delete()
+
+        self.assertEqual(CourseSeatSkuMapping.get_mapping(course.id, 'verified').seat_sku, self.get_sku(seat))
+
+        StockRecord.objects.filter(product=seat).delete()
+        self.assertIsNone(CourseSeatSkuMapping.get_mapping(course.id, 'verified').seat_sku)
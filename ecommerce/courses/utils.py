@@ -16,10 +16,10 @@ def mode_for_product(product):
     bulk purchase "enrollment code" product variant of the single-seat product, so we attempt
     to locate the 'seat_type' attribute in its place.
     """
-    mode = getattr(product.attr, 'certificate_type', getattr(product.attr, 'seat_type', None))
+    mode = product.get_attr('certificate_type', product.get_attr('seat_type', None))
     if not mode:
         return 'audit'
-    if mode == 'professional' and not getattr(product.attr, 'id_verification_required', False):
+    if mode == 'professional' and not product.get_attr('id_verification_required', False):
         return 'no-id-professional'
     return mode
 
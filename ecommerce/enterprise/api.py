@@ -12,6 +12,11 @@ from requests.exceptions import ConnectionError as ReqConnectionError
 from requests.exceptions import HTTPError, Timeout
 
 from ecommerce.core.utils import get_cache_key
+from ecommerce.enterprise.cache import (
+    get_enterprise_data,
+    get_enterprise_learner_cache_key,
+    refresh_enterprise_data
+)
 from ecommerce.enterprise.utils import (
     find_active_enterprise_customer_user,
     get_enterprise_id_for_current_request_user_from_jwt
@@ -93,32 +98,23 @@ def fetch_enterprise_learner_data(site, user):
 
     """
     api_resource_name = 'enterprise-learner'
-    partner_code = site.siteconfiguration.partner.short_code
-    cache_key = get_cache_key(
-        site_domain=site.domain,
-        partner_code=partner_code,
-        resource=api_resource_name,
-        username=user.username
-    )
-
-    cached_response = TieredCache.get_cached_response(cache_key)
-    if cached_response.is_found:
-        return cached_response.value
-
+    cache_key = get_enterprise_learner_cache_key(site, user.username)
     api_client = site.siteconfiguration.oauth_api_client
     enterprise_api_url = urljoin(f"{site.siteconfiguration.enterprise_api_url}/", f"{api_resource_name}/")
     querystring = {'username': user.username}
-    response = api_client.get(enterprise_api_url, params=querystring)
-    response.raise_for_status()
-    result = response.json()
 
-    TieredCache.set_all_tiers(cache_key, result, settings.ENTERPRISE_API_CACHE_TIMEOUT)
-    return result
+    def fetch():
+        response = api_client.get(enterprise_api_url, params=querystring)
+        response.raise_for_status()
+        return response.json()
 
+    return get_enterprise_data(api_resource_name, cache_key, fetch, settings.ENTERPRISE_API_CACHE_TIMEOUT)
 
-def catalog_contains_course_runs(site, course_run_ids, enterprise_customer_uuid, enterprise_customer_catalog_uuid=None):
+
+def _get_catalog_contains_course_runs_entry(site, course_run_ids, enterprise_customer_uuid,
+                                            enterprise_customer_catalog_uuid):
     """
-    Determine if course runs are associated with the EnterpriseCustomer.
+    Returns the resource name, cache key and fetch function of the catalog contains check of the course runs.
     """
     query_params = {'course_run_ids': course_run_ids}
     api_client = site.siteconfiguration.oauth_api_client
@@ -139,19 +135,38 @@ def catalog_contains_course_runs(site, course_run_ids, enterprise_customer_uuid,
         query_params=urlencode(query_params, True)
     )
 
-    contains_content_cached_response = TieredCache.get_cached_response(cache_key)
-    if contains_content_cached_response.is_found:
-        return contains_content_cached_response.value
-
     api_url = urljoin(
         f"{site.siteconfiguration.enterprise_catalog_api_url}/",
         f"{api_resource_name}/{api_resource_id}/contains_content_items/"
     )
-    response = api_client.get(api_url, params=query_params)
-    response.raise_for_status()
-    contains_content = response.json()['contains_content_items']
-    TieredCache.set_all_tiers(cache_key, contains_content, settings.ENTERPRISE_API_CACHE_TIMEOUT)
-    return contains_content
+
+    def fetch():
+        response = api_client.get(api_url, params=query_params)
+        response.raise_for_status()
+        return response.json()['contains_content_items']
+
+    return '{}-contains_content_items'.format(api_resource_name), cache_key, fetch
+
+
+def catalog_contains_course_runs(site, course_run_ids, enterprise_customer_uuid, enterprise_customer_catalog_uuid=None):
+    """
+    Determine if course runs are associated with the EnterpriseCustomer.
+    """
+    resource, cache_key, fetch = _get_catalog_contains_course_runs_entry(
+        site, course_run_ids, enterprise_customer_uuid, enterprise_customer_catalog_uuid
+    )
+    return get_enterprise_data(resource, cache_key, fetch, settings.ENTERPRISE_API_CACHE_TIMEOUT)
+
+
+def refresh_catalog_contains_course_runs(site, course_run_ids, enterprise_customer_uuid,
+                                         enterprise_customer_catalog_uuid=None):
+    """
+    Determine if course runs are associated with the EnterpriseCustomer, bypassing and refreshing the cached answer.
+    """
+    __, cache_key, fetch = _get_catalog_contains_course_runs_entry(
+        site, course_run_ids, enterprise_customer_uuid, enterprise_customer_catalog_uuid
+    )
+    return refresh_enterprise_data(cache_key, fetch, settings.ENTERPRISE_API_CACHE_TIMEOUT)
 
 
 def fetch_enterprise_catalogs_for_content_items(site, content_ids, enterprise_customer_uuid):
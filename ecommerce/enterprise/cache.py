@@ -0,0 +1,205 @@
+"""
+Cache of the data fetched from the enterprise and enterprise catalog services.
+
+Data is fresh for the timeout given when it is cached, and is then kept for ENTERPRISE_API_STALE_CACHE_TIMEOUT more.
+Stale data is returned right away, while a single refresh of it runs in the background. Concurrent misses of the same
+data are coalesced: one request fetches it, while the others wait up to ENTERPRISE_API_CACHE_MISS_WAIT for it before
+fetching it themselves.
+
+Fresh hits, stale hits and misses are counted per resource, for the process by get_enterprise_cache_stats(), and for
+the request as custom metrics.
+"""
+
+
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from edx_django_utils import monitoring as monitoring_utils
+from edx_django_utils.cache import DEFAULT_REQUEST_CACHE, TieredCache
+
+from ecommerce.core.utils import get_cache_key
+
+logger = logging.getLogger(__name__)
+
+HIT = 'hit'
+STALE = 'stale'
+MISS = 'miss'
+
+# Time after which a fetch of missing or stale data is assumed to have failed, and may be retried.
+ENTERPRISE_DATA_FETCH_LOCK_TIMEOUT = 30  # Value is in seconds.
+# Interval at which requests waiting for data fetched by another request check the cache.
+ENTERPRISE_DATA_MISS_POLL_INTERVAL = 0.05  # Value is in seconds.
+
+_stats = defaultdict(Counter)
+_stats_lock = threading.Lock()
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _fresh_key(cache_key):
+    return '{}_fresh'.format(cache_key)
+
+
+def _fetch_lock_key(cache_key):
+    return '{}_fetching'.format(cache_key)
+
+
+def _refresh_lock_key(cache_key):
+    return '{}_refreshing'.format(cache_key)
+
+
+def _record(resource, outcome):
+    with _stats_lock:
+        _stats[resource][outcome] += 1
+    monitoring_utils.accumulate('enterprise_cache_{}_{}'.format(resource, outcome), 1)
+
+
+def get_enterprise_cache_stats():
+    """
+    Returns the numbers of fresh hits, stale hits and misses of the process, and its hit rate, keyed by resource.
+    """
+    with _stats_lock:
+        stats = {resource: dict(counts) for resource, counts in _stats.items()}
+
+    for counts in stats.values():
+        total = sum(counts.values())
+        counts['hit_rate'] = (counts.get(HIT, 0) + counts.get(STALE, 0)) / total if total else None
+    return stats
+
+
+def _set_enterprise_data(cache_key, value, timeout):
+    TieredCache.set_all_tiers(cache_key, value, timeout + settings.ENTERPRISE_API_STALE_CACHE_TIMEOUT)
+    cache.set(_fresh_key(cache_key), True, timeout)
+
+
+def _refresh_enterprise_data(resource, cache_key, fetch, timeout):
+    try:
+        _set_enterprise_data(cache_key, fetch(), timeout)
+    except Exception:  # pylint: disable=broad-except
+        logger.warning('Failed to refresh the cached [%s] data [%s]. The stale data is kept.', resource, cache_key,
+                       exc_info=True)
+    finally:
+        cache.delete(_refresh_lock_key(cache_key))
+
+
+def _refresh_in_background(resource, cache_key, fetch, timeout):
+    try:
+        _refresh_enterprise_data(resource, cache_key, fetch, timeout)
+    finally:
+        # Database connections are per thread, and would otherwise stay open with the thread.
+        connections.close_all()
+
+
+def _schedule_refresh(resource, cache_key, fetch, timeout):
+    global _executor  # pylint: disable=global-statement
+
+    if not settings.ENTERPRISE_API_CACHE_REFRESH_WORKERS:
+        _refresh_enterprise_data(resource, cache_key, fetch, timeout)
+        return
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.ENTERPRISE_API_CACHE_REFRESH_WORKERS, thread_name_prefix='enterprise-cache'
+            )
+    _executor.submit(_refresh_in_background, resource, cache_key, fetch, timeout)
+
+
+def get_enterprise_data(resource, cache_key, fetch, timeout):
+    """
+    Returns the data cached under the given key, calling fetch() to get it when it is missing or stale.
+
+    Arguments:
+        resource (str): Name of the resource, under which hits and misses are counted.
+        cache_key (str): Key of the data in TieredCache.
+        fetch (callable): Function returning the data from the service. It may be called from another thread, so it
+            should not depend on the request.
+        timeout (int): Time, in seconds, for which fetched data is fresh.
+
+    Raises:
+        Whatever fetch() raises when the data is missing. Errors refreshing stale data are logged, and the stale data
+        is returned.
+    """
+    cached_response = DEFAULT_REQUEST_CACHE.get_cached_response(cache_key)
+    if cached_response.is_found:
+        _record(resource, HIT)
+        return cached_response.value
+
+    cached = cache.get_many([cache_key, _fresh_key(cache_key)])
+    if cache_key in cached:
+        value = cached[cache_key]
+        DEFAULT_REQUEST_CACHE.set(cache_key, value)
+        if _fresh_key(cache_key) in cached:
+            _record(resource, HIT)
+        else:
+            _record(resource, STALE)
+            if cache.add(_refresh_lock_key(cache_key), True, ENTERPRISE_DATA_FETCH_LOCK_TIMEOUT):
+                _schedule_refresh(resource, cache_key, fetch, timeout)
+        return value
+
+    _record(resource, MISS)
+    if cache.add(_fetch_lock_key(cache_key), True, ENTERPRISE_DATA_FETCH_LOCK_TIMEOUT):
+        try:
+            value = fetch()
+        except Exception:
+            cache.delete(_fetch_lock_key(cache_key))
+            raise
+        # The lock is left to expire rather than deleted, saving a cache call. It is only checked on misses.
+        _set_enterprise_data(cache_key, value, timeout)
+        return value
+
+    # Another request is fetching the data. Stop waiting once it has released the lock without caching the data,
+    # since its fetch failed.
+    deadline = time.monotonic() + settings.ENTERPRISE_API_CACHE_MISS_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(ENTERPRISE_DATA_MISS_POLL_INTERVAL)
+        cached = cache.get_many([cache_key, _fetch_lock_key(cache_key)])
+        if cache_key in cached:
+            DEFAULT_REQUEST_CACHE.set(cache_key, cached[cache_key])
+            return cached[cache_key]
+        if _fetch_lock_key(cache_key) not in cached:
+            break
+
+    value = fetch()
+    _set_enterprise_data(cache_key, value, timeout)
+    return value
+
+
+def refresh_enterprise_data(cache_key, fetch, timeout):
+    """
+    Fetches data with fetch() and caches it under the given key as fresh, whether or not it was cached, e.g. to warm
+    the cache ahead of requests.
+
+    Raises:
+        Whatever fetch() raises, in which case the cached data is kept.
+    """
+    value = fetch()
+    _set_enterprise_data(cache_key, value, timeout)
+    return value
+
+
+def invalidate_enterprise_data(cache_key):
+    """ Removes the data cached under the given key, so that it is fetched again when next read. """
+    TieredCache.delete_all_tiers(cache_key)
+    cache.delete_many([_fresh_key(cache_key), _fetch_lock_key(cache_key)])
+
+
+def get_enterprise_learner_cache_key(site, username):
+    """ Returns the cache key of the enterprise learner data of the user. """
+    return get_cache_key(
+        site_domain=site.domain,
+        partner_code=site.siteconfiguration.partner.short_code,
+        resource='enterprise-learner',
+        username=username
+    )
+
+
+def invalidate_enterprise_learner_data(site, username):
+    """ Removes the cached enterprise learner data of the user, whose memberships or consents changed. """
+    invalidate_enterprise_data(get_enterprise_learner_cache_key(site, username))
@@ -23,7 +23,6 @@ from ecommerce.extensions.offer.models import OFFER_PRIORITY_ENTERPRISE
 from ecommerce.extensions.offer.utils import get_benefit_type, get_discount_value
 from ecommerce.extensions.refund.status import REFUND
 
-BasketAttribute = get_model('basket', 'BasketAttribute')
 BasketAttributeType = get_model('basket', 'BasketAttributeType')
 Benefit = get_model('offer', 'Benefit')
 Condition = get_model('offer', 'Condition')
@@ -308,15 +307,7 @@ class EnterpriseCustomerCondition(ConditionWithoutRangeMixin, SingleItemConsumpt
 
         if not catalog:
             # For actual baskets get `catalog` from basket attribute
-            enterprise_catalog_attribute, __ = BasketAttributeType.objects.get_or_create(
-                name=ENTERPRISE_CATALOG_ATTRIBUTE_TYPE
-            )
-            enterprise_customer_catalog = BasketAttribute.objects.filter(
-                basket=basket,
-                attribute_type=enterprise_catalog_attribute,
-            ).first()
-            if enterprise_customer_catalog:
-                catalog = enterprise_customer_catalog.value_text
+            catalog = basket.get_attribute(ENTERPRISE_CATALOG_ATTRIBUTE_TYPE)
 
         # Return only valid UUID
         try:
@@ -0,0 +1,82 @@
+"""
+Warm the cached enterprise catalog containment checks of popular enterprise offers and course runs.
+"""
+
+
+from django.core.management import BaseCommand
+
+from ecommerce.core.models import SiteConfiguration
+from ecommerce.enterprise.warming import (
+    DEFAULT_DAYS,
+    DEFAULT_MAX_COURSE_RUNS,
+    DEFAULT_MAX_OFFERS,
+    DEFAULT_WORKERS,
+    warm_enterprise_catalog_cache
+)
+
+
+class Command(BaseCommand):
+    """
+    Management command to refresh the cached enterprise catalog containment checks of the enterprise offers redeemed
+    most often and the course runs ordered or added to baskets most often, for every site. Run it more often than
+    ENTERPRISE_API_CACHE_TIMEOUT to keep the checks from expiring, e.g. from cron or Celery beat through
+    ecommerce.enterprise.tasks.warm_enterprise_catalog_cache_task.
+    """
+
+    help = 'Warm the cached enterprise catalog containment checks of popular enterprise offers and course runs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--site-domain',
+            action='store',
+            dest='site_domain',
+            default=None,
+            help='Domain of the site to warm. All sites are warmed by default.',
+            type=str,
+        )
+        parser.add_argument(
+            '--days',
+            action='store',
+            dest='days',
+            default=DEFAULT_DAYS,
+            help='Number of days of orders and baskets used to find popular offers and course runs.',
+            type=int,
+        )
+        parser.add_argument(
+            '--max-offers',
+            action='store',
+            dest='max_offers',
+            default=DEFAULT_MAX_OFFERS,
+            help='Maximum number of enterprise offers whose catalogs are warmed, per site.',
+            type=int,
+        )
+        parser.add_argument(
+            '--max-course-runs',
+            action='store',
+            dest='max_course_runs',
+            default=DEFAULT_MAX_COURSE_RUNS,
+            help='Maximum number of course runs checked in each catalog.',
+            type=int,
+        )
+        parser.add_argument(
+            '--workers',
+            action='store',
+            dest='workers',
+            default=DEFAULT_WORKERS,
+            help='Number of containment checks run concurrently.',
+            type=int,
+        )
+
+    def handle(self, *args, **options):
+        site_configurations = SiteConfiguration.objects.select_related('site')
+        if options['site_domain']:
+            site_configurations = site_configurations.filter(site__domain=options['site_domain'])
+
+        for site_configuration in site_configurations:
+            warm_enterprise_catalog_cache(
+                site_configuration.site,
+                days=options['days'],
+                max_offers=options['max_offers'],
+                max_course_runs=options['max_course_runs'],
+                workers=options['workers'],
+            )
@@ -0,0 +1,11 @@
+from celery import shared_task
+from django.core.management import call_command
+
+
+@shared_task(bind=True, ignore_result=True)
+def warm_enterprise_catalog_cache_task(self, **options):  # pylint: disable=unused-argument
+    """
+    Warm the cached enterprise catalog containment checks, e.g. from Celery beat. Takes the options of the
+    warm_enterprise_catalog_cache management command.
+    """
+    call_command('warm_enterprise_catalog_cache', **options)
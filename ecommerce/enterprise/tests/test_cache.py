@@ -0,0 +1,121 @@
+
+
+import mock
+from django.core.cache import cache
+from django.test import override_settings
+from edx_django_utils.cache import DEFAULT_REQUEST_CACHE, TieredCache
+
+from ecommerce.enterprise import cache as enterprise_cache
+from ecommerce.tests.testcases import TestCase
+
+CACHE_KEY = 'enterprise-data'
+
+
+class EnterpriseDataCacheTests(TestCase):
+    """ Tests for the cache of enterprise data. """
+
+    def setUp(self):
+        super(EnterpriseDataCacheTests, self).setUp()
+        self.fetch = mock.Mock(return_value='data')
+        enterprise_cache._stats.clear()  # pylint: disable=protected-access
+
+    def get_enterprise_data(self):
+        return enterprise_cache.get_enterprise_data('resource', CACHE_KEY, self.fetch, 60)
+
+    def expire(self):
+        """ Makes the cached data stale, and starts a new request. """
+        cache.delete(enterprise_cache._fresh_key(CACHE_KEY))  # pylint: disable=protected-access
+        DEFAULT_REQUEST_CACHE.clear()
+
+    def test_get_enterprise_data(self):
+        """ Verify data is fetched once, then read from the cache. """
+        self.assertEqual(self.get_enterprise_data(), 'data')
+        self.assertEqual(self.get_enterprise_data(), 'data')
+        DEFAULT_REQUEST_CACHE.clear()
+        self.assertEqual(self.get_enterprise_data(), 'data')
+
+        self.fetch.assert_called_once_with()
+        self.assertEqual(
+            enterprise_cache.get_enterprise_cache_stats(), {'resource': {'miss': 1, 'hit': 2, 'hit_rate': 2 / 3}}
+        )
+
+    def test_stale_data_refreshed(self):
+        """ Verify stale data is returned while it is refreshed. """
+        self.get_enterprise_data()
+        self.expire()
+        self.fetch.return_value = 'new data'
+
+        self.assertEqual(self.get_enterprise_data(), 'data')
+        self.assertEqual(self.fetch.call_count, 2)
+        DEFAULT_REQUEST_CACHE.clear()
+        self.assertEqual(self.get_enterprise_data(), 'new data')
+        self.assertEqual(self.fetch.call_count, 2)
+
+    def test_stale_data_refresh_failure(self):
+        """ Verify stale data is kept when it cannot be refreshed. """
+        self.get_enterprise_data()
+        self.expire()
+        self.fetch.side_effect = Exception
+
+        self.assertEqual(self.get_enterprise_data(), 'data')
+        self.expire()
+        self.assertEqual(self.get_enterprise_data(), 'data')
+        self.assertEqual(self.fetch.call_count, 3)
+
+    @override_settings(ENTERPRISE_API_CACHE_REFRESH_WORKERS=1)
+    def test_stale_data_refreshed_in_background(self):
+        """ Verify stale data is refreshed by a background thread. """
+        self.get_enterprise_data()
+        self.expire()
+        self.fetch.return_value = 'new data'
+
+        self.assertEqual(self.get_enterprise_data(), 'data')
+        enterprise_cache._executor.shutdown(wait=True)  # pylint: disable=protected-access
+        enterprise_cache._executor = None  # pylint: disable=protected-access
+        self.assertEqual(TieredCache.get_cached_response(CACHE_KEY).value, 'new data')
+
+    def test_concurrent_miss(self):
+        """ Verify requests missing data being fetched by another request wait for it. """
+        cache.add(enterprise_cache._fetch_lock_key(CACHE_KEY), True)  # pylint: disable=protected-access
+
+        def fetched_by_other_request(__):
+            TieredCache.set_all_tiers(CACHE_KEY, 'other data', 60)
+
+        with mock.patch('ecommerce.enterprise.cache.time.sleep', side_effect=fetched_by_other_request):
+            self.assertEqual(self.get_enterprise_data(), 'other data')
+        self.fetch.assert_not_called()
+
+    @override_settings(ENTERPRISE_API_CACHE_MISS_WAIT=0)
+    def test_concurrent_miss_timeout(self):
+        """ Verify requests fetch the data themselves when another request does not fetch it in time. """
+        cache.add(enterprise_cache._fetch_lock_key(CACHE_KEY), True)  # pylint: disable=protected-access
+        self.assertEqual(self.get_enterprise_data(), 'data')
+        self.fetch.assert_called_once_with()
+
+    def test_concurrent_miss_failure(self):
+        """ Verify requests stop waiting for data once the request fetching it failed. """
+        cache.add(enterprise_cache._fetch_lock_key(CACHE_KEY), True)  # pylint: disable=protected-access
+
+        def fetch_failed(__):
+            cache.delete(enterprise_cache._fetch_lock_key(CACHE_KEY))  # pylint: disable=protected-access
+
+        with mock.patch('ecommerce.enterprise.cache.time.sleep', side_effect=fetch_failed) as mock_sleep:
+            self.assertEqual(self.get_enterprise_data(), 'data')
+        mock_sleep.assert_called_once_with(enterprise_cache.ENTERPRISE_DATA_MISS_POLL_INTERVAL)
+        self.fetch.assert_called_once_with()
+
+    def test_fetch_failure(self):
+        """ Verify errors fetching missing data are raised, and not cached. """
+        self.fetch.side_effect = ValueError
+        with self.assertRaises(ValueError):
+            self.get_enterprise_data()
+
+        self.fetch.side_effect = None
+        self.assertEqual(self.get_enterprise_data(), 'data')
+
+    def test_invalidate_enterprise_data(self):
+        """ Verify invalidated data is fetched again. """
+        self.get_enterprise_data()
+        enterprise_cache.invalidate_enterprise_data(CACHE_KEY)
+        self.fetch.return_value = 'new data'
+        self.assertEqual(self.get_enterprise_data(), 'new data')
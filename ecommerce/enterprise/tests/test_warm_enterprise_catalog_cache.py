@@ -0,0 +1,82 @@
+
+
+import datetime
+from decimal import Decimal
+
+import responses
+from django.core.management import call_command
+from django.utils import timezone
+from oscar.test.factories import OrderDiscountFactory
+
+from ecommerce.courses.tests.factories import CourseFactory
+from ecommerce.enterprise import api as enterprise_api
+from ecommerce.enterprise.tests.mixins import EnterpriseServiceMockMixin
+from ecommerce.enterprise.warming import get_popular_course_runs, get_popular_enterprise_catalogs
+from ecommerce.extensions.test.factories import EnterpriseOfferFactory, create_basket, create_order
+from ecommerce.tests.testcases import TestCase
+
+
+class WarmEnterpriseCatalogCacheTests(EnterpriseServiceMockMixin, TestCase):
+    """ Tests for the warm_enterprise_catalog_cache management command. """
+
+    def setUp(self):
+        super(WarmEnterpriseCatalogCacheTests, self).setUp()
+        self.offer = EnterpriseOfferFactory()
+        self.seat = CourseFactory(partner=self.partner).create_or_update_seat('verified', True, Decimal(100))
+        self.other_seat = CourseFactory(partner=self.partner).create_or_update_seat('verified', True, Decimal(100))
+        self.since = timezone.now() - datetime.timedelta(days=1)
+
+        basket = create_basket(site=self.site, empty=True)
+        basket.add_product(self.seat)
+        OrderDiscountFactory(order=create_order(basket=basket, user=basket.owner), offer_id=self.offer.id)
+        basket = create_basket(site=self.site, empty=True)
+        basket.add_product(self.other_seat)
+        create_order(basket=basket, user=basket.owner)
+        for __ in range(2):
+            create_basket(site=self.site, empty=True).add_product(self.seat)
+        # Baskets of other sites are not counted.
+        for __ in range(3):
+            create_basket(empty=True).add_product(self.other_seat)
+
+    @property
+    def enterprise_catalog(self):
+        condition = self.offer.condition
+        return str(condition.enterprise_customer_uuid), str(condition.enterprise_customer_catalog_uuid)
+
+    def test_get_popular_enterprise_catalogs(self):
+        """ Verify only enterprise offers redeemed on the site are returned, without duplicate catalogs. """
+        other_offer = EnterpriseOfferFactory(condition=self.offer.condition)
+        OrderDiscountFactory(order=create_order(site=self.site), offer_id=other_offer.id)
+        OrderDiscountFactory(order=create_order(), offer_id=EnterpriseOfferFactory().id)
+
+        self.assertEqual(get_popular_enterprise_catalogs(self.site, self.since, 10), [self.enterprise_catalog])
+
+    def test_get_popular_course_runs(self):
+        """ Verify course runs are ordered by the number of order and basket lines holding them on the site. """
+        self.assertEqual(
+            get_popular_course_runs(self.site, self.since, 10), [self.seat.course_id, self.other_seat.course_id]
+        )
+        self.assertEqual(get_popular_course_runs(self.site, self.since, 1), [self.seat.course_id])
+
+    @responses.activate
+    def test_warm_enterprise_catalog_cache(self):
+        """ Verify the containment checks of popular course runs in popular catalogs are cached. """
+        enterprise_customer_uuid, enterprise_catalog_uuid = self.enterprise_catalog
+        for seat, contains_content in ((self.seat, True), (self.other_seat, False)):
+            self.mock_catalog_contains_course_runs(
+                [seat.course_id], enterprise_customer_uuid,
+                enterprise_customer_catalog_uuid=enterprise_catalog_uuid, contains_content=contains_content
+            )
+
+        call_command('warm_enterprise_catalog_cache', '--site-domain', self.site.domain, '--workers', '1')
+        calls = len(responses.calls)
+
+        for seat, contains_content in ((self.seat, True), (self.other_seat, False)):
+            self.assertEqual(
+                enterprise_api.catalog_contains_course_runs(
+                    self.site, [seat.course_id], enterprise_customer_uuid,
+                    enterprise_customer_catalog_uuid=enterprise_catalog_uuid
+                ),
+                contains_content
+            )
+        self.assertEqual(len(responses.calls), calls)
@@ -21,6 +21,7 @@ from requests.exceptions import HTTPError, Timeout
 
 from ecommerce.core.constants import SYSTEM_ENTERPRISE_LEARNER_ROLE
 from ecommerce.core.url_utils import absolute_url, get_lms_dashboard_url
+from ecommerce.enterprise.cache import get_enterprise_data, invalidate_enterprise_learner_data
 from ecommerce.enterprise.constants import SENDER_ALIAS
 from ecommerce.enterprise.exceptions import EnterpriseDoesNotExist
 from ecommerce.extensions.offer.models import OFFER_PRIORITY_ENTERPRISE
@@ -54,43 +55,33 @@ def get_enterprise_customer(site, uuid):
         enterprise_uuid=uuid,
     )
     cache_key = hashlib.md5(cache_key.encode('utf-8')).hexdigest()
-    cached_response = TieredCache.get_cached_response(cache_key)
-    if cached_response.is_found:
-        return cached_response.value
-
     api_client = site.siteconfiguration.oauth_api_client
     enterprise_api_url = urljoin(
         f"{site.siteconfiguration.enterprise_api_url}/",
         f"{resource}/{str(uuid)}/"
     )
 
-    try:
+    def fetch():
         response = api_client.get(enterprise_api_url)
         response.raise_for_status()
         response = response.json()
+        return {
+            'name': response['name'],
+            'id': response['uuid'],
+            'enable_data_sharing_consent': response['enable_data_sharing_consent'],
+            'enforce_data_sharing_consent': response['enforce_data_sharing_consent'],
+            'contact_email': response.get('contact_email', ''),
+            'slug': response.get('slug'),
+            'sender_alias': response.get('sender_alias', ''),
+            'reply_to': response.get('reply_to', ''),
+        }
+
+    try:
+        return get_enterprise_data(resource, cache_key, fetch, settings.ENTERPRISE_CUSTOMER_RESULTS_CACHE_TIMEOUT)
     except (ReqConnectionError, HTTPError, Timeout):
         log.exception("Failed to fetch enterprise customer")
         return None
 
-    enterprise_customer_response = {
-        'name': response['name'],
-        'id': response['uuid'],
-        'enable_data_sharing_consent': response['enable_data_sharing_consent'],
-        'enforce_data_sharing_consent': response['enforce_data_sharing_consent'],
-        'contact_email': response.get('contact_email', ''),
-        'slug': response.get('slug'),
-        'sender_alias': response.get('sender_alias', ''),
-        'reply_to': response.get('reply_to', ''),
-    }
-
-    TieredCache.set_all_tiers(
-        cache_key,
-        enterprise_customer_response,
-        settings.ENTERPRISE_CUSTOMER_RESULTS_CACHE_TIMEOUT
-    )
-
-    return enterprise_customer_response
-
 
 def get_enterprise_customers(request):
     api_client = request.site.siteconfiguration.oauth_api_client
@@ -189,22 +180,20 @@ def get_enterprise_customer_catalogs(site, endpoint_request_url, enterprise_cust
     )
     cache_key = hashlib.md5(cache_key.encode('utf-8')).hexdigest()
 
-    cached_response = TieredCache.get_cached_response(cache_key)
-    if cached_response.is_found:
-        return cached_response.value
-
     api_client = site.siteconfiguration.oauth_api_client
     enterprise_api_url = urljoin(
         f"{site.siteconfiguration.enterprise_api_url}/", f"{resource}/"
     )
 
-    try:
+    def fetch():
         response = api_client.get(
             enterprise_api_url, params={"enterprise_customer": enterprise_customer_uuid, "page": page}
         )
         response.raise_for_status()
-        response = response.json()
-        response = update_paginated_response(endpoint_request_url, response)
+        return update_paginated_response(endpoint_request_url, response.json())
+
+    try:
+        return get_enterprise_data(resource, cache_key, fetch, settings.ENTERPRISE_API_CACHE_TIMEOUT)
     except (ReqConnectionError, HTTPError, Timeout) as exc:
         logging.exception(
             'Unable to retrieve catalogs for enterprise customer! customer: %s, Exception: %s',
@@ -213,10 +202,6 @@ def get_enterprise_customer_catalogs(site, endpoint_request_url, enterprise_cust
         )
         return CUSTOMER_CATALOGS_DEFAULT_RESPONSE
 
-    TieredCache.set_all_tiers(cache_key, response, settings.ENTERPRISE_API_CACHE_TIMEOUT)
-
-    return response
-
 
 def get_enterprise_customer_consent_failed_context_data(request, voucher):
     """
@@ -293,6 +278,7 @@ def get_or_create_enterprise_customer_user(site, enterprise_customer_uuid, usern
 
     response = api_client.post(enterprise_api_url, json=data)
     response.raise_for_status()
+    invalidate_enterprise_learner_data(site, username)
     return response.json()
 
 
@@ -380,6 +366,7 @@ def create_enterprise_customer_user_consent(site, enterprise_customer_uuid, cour
 
     response = api_client.post(consent_url, json=data)
     response.raise_for_status()
+    invalidate_enterprise_learner_data(site, username)
     return response.json()['consent_provided']
 
 
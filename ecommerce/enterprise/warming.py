@@ -0,0 +1,129 @@
+"""
+Warming of the cached enterprise catalog containment checks.
+
+Baskets check whether the enterprise catalog of each enterprise offer contains their course runs. The warmer runs
+these checks ahead of requests for the combinations most likely to be requested: the enterprise offers redeemed most
+often, and the course runs ordered or added to baskets most often, recently. Results are cached as fresh, so running
+the warmer more often than ENTERPRISE_API_CACHE_TIMEOUT keeps them from expiring.
+"""
+
+
+import datetime
+import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db.models import Count
+from django.utils import timezone
+from oscar.core.loading import get_model
+from requests.exceptions import ConnectionError as ReqConnectionError
+from requests.exceptions import HTTPError, Timeout
+
+from ecommerce.enterprise.api import refresh_catalog_contains_course_runs
+
+BasketLine = get_model('basket', 'Line')
+ConditionalOffer = get_model('offer', 'ConditionalOffer')
+OrderDiscount = get_model('order', 'OrderDiscount')
+OrderLine = get_model('order', 'Line')
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DAYS = 7
+DEFAULT_MAX_OFFERS = 20
+DEFAULT_MAX_COURSE_RUNS = 20
+DEFAULT_WORKERS = 4
+
+
+def get_popular_enterprise_catalogs(site, since, max_offers):
+    """
+    Returns the enterprise customer and catalog UUIDs of the enterprise offers of the site redeemed most often since
+    the given time, most redeemed first.
+
+    Returns:
+        list: Tuples of enterprise customer UUID and enterprise catalog UUID, or None for offers without a catalog.
+    """
+    redemptions = OrderDiscount.objects.filter(
+        order__site=site,
+        order__date_placed__gte=since,
+        offer_id__in=ConditionalOffer.objects.filter(condition__enterprise_customer_uuid__isnull=False).values('id'),
+    ).values('offer_id').annotate(count=Count('id')).order_by('-count')[:max_offers]
+    offer_ids = [redemption['offer_id'] for redemption in redemptions]
+    offers = ConditionalOffer.objects.select_related('condition').in_bulk(offer_ids)
+
+    catalogs = []
+    for offer_id in offer_ids:
+        condition = offers[offer_id].condition
+        catalog = (
+            str(condition.enterprise_customer_uuid),
+            str(condition.enterprise_customer_catalog_uuid) if condition.enterprise_customer_catalog_uuid else None,
+        )
+        if catalog not in catalogs:
+            catalogs.append(catalog)
+    return catalogs
+
+
+def get_popular_course_runs(site, since, max_course_runs):
+    """
+    Returns the IDs of the course runs ordered or added to baskets on the site most often since the given time, most
+    popular first.
+    """
+    counts = Counter()
+    for lines in (
+            OrderLine.objects.filter(order__site=site, order__date_placed__gte=since),
+            BasketLine.objects.filter(basket__site=site, date_created__gte=since),
+    ):
+        for line in lines.filter(product__course__isnull=False).values('product__course_id').annotate(
+                count=Count('id')):
+            counts[line['product__course_id']] += line['count']
+    return [course_run_id for course_run_id, __ in counts.most_common(max_course_runs)]
+
+
+def warm_enterprise_catalog_cache(site, days=DEFAULT_DAYS, max_offers=DEFAULT_MAX_OFFERS,
+                                  max_course_runs=DEFAULT_MAX_COURSE_RUNS, workers=DEFAULT_WORKERS):
+    """
+    Refreshes the cached containment of the popular course runs of the site in its popular enterprise catalogs.
+
+    Each course run is checked on its own, as baskets holding a single course run do.
+
+    Arguments:
+        site (Site): Site whose orders and baskets are considered, and whose enterprise catalog service is called.
+        days (int): Number of days of orders and baskets considered.
+        max_offers (int): Maximum number of enterprise offers whose catalogs are checked.
+        max_course_runs (int): Maximum number of course runs checked in each catalog.
+        workers (int): Number of checks run concurrently.
+
+    Returns:
+        tuple: Numbers of checks refreshed and failed.
+    """
+    since = timezone.now() - datetime.timedelta(days=days)
+    catalogs = get_popular_enterprise_catalogs(site, since, max_offers)
+    course_run_ids = get_popular_course_runs(site, since, max_course_runs) if catalogs else []
+
+    def refresh(enterprise_customer_uuid, enterprise_customer_catalog_uuid, course_run_id):
+        try:
+            refresh_catalog_contains_course_runs(
+                site, [course_run_id], enterprise_customer_uuid,
+                enterprise_customer_catalog_uuid=enterprise_customer_catalog_uuid
+            )
+        except (ReqConnectionError, KeyError, HTTPError, Timeout) as exc:
+            logger.warning(
+                'Failed to check whether the catalog [%s] of enterprise [%s] contains course run [%s]: %s',
+                enterprise_customer_catalog_uuid, enterprise_customer_uuid, course_run_id, exc
+            )
+            return False
+        return True
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        results = list(executor.map(
+            lambda check: refresh(*check),
+            [catalog + (course_run_id,) for catalog in catalogs for course_run_id in course_run_ids]
+        ))
+
+    refreshed = results.count(True)
+    failed = results.count(False)
+    logger.info(
+        'Refreshed [%d] enterprise catalog contains checks of [%d] catalogs and [%d] course runs for site [%s], '
+        '[%d] failed.',
+        refreshed, len(catalogs), len(course_run_ids), site.domain, failed
+    )
+    return refreshed, failed
@@ -0,0 +1,119 @@
+"""
+Process-wide pool of Segment clients.
+
+Each Segment client has a queue of events and a consumer thread uploading them. The pool holds a single client per
+Segment key for the whole process, rather than one per site configuration instance, so that the number of threads and
+queued events of a worker is bounded by the number of keys in use.
+
+Clients are flushed and stopped when the process exits. Servers recycling workers without running atexit handlers,
+such as gunicorn when a worker is killed after its graceful timeout, should call shutdown_segment_clients() from their
+worker exit hook.
+"""
+
+
+import atexit
+import logging
+import os
+import threading
+import time
+from functools import wraps
+
+from analytics import Client
+from django.conf import settings
+from edx_django_utils import monitoring as monitoring_utils
+
+logger = logging.getLogger(__name__)
+
+_clients = {}
+_clients_pid = None
+_lock = threading.Lock()
+
+
+class SegmentClient(Client):
+    """
+    Segment client recording the duration of its uploads, and reporting its queue depth and the duration of its last
+    upload as custom metrics of the requests tracking events.
+    """
+
+    def __init__(self, write_key, send=True, **kwargs):
+        # Client starts its consumer threads when sending is enabled. They are started here instead, once their
+        # uploads are timed.
+        super(SegmentClient, self).__init__(write_key, send=False, **kwargs)
+        self.send = send
+        self.upload_count = 0
+        self.upload_duration = 0.0
+        self.last_upload_duration = None
+
+        if send:
+            for consumer in self.consumers:
+                consumer.request = self._time_upload(consumer.request)
+                consumer.start()
+
+    def _time_upload(self, request):
+        @wraps(request)
+        def wrapper(batch):
+            started = time.perf_counter()
+            try:
+                return request(batch)
+            finally:
+                duration = time.perf_counter() - started
+                self.upload_count += 1
+                self.upload_duration += duration
+                self.last_upload_duration = duration
+                logger.debug('Uploaded %d Segment events in %.3f seconds.', len(batch), duration)
+
+        return wrapper
+
+    def _enqueue(self, msg):
+        result = super(SegmentClient, self)._enqueue(msg)
+        monitoring_utils.set_custom_metric('segment_queue_depth', self.queue.qsize())
+        if self.last_upload_duration is not None:
+            monitoring_utils.set_custom_metric(
+                'segment_last_upload_duration_ms', round(self.last_upload_duration * 1000, 3)
+            )
+        return result
+
+
+def get_segment_client(write_key):
+    """
+    Returns the Segment client of the process for the given key, creating it if needed.
+
+    Consumer threads do not survive a fork, so clients created before the process was forked, by a preloading server
+    for instance, are not reused by the child process.
+    """
+    global _clients_pid  # pylint: disable=global-statement
+
+    with _lock:
+        if _clients_pid != os.getpid():
+            _clients.clear()
+            _clients_pid = os.getpid()
+
+        client = _clients.get(write_key)
+        if client is None:
+            client = SegmentClient(
+                write_key,
+                debug=settings.DEBUG,
+                send=settings.SEND_SEGMENT_EVENTS,
+                max_queue_size=settings.SEGMENT_MAX_QUEUE_SIZE,
+                upload_size=settings.SEGMENT_UPLOAD_SIZE,
+                upload_interval=settings.SEGMENT_UPLOAD_INTERVAL,
+            )
+            _clients[write_key] = client
+
+        return client
+
+
+def shutdown_segment_clients():
+    """ Uploads the queued events of every Segment client of the process, then stops their consumer threads. """
+    with _lock:
+        clients = list(_clients.values()) if _clients_pid == os.getpid() else []
+        _clients.clear()
+
+    for client in clients:
+        try:
+            client.shutdown()
+        except Exception:  # pylint: disable=broad-except
+            logger.exception('Failed to shut down the Segment client.')
+
+
+atexit.register(shutdown_segment_clients)
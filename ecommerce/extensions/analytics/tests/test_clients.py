@@ -0,0 +1,73 @@
+
+
+import mock
+from django.test import override_settings
+
+from ecommerce.extensions.analytics import clients
+from ecommerce.tests.testcases import TestCase
+
+
+class SegmentClientPoolTests(TestCase):
+    """ Tests for the Segment client pool. """
+
+    def setUp(self):
+        super(SegmentClientPoolTests, self).setUp()
+        clients.shutdown_segment_clients()
+        self.addCleanup(clients.shutdown_segment_clients)
+
+    def test_get_segment_client(self):
+        """ Verify a single client is created per Segment key, with the configured queue and upload settings. """
+        with override_settings(SEGMENT_MAX_QUEUE_SIZE=10, SEGMENT_UPLOAD_SIZE=5, SEGMENT_UPLOAD_INTERVAL=2):
+            client = clients.get_segment_client('key')
+
+        self.assertIsInstance(client, clients.SegmentClient)
+        self.assertIs(clients.get_segment_client('key'), client)
+        self.assertIsNot(clients.get_segment_client('other-key'), client)
+        self.assertEqual(client.queue.maxsize, 10)
+        self.assertEqual(client.consumers[0].upload_size, 5)
+        self.assertEqual(client.consumers[0].upload_interval, 2)
+
+    def test_segment_client_of_site_configuration(self):
+        """ Verify site configurations sharing a Segment key share its client. """
+        self.site_configuration.segment_key = 'key'
+        self.assertIs(self.site_configuration.segment_client, clients.get_segment_client('key'))
+
+    def test_get_segment_client_after_fork(self):
+        """ Verify clients created by the parent of a forked process are not reused. """
+        client = clients.get_segment_client('key')
+        with mock.patch('os.getpid', return_value=-1):
+            self.assertIsNot(clients.get_segment_client('key'), client)
+
+    def test_shutdown_segment_clients(self):
+        """ Verify the clients are shut down and removed from the pool. """
+        client = clients.get_segment_client('key')
+        with mock.patch.object(clients.SegmentClient, 'shutdown') as mock_shutdown:
+            clients.shutdown_segment_clients()
+        mock_shutdown.assert_called_once_with()
+        self.assertIsNot(clients.get_segment_client('key'), client)
+
+    @override_settings(SEND_SEGMENT_EVENTS=True)
+    def test_metrics(self):
+        """ Verify uploads are timed, and the queue depth and last upload duration are reported. """
+        client = clients.get_segment_client('key')
+        consumer = client.consumers[0]
+        # Stop the consumer thread, so that events are uploaded here.
+        consumer.pause()
+        consumer.join()
+        client.queue.put({'type': 'track'})
+
+        with mock.patch('ecommerce.extensions.analytics.clients.monitoring_utils.set_custom_metric') as mock_metric:
+            client.track('user', 'event')
+        mock_metric.assert_called_once_with('segment_queue_depth', 2)
+
+        with mock.patch('analytics.consumer.post'):
+            consumer.upload()
+        self.assertEqual(client.upload_count, 1)
+        self.assertIsNotNone(client.last_upload_duration)
+        self.assertEqual(client.queue.qsize(), 0)
+
+        with mock.patch('ecommerce.extensions.analytics.clients.monitoring_utils.set_custom_metric') as mock_metric:
+            client.track('user', 'event')
+        mock_metric.assert_any_call(
+            'segment_last_upload_duration_ms', round(client.last_upload_duration * 1000, 3)
+        )
@@ -1,6 +1,8 @@
 
 
+from django.db.models import QuerySet
 from edx_rest_framework_extensions.paginators import DefaultPagination
+from rest_framework import pagination
 from rest_framework_datatables.pagination import DatatablesPageNumberPagination
 
 
@@ -14,3 +16,41 @@ class PageNumberPagination(DatatablesPageNumberPagination):
 
 class DatatablesDefaultPagination(DefaultPagination, PageNumberPagination):
     """ Default Pagination for Datatables. """
+
+
+class CursorPagination(pagination.CursorPagination):
+    """
+    Keyset pagination: pages are selected by filtering on an indexed column rather than with an OFFSET,
+    and results are not counted, so each page costs the same however deep into the list it is.
+    """
+    ordering = '-id'
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+
+
+class OptionalCursorPagination(PageNumberPagination):
+    """
+    Page number pagination which switches to cursor pagination when the client opts in.
+
+    Clients request the first page with an empty `cursor` query parameter, then follow the `next` links, which
+    carry opaque cursors. Only list actions returning a queryset are paginated this way.
+    """
+    cursor_pagination_class = CursorPagination
+    cursor_paginator = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if (
+                isinstance(queryset, QuerySet) and getattr(view, 'action', None) == 'list' and
+                self.cursor_pagination_class.cursor_query_param in request.query_params and
+                request.accepted_renderer.format != 'datatables'
+        ):
+            self.cursor_paginator = self.cursor_pagination_class()
+            self.cursor_paginator.page_size = self.page_size
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+
+        return super(OptionalCursorPagination, self).paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super(OptionalCursorPagination, self).get_paginated_response(data)
@@ -13,7 +13,7 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.db import transaction
-from django.db.models import Count, Q, Sum, prefetch_related_objects
+from django.db.models import Count, Manager, Prefetch, Q, Sum, prefetch_related_objects
 from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 from opaque_keys.edx.keys import CourseKey
@@ -87,6 +87,7 @@ from ecommerce.programs.custom import class_path
 logger = logging.getLogger(__name__)
 
 Basket = get_model('basket', 'Basket')
+BasketAttribute = get_model('basket', 'BasketAttribute')
 BasketLine = get_model('basket', 'Line')
 Benefit = get_model('offer', 'Benefit')
 BillingAddress = get_model('order', 'BillingAddress')
@@ -106,6 +107,7 @@ ProductAttributeValue = get_model('catalogue', 'ProductAttributeValue')
 ProductCategory = get_model('catalogue', 'ProductCategory')
 Refund = get_model('refund', 'Refund')
 Selector = get_class('partner.strategy', 'Selector')
+Source = get_model('payment', 'Source')
 StockRecord = get_model('partner', 'StockRecord')
 Voucher = get_model('voucher', 'Voucher')
 VoucherApplication = get_model('voucher', 'VoucherApplication')
@@ -407,6 +409,15 @@ class LineSerializer(serializers.ModelSerializer):
         )
 
 
+class OrderListSerializer(serializers.ListSerializer):  # pylint: disable=abstract-method
+    """Serializes many orders, loading the objects they reference in bulk."""
+
+    def to_representation(self, data):
+        orders = list(data.all() if isinstance(data, Manager) else data)
+        OrderSerializer.load_related_objects(orders)
+        return super().to_representation(orders)
+
+
 class OrderSerializer(serializers.ModelSerializer):
     """Serializer for parsing order data."""
     basket_discounts = serializers.SerializerMethodField()
@@ -426,6 +437,74 @@ class OrderSerializer(serializers.ModelSerializer):
     total_before_discounts_incl_tax = serializers.SerializerMethodField()
     order_product_ids = serializers.SerializerMethodField()
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """
+        Returns the queryset with every relation read by this serializer loaded up front, so that
+        serializing a page of orders costs the same number of queries regardless of its size.
+        """
+        return queryset.select_related('billing_address', 'user', 'basket').prefetch_related(
+            'discounts',
+            Prefetch('sources', queryset=Source.objects.select_related('source_type')),
+            Prefetch(
+                'basket__basketattribute_set', queryset=BasketAttribute.objects.select_related('attribute_type')
+            ),
+            Prefetch(
+                'basket__vouchers',
+                queryset=Voucher.objects.prefetch_related(
+                    'applications',
+                    Prefetch(
+                        'offers', queryset=ConditionalOffer.objects.select_related('condition__range', 'benefit')
+                    ),
+                )
+            ),
+            Prefetch(
+                'lines',
+                queryset=Line.objects.select_related(
+                    'product__product_class', 'product__parent__product_class', 'product__course'
+                ).prefetch_related(
+                    Prefetch(
+                        'product__attribute_values',
+                        queryset=ProductAttributeValue.objects.select_related('attribute')
+                    ),
+                    'product__stockrecords',
+                    'attributes',
+                )
+            ),
+        )
+
+    @staticmethod
+    def load_related_objects(orders):
+        """
+        Loads in bulk the objects referenced by the orders which cannot be prefetched by
+        `setup_eager_loading`, as they are not related through foreign keys.
+        """
+        discounts = [
+            discount for order in orders for discount in order.discounts.all()
+            if 'discounts' in getattr(order, '_prefetched_objects_cache', {})
+        ]
+        if discounts:
+            offers = ConditionalOffer.objects.select_related('condition__range', 'benefit').in_bulk(
+                {discount.offer_id for discount in discounts if discount.offer_id}
+            )
+            vouchers = Voucher.objects.prefetch_related(
+                Prefetch('offers', queryset=ConditionalOffer.objects.select_related('benefit', 'condition'))
+            ).in_bulk({discount.voucher_id for discount in discounts if discount.voucher_id})
+            for discount in discounts:
+                discount.set_offer_and_voucher(offers.get(discount.offer_id), vouchers.get(discount.voucher_id))
+
+        # Product attributes are otherwise loaded with a query per product on first access.
+        for order in orders:
+            if 'lines' not in getattr(order, '_prefetched_objects_cache', {}):
+                continue
+            for line in order.lines.all():
+                product = line.product
+                if product is None or 'attribute_values' not in getattr(product, '_prefetched_objects_cache', {}):
+                    continue
+                for attribute_value in product.attribute_values.all():
+                    setattr(product.attr, attribute_value.attribute.code, attribute_value.value)
+                product.attr.initialised = True
+
     def get_basket_discounts(self, obj):
         basket_discounts = []
         try:
@@ -518,7 +597,12 @@ class OrderSerializer(serializers.ModelSerializer):
     def get_enterprise_learner_portal_url(self, obj):
         try:
             request = self.context['request']
-            enterprise_customer_user = ReceiptResponseView().get_metadata_for_enterprise_user(request)
+            # The enterprise learner metadata only depends on the request, so it is retrieved once for all orders.
+            if not hasattr(self, '_enterprise_customer_user'):
+                self._enterprise_customer_user = (  # pylint: disable=attribute-defined-outside-init
+                    ReceiptResponseView().get_metadata_for_enterprise_user(request)
+                )
+            enterprise_customer_user = self._enterprise_customer_user
             if not enterprise_customer_user:
                 return None
             enterprise_customer = enterprise_customer_user['enterprise_customer']
@@ -541,7 +625,7 @@ class OrderSerializer(serializers.ModelSerializer):
 
     def get_order_product_ids(self, obj):
         try:
-            return ','.join(map(str, obj.lines.values_list('product_id', flat=True)))
+            return ','.join(str(line.product_id) for line in obj.lines.all())
         except (AttributeError, ValueError):
             logger.exception(
                 '[Receipt MFE] Failed to retrieve order product IDs for order [%s]',
@@ -584,6 +668,7 @@ class OrderSerializer(serializers.ModelSerializer):
             'user',
             'vouchers',
         )
+        list_serializer_class = OrderListSerializer
 
 
 class BasketSerializer(serializers.ModelSerializer):
@@ -618,7 +703,9 @@ class BasketSerializer(serializers.ModelSerializer):
         return "None"
 
     def get_products(self, obj):
-        lines = BasketLine.objects.filter(basket=obj)
+        lines = BasketLine.objects.filter(basket=obj).select_related('product').prefetch_related(
+            'product__attribute_values__attribute'
+        )
         products = [line.product for line in lines]
         serialized_data = []
         for product in products:
@@ -10,7 +10,9 @@ import pytz
 import responses
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Permission
+from django.db import connection
 from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from opaque_keys.edx.keys import CourseKey
 from oscar.core.loading import get_class, get_model
@@ -105,6 +107,23 @@ class OrderListViewTests(AccessTokenMixin, ThrottlingMixin, TestCase):
         self.assertEqual(content['results'][0]['number'], str(order_2.number))
         self.assertEqual(content['results'][1]['number'], str(order.number))
 
+    def test_with_orders_cursor_pagination(self):
+        """ The view should page through the user's orders with cursors, without counting them, if requested. """
+        orders = [create_order(site=self.site, user=self.user) for __ in range(3)]
+
+        response = self.client.get(self.path, {'cursor': '', 'page_size': 2}, HTTP_AUTHORIZATION=self.token)
+        self.assertEqual(response.status_code, 200)
+        content = response.json()
+        self.assertNotIn('count', content)
+        self.assertIsNone(content['previous'])
+        self.assertEqual([result['number'] for result in content['results']], [orders[2].number, orders[1].number])
+
+        response = self.client.get(content['next'], HTTP_AUTHORIZATION=self.token)
+        self.assertEqual(response.status_code, 200)
+        content = response.json()
+        self.assertIsNone(content['next'])
+        self.assertEqual([result['number'] for result in content['results']], [orders[0].number])
+
     @ddt.data(True, False)
     def test_enable_hoist_order_history(self, enable_hoist_order_history_flag):
         """ Verify that orders contain the Order History flag value """
@@ -240,6 +259,41 @@ class OrderListViewTests(AccessTokenMixin, ThrottlingMixin, TestCase):
         self.assertIn('course_organization', content['results'][0]['lines'][0])
         self.assertEqual(CourseKey.from_string(course_id).org, content['results'][0]['lines'][0]['course_organization'])
 
+    def _create_discounted_seat_order(self, index):
+        course = CourseFactory(id='course-v1:org+course+run{}'.format(index), partner=self.partner)
+        product = course.create_or_update_seat('credit', True, 100, credit_provider='Harvard', credit_hours=1)
+        voucher, product = prepare_voucher(
+            code='CODE{}'.format(index),
+            _range=factories.RangeFactory(products=[product]),
+            benefit_value=15,
+            benefit_type=Benefit.PERCENTAGE
+        )
+        basket = factories.BasketFactory(owner=self.user, site=self.site)
+        basket.vouchers.add(voucher)
+        basket.add_product(product)
+        Applicator().apply(basket, user=basket.owner, request=self.request)
+        return factories.create_order(basket=basket, user=self.user)
+
+    def _count_list_queries(self, page_size):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.path, {'page_size': page_size}, HTTP_AUTHORIZATION=self.token)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), page_size)
+        return len(queries)
+
+    @mock.patch(
+        'ecommerce.extensions.checkout.views.ReceiptResponseView.get_metadata_for_enterprise_user',
+        mock.Mock(return_value=None)
+    )
+    def test_list_query_count(self):
+        """ The number of queries needed to list a page of orders should not depend on the page size. """
+        for index in range(4):
+            self._create_discounted_seat_order(index)
+
+        # Warm up caches which are not specific to the listed orders.
+        self._count_list_queries(page_size=1)
+        self.assertEqual(self._count_list_queries(page_size=4), self._count_list_queries(page_size=1))
+
     def test_with_other_users_orders(self):
         """ The view should only return orders for the authenticated users. """
         other_user = self.create_user()
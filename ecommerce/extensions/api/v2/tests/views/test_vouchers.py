@@ -10,6 +10,7 @@ import responses
 from django.http import Http404
 from django.urls import reverse
 from django.utils.timezone import now
+from edx_django_utils.cache import TieredCache
 from opaque_keys.edx.keys import CourseKey
 from oscar.core.loading import get_model
 from oscar.test.factories import BenefitFactory, OrderFactory, OrderLineFactory, ProductFactory, RangeFactory
@@ -266,6 +267,22 @@ class VoucherViewSetTests(DiscoveryMockMixin, DiscoveryTestMixin, LmsApiMockMixi
         self.assertNotIn(expired_seat, products)
         self.assertNotIn(future_enrollment_seat, products)
 
+    def test_retrieve_course_objects_ordering(self):
+        """Verify products are ordered by seat type, and products of unlisted seat types go last."""
+        course = CourseFactory(partner=self.partner)
+        verified_seat = course.create_or_update_seat('verified', True, 100)
+        professional_seat = course.create_or_update_seat('professional', True, 100)
+        outdated_seat = CourseFactory(partner=self.partner).create_or_update_seat('verified', True, 100)
+        Product.objects.filter(id=outdated_seat.id).update(attribute_snapshot={
+            'version': Product.ATTRIBUTE_SNAPSHOT_VERSION, 'values': {'certificate_type': 'honor'}
+        })
+        course_discovery_results = [{'key': course.id}, {'key': outdated_seat.course_id}]
+
+        products, _, __ = VoucherViewSet().retrieve_course_objects(
+            course_discovery_results, 'professional, verified'
+        )
+        self.assertEqual(products, [professional_seat, verified_seat, outdated_seat])
+
 
 @ddt.ddt
 class VoucherViewOffersEndpointTests(DiscoveryMockMixin, CouponMixin, DiscoveryTestMixin, LmsApiMockMixin,
@@ -361,19 +378,9 @@ class VoucherViewOffersEndpointTests(DiscoveryMockMixin, CouponMixin, DiscoveryT
 
         self.assertEqual(response.status_code, 200)
 
-    @ddt.data(
-        (
-            StockRecord.objects.none(),
-            'ecommerce.extensions.api.v2.views.vouchers.StockRecord.objects.filter'
-        ),
-        (
-            Product.objects.none(),
-            'ecommerce.extensions.api.v2.views.vouchers.Product.objects.filter'
-        )
-    )
-    @ddt.unpack
+    @ddt.data(True, False)
     @responses.activate
-    def test_voucher_offers_listing_catalog_query_exception(self, return_value, method):
+    def test_voucher_offers_listing_catalog_query_exception(self, product_found):
         """
         Verify the endpoint returns status 200 and an empty list of course offers
         when all product Courses and Stock Records are not found
@@ -389,9 +396,16 @@ class VoucherViewOffersEndpointTests(DiscoveryMockMixin, CouponMixin, DiscoveryT
         voucher, __ = prepare_voucher(_range=new_range)
         request = self.prepare_offers_listing_request(voucher.code)
 
-        with mock.patch(method, mock.Mock(return_value=return_value)):
+        if product_found:
+            StockRecord.objects.filter(product=seat).delete()
             offers = VoucherViewSet().get_offers(request=request, voucher=voucher)['results']
-            self.assertEqual(len(offers), 0)
+        else:
+            with mock.patch(
+                'ecommerce.extensions.api.v2.views.vouchers.Product.objects.filter',
+                mock.Mock(return_value=Product.objects.none())
+            ):
+                offers = VoucherViewSet().get_offers(request=request, voucher=voucher)['results']
+        self.assertEqual(len(offers), 0)
 
     @responses.activate
     def test_voucher_offers_listing_catalog_query(self):
@@ -735,6 +749,41 @@ class VoucherViewOffersEndpointTests(DiscoveryMockMixin, CouponMixin, DiscoveryT
             }],
         )
 
+    @responses.activate
+    def test_offers_api_endpoint_caches_pages(self):
+        """ Verify that rendered pages of offers are cached, unless they may depend on the user. """
+        catalog_query = '*:*'
+        self.mock_access_token_response()
+        course, seat = self.create_course_and_seat()
+        self.mock_course_runs_endpoint(
+            discovery_api_url=self.site_configuration.discovery_api_url, query=catalog_query, course_run=course
+        )
+        new_range, __ = Range.objects.get_or_create(catalog_query=catalog_query, course_seat_types='verified')
+        new_range.add_product(seat)
+        voucher, __ = prepare_voucher(_range=new_range, benefit_value=10)
+
+        response = self.endpointView(self.prepare_offers_listing_request(voucher.code))
+        self.assertEqual(len(response.data['results']), 1)
+
+        with mock.patch.object(VoucherViewSet, 'get_offers') as mock_get_offers:
+            cached_response = self.endpointView(self.prepare_offers_listing_request(voucher.code))
+            self.assertFalse(mock_get_offers.called)
+        self.assertEqual(cached_response.data, response.data)
+
+        # Offers of credit seats depend on the eligibility and orders of the user.
+        new_range.course_seat_types = 'verified, credit'
+        new_range.save()
+        TieredCache.dangerous_clear_all_tiers()
+        self.endpointView(self.prepare_offers_listing_request(voucher.code))
+        with mock.patch.object(VoucherViewSet, 'get_offers', return_value={'next': None, 'results': []}):
+            response = self.endpointView(self.prepare_offers_listing_request(voucher.code))
+        self.assertEqual(response.data['results'], [])
+
+    def test_parse_course_seat_types(self):
+        """ Verify seat types are parsed from comma-separated strings, with or without spaces. """
+        self.assertEqual(VoucherViewSet.parse_course_seat_types('verified, credit'), ['verified', 'credit'])
+        self.assertEqual(VoucherViewSet.parse_course_seat_types('verified,credit,'), ['verified', 'credit'])
+
     @responses.activate
     def test_get_offers_for_course_catalog_voucher_api_error(self):
         """
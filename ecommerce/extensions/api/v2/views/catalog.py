@@ -26,6 +26,7 @@ logger = logging.getLogger(__name__)
 class CatalogViewSet(NestedViewSetMixin, ReadOnlyModelViewSet):
     serializer_class = serializers.CatalogSerializer
     permission_classes = (IsAuthenticated, IsAdminUser,)
+    use_read_replica = True
 
     def get_queryset(self):
         self.queryset = Catalog.objects.all()
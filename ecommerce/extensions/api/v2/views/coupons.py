@@ -18,6 +18,7 @@ from ecommerce.core.models import BusinessClient
 from ecommerce.coupons.utils import prepare_course_seat_types
 from ecommerce.extensions.api import data as data_api
 from ecommerce.extensions.api.filters import ProductFilter
+from ecommerce.extensions.api.pagination import OptionalCursorPagination
 from ecommerce.extensions.api.serializers import (
     CategorySerializer,
     CouponListSerializer,
@@ -60,7 +61,9 @@ DEPRECATED_COUPON_CATEGORIES = ['Bulk Enrollment']
 class CouponViewSet(EdxOrderPlacementMixin, viewsets.ModelViewSet):
     """ Coupon resource. """
     permission_classes = (IsAuthenticated, IsAdminUser)
+    use_read_replica = True
     filterset_class = ProductFilter
+    pagination_class = OptionalCursorPagination
 
     def get_queryset(self):
         product_filter = Product.objects.filter(
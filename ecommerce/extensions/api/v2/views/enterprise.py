@@ -152,6 +152,7 @@ class OfferAssignmentSummaryViewSet(ModelViewSet):
     """
 
     permission_classes = (IsAuthenticated,)
+    use_read_replica = True
 
     serializer_class = OfferAssignmentSummarySerializer
     pagination_class = DatatablesDefaultPagination
@@ -1042,6 +1043,7 @@ class EnterpriseCouponViewSet(CouponViewSet):
 class BaseOfferApiViewSet(PermissionRequiredMixin, ReadOnlyModelViewSet):
     model = ConditionalOffer
     permission_classes = (IsAuthenticated,)
+    use_read_replica = True
     filter_backends = (django_filters.rest_framework.DjangoFilterBackend,)
     filterset_class = OfferApiFilter
 
@@ -28,6 +28,7 @@ from ecommerce.enterprise.mixins import EnterpriseDiscountMixin
 from ecommerce.extensions.analytics.utils import audit_log
 from ecommerce.extensions.api import serializers
 from ecommerce.extensions.api.filters import OrderFilter
+from ecommerce.extensions.api.pagination import OptionalCursorPagination
 from ecommerce.extensions.api.permissions import IsStaffOrOwner
 from ecommerce.extensions.api.throttles import ServiceUserThrottle
 from ecommerce.extensions.checkout.mixins import EdxOrderPlacementMixin
@@ -54,11 +55,19 @@ Benefit = get_model('offer', 'Benefit')
 class OrderViewSet(viewsets.ReadOnlyModelViewSet):
     lookup_field = 'number'
     permission_classes = (IsAuthenticated, IsStaffOrOwner, DjangoModelPermissions,)
+    use_read_replica = True
     queryset = Order.objects.all()
     serializer_class = serializers.OrderSerializer
     throttle_classes = (ServiceUserThrottle,)
     filter_backends = (django_filters.rest_framework.DjangoFilterBackend,)
     filterset_class = OrderFilter
+    pagination_class = OptionalCursorPagination
+
+    def get_queryset(self):
+        queryset = super(OrderViewSet, self).get_queryset()
+        if self.action in ('list', 'retrieve'):
+            queryset = serializers.OrderSerializer.setup_eager_loading(queryset)
+        return queryset
 
     def filter_queryset(self, queryset):
         queryset = super(OrderViewSet, self).filter_queryset(queryset)
@@ -28,6 +28,7 @@ class ProductViewSet(NestedViewSetMixin, NonDestroyableModelViewSet):
     filter_backends = (django_filters.rest_framework.DjangoFilterBackend,)
     filterset_class = ProductFilter
     permission_classes = (IsAuthenticated, IsAdminUser,)
+    use_read_replica = True
 
     def get_queryset(self):
         self.queryset = Product.objects.all()
@@ -40,7 +41,7 @@ class ProductViewSet(NestedViewSetMixin, NonDestroyableModelViewSet):
         return super(ProductViewSet, self).get_queryset().filter(
             Q(stockrecords__partner=partner) |
             Q(course__partner=partner)
-        )
+        ).prefetch_related('attribute_values__attribute', 'stockrecords')
 
     def invalid_product_response(self, http_method):
         """
@@ -8,8 +8,10 @@ import django_filters
 import pytz
 from dateutil.parser import parse
 from dateutil.utils import default_tzinfo
+from django.conf import settings
 from django.shortcuts import get_object_or_404
 from django.utils.timezone import now
+from edx_django_utils.cache import TieredCache
 from opaque_keys.edx.keys import CourseKey
 from oscar.core.loading import get_model
 from requests.exceptions import ConnectionError as ReqConnectionError
@@ -19,11 +21,13 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 
 from ecommerce.core.constants import DEFAULT_CATALOG_PAGE_SIZE
+from ecommerce.core.utils import get_cache_key
 from ecommerce.coupons.utils import fetch_course_catalog, get_catalog_course_runs
 from ecommerce.courses.models import Course
 from ecommerce.courses.utils import get_course_info_from_catalog
 from ecommerce.enterprise.utils import get_enterprise_catalog
 from ecommerce.extensions.api import serializers
+from ecommerce.extensions.api.pagination import OptionalCursorPagination
 from ecommerce.extensions.api.permissions import IsOffersOrIsAuthenticatedAndStaff
 from ecommerce.extensions.api.v2.views import NonDestroyableModelViewSet
 
@@ -50,8 +54,10 @@ class VoucherViewSet(NonDestroyableModelViewSet):
     """ View set for vouchers. """
     serializer_class = serializers.VoucherSerializer
     permission_classes = (IsOffersOrIsAuthenticatedAndStaff,)
+    use_read_replica = True
     filter_backends = (django_filters.rest_framework.DjangoFilterBackend,)
     filterset_class = VoucherFilter
+    pagination_class = OptionalCursorPagination
 
     def get_queryset(self):
         return Voucher.objects.filter(
@@ -74,6 +80,20 @@ class VoucherViewSet(NonDestroyableModelViewSet):
         """
         code = request.GET.get('code', '')
 
+        # Coupon landing pages get bursts of traffic whenever a campaign email goes out, so rendered pages of
+        # offers are cached briefly, unless they depend on the user.
+        cache_key = get_cache_key(
+            resource='voucher_offers',
+            site_domain=request.site.domain,
+            code=code,
+            limit=request.GET.get('limit'),
+            offset=request.GET.get('offset'),
+            page=request.GET.get('page'),
+        )
+        cached_response = TieredCache.get_cached_response(cache_key)
+        if cached_response.is_found:
+            return Response(data=cached_response.value)
+
         try:
             voucher = Voucher.objects.get(code=code)
         except Voucher.DoesNotExist:
@@ -97,8 +117,62 @@ class VoucherViewSet(NonDestroyableModelViewSet):
                 path=request.path,
                 query=next_page_query,
             )
+
+        if 'credit' not in self.parse_course_seat_types(self.get_course_seat_types(voucher.best_offer.benefit)):
+            TieredCache.set_all_tiers(cache_key, offers_data, settings.VOUCHER_OFFERS_CACHE_TIMEOUT)
         return Response(data=offers_data)
 
+    @staticmethod
+    def get_course_seat_types(benefit):
+        """ Returns the comma-separated seat types offered by the benefit, which default to all paid seat types. """
+        if benefit.range and benefit.range.course_seat_types:
+            return benefit.range.course_seat_types
+        return 'verified,professional,credit'
+
+    @staticmethod
+    def parse_course_seat_types(course_seat_types):
+        """ Returns the list of seat types in a comma-separated string of seat types, e.g. 'verified, credit'. """
+        return [seat_type.strip() for seat_type in course_seat_types.split(',') if seat_type.strip()]
+
+    @staticmethod
+    def build_course_run_index(results):
+        """ Helper method to index the course runs in course catalog response results by key.
+
+        Each course run is indexed with its metadata and the parsed dates of its enrollment window,
+        so that whether it is enrollable can be checked without parsing them again.
+
+        Args:
+            results(dict): Course catalog response results.
+
+        Returns:
+            dict: Tuples of course run metadata and (end, enrollment start, enrollment end) dates by course run key.
+        """
+        def parse_date(course_run, field):
+            return course_run.get(field) and default_tzinfo(parse(course_run[field]), pytz.UTC)
+
+        def index_course_run(course_run):
+            course_run_index[course_run['key']] = (
+                course_run,
+                (
+                    parse_date(course_run, 'end'),
+                    parse_date(course_run, 'enrollment_start'),
+                    parse_date(course_run, 'enrollment_end'),
+                ),
+            )
+
+        course_run_index = {}
+        for result in results:
+            if 'content_type' in result and result['content_type'] == 'course':
+                for course_run in result['course_runs']:
+                    # Copy over title and image from course to course_run metadata,
+                    # which get used to display the offer.
+                    index_course_run(dict(
+                        course_run, title=result['title'], card_image_url=result['card_image_url']
+                    ))
+            else:
+                index_course_run(result)
+        return course_run_index
+
     def retrieve_course_objects(self, results, course_seat_types):
         """ Helper method to retrieve all the courses, products and stock records
         from course IDs in course catalog response results. Professional courses
@@ -109,57 +183,50 @@ class VoucherViewSet(NonDestroyableModelViewSet):
             course_seat_types(str): Comma-separated list of accepted seat types.
 
         Returns:
-            Querysets of products and stock records retrieved from results.
+            Products (with their course and stock records loaded), stock records by product ID
+            and course run metadata by course run key retrieved from results.
         """
-        course_run_metadata = {}
-
-        def is_course_run_enrollable(course_run):
-            # Checks if a course run is available for enrollment by checking the following conditions:
-            #   if end date is not set or is in the future
-            #   if enrollment start is not set or is in the past
-            #   if enrollment end is not set or is in the future
-            end = course_run.get('end') and default_tzinfo(parse(course_run['end']), pytz.UTC)
-            enrollment_start = (course_run.get('enrollment_start') and
-                                default_tzinfo(parse(course_run['enrollment_start']), pytz.UTC))
-            enrollment_end = (course_run.get('enrollment_end') and
-                              default_tzinfo(parse(course_run['enrollment_end']), pytz.UTC))
-            current_time = now()
-
-            return (
+        course_run_index = self.build_course_run_index(results)
+
+        # A course run is available for enrollment if:
+        #   its end date is not set or is in the future
+        #   its enrollment start is not set or is in the past
+        #   its enrollment end is not set or is in the future
+        current_time = now()
+        course_run_metadata = {
+            key: course_run
+            for key, (course_run, (end, enrollment_start, enrollment_end)) in course_run_index.items()
+            if (
                 (not end or end > current_time) and
                 (not enrollment_start or enrollment_start <= current_time) and
                 (not enrollment_end or enrollment_end > current_time)
             )
+        }
 
-        for result in results:
-            if 'content_type' in result and result['content_type'] == 'course':
-                for course_run in result['course_runs']:
-                    if is_course_run_enrollable(course_run):
-                        course_run_metadata[course_run['key']] = course_run
-                        # Copy over title and image from course to course_run metadata,
-                        # which get used to display the offer.
-                        course_run_metadata[course_run['key']]['title'] = result['title']
-                        course_run_metadata[course_run['key']]['card_image_url'] = result['card_image_url']
-            elif is_course_run_enrollable(result):
-                course_run_metadata[result['key']] = result
-
-        products = []
-        for seat_type in course_seat_types.split(','):
-            products.extend(Product.objects.filter(
-                course_id__in=list(course_run_metadata.keys()),
-                attributes__name='certificate_type',
-                attribute_values__value_text=seat_type
-            ))
-        stock_records = StockRecord.objects.filter(product__in=products)
+        seat_types = self.parse_course_seat_types(course_seat_types)
+        products = Product.objects.filter(
+            course_id__in=list(course_run_metadata.keys()),
+            attribute_values__attribute__name='certificate_type',
+            attribute_values__value_text__in=seat_types,
+        ).select_related('course', 'parent').prefetch_related('stockrecords')
+        # Products are grouped by seat type, in the order of the seat types. Seat types matched by the database
+        # but not listed, e.g. in another case, go last.
+        seat_type_ranks = {seat_type.lower(): rank for rank, seat_type in enumerate(seat_types)}
+        products = sorted(products, key=lambda product: seat_type_ranks.get(
+            str(product.get_attr('certificate_type', '')).lower(), len(seat_types)
+        ))
+
+        stock_records = {}
+        for product in products:
+            product_stock_records = product.stockrecords.all()
+            if product_stock_records:
+                stock_records[product.id] = product_stock_records[0]
         return products, stock_records, course_run_metadata
 
     def convert_catalog_response_to_offers(self, request, voucher, response):
         offers = []
         benefit = voucher.best_offer.benefit
-        # default course_seat_types value to all paid seat types.
-        course_seat_types = 'verified,professional,credit'
-        if benefit.range and benefit.range.course_seat_types:
-            course_seat_types = benefit.range.course_seat_types
+        course_seat_types = self.get_course_seat_types(benefit)
         multiple_credit_providers = False
         credit_provider_price = None
 
@@ -179,7 +246,7 @@ class VoucherViewSet(NonDestroyableModelViewSet):
 
             course_id = product.course_id
             course_catalog_data = course_run_metadata[course_id]
-            if course_seat_types == 'credit' or product.attr.certificate_type == 'credit':
+            if course_seat_types == 'credit' or product.get_attr('certificate_type') == 'credit':
                 logger.info('[Voucher Offers] Constructing offer data for credit.')
                 # Omit credit seats for which the user is not eligible or which the user already bought.
                 if not request.user.is_eligible_for_credit(product.course_id, request.site.siteconfiguration):
@@ -195,17 +262,11 @@ class VoucherViewSet(NonDestroyableModelViewSet):
                     multiple_credit_providers = False
                     credit_provider_price = StockRecord.objects.get(product=product).price_excl_tax
 
-            try:
-                stock_record = stock_records.get(product__id=product.id)
-            except StockRecord.DoesNotExist:
-                stock_record = None
+            stock_record = stock_records.get(product.id)
+            if not stock_record:
                 logger.error('Stock Record for product %s not found.', product.id)
 
-            try:
-                course = Course.objects.get(id=course_id)
-            except Course.DoesNotExist:  # pragma: no cover
-                course = None
-                logger.error('Course %s not found.', course_id)
+            course = product.course
 
             if course_catalog_data and course and stock_record:
                 offers.append(self.get_course_offer_data(
@@ -348,7 +409,7 @@ class VoucherViewSet(NonDestroyableModelViewSet):
             'multiple_credit_providers': multiple_credit_providers,
             'organization': CourseKey.from_string(course.id).org,
             'credit_provider_price': credit_provider_price,
-            'seat_type': product.attr.certificate_type,
+            'seat_type': product.get_attr('certificate_type'),
             'stockrecords': serializers.StockRecordSerializer(stock_record).data,
             'title': course_info.get('title', course.name),
             'voucher_end_date': voucher.end_datetime
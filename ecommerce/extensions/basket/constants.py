@@ -23,3 +23,14 @@ ENABLE_STRIPE_PAYMENT_PROCESSOR = 'enable_stripe_payment_processor'
 # .. toggle_tickets: REV-3147
 # .. toggle_status: supported
 REDIRECT_WITH_WAFFLE_TESTING_QUERYSTRING = 'redirect_with_waffle_testing_querystring'
+
+# .. toggle_name: enable_prepared_basket_reuse
+# .. toggle_type: waffle_flag
+# .. toggle_default: False
+# .. toggle_description: Returns the open basket unchanged when a learner repeats a request to add the same products,
+#   voucher and bundle to it, instead of rebuilding it.
+# .. toggle_use_cases: open_edx
+# .. toggle_creation_date: 2026-10-19
+# .. toggle_status: supported
+ENABLE_PREPARED_BASKET_REUSE = 'enable_prepared_basket_reuse'
+PREPARED_BASKET_SESSION_KEY = 'prepared_basket_{site_id}'
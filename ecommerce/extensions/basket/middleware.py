@@ -1,5 +1,6 @@
 
 
+from django.core.signing import BadSignature, Signer
 from edx_django_utils import monitoring as monitoring_utils
 from oscar.apps.basket.middleware import BasketMiddleware as OscarBasketMiddleware
 from oscar.core.loading import get_model
@@ -31,6 +32,45 @@ class BasketMiddleware(OscarBasketMiddleware):
         key = '{base}_{site_id}'.format(base=key, site_id=request.site.id)
         return key
 
+    def get_session_key(self, request):
+        """
+        Returns the session key under which a reference to the open basket of the user is stored.
+
+        Parameters:
+            request (Request) -- current request being processed
+
+        Returns:
+            str - session key
+        """
+        return 'open_basket_{site_id}'.format(site_id=request.site.id)
+
+    def get_session_basket(self, session_key, request, manager):
+        """
+        Returns the open basket of the user referenced by the session, if it is still open and owned by the user.
+
+        The reference is only stored in existing sessions, so that requests authenticated otherwise, such as with a
+        JWT, do not create a session.
+        """
+        session = getattr(request, 'session', None)
+        if session is None or not session.session_key or session_key not in session:
+            return None
+
+        try:
+            basket_id = Signer().unsign(session[session_key])
+        except BadSignature:
+            return None
+
+        return manager.filter(id=basket_id, owner=request.user, site=request.site).first()
+
+    def set_session_basket(self, session_key, request, basket):
+        session = getattr(request, 'session', None)
+        if session is None or not session.session_key:
+            return
+
+        basket_hash = self.get_basket_hash(basket.id)
+        if session.get(session_key) != basket_hash:
+            session[session_key] = basket_hash
+
     def get_basket(self, request):
         """ Return the open basket for this request """
         # pylint: disable=protected-access
@@ -46,19 +86,25 @@ class BasketMiddleware(OscarBasketMiddleware):
             # Signed-in user: if they have a cookie basket too, it means
             # that they have just signed in and we need to merge their cookie
             # basket into their user basket, then delete the cookie.
-            try:
-                basket, __ = manager.get_or_create(owner=request.user, site=request.site)
-            except Basket.MultipleObjectsReturned:
-                # Not sure quite how we end up here with multiple baskets.
-                # We merge them and create a fresh one
-                old_baskets = list(manager.filter(owner=request.user, site=request.site))
-                basket = old_baskets[0]
-                for other_basket in old_baskets[1:]:
-                    self.merge_baskets(basket, other_basket)
-
-            # Assign user onto basket to prevent further SQL queries when
-            # basket.owner is accessed.
+            session_key = self.get_session_key(request)
+            # Look up the basket referenced by the session first, only falling back
+            # to the full lookup when the reference is missing or stale.
+            basket = self.get_session_basket(session_key, request, manager)
+            if basket is None:
+                try:
+                    basket, __ = manager.get_or_create(owner=request.user, site=request.site)
+                except Basket.MultipleObjectsReturned:
+                    # Not sure quite how we end up here with multiple baskets.
+                    # We merge them and create a fresh one
+                    old_baskets = list(manager.filter(owner=request.user, site=request.site))
+                    basket = old_baskets[0]
+                    basket.merge_all(old_baskets[1:], add_quantities=False)
+                self.set_session_basket(session_key, request, basket)
+
+            # Assign user and site onto basket to prevent further SQL queries when
+            # basket.owner or basket.site is accessed.
             basket.owner = request.user
+            basket.site = request.site
 
             if cookie_basket:
                 self.merge_baskets(basket, cookie_basket)
@@ -80,6 +126,9 @@ class BasketMiddleware(OscarBasketMiddleware):
 
         return basket
 
+    def merge_baskets(self, master, slave):
+        master.merge_all([slave], add_quantities=False)
+
     @monitoring_utils.function_trace('apply_offers_to_basket')
     def apply_offers_to_basket(self, request, basket):
         apply_offers_on_basket(request, basket)
@@ -1,11 +1,16 @@
 
 
-from django.db import models
+from django.conf import settings
+from django.db import IntegrityError, models, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.timezone import now
 from django.utils.translation import ugettext_lazy as _
-from edx_django_utils.cache import DEFAULT_REQUEST_CACHE
+from edx_django_utils.cache import DEFAULT_REQUEST_CACHE, TieredCache
 from oscar.apps.basket.abstract_models import AbstractBasket
 from oscar.core.loading import get_class
 
+from ecommerce.core.utils import get_cache_key
 from ecommerce.extensions.analytics.utils import track_segment_event, translate_basket_line_for_segment
 from ecommerce.extensions.basket.constants import TEMPORARY_BASKET_CACHE_KEY
 from ecommerce.programs.utils import get_program
@@ -20,6 +25,13 @@ class Basket(AbstractBasket):
         'sites.Site', verbose_name=_("Site"), null=True, blank=True, default=None, on_delete=models.SET_NULL
     )
 
+    def __init__(self, *args, **kwargs):
+        super(Basket, self).__init__(*args, **kwargs)  # pylint: disable=bad-super-call
+        # Attributes of the basket by type name, read by _get_attributes().
+        self._attributes = None
+        self._changed_attributes = set()
+        self._deleted_attributes = set()
+
     @property
     def order_number(self):
         return OrderNumberGenerator().order_number(self)
@@ -44,15 +56,143 @@ class Basket(AbstractBasket):
         else:
             stale_baskets = list(editable_baskets)
             basket = stale_baskets.pop(0)
-            for stale_basket in stale_baskets:
-                # Don't add line quantities when merging baskets
-                basket.merge(stale_basket, add_quantities=False)
+            # Don't add line quantities when merging baskets
+            basket.merge_all(stale_baskets, add_quantities=False)
 
         # Assign the appropriate strategy class to the basket
         basket.strategy = Selector().strategy(user=user)
 
         return basket
 
+    def merge_all(self, baskets, add_quantities=True):
+        """
+        Merges other baskets into this one, as merge() does for each of them, with a number of queries independent
+        of the number of baskets and lines.
+
+        Lines are moved to this basket, except those for which this basket, or a basket merged before, already has a
+        line with the same reference. The quantities of those are added, or the largest is kept, and the duplicate
+        lines deleted. Vouchers are moved to this basket, and the baskets marked as merged.
+        """
+        baskets = [basket for basket in baskets if basket.id != self.id]
+        if not baskets:
+            return
+
+        line_model = self.lines.model
+        lines = {line.line_reference: line for line in self.lines.all()}
+        lines_to_move, lines_to_update, lines_to_delete = [], {}, []
+        for line in line_model.objects.filter(basket__in=baskets).order_by('basket_id', 'id'):
+            existing_line = lines.get(line.line_reference)
+            if existing_line is None:
+                lines[line.line_reference] = line
+                lines_to_move.append(line.id)
+            else:
+                if add_quantities:
+                    existing_line.quantity += line.quantity
+                else:
+                    existing_line.quantity = max(existing_line.quantity, line.quantity)
+                lines_to_update[existing_line.id] = existing_line
+                lines_to_delete.append(line.id)
+
+        if lines_to_delete:
+            line_model.objects.filter(id__in=lines_to_delete).delete()
+        if lines_to_move:
+            line_model.objects.filter(id__in=lines_to_move).update(basket=self)
+        if lines_to_update:
+            line_model.objects.bulk_update(lines_to_update.values(), ['quantity'])
+
+        vouchers = self.vouchers.through.objects.filter(basket__in=baskets)
+        voucher_ids = set(vouchers.values_list('voucher_id', flat=True))
+        if voucher_ids:
+            vouchers.delete()
+            self.vouchers.add(*voucher_ids)
+
+        date_merged = now()
+        Basket.objects.filter(id__in=[basket.id for basket in baskets]).update(
+            status=self.MERGED, date_merged=date_merged
+        )
+        for basket in baskets:
+            basket.status = self.MERGED
+            basket.date_merged = date_merged
+            basket._lines = None  # pylint: disable=protected-access
+        self._lines = None
+
+    merge_all.alters_data = True
+
+    def _get_attributes(self):
+        """
+        Returns the attributes of the basket by type name, read in a single query and kept on the basket.
+        """
+        if self._attributes is None:
+            self._attributes = {
+                attribute.attribute_type.name: attribute
+                for attribute in BasketAttribute.objects.filter(basket=self).select_related('attribute_type')
+            } if self.id else {}
+        return self._attributes
+
+    def get_attribute(self, name, default=None):
+        """ Returns the value of the named attribute of the basket, or the default if it has none. """
+        attribute = self._get_attributes().get(name)
+        return attribute.value_text if attribute else default
+
+    def set_attribute(self, name, value):
+        """ Sets the value of the named attribute of the basket. Changes are written by save_attributes(). """
+        attributes = self._get_attributes()
+        value = value if value is None else str(value)
+        attribute = attributes.get(name)
+        if attribute is None:
+            attributes[name] = BasketAttribute(
+                basket=self, attribute_type=BasketAttributeType.get_by_name(name), value_text=value
+            )
+        elif attribute.value_text == value:
+            return
+        else:
+            attribute.value_text = value
+
+        self._changed_attributes.add(name)
+        self._deleted_attributes.discard(name)
+
+    def delete_attribute(self, name):
+        """ Deletes the named attribute of the basket. Changes are written by save_attributes(). """
+        if self._get_attributes().pop(name, None) is not None:
+            self._changed_attributes.discard(name)
+            self._deleted_attributes.add(name)
+
+    def save_attributes(self):
+        """
+        Writes the attributes set or deleted since they were read, or last written, with at most one query each to
+        create, update and delete attributes.
+        """
+        if self._attributes is None:
+            return
+
+        attributes = [self._attributes[name] for name in self._changed_attributes]
+        created_attributes = [attribute for attribute in attributes if attribute.pk is None]
+        updated_attributes = [attribute for attribute in attributes if attribute.pk is not None]
+
+        if created_attributes:
+            try:
+                with transaction.atomic():
+                    BasketAttribute.objects.bulk_create(created_attributes)
+            except IntegrityError:
+                # Another request created some of the attributes first.
+                for attribute in created_attributes:
+                    BasketAttribute.objects.update_or_create(
+                        basket=self, attribute_type=attribute.attribute_type,
+                        defaults={'value_text': attribute.value_text}
+                    )
+        if updated_attributes:
+            BasketAttribute.objects.bulk_update(updated_attributes, ['value_text'])
+        if self._deleted_attributes:
+            BasketAttribute.objects.filter(basket=self, attribute_type__name__in=self._deleted_attributes).delete()
+
+        self._changed_attributes = set()
+        self._deleted_attributes = set()
+        if created_attributes:
+            # Bulk creation does not set the primary keys of the attributes on every database, so they are read again.
+            self._attributes = None
+
+    save_attributes.alters_data = True
+
     def flush(self):
         """Remove all products in basket and fire Segment 'Product Removed' Analytic event for each"""
         cached_response = DEFAULT_REQUEST_CACHE.get_cached_response(TEMPORARY_BASKET_CACHE_KEY)
@@ -70,8 +210,8 @@ class Basket(AbstractBasket):
 
         # Validate we sent an event for > 0 products to check if the bundle event is even necessary
         if product_removed_event_fired:
-            try:
-                bundle_id = BasketAttribute.objects.get(basket=self, attribute_type__name=BUNDLE).value_text
+            bundle_id = self.get_attribute(BUNDLE)
+            if bundle_id:
                 program = get_program(bundle_id, self.site.siteconfiguration)
                 bundle_properties = {
                     'bundle_id': bundle_id,
@@ -83,9 +223,6 @@ class Basket(AbstractBasket):
                     bundle_properties['marketing_slug'] = (program['type_attrs']['slug'] + '/' +
                                                            program.get('marketing_slug'))
                 track_segment_event(self.site, self.owner, 'edx.bi.ecommerce.basket.bundle_removed', bundle_properties)
-            except BasketAttribute.DoesNotExist:
-                # Nothing to do here. It's not a bundle ¯\_(ツ)_/¯
-                pass
 
         # Call flush after we fetch all_lines() which is cleared during flush()
         super(Basket, self).flush()  # pylint: disable=bad-super-call
@@ -132,6 +269,28 @@ class BasketAttributeType(models.Model):
     def __str__(self):  # pylint: disable=invalid-str-returned
         return self.name
 
+    @staticmethod
+    def _get_cache_key(name):
+        return get_cache_key(resource='basket_attribute_type', name=name)
+
+    @classmethod
+    def get_by_name(cls, name):
+        """
+        Returns the attribute type with the given name, creating it if it does not exist.
+
+        Attribute types are cached, and invalidated when they change.
+        """
+        cache_key = cls._get_cache_key(name)
+        cached_response = TieredCache.get_cached_response(cache_key)
+        if cached_response.is_found:
+            return cached_response.value
+
+        attribute_type, created = cls.objects.get_or_create(name=name)
+        if not created:
+            # Types created by this request are not cached, as the request's transaction may yet be rolled back.
+            TieredCache.set_all_tiers(cache_key, attribute_type, settings.BASKET_ATTRIBUTE_TYPE_CACHE_TIMEOUT)
+        return attribute_type
+
 
 class BasketAttribute(models.Model):
     """
@@ -149,5 +308,11 @@ class BasketAttribute(models.Model):
         unique_together = ('basket', 'attribute_type')
 
 
+@receiver(post_save, sender=BasketAttributeType)
+@receiver(post_delete, sender=BasketAttributeType)
+def invalidate_basket_attribute_type(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    TieredCache.delete_all_tiers(BasketAttributeType._get_cache_key(instance.name))  # pylint: disable=protected-access
+
+
 # noinspection PyUnresolvedReferences
 from oscar.apps.basket.models import *  # noqa isort:skip pylint: disable=wildcard-import,unused-wildcard-import,wrong-import-position,wrong-import-order,ungrouped-imports
@@ -3,6 +3,7 @@
 import mock
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.backends.db import SessionStore
 from django.http import HttpResponse
 from django.test.client import RequestFactory
 from oscar.core.loading import get_model
@@ -101,3 +102,68 @@ class BasketMiddlewareTests(TestCase):
         """ Verify the method returns a site-specific key. """
         expected = '{base}_{site_id}'.format(base=settings.OSCAR_BASKET_COOKIE_OPEN, site_id=self.site.id)
         self.assertEqual(self.middleware.get_cookie_key(self.request), expected)
+
+    def create_session_request(self, user):
+        """ Returns a request authenticated by a saved session. """
+        request = RequestFactory().get('/')
+        request.user = user
+        request.site = self.site
+        request.cookies_to_delete = []
+        request._basket_cache = None  # pylint: disable=protected-access
+        request.session = SessionStore()
+        request.session.save()
+        return request
+
+    def test_get_basket_from_session(self):
+        """ Verify the basket referenced by the session is returned with a single query. """
+        user = self.create_user()
+        basket = BasketFactory(owner=user, site=self.site)
+        self.assertEqual(self.middleware.get_basket(self.create_session_request(user)), basket)
+
+        request = self.create_session_request(user)
+        request.session[self.middleware.get_session_key(request)] = self.middleware.get_basket_hash(basket.id)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.middleware.get_basket(request), basket)
+            self.assertEqual(basket.site, self.site)
+
+    def test_get_basket_stores_session_reference(self):
+        """ Verify the full lookup stores a reference to the basket in the session. """
+        user = self.create_user()
+        request = self.create_session_request(user)
+        basket = self.middleware.get_basket(request)
+        self.assertEqual(
+            request.session[self.middleware.get_session_key(request)], self.middleware.get_basket_hash(basket.id)
+        )
+
+    def test_get_basket_with_stale_session_reference(self):
+        """ Verify the full lookup is used when the basket referenced by the session is no longer open. """
+        user = self.create_user()
+        submitted_basket = BasketFactory(owner=user, site=self.site, status=Basket.SUBMITTED)
+        request = self.create_session_request(user)
+        session_key = self.middleware.get_session_key(request)
+        request.session[session_key] = self.middleware.get_basket_hash(submitted_basket.id)
+
+        basket = self.middleware.get_basket(request)
+        self.assertNotEqual(basket, submitted_basket)
+        self.assertEqual(basket.status, Basket.OPEN)
+        self.assertEqual(request.session[session_key], self.middleware.get_basket_hash(basket.id))
+
+    def test_get_basket_with_other_users_session_reference(self):
+        """ Verify baskets of other users referenced by the session are ignored, as are invalid references. """
+        user = self.create_user()
+        other_basket = BasketFactory(owner=self.create_user(), site=self.site)
+        for reference in (self.middleware.get_basket_hash(other_basket.id), '1:NOTAVALIDHASH'):
+            request = self.create_session_request(user)
+            request.session[self.middleware.get_session_key(request)] = reference
+            basket = self.middleware.get_basket(request)
+            self.assertNotEqual(basket, other_basket)
+            self.assertEqual(basket.owner, user)
+
+    def test_get_basket_without_session(self):
+        """ Verify no session is created to store the reference for requests without one. """
+        user = self.create_user()
+        request = self.create_session_request(user)
+        request.session = SessionStore()
+        self.middleware.get_basket(request)
+        self.assertIsNone(request.session.session_key)
+        self.assertFalse(request.session.modified)
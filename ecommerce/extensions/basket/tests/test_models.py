@@ -6,6 +6,7 @@ import mock
 from analytics import Client
 from edx_django_utils.cache import DEFAULT_REQUEST_CACHE
 from oscar.core.loading import get_class, get_model
+from oscar.test import factories
 
 from ecommerce.courses.tests.factories import CourseFactory
 from ecommerce.extensions.analytics.utils import parse_tracking_context, translate_basket_line_for_segment
@@ -18,6 +19,8 @@ from ecommerce.tests.factories import SiteConfigurationFactory, UserFactory
 from ecommerce.tests.testcases import TransactionTestCase
 
 Basket = get_model('basket', 'Basket')
+BasketAttribute = get_model('basket', 'BasketAttribute')
+BasketAttributeType = get_model('basket', 'BasketAttributeType')
 OrderNumberGenerator = get_class('order.utils', 'OrderNumberGenerator')
 
 
@@ -109,6 +112,53 @@ class BasketTests(CatalogMixin, BasketMixin, TransactionTestCase):
         # Verify the basket for the second site/tenant is not modified
         self.assert_basket_state(user.baskets.get(site=site2), Basket.OPEN, user, site2)
 
+    @staticmethod
+    def create_product():
+        product = factories.create_product()
+        factories.create_stockrecord(product, num_in_stock=10)
+        return product
+
+    def test_merge_all(self):
+        """ Verify the lines and vouchers of the baskets are merged into the basket. """
+        user = UserFactory()
+        first_product, second_product = self.create_product(), self.create_product()
+        voucher = factories.VoucherFactory()
+
+        basket = self.create_basket(user, self.site, empty=True)
+        basket.add_product(first_product)
+        other_basket = self.create_basket(user, self.site, empty=True)
+        other_basket.add_product(first_product, quantity=3)
+        other_basket.add_product(second_product)
+        other_basket.vouchers.add(voucher)
+        last_basket = self.create_basket(user, self.site, empty=True)
+        last_basket.add_product(second_product, quantity=2)
+
+        basket.merge_all([basket, other_basket, last_basket], add_quantities=False)
+
+        self.assertEqual(
+            [(line.product, line.quantity) for line in basket.lines.order_by('id')],
+            [(first_product, 3), (second_product, 2)]
+        )
+        self.assertEqual(list(basket.vouchers.all()), [voucher])
+        for merged_basket in (other_basket, last_basket):
+            merged_basket.refresh_from_db()
+            self.assertEqual(merged_basket.status, Basket.MERGED)
+            self.assertIsNotNone(merged_basket.date_merged)
+            self.assertFalse(merged_basket.lines.exists())
+            self.assertFalse(merged_basket.vouchers.exists())
+
+    def test_merge_all_adding_quantities(self):
+        user = UserFactory()
+        product = self.create_product()
+        basket = self.create_basket(user, self.site, empty=True)
+        basket.add_product(product)
+        other_baskets = [self.create_basket(user, self.site, empty=True) for __ in range(3)]
+        for other_basket in other_baskets:
+            other_basket.add_product(product, quantity=2)
+
+        basket.merge_all(other_baskets)
+        self.assertEqual(basket.lines.get().quantity, 7)
+
     def test_create_basket(self):
         """ Verify the method creates a new basket. """
         user = UserFactory()
@@ -116,6 +166,66 @@ class BasketTests(CatalogMixin, BasketMixin, TransactionTestCase):
         self.assertEqual(basket.site, self.site)
         self.assertEqual(basket.owner, user)
 
+    def test_attributes(self):
+        """ Verify attributes are read in a single query, and written when saved. """
+        basket = self.create_basket(UserFactory(), self.site, empty=True)
+        BasketAttribute.objects.create(
+            basket=basket, attribute_type=BasketAttributeType.get_by_name('first'), value_text='1'
+        )
+        BasketAttribute.objects.create(
+            basket=basket, attribute_type=BasketAttributeType.get_by_name('second'), value_text='2'
+        )
+
+        with self.assertNumQueries(1):
+            self.assertEqual(basket.get_attribute('first'), '1')
+            self.assertEqual(basket.get_attribute('second'), '2')
+            self.assertEqual(basket.get_attribute('third', default='3'), '3')
+
+        basket.set_attribute('first', True)
+        basket.delete_attribute('second')
+        basket.set_attribute('third', 3)
+        basket.set_attribute('fourth', 4)
+        self.assertEqual(basket.get_attribute('first'), 'True')
+        self.assertIsNone(basket.get_attribute('second'))
+        basket.save_attributes()
+
+        self.assertEqual(
+            dict(BasketAttribute.objects.filter(basket=basket).values_list('attribute_type__name', 'value_text')),
+            {'first': 'True', 'third': '3', 'fourth': '4'}
+        )
+        self.assertEqual(basket.get_attribute('third'), '3')
+
+        # Unchanged attributes are not written again.
+        basket.set_attribute('third', 3)
+        with self.assertNumQueries(0):
+            basket.save_attributes()
+
+    def test_save_attributes_created_concurrently(self):
+        """ Verify attributes created by another request since they were read are updated. """
+        basket = self.create_basket(UserFactory(), self.site, empty=True)
+        self.assertIsNone(basket.get_attribute('first'))
+        BasketAttribute.objects.create(
+            basket=basket, attribute_type=BasketAttributeType.get_by_name('first'), value_text='1'
+        )
+
+        basket.set_attribute('first', '2')
+        basket.save_attributes()
+        self.assertEqual(BasketAttribute.objects.get(basket=basket).value_text, '2')
+
+    def test_get_attribute_type_by_name(self):
+        """ Verify attribute types are created if needed, cached, and invalidated when they change. """
+        attribute_type = BasketAttributeType.get_by_name('new')
+        self.assertEqual(attribute_type.name, 'new')
+
+        with self.assertNumQueries(1):
+            self.assertEqual(BasketAttributeType.get_by_name('new'), attribute_type)
+        with self.assertNumQueries(0):
+            self.assertEqual(BasketAttributeType.get_by_name('new'), attribute_type)
+
+        attribute_type_id = attribute_type.id
+        attribute_type.delete()
+        self.assertNotEqual(BasketAttributeType.get_by_name('new').id, attribute_type_id)
+
     def test_flush_with_product(self):
         """
         Verify the method fires 'Product Removed' Segment event with the correct information when basket is not empty
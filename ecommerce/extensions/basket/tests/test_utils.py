@@ -9,7 +9,9 @@ import mock
 import pytz
 import requests
 import responses
+from django.contrib.sessions.backends.db import SessionStore
 from django.db import transaction
+from django.test import override_settings
 from django.utils.timezone import now
 from oscar.core.loading import get_model
 from oscar.test.factories import BasketFactory, ProductFactory, RangeFactory
@@ -19,6 +21,7 @@ from ecommerce.core.constants import ENROLLMENT_CODE_PRODUCT_CLASS_NAME
 from ecommerce.core.tests import toggle_switch
 from ecommerce.courses.tests.factories import CourseFactory
 from ecommerce.entitlements.utils import create_or_update_course_entitlement
+from ecommerce.extensions.basket.constants import ENABLE_PREPARED_BASKET_REUSE
 from ecommerce.extensions.basket.tests.mixins import BasketMixin
 from ecommerce.extensions.basket.utils import (
     ENTERPRISE_CATALOG_ATTRIBUTE_TYPE,
@@ -372,7 +375,8 @@ class BasketUtilsTests(DiscoveryTestMixin, BasketMixin, TestCase):
         course = CourseFactory(partner=self.partner)
         course.create_or_update_seat('verified', False, 10, create_enrollment_code=True)
         enrollment_code = Product.objects.get(product_class__name=ENROLLMENT_CODE_PRODUCT_CLASS_NAME)
-        with mock.patch.object(UserAlreadyPlacedOrder, 'user_already_placed_order', return_value=True):
+        with mock.patch.object(UserAlreadyPlacedOrder, 'get_already_purchased_products',
+                               side_effect=lambda user, products, site: {product.id for product in products}):
             basket = prepare_basket(self.request, [enrollment_code])
             self.assertIsNotNone(basket)
 
@@ -704,6 +708,68 @@ class BasketUtilsTests(DiscoveryTestMixin, BasketMixin, TestCase):
             self.site_configuration.payment_microfrontend_url = payment_microfrontend_url
             self.assertEqual(get_payment_microfrontend_url_if_configured(self.request), expected_result)
 
+    def prepare_basket_reusing_prepared_basket(self, products, voucher=None):
+        """ Prepares a basket with prepared basket reuse enabled, returning it and whether it was rebuilt. """
+        with override_flag(ENABLE_PREPARED_BASKET_REUSE, active=True):
+            with mock.patch.object(Basket, 'flush', autospec=True, side_effect=Basket.flush) as mock_flush:
+                basket = prepare_basket(self.request, products, voucher)
+        return basket, mock_flush.called
+
+    def test_prepare_basket_reuses_prepared_basket(self):
+        """ Verify a repeated request to prepare the basket returns it unchanged. """
+        self.request.session = SessionStore()
+        self.request.session.save()
+        product = ProductFactory(stockrecords__price_excl_tax=100)
+        voucher, __ = prepare_voucher(_range=RangeFactory(products=[product]), benefit_value=10)
+
+        basket, rebuilt = self.prepare_basket_reusing_prepared_basket([product], voucher)
+        self.assertTrue(rebuilt)
+
+        with mock.patch('ecommerce.extensions.basket.utils.attribute_cookie_data') as mock_attribute_cookie_data:
+            reused_basket, rebuilt = self.prepare_basket_reusing_prepared_basket([product], voucher)
+        self.assertFalse(rebuilt)
+        self.assertFalse(mock_attribute_cookie_data.called)
+        self.assertEqual(reused_basket, basket)
+        self.assertEqual(reused_basket.product_quantity(product), 1)
+        self.assertEqual(list(reused_basket.vouchers.all()), [voucher])
+
+    def test_prepare_basket_rebuilds_changed_basket(self):
+        """ Verify the basket is rebuilt when the request, the basket or the age of the prepared basket differ. """
+        self.request.session = SessionStore()
+        self.request.session.save()
+        product = ProductFactory(stockrecords__price_excl_tax=100)
+        voucher, __ = prepare_voucher(_range=RangeFactory(products=[product]), benefit_value=10)
+        basket, __ = self.prepare_basket_reusing_prepared_basket([product], voucher)
+
+        # The voucher differs from the one the basket was prepared with.
+        __, rebuilt = self.prepare_basket_reusing_prepared_basket([product])
+        self.assertTrue(rebuilt)
+
+        # The basket changed since it was prepared.
+        basket.vouchers.remove(voucher)
+        __, rebuilt = self.prepare_basket_reusing_prepared_basket([product], voucher)
+        self.assertTrue(rebuilt)
+
+        # The prepared basket expired.
+        with override_settings(PREPARED_BASKET_REUSE_TIMEOUT=0):
+            __, rebuilt = self.prepare_basket_reusing_prepared_basket([product], voucher)
+        self.assertTrue(rebuilt)
+
+        # The referral cookies changed.
+        self.request.COOKIES[self.site_configuration.utm_cookie_name] = json.dumps({'utm_source': 'test-source'})
+        __, rebuilt = self.prepare_basket_reusing_prepared_basket([product], voucher)
+        self.assertTrue(rebuilt)
+
+        __, rebuilt = self.prepare_basket_reusing_prepared_basket([product], voucher)
+        self.assertFalse(rebuilt)
+
+    def test_prepare_basket_without_session_rebuilds_basket(self):
+        """ Verify the basket is rebuilt for requests without a session. """
+        product = ProductFactory()
+        self.prepare_basket_reusing_prepared_basket([product])
+        __, rebuilt = self.prepare_basket_reusing_prepared_basket([product])
+        self.assertTrue(rebuilt)
+
     def test_prepare_basket_with_duplicate_seat(self):
         """ Verify a basket fixes the case where flush doesn't work and we attempt adding duplicate seat. """
         with mock.patch('ecommerce.extensions.basket.utils.Basket.flush'):
@@ -221,7 +221,8 @@ class BasketAddItemsViewTests(CouponMixin, DiscoveryTestMixin, DiscoveryMockMixi
         stock_record = StockRecordFactory(product=product2, partner=self.partner)
         catalog.stock_records.add(stock_record)
 
-        with mock.patch.object(UserAlreadyPlacedOrder, 'user_already_placed_order', return_value=True):
+        with mock.patch.object(UserAlreadyPlacedOrder, 'get_already_purchased_products',
+                               side_effect=lambda user, products, site: {product.id for product in products}):
             response = self._get_response(
                 [product.stockrecords.first().partner_sku for product in [product1, product2]],
             )
@@ -233,7 +234,7 @@ class BasketAddItemsViewTests(CouponMixin, DiscoveryTestMixin, DiscoveryMockMixi
         Test user can purchase products which have not been already purchased
         """
         products = ProductFactory.create_batch(3, stockrecords__partner=self.partner)
-        with mock.patch.object(UserAlreadyPlacedOrder, 'user_already_placed_order', return_value=False):
+        with mock.patch.object(UserAlreadyPlacedOrder, 'get_already_purchased_products', return_value=set()):
             response = self._get_response([product.stockrecords.first().partner_sku for product in products])
             self.assertEqual(response.status_code, 303)
 
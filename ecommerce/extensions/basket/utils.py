@@ -1,8 +1,10 @@
 
 
 import datetime
+import hashlib
 import json
 import logging
+import time
 from urllib.parse import unquote, urlencode
 
 import pytz
@@ -21,8 +23,10 @@ from ecommerce.extensions.analytics.utils import track_segment_event
 from ecommerce.extensions.basket.constants import (
     DYNAMIC_PAYMENT_METHODS_ENABLED,
     EMAIL_OPT_IN_ATTRIBUTE,
+    ENABLE_PREPARED_BASKET_REUSE,
     ENABLE_STRIPE_PAYMENT_PROCESSOR,
     PAYMENT_INTENT_ID_ATTRIBUTE,
+    PREPARED_BASKET_SESSION_KEY,
     PURCHASER_BEHALF_ATTRIBUTE,
     REDIRECT_WITH_WAFFLE_TESTING_QUERYSTRING
 )
@@ -35,15 +39,13 @@ from ecommerce.referrals.models import Referral
 
 Applicator = get_class('offer.applicator', 'Applicator')
 Basket = get_model('basket', 'Basket')
-BasketAttribute = get_model('basket', 'BasketAttribute')
-BasketAttributeType = get_model('basket', 'BasketAttributeType')
 BillingAddress = get_model('order', 'BillingAddress')
 Country = get_model('address', 'Country')
 BUNDLE = 'bundle_identifier'
 ORGANIZATION_ATTRIBUTE_TYPE = 'organization'
 ENTERPRISE_CATALOG_ATTRIBUTE_TYPE = 'enterprise_catalog_uuid'
-StockRecord = get_model('partner', 'StockRecord')
 OrderLine = get_model('order', 'Line')
+Product = get_model('catalogue', 'Product')
 Refund = get_model('refund', 'Refund')
 Voucher = get_model('voucher', 'Voucher')
 
@@ -140,6 +142,18 @@ def prepare_basket(request, products, voucher=None):
         basket (Basket): Contains the product to be redeemed and the Voucher applied.
     """
     basket = Basket.get_basket(request.user, request.site)
+
+    reuse_prepared_basket = waffle.flag_is_active(request, ENABLE_PREPARED_BASKET_REUSE)
+    if reuse_prepared_basket:
+        fingerprint = _get_prepare_basket_fingerprint(request, products, voucher)
+        if _is_prepared_basket(request, basket, fingerprint):
+            logger.info(
+                'User [%s] repeated request to prepare basket [%s], returning it unchanged',
+                request.user.username,
+                basket.id
+            )
+            return basket
+
     basket_add_enterprise_catalog_attribute(basket, request.GET)
     basket.flush()
     basket.save()
@@ -162,6 +176,11 @@ def prepare_basket(request, products, voucher=None):
             return basket
 
     is_multi_product_basket = len(products) > 1
+    already_purchased_product_ids = UserAlreadyPlacedOrder.get_already_purchased_products(
+        user=request.user,
+        products=[product for product in products if not product.is_enrollment_code_product],
+        site=request.site
+    )
     for product in products:
         # Multiple clicks can try adding twice, return if product is seat already in basket
         if is_duplicate_seat_attempt(basket, product):
@@ -173,9 +192,7 @@ def prepare_basket(request, products, voucher=None):
             )
             return basket
 
-        if product.is_enrollment_code_product or \
-                not UserAlreadyPlacedOrder.user_already_placed_order(user=request.user,
-                                                                     product=product, site=request.site):
+        if product.id not in already_purchased_product_ids:
             basket.add_product(product, 1)
             # Call signal handler to notify listeners that something has been added to the basket
             basket_addition.send(sender=basket_addition, product=product, user=request.user, request=request,
@@ -220,9 +237,78 @@ def prepare_basket(request, products, voucher=None):
                            request.user.username, request.basket.id, voucher.code, message)
 
     attribute_cookie_data(basket, request)
+    if reuse_prepared_basket:
+        _set_prepared_basket(request, basket, fingerprint)
     return basket
 
 
+def _get_prepare_basket_fingerprint(request, products, voucher):
+    """
+    Returns a digest of the inputs of prepare_basket, including the referral cookies recorded on the basket.
+    """
+    utm_cookie_name = request.site.siteconfiguration.utm_cookie_name
+    inputs = [
+        sorted(product.id for product in products),
+        voucher.id if voucher else None,
+        request.GET.get('bundle'),
+        request.GET.get('catalog'),
+        request.COOKIES.get(settings.AFFILIATE_COOKIE_KEY),
+        request.COOKIES.get(utm_cookie_name) if utm_cookie_name else None,
+    ]
+    return hashlib.md5(json.dumps(inputs).encode('utf-8')).hexdigest()
+
+
+def _get_basket_contents(basket):
+    """ Returns the products, with their quantities, and the vouchers of the basket, in a JSON serializable form. """
+    return {
+        'lines': [list(line) for line in basket.lines.order_by('product_id').values_list('product_id', 'quantity')],
+        'vouchers': list(basket.vouchers.order_by('id').values_list('id', flat=True)),
+    }
+
+
+def _get_session(request):
+    """ Returns the session of the request, unless it has none or it has not been saved yet. """
+    session = getattr(request, 'session', None)
+    if session is None or not session.session_key:
+        return None
+    return session
+
+
+def _is_prepared_basket(request, basket, fingerprint):
+    """
+    Returns whether the basket was prepared from the same inputs by a recent request of the session, and its products
+    and vouchers have not changed since.
+
+    The embargo and ownership checks made when the basket was prepared are reused until
+    PREPARED_BASKET_REUSE_TIMEOUT expires.
+    """
+    session = _get_session(request)
+    if session is None:
+        return False
+
+    prepared = session.get(PREPARED_BASKET_SESSION_KEY.format(site_id=request.site.id))
+    return bool(
+        prepared and
+        prepared['basket_id'] == basket.id and
+        prepared['fingerprint'] == fingerprint and
+        time.time() - prepared['prepared_at'] < settings.PREPARED_BASKET_REUSE_TIMEOUT and
+        prepared['contents'] == _get_basket_contents(basket)
+    )
+
+
+def _set_prepared_basket(request, basket, fingerprint):
+    session = _get_session(request)
+    if session is None:
+        return
+
+    session[PREPARED_BASKET_SESSION_KEY.format(site_id=request.site.id)] = {
+        'basket_id': basket.id,
+        'fingerprint': fingerprint,
+        'prepared_at': time.time(),
+        'contents': _get_basket_contents(basket),
+    }
+
+
 @monitoring_utils.function_trace('get_basket_switch_data')
 def get_basket_switch_data(product):
     """
@@ -264,30 +350,18 @@ def _find_seat_enrollment_toggle_sku(product, target_structure):
     Returns:
         sku (str): The sku of the associated Seat or Enrollment Code product.
     """
+    # "Seat" products have "certificate_type" attributes, and "Enrollment Code" products have "seat_type" attributes.
+    # If the basket is in single-purchase mode, we are working with a Seat product and must present the 'buy
+    # multiple' switch link and SKU from the corresponding Enrollment Code product.  If the basket is in
+    # multi-purchase mode, we are working with an Enrollment Code product and must present the 'buy single' switch
+    # link and SKU from the corresponding Seat product.
+    seat_type = getattr(product.attr, 'seat_type', None) or getattr(product.attr, 'certificate_type', None)
+    if not product.course_id or not seat_type:
+        return None
 
-    # Note: This query filter will not perform well with products that do not have a course_id
-    stock_records = StockRecord.objects.filter(
-        product__course_id=product.course_id,
-        product__structure=target_structure
-    )
-
-    # Determine the proper partner SKU to embed in the single/multiple basket switch link
-    # The logic here is a little confusing.  "Seat" products have "certificate_type" attributes, and
-    # "Enrollment Code" products have "seat_type" attributes.  If the basket is in single-purchase
-    # mode, we are working with a Seat product and must present the 'buy multiple' switch link and
-    # SKU from the corresponding Enrollment Code product.  If the basket is in multi-purchase mode,
-    # we are working with an Enrollment Code product and must present the 'buy single' switch link
-    # and SKU from the corresponding Seat product.
-    product_cert_type = getattr(product.attr, 'certificate_type', None)
-    product_seat_type = getattr(product.attr, 'seat_type', None)
-    for stock_record in stock_records:
-        stock_record_cert_type = getattr(stock_record.product.attr, 'certificate_type', None)
-        stock_record_seat_type = getattr(stock_record.product.attr, 'seat_type', None)
-        if (product_seat_type and product_seat_type == stock_record_cert_type) or \
-                (product_cert_type and product_cert_type == stock_record_seat_type):
-            return stock_record.partner_sku
-
-    return None
+    CourseSeatSkuMapping = get_model('courses', 'CourseSeatSkuMapping')
+    mapping = CourseSeatSkuMapping.get_mapping(product.course_id, seat_type)
+    return mapping.seat_sku if target_structure == Product.CHILD else mapping.enrollment_code_sku
 
 
 @monitoring_utils.function_trace('attribute_cookie_data')
@@ -379,20 +453,11 @@ def basket_add_organization_attribute(basket, request_data):
     purchaser = request_data.get(PURCHASER_BEHALF_ATTRIBUTE)
 
     if business_client:
-        organization_attribute, __ = BasketAttributeType.objects.get_or_create(name=ORGANIZATION_ATTRIBUTE_TYPE)
-        BasketAttribute.objects.get_or_create(
-            basket=basket,
-            attribute_type=organization_attribute,
-            value_text=business_client.strip()
-        )
+        basket.set_attribute(ORGANIZATION_ATTRIBUTE_TYPE, business_client.strip())
         # Also add the 'purchaser' attribute to the carts of all business client purchases. This way we can track
         # how many people read/paid attention to the checkbox during purchases.
-        purchaser_attribute, __ = BasketAttributeType.objects.get_or_create(name=PURCHASER_BEHALF_ATTRIBUTE)
-        BasketAttribute.objects.get_or_create(
-            basket=basket,
-            attribute_type=purchaser_attribute,
-            value_text=purchaser
-        )
+        basket.set_attribute(PURCHASER_BEHALF_ATTRIBUTE, purchaser)
+        basket.save_attributes()
 
 
 @monitoring_utils.function_trace('basket_add_dynamic_payment_methods_enabled')
@@ -401,16 +466,8 @@ def basket_add_dynamic_payment_methods_enabled(basket, payment_intent):
     Adds a boolean value which is True if there is more than
     'card' payment method type in the Stripe Payment Intent.
     """
-    dynamic_payment_methods_enabled_attribute, __ = BasketAttributeType.objects.get_or_create(
-        name=DYNAMIC_PAYMENT_METHODS_ENABLED)
-    # Do a get_or_create and update value_text after (instead of update_or_create)
-    # to prevent a particularly slow full table scan that uses a LIKE
-    basket_attribute, __ = BasketAttribute.objects.get_or_create(
-        attribute_type=dynamic_payment_methods_enabled_attribute,
-        basket=basket,
-    )
-    basket_attribute.value_text = len(payment_intent['payment_method_types']) > 1
-    basket_attribute.save()
+    basket.set_attribute(DYNAMIC_PAYMENT_METHODS_ENABLED, len(payment_intent['payment_method_types']) > 1)
+    basket.save_attributes()
 
 
 @monitoring_utils.function_trace('basket_add_payment_intent_id_attribute')
@@ -423,16 +480,8 @@ def basket_add_payment_intent_id_attribute(basket, payment_intent_id):
         payment_intent_id (string): Payment Intent Identifier
 
     """
-
-    payment_intent_id_attribute, __ = BasketAttributeType.objects.get_or_create(name=PAYMENT_INTENT_ID_ATTRIBUTE)
-    # Do a get_or_create and update value_text after (instead of update_or_create)
-    # to prevent a particularly slow full table scan that uses a LIKE
-    basket_attribute, __ = BasketAttribute.objects.get_or_create(
-        attribute_type=payment_intent_id_attribute,
-        basket=basket,
-    )
-    basket_attribute.value_text = payment_intent_id.strip()
-    basket_attribute.save()
+    basket.set_attribute(PAYMENT_INTENT_ID_ATTRIBUTE, payment_intent_id.strip())
+    basket.save_attributes()
 
 
 @monitoring_utils.function_trace('basket_add_enterprise_catalog_attribute')
@@ -449,20 +498,12 @@ def basket_add_enterprise_catalog_attribute(basket, request_data):
     # Value of enterprise catalog UUID is being passed as `catalog` from
     # basket page
     enterprise_catalog_uuid = request_data.get('catalog') if request_data else None
-    enterprise_catalog_attribute, __ = BasketAttributeType.objects.get_or_create(
-        name=ENTERPRISE_CATALOG_ATTRIBUTE_TYPE
-    )
     if enterprise_catalog_uuid:
-        BasketAttribute.objects.update_or_create(
-            basket=basket,
-            attribute_type=enterprise_catalog_attribute,
-            defaults={
-                'value_text': enterprise_catalog_uuid.strip()
-            }
-        )
+        basket.set_attribute(ENTERPRISE_CATALOG_ATTRIBUTE_TYPE, enterprise_catalog_uuid.strip())
     else:
         # Remove the enterprise catalog attribute for future update in basket
-        BasketAttribute.objects.filter(basket=basket, attribute_type=enterprise_catalog_attribute).delete()
+        basket.delete_attribute(ENTERPRISE_CATALOG_ATTRIBUTE_TYPE)
+    basket.save_attributes()
 
 
 @monitoring_utils.function_trace('_set_basket_bundle_status')
@@ -484,14 +525,11 @@ def _set_basket_bundle_status(bundle, basket):
 
     """
     if bundle:
-        BasketAttribute.objects.update_or_create(
-            basket=basket,
-            attribute_type=BasketAttributeType.objects.get(name=BUNDLE),
-            defaults={'value_text': bundle}
-        )
+        basket.set_attribute(BUNDLE, bundle)
         basket.clear_vouchers()
     else:
-        BasketAttribute.objects.filter(basket=basket, attribute_type__name=BUNDLE).delete()
+        basket.delete_attribute(BUNDLE)
+    basket.save_attributes()
 
 
 @monitoring_utils.function_trace('validate_voucher')
@@ -534,11 +572,7 @@ def validate_voucher(voucher, user, basket, request_site):
         return False, message
 
     # Do not allow single course run coupons used on bundles.
-    bundle_attribute = BasketAttribute.objects.filter(
-        basket=basket,
-        attribute_type=BasketAttributeType.objects.get(name=BUNDLE)
-    )
-    is_bundle_purchase = len(bundle_attribute) > 0
+    is_bundle_purchase = basket.get_attribute(BUNDLE) is not None
     voucher_program_uuid = voucher.best_offer.condition.program_uuid
     is_voucher_valid_for_bundle = voucher_program_uuid or voucher.usage == Voucher.MULTI_USE
 
@@ -705,8 +739,5 @@ def set_email_preference_on_basket(request, basket):
     Associate the user's email opt in preferences with the basket in
     order to opt them in later as part of fulfillment
     """
-    BasketAttribute.objects.update_or_create(
-        basket=basket,
-        attribute_type=BasketAttributeType.objects.get(name=EMAIL_OPT_IN_ATTRIBUTE),
-        defaults={'value_text': request.GET.get('email_opt_in') == 'true'},
-    )
+    basket.set_attribute(EMAIL_OPT_IN_ATTRIBUTE, request.GET.get('email_opt_in') == 'true')
+    basket.save_attributes()
@@ -81,8 +81,6 @@ from ecommerce.extensions.payment.forms import PaymentForm
 from ecommerce.programs.utils import get_program
 
 Basket = get_model('basket', 'basket')
-BasketAttribute = get_model('basket', 'BasketAttribute')
-BasketAttributeType = get_model('basket', 'BasketAttributeType')
 BUNDLE = 'bundle_identifier'
 ConditionalOffer = get_model('offer', 'ConditionalOffer')
 Benefit = get_model('offer', 'Benefit')
@@ -755,28 +753,15 @@ class PaymentApiLogicMixin(BasketLogicMixin):
         )
 
     def _add_payment_intent_id(self, response, basket):
-        try:
-            payment_intent_id_attribute = BasketAttributeType.objects.get(name=PAYMENT_INTENT_ID_ATTRIBUTE)
-            payment_intent_attr = BasketAttribute.objects.get(
-                basket=basket,
-                attribute_type=payment_intent_id_attribute
-            )
-            response['payment_intent_id'] = payment_intent_attr.value_text.strip()
-        except (BasketAttribute.DoesNotExist, BasketAttributeType.DoesNotExist):
-            response['payment_intent_id'] = None
+        payment_intent_id = basket.get_attribute(PAYMENT_INTENT_ID_ATTRIBUTE)
+        response['payment_intent_id'] = payment_intent_id.strip() if payment_intent_id is not None else None
 
     def _add_is_dynamic_payment_methods(self, response, basket):
-        try:
-            dynamic_payment_methods_enabled_attribute = BasketAttributeType.objects.get(
-                name=DYNAMIC_PAYMENT_METHODS_ENABLED)
-            payment_intent_attr = BasketAttribute.objects.get(
-                basket=basket,
-                attribute_type=dynamic_payment_methods_enabled_attribute
-            )
-            is_dynamic_payment_methods_enabled = payment_intent_attr.value_text.strip()
-            response['is_dynamic_payment_methods_enabled'] = is_dynamic_payment_methods_enabled == 'True'
-        except (BasketAttribute.DoesNotExist, BasketAttributeType.DoesNotExist):
-            response['is_dynamic_payment_methods_enabled'] = None
+        is_dynamic_payment_methods_enabled = basket.get_attribute(DYNAMIC_PAYMENT_METHODS_ENABLED)
+        response['is_dynamic_payment_methods_enabled'] = (
+            is_dynamic_payment_methods_enabled.strip() == 'True' if is_dynamic_payment_methods_enabled is not None
+            else None
+        )
 
     def _get_response_status(self, response):
         return message_utils.get_response_status(response['messages'])
@@ -837,11 +822,7 @@ class PaymentApiView(PaymentApiLogicMixin, APIView):
         Gets the event properties for the cart viewed event.
         """
         # First we need to check if the basket is a bundle
-        try:
-            bundle_id = BasketAttribute.objects.get(basket=basket, attribute_type__name=BUNDLE).value_text
-        except BasketAttribute.DoesNotExist:
-            # No reason to raise an error. Just means it's a single product and not a bundle
-            bundle_id = None
+        bundle_id = basket.get_attribute(BUNDLE)
 
         product_slug = None
         # Now we can set fields based on if our basket contains a bundle or not
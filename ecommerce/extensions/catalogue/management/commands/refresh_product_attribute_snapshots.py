@@ -0,0 +1,75 @@
+"""
+This command builds the attribute snapshots of existing products.
+"""
+
+
+import logging
+
+from django.core.management import BaseCommand
+from django.db.models import Prefetch
+from oscar.core.loading import get_model
+
+Product = get_model('catalogue', 'Product')
+ProductAttributeValue = get_model('catalogue', 'ProductAttributeValue')
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Build the attribute snapshots of products which do not have one yet.
+
+    Snapshots are kept up to date when attribute values are saved, so this only needs to run once after
+    the snapshot is introduced, and again with --all whenever the snapshotted attributes change.
+
+    Example:
+
+        ./manage.py refresh_product_attribute_snapshots --all
+    """
+
+    help = 'Build the attribute snapshots of products.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            dest='all',
+            default=False,
+            help='Rebuild the snapshots of all products, rather than only of products without one.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            dest='batch_size',
+            default=1000,
+            help='Number of products to update per query.',
+            type=int,
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        products = Product.objects.order_by('id')
+        if not options['all']:
+            products = products.filter(attribute_snapshot__isnull=True)
+
+        products = products.prefetch_related(
+            Prefetch(
+                'attribute_values',
+                queryset=ProductAttributeValue.objects.filter(
+                    attribute__code__in=Product.ATTRIBUTE_SNAPSHOT_CODES
+                ).select_related('attribute')
+            )
+        ).only('id')
+
+        updated = 0
+        last_id = 0
+        while True:
+            batch = list(products.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+
+            for product in batch:
+                product.attribute_snapshot = product.build_attribute_snapshot(product.attribute_values.all())
+            Product.objects.bulk_update(batch, ['attribute_snapshot'])
+
+            updated += len(batch)
+            last_id = batch[-1].id
+            logger.info('Refreshed the attribute snapshots of %d products.', updated)
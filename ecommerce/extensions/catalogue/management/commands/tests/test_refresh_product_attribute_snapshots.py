@@ -0,0 +1,36 @@
+from django.core.management import call_command
+from oscar.core.loading import get_model
+
+from ecommerce.extensions.catalogue.tests.mixins import DiscoveryTestMixin
+from ecommerce.tests.testcases import TestCase
+
+Product = get_model('catalogue', 'Product')
+
+
+class RefreshProductAttributeSnapshotsTests(DiscoveryTestMixin, TestCase):
+    """Tests for the refresh_product_attribute_snapshots management command."""
+
+    def setUp(self):
+        super(RefreshProductAttributeSnapshotsTests, self).setUp()
+        __, self.seat, self.enrollment_code = self.create_course_seat_and_enrollment_code()
+        self.expected_seat_snapshot = Product.objects.get(id=self.seat.id).attribute_snapshot
+
+    def test_refresh_missing_snapshots(self):
+        """Verify the command builds the snapshots of products which do not have one."""
+        Product.objects.filter(id=self.seat.id).update(attribute_snapshot=None)
+        Product.objects.filter(id=self.enrollment_code.id).update(attribute_snapshot={'version': 0, 'values': {}})
+
+        call_command('refresh_product_attribute_snapshots', batch_size=1)
+
+        self.assertEqual(Product.objects.get(id=self.seat.id).attribute_snapshot, self.expected_seat_snapshot)
+        self.assertEqual(
+            Product.objects.get(id=self.enrollment_code.id).attribute_snapshot, {'version': 0, 'values': {}}
+        )
+
+    def test_refresh_all_snapshots(self):
+        """Verify the command rebuilds every snapshot when asked to."""
+        Product.objects.filter(id=self.seat.id).update(attribute_snapshot={'version': 0, 'values': {}})
+
+        call_command('refresh_product_attribute_snapshots', '--all')
+
+        self.assertEqual(Product.objects.get(id=self.seat.id).attribute_snapshot, self.expected_seat_snapshot)
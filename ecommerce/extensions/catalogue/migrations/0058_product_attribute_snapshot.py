@@ -0,0 +1,19 @@
+# Generated by Django 3.2.25 on 2026-10-19 09:56
+
+from django.db import migrations
+import jsonfield.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalogue', '0057_add_app_store_id_product_attr'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='attribute_snapshot',
+            field=jsonfield.fields.JSONField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -1,11 +1,17 @@
 
 
+from array import array
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.core.validators import validate_email
 from django.db import models
-from django.db.models.signals import post_init, post_save
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, pre_delete
 from django.dispatch import receiver
 from django.utils.translation import ugettext_lazy as _
+from jsonfield.fields import JSONField
 from oscar.apps.catalogue.abstract_models import (
     AbstractCategory,
     AbstractOption,
@@ -23,9 +29,11 @@ from ecommerce.core.constants import (
     ENROLLMENT_CODE_PRODUCT_CLASS_NAME,
     SEAT_PRODUCT_CLASS_NAME
 )
-from ecommerce.core.utils import log_message_and_raise_validation_error
+from ecommerce.core.utils import get_cache_version, invalidate_cache_versions, log_message_and_raise_validation_error
 from ecommerce.courses.constants import CertificateType
 
+_NO_DEFAULT = object()
+
 
 class CreateSafeHistoricalRecords(HistoricalRecords):
     """
@@ -67,9 +75,24 @@ class Product(AbstractProduct):
     )
     expires = models.DateTimeField(null=True, blank=True,
                                    help_text=_('Last date/time on which this product can be purchased.'))
+    # Values of the most frequently read attributes, kept in sync with the attribute values table so that they
+    # can be read without loading every attribute value of the product. See `get_attr`.
+    attribute_snapshot = JSONField(null=True, blank=True, editable=False)
     original_expires = None
 
-    history = HistoricalRecords()
+    # Bump the version whenever the snapshotted attributes change, so that outdated snapshots are ignored
+    # until they are refreshed.
+    ATTRIBUTE_SNAPSHOT_VERSION = 1
+    ATTRIBUTE_SNAPSHOT_CODES = (
+        'certificate_type',
+        'course_key',
+        'credit_provider',
+        'id_verification_required',
+        'seat_type',
+        'UUID',
+    )
+
+    history = HistoricalRecords(excluded_fields=['attribute_snapshot'])
 
     @property
     def is_seat_product(self):
@@ -96,6 +119,53 @@ class Product(AbstractProduct):
             CertificateType.UNPAID_EXECUTIVE_EDUCATION
         ]
 
+    def get_attr(self, code, default=_NO_DEFAULT):
+        """
+        Returns the value of the product attribute with the given code, like `getattr(product.attr, code, default)`.
+
+        Snapshotted attributes are read from the snapshot unless the attributes of this instance have already
+        been loaded or modified; anything else is read through `attr`, which loads the attribute values.
+        """
+        if code in self.attr.__dict__:
+            return self.attr.__dict__[code]
+
+        snapshot = self.attribute_snapshot
+        if (
+                not self.attr.initialised and code in self.ATTRIBUTE_SNAPSHOT_CODES and
+                isinstance(snapshot, dict) and snapshot.get('version') == self.ATTRIBUTE_SNAPSHOT_VERSION
+        ):
+            if code in snapshot['values']:
+                return snapshot['values'][code]
+            if default is not _NO_DEFAULT:
+                return default
+
+        if default is _NO_DEFAULT:
+            return getattr(self.attr, code)
+        return getattr(self.attr, code, default)
+
+    def build_attribute_snapshot(self, attribute_values=None):
+        """
+        Returns the snapshot of the product's attribute values, as stored in the database unless
+        the (already loaded) `attribute_values` of the product are given.
+        """
+        if attribute_values is None:
+            attribute_values = self.attribute_values.filter(
+                attribute__code__in=self.ATTRIBUTE_SNAPSHOT_CODES
+            ).select_related('attribute')
+        attribute_values = [
+            attribute_value for attribute_value in attribute_values
+            if attribute_value.attribute.code in self.ATTRIBUTE_SNAPSHOT_CODES
+        ]
+        return {
+            'version': self.ATTRIBUTE_SNAPSHOT_VERSION,
+            'values': {attribute_value.attribute.code: attribute_value.value for attribute_value in attribute_values},
+        }
+
+    def refresh_attribute_snapshot(self):
+        """ Rebuilds and stores the attribute snapshot, without saving the rest of the product. """
+        self.attribute_snapshot = self.build_attribute_snapshot()
+        Product.objects.filter(pk=self.pk).update(attribute_snapshot=self.attribute_snapshot)
+
     def save(self, *args, **kwargs):
         try:
             if not isinstance(self.attr.note, str) and self.attr.note is not None:
@@ -115,6 +185,15 @@ class Product(AbstractProduct):
         except AttributeError:
             pass
 
+        if not self._state.adding and not args and not kwargs.get('force_insert') and not kwargs.get('update_fields'):
+            # The snapshot is only written by refresh_attribute_snapshot, so that saving an instance loaded before
+            # the snapshot was last refreshed does not write back its outdated snapshot.
+            excluded_fields = self.get_deferred_fields() | {'attribute_snapshot'}
+            kwargs['update_fields'] = [
+                field.attname for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in excluded_fields
+            ]
+
         super(Product, self).save(*args, **kwargs)  # pylint: disable=bad-super-call
 
 
@@ -154,6 +233,21 @@ class ProductAttributeValue(AbstractProductAttributeValue):
     history = CreateSafeHistoricalRecords()
 
 
+@receiver(post_save, sender=ProductAttributeValue)
+@receiver(post_delete, sender=ProductAttributeValue)
+def update_product_attribute_snapshot(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Refreshes the attribute snapshot of the product whose snapshotted attribute value changed."""
+    if kwargs.get('raw') or instance.attribute.code not in Product.ATTRIBUTE_SNAPSHOT_CODES:
+        return
+
+    try:
+        product = instance.product
+    except Product.DoesNotExist:
+        # The product itself is being deleted.
+        return
+    product.refresh_attribute_snapshot()
+
+
 class Catalog(models.Model):
     name = models.CharField(max_length=255)
     partner = models.ForeignKey('partner.Partner', related_name='catalogs', on_delete=models.CASCADE)
@@ -166,6 +260,75 @@ class Catalog(models.Model):
             catalog_name=self.name
         )
 
+    @staticmethod
+    def _get_product_ids_version_cache_key(catalog_id):
+        return 'catalog_product_ids_version_{catalog_id}'.format(catalog_id=catalog_id)
+
+    @classmethod
+    def get_product_ids_version(cls, catalog_id):
+        """
+        Returns the current version of the product IDs of the catalog with the given ID, replaced whenever the stock
+        records of the catalog change.
+        """
+        return get_cache_version(cls._get_product_ids_version_cache_key(catalog_id))
+
+    @classmethod
+    def get_product_ids(cls, catalog_id):
+        """
+        Returns the IDs of the products of the stock records in the catalog with the given ID, as a frozenset.
+
+        The set is cached in-process and, as a sorted array, in the shared cache, so that membership checks
+        do not query the database.
+        """
+        return _get_catalog_product_ids(catalog_id, cls.get_product_ids_version(catalog_id))
+
+    @classmethod
+    def invalidate_product_ids(cls, catalog_ids):
+        """ Invalidates the cached product IDs of the catalogs with the given IDs, see invalidate_cache_versions. """
+        invalidate_cache_versions(cls._get_product_ids_version_cache_key(catalog_id) for catalog_id in catalog_ids)
+
+    @property
+    def product_ids(self):
+        return self.get_product_ids(self.id)
+
+
+@lru_cache(maxsize=128)
+def _get_catalog_product_ids(catalog_id, version):
+    cache_key = 'catalog_product_ids_{catalog_id}_{version}'.format(catalog_id=catalog_id, version=version)
+    product_ids = cache.get(cache_key)
+    if product_ids is None:
+        product_ids = array('l', sorted(set(
+            Catalog.stock_records.through.objects.filter(catalog_id=catalog_id).values_list(
+                'stockrecord__product_id', flat=True
+            )
+        )))
+        cache.set(cache_key, product_ids, settings.CATALOG_PRODUCT_IDS_CACHE_TIMEOUT)
+    return frozenset(product_ids)
+
+
+@receiver(m2m_changed, sender=Catalog.stock_records.through)
+def invalidate_catalog_product_ids(sender, instance, action, pk_set, **kwargs):  # pylint: disable=unused-argument
+    """Invalidates the cached product IDs of catalogs whose stock records were added or removed."""
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+
+    if not kwargs['reverse']:
+        catalog_ids = [instance.id]
+    elif action == 'pre_clear':
+        catalog_ids = list(instance.catalogs.values_list('id', flat=True))
+    else:
+        catalog_ids = pk_set
+    Catalog.invalidate_product_ids(catalog_ids)
+
+
+@receiver(pre_delete, sender='partner.StockRecord')
+def invalidate_stock_record_catalog_product_ids(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Invalidates the cached product IDs of the catalogs of a deleted stock record.
+
+    Deleting a stock record removes it from its catalogs without sending m2m_changed.
+    """
+    Catalog.invalidate_product_ids(instance.catalogs.values_list('id', flat=True))
+
 
 class Category(AbstractCategory):
     # Do not record the slug field in the history table because AutoSlugField is not compatible with
@@ -11,6 +11,7 @@ from ecommerce.extensions.catalogue.tests.mixins import DiscoveryTestMixin
 from ecommerce.extensions.voucher.models import CouponVouchers
 from ecommerce.tests.testcases import TestCase
 
+Catalog = get_model('catalogue', 'Catalog')
 Product = get_model('catalogue', 'Product')
 ProductClass = get_model('catalogue', 'ProductClass')
 
@@ -122,3 +123,108 @@ class ProductTests(CouponMixin, DiscoveryTestMixin, TestCase):
 
         exception = ve.exception
         self.assertIn('Notification email must be a valid email address.', exception.message)
+
+    def test_attribute_snapshot_maintained(self):
+        """Verify saving or deleting snapshotted attribute values updates the product's attribute snapshot."""
+        __, seat, enrollment_code = self.create_course_seat_and_enrollment_code(id_verification=True)
+        seat = Product.objects.get(id=seat.id)
+        self.assertEqual(seat.attribute_snapshot, {
+            'version': Product.ATTRIBUTE_SNAPSHOT_VERSION,
+            'values': {
+                'certificate_type': 'verified',
+                'course_key': seat.course_id,
+                'id_verification_required': True,
+            },
+        })
+        self.assertEqual(
+            Product.objects.get(id=enrollment_code.id).attribute_snapshot['values']['seat_type'], 'verified'
+        )
+
+        seat.attr.credit_provider = 'MIT'
+        seat.save()
+        self.assertEqual(Product.objects.get(id=seat.id).attribute_snapshot['values']['credit_provider'], 'MIT')
+
+        seat.attribute_values.get(attribute__code='credit_provider').delete()
+        self.assertNotIn('credit_provider', Product.objects.get(id=seat.id).attribute_snapshot['values'])
+
+    def test_attribute_snapshot_kept_by_outdated_instances(self):
+        """Verify saving an instance loaded before its snapshot was refreshed does not store its outdated snapshot."""
+        __, seat, __ = self.create_course_seat_and_enrollment_code()
+        outdated_seat = Product.objects.get(id=seat.id)
+
+        seat = Product.objects.get(id=seat.id)
+        seat.attr.certificate_type = 'professional'
+        seat.save()
+
+        outdated_seat.expires = now() + timedelta(days=1)
+        outdated_seat.save()
+
+        seat = Product.objects.get(id=seat.id)
+        self.assertEqual(seat.expires, outdated_seat.expires)
+        self.assertEqual(seat.get_attr('certificate_type'), 'professional')
+        self.assertFalse(seat.attr.initialised)
+
+    def test_get_attr_reads_snapshot(self):
+        """Verify snapshotted attributes are read without loading the product's attribute values."""
+        __, seat, __ = self.create_course_seat_and_enrollment_code()
+        seat = Product.objects.get(id=seat.id)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(seat.get_attr('certificate_type'), 'verified')
+            self.assertIsNone(seat.get_attr('credit_provider', None))
+        self.assertFalse(seat.attr.initialised)
+
+        with self.assertRaises(AttributeError):
+            seat.get_attr('credit_provider')
+
+    def test_get_attr_falls_back_to_attribute_values(self):
+        """Verify attribute values are read through attr when the snapshot is missing or outdated."""
+        __, seat, __ = self.create_course_seat_and_enrollment_code()
+        Product.objects.filter(id=seat.id).update(
+            attribute_snapshot={'version': Product.ATTRIBUTE_SNAPSHOT_VERSION - 1, 'values': {}}
+        )
+        seat = Product.objects.get(id=seat.id)
+        self.assertEqual(seat.get_attr('certificate_type'), 'verified')
+        self.assertTrue(seat.attr.initialised)
+
+        # Values set on the instance take precedence over the stored snapshot.
+        seat = Product.objects.get(id=seat.id)
+        seat.attr.certificate_type = 'professional'
+        self.assertEqual(seat.get_attr('certificate_type'), 'professional')
+
+
+class CatalogTests(TestCase):
+    def setUp(self):
+        super(CatalogTests, self).setUp()
+        self.catalog = Catalog.objects.create(partner=self.partner)
+        self.stock_records = [factories.create_stockrecord(factories.create_product()) for __ in range(2)]
+
+    def test_product_ids(self):
+        """Verify product IDs are read from the database once, then from the cache."""
+        self.catalog.stock_records.add(*self.stock_records)
+        expected = {stock_record.product_id for stock_record in self.stock_records}
+
+        self.assertEqual(self.catalog.product_ids, expected)
+        with self.assertNumQueries(0):
+            self.assertEqual(Catalog.get_product_ids(self.catalog.id), expected)
+
+    def test_product_ids_invalidation(self):
+        """Verify cached product IDs are invalidated when the stock records of the catalog change."""
+        first, second = self.stock_records
+        self.catalog.stock_records.add(first)
+        self.assertEqual(self.catalog.product_ids, {first.product_id})
+
+        self.catalog.stock_records.add(second)
+        self.assertEqual(self.catalog.product_ids, {first.product_id, second.product_id})
+
+        second.catalogs.remove(self.catalog)
+        self.assertEqual(self.catalog.product_ids, {first.product_id})
+
+        first.delete()
+        self.assertEqual(self.catalog.product_ids, set())
+
+        second.catalogs.add(self.catalog)
+        self.assertEqual(self.catalog.product_ids, {second.product_id})
+
+        second.catalogs.clear()
+        self.assertEqual(self.catalog.product_ids, set())
@@ -24,8 +24,6 @@ from ecommerce.invoice.models import Invoice
 CommunicationEventType = get_model('communication', 'CommunicationEventType')
 logger = logging.getLogger(__name__)
 Basket = get_model('basket', 'Basket')
-BasketAttribute = get_model('basket', 'BasketAttribute')
-BasketAttributeType = get_model('basket', 'BasketAttributeType')
 NoShippingRequired = get_class('shipping.methods', 'NoShippingRequired')
 OfferAssignment = get_model('offer', 'OfferAssignment')
 CodeAssignmentNudgeEmails = get_model('offer', 'CodeAssignmentNudgeEmails')
@@ -228,13 +226,7 @@ class EdxOrderPlacementMixin(OrderPlacementMixin, metaclass=abc.ABCMeta):
         )
 
         # Check for the user's email opt in preference, defaulting to false if it hasn't been set
-        try:
-            email_opt_in = BasketAttribute.objects.get(
-                basket=order.basket,
-                attribute_type=BasketAttributeType.objects.get(name=EMAIL_OPT_IN_ATTRIBUTE),
-            ).value_text == 'True'
-        except BasketAttribute.DoesNotExist:
-            email_opt_in = False
+        email_opt_in = order.basket.get_attribute(EMAIL_OPT_IN_ATTRIBUTE) == 'True'
 
         # create offer assignment for MULTI_USE_PER_CUSTOMER
         self.create_assignments_for_multi_use_per_customer(order)
@@ -314,16 +306,9 @@ class EdxOrderPlacementMixin(OrderPlacementMixin, metaclass=abc.ABCMeta):
             line.product.is_enrollment_code_product for line in order.basket.all_lines()
         )
 
-        organization_attribute = BasketAttributeType.objects.filter(name=ORGANIZATION_ATTRIBUTE_TYPE).first()
-        if not organization_attribute:
-            return
-
-        business_client = BasketAttribute.objects.filter(
-            basket=order.basket,
-            attribute_type=organization_attribute,
-        ).first()
+        business_client = order.basket.get_attribute(ORGANIZATION_ATTRIBUTE_TYPE)
         if basket_has_enrollment_code_product and business_client:
-            client, __ = BusinessClient.objects.get_or_create(name=business_client.value_text)
+            client, __ = BusinessClient.objects.get_or_create(name=business_client)
             Invoice.objects.create(
                 order=order, business_client=client, type=Invoice.BULK_PURCHASE, state=Invoice.PAID
             )
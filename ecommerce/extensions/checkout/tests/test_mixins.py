@@ -11,9 +11,10 @@ from testfixtures import LogCapture
 from waffle.models import Sample
 
 from ecommerce.core.constants import ENROLLMENT_CODE_PRODUCT_CLASS_NAME, ENROLLMENT_CODE_SWITCH
-from ecommerce.core.models import BusinessClient, SegmentClient
+from ecommerce.core.models import BusinessClient
 from ecommerce.core.tests import toggle_switch
 from ecommerce.courses.tests.factories import CourseFactory
+from ecommerce.extensions.analytics.clients import SegmentClient
 from ecommerce.extensions.analytics.utils import (
     ECOM_TRACKING_ID_FMT,
     parse_tracking_context,
@@ -44,7 +45,6 @@ from ecommerce.tests.testcases import TransactionTestCase
 
 LOGGER_NAME = 'ecommerce.extensions.analytics.utils'
 Basket = get_model('basket', 'Basket')
-BasketAttribute = get_model('basket', 'BasketAttribute')
 BasketAttributeType = get_model('basket', 'BasketAttributeType')
 NoShippingRequired = get_class('shipping.methods', 'NoShippingRequired')
 OfferAssignment = get_model('offer', 'OfferAssignment')
@@ -347,11 +347,8 @@ class EdxOrderPlacementMixinTests(BusinessIntelligenceMixin, PaymentEventsMixin,
         """
         Verify that the post checkout sets email_opt_in if it is given.
         """
-        BasketAttribute.objects.get_or_create(
-            basket=self.order.basket,
-            attribute_type=self.basket_attribute_type,
-            value_text=expected_opt_in,
-        )
+        self.order.basket.set_attribute(EMAIL_OPT_IN_ATTRIBUTE, expected_opt_in)
+        self.order.basket.save_attributes()
 
         with mock.patch('ecommerce.extensions.checkout.mixins.post_checkout.send') as mock_send:
             mixin = EdxOrderPlacementMixin()
@@ -22,8 +22,6 @@ from ecommerce.tests.factories import ProductFactory
 from ecommerce.tests.testcases import TestCase
 
 Applicator = get_class('offer.applicator', 'Applicator')
-BasketAttribute = get_model('basket', 'BasketAttribute')
-BasketAttributeType = get_model('basket', 'BasketAttributeType')
 Benefit = get_model('offer', 'Benefit')
 Condition = get_model('offer', 'Condition')
 ConditionalOffer = get_model('offer', 'ConditionalOffer')
@@ -301,11 +299,8 @@ class SignalTests(ProgramTestMixin, CouponMixin, TestCase):
     def test_track_bundle_order(self, mock_track):
         """ If the order is a bundle purchase, we should track the associated bundle in the properties """
         order = self.prepare_order('verified')
-        BasketAttribute.objects.update_or_create(
-            basket=order.basket,
-            attribute_type=BasketAttributeType.objects.get(name=BUNDLE),
-            value_text=TEST_BUNDLE_ID
-        )
+        order.basket.set_attribute(BUNDLE, TEST_BUNDLE_ID)
+        order.basket.save_attributes()
 
         # Tracks a full bundle order
         with mock.patch('ecommerce.extensions.checkout.signals.get_program',
@@ -249,7 +249,8 @@ class ReceiptResponseView(ThankYouView):
         return get_object_or_404(Order, **kwargs)
 
     def get_payment_method(self, order):
-        source = order.sources.first()
+        # Equivalent to order.sources.first(), but uses sources prefetched with the order.
+        source = min(order.sources.all(), key=lambda source: source.pk, default=None)
         if source:
             if source.card_type:
                 return '{type} {number}'.format(
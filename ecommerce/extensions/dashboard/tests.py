@@ -1,11 +1,20 @@
 
 
+from datetime import timedelta
+from decimal import Decimal as D
+
 from django.urls import reverse
+from django.utils.timezone import now
+from oscar.core.loading import get_class, get_model
 from oscar.test.factories import OrderFactory
 
 from ecommerce.tests.factories import UserFactory
 from ecommerce.tests.testcases import TestCase
 
+ExtendedIndexView = get_class('dashboard.views', 'ExtendedIndexView')
+OrderStatsRollup = get_model('order', 'OrderStatsRollup')
+get_stats_rollup_hour = get_class('order.utils', 'get_stats_rollup_hour')
+
 
 class DashboardViewTestMixin:
     def assert_message_equals(self, response, msg, level):  # pylint: disable=unused-argument
@@ -33,3 +42,34 @@ class ExtendedIndexViewTests(TestCase):
         order = OrderFactory()
         actual = response.context['average_paid_order_costs']
         self.assertEqual(actual, order.total_incl_tax)
+
+    def test_get_stats_from_rollups(self):
+        """ Verify the order and user stats are read from the rollups of the last 24 hours. """
+        OrderStatsRollup.objects.all().delete()
+        current_hour = get_stats_rollup_hour(now())
+        OrderStatsRollup.objects.create(
+            site=self.site, hour=current_hour, order_count=3, paid_order_count=2, revenue=D('30.00'),
+            paid_revenue=D('30.00')
+        )
+        OrderStatsRollup.objects.create(
+            site=self.site, hour=current_hour - timedelta(hours=23), order_count=1, paid_order_count=1,
+            revenue=D('10.00'), paid_revenue=D('10.00')
+        )
+        OrderStatsRollup.objects.create(site=None, hour=current_hour - timedelta(hours=1), new_user_count=4)
+        OrderStatsRollup.objects.create(
+            site=self.site, hour=current_hour - timedelta(hours=24), order_count=100, revenue=D('1000.00')
+        )
+
+        view = ExtendedIndexView()
+        view.get_stats()
+        # Only the rollups are queried once product and voucher counts are cached.
+        with self.assertNumQueries(2):
+            stats = view.get_stats()
+
+        self.assertEqual(stats['total_orders_last_day'], 4)
+        self.assertEqual(stats['total_revenue_last_day'], D('40.00'))
+        self.assertEqual(stats['average_order_costs'], D('10.00'))
+        self.assertEqual(stats['average_paid_order_costs'], D('40.00') / 3)
+        self.assertEqual(stats['total_customers_last_day'], 4)
+        hourly_totals = [item['total_incl_tax'] for item in stats['hourly_report_dict']['order_total_hourly']]
+        self.assertEqual(hourly_totals, [D('10.00')] + [D('0.0')] * 10 + [D('30.00')])
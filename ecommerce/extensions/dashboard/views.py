@@ -1,47 +1,110 @@
 
 
+from django.conf import settings
+from edx_django_utils.cache import TieredCache
 from oscar.apps.dashboard.views import *  # pylint: disable=wildcard-import, unused-wildcard-import
 
+OrderStatsRollup = get_model('order', 'OrderStatsRollup')
+get_stats_rollup_hour = get_class('order.utils', 'get_stats_rollup_hour')
+
+DASHBOARD_CATALOG_STATS_CACHE_KEY = 'dashboard.catalog_stats'
+
 
 class ExtendedIndexView(IndexView):
-    def get_stats(self):
+    def get_hourly_report(self, rollups, hours=24, segments=10):
         """
-        Statistics for the store dashboard.
+        Get report of order revenue split up in hourly chunks, from the hourly order stats rollups.
 
-        To limit the impact this page can have on systems with millions of orders,
-        all queries against orders are limited to those placed in the last 24 hours;
-        Order's date_placed field is indexed for more efficient queries.
+        The report has the same format as Oscar's, which is computed from the orders table.
         """
-        datetime_24hrs_ago = now() - timedelta(hours=24)
+        start_time = get_stats_rollup_hour(now()) - timedelta(hours=hours - 1)
+        revenue_by_hour = dict(rollups.values_list('hour').annotate(Sum('revenue')).order_by())
+
+        order_total_hourly = []
+        for __ in range(0, hours, 2):
+            end_time = start_time + timedelta(hours=2)
+            total = sum(
+                (revenue_by_hour.get(start_time + timedelta(hours=offset)) or D('0.0') for offset in range(2)),
+                D('0.0')
+            )
+            order_total_hourly.append({
+                'end_time': end_time,
+                'total_incl_tax': total
+            })
+            start_time = end_time
+
+        max_value = max([x['total_incl_tax'] for x in order_total_hourly])
+        divisor = 1
+        while divisor < max_value / 50:
+            divisor *= 10
+        max_value = (max_value / divisor).quantize(D('1'), rounding=ROUND_UP)
+        max_value *= divisor
+        if max_value:
+            segment_size = (max_value) / D('100.0')
+            for item in order_total_hourly:
+                item['percentage'] = int(item['total_incl_tax'] / segment_size)
+
+            y_range = []
+            y_axis_steps = max_value / D(str(segments))
+            for idx in reversed(range(segments + 1)):
+                y_range.append(idx * y_axis_steps)
+        else:
+            y_range = []
+            for item in order_total_hourly:
+                item['percentage'] = 0
+
+        return {
+            'order_total_hourly': order_total_hourly,
+            'max_revenue': max_value,
+            'y_range': y_range,
+        }
 
-        orders = Order.objects.filter()
-        orders_last_day = orders.filter(date_placed__gt=datetime_24hrs_ago)
-        paid_orders_last_day = orders.filter(date_placed__gt=datetime_24hrs_ago, total_incl_tax__gt=0)
+    def get_catalog_stats(self):
+        """ Product and active voucher counts, cached for ``settings.DASHBOARD_STATS_CACHE_TIMEOUT`` seconds. """
+        cached_response = TieredCache.get_cached_response(DASHBOARD_CATALOG_STATS_CACHE_KEY)
+        if cached_response.is_found:
+            return cached_response.value
 
         stats = {
-            'total_orders_last_day': orders_last_day.count(),
+            'total_products': Product.objects.count(),
+            'total_vouchers': self.get_active_vouchers().count(),
+        }
+        TieredCache.set_all_tiers(DASHBOARD_CATALOG_STATS_CACHE_KEY, stats, settings.DASHBOARD_STATS_CACHE_TIMEOUT)
+        return stats
 
-            'average_order_costs': orders_last_day.aggregate(
-                Avg('total_incl_tax')
-            )['total_incl_tax__avg'] or D('0.00'),
+    def get_stats(self):
+        """
+        Statistics for the store dashboard.
 
-            'average_paid_order_costs': paid_orders_last_day.aggregate(
-                Avg('total_incl_tax')
-            )['total_incl_tax__avg'] or D('0.00'),
+        To limit the impact this page can have on systems with millions of orders, order and user
+        statistics are read from the hourly rollups maintained by OrderStatsRollup, rather than
+        aggregated from the orders placed in the last 24 hours.
+        """
+        rollups = OrderStatsRollup.objects.filter(hour__gte=get_stats_rollup_hour(now()) - timedelta(hours=23))
+        totals = rollups.aggregate(
+            order_count=Sum('order_count'),
+            paid_order_count=Sum('paid_order_count'),
+            revenue=Sum('revenue'),
+            paid_revenue=Sum('paid_revenue'),
+            new_user_count=Sum('new_user_count'),
+        )
+        order_count = totals['order_count'] or 0
+        paid_order_count = totals['paid_order_count'] or 0
+        revenue = totals['revenue'] or D('0.00')
 
-            'total_revenue_last_day': orders_last_day.aggregate(
-                Sum('total_incl_tax')
-            )['total_incl_tax__sum'] or D('0.00'),
+        stats = {
+            'total_orders_last_day': order_count,
 
-            'hourly_report_dict': self.get_hourly_report(orders_last_day, hours=24),
-            'total_customers_last_day': User.objects.filter(
-                date_joined__gt=datetime_24hrs_ago,
-            ).count(),
+            'average_order_costs': revenue / order_count if order_count else D('0.00'),
 
-            'total_products': Product.objects.count(),
+            'average_paid_order_costs': totals['paid_revenue'] / paid_order_count if paid_order_count else D('0.00'),
 
-            'total_vouchers': self.get_active_vouchers().count(),
+            'total_revenue_last_day': revenue,
+
+            'hourly_report_dict': self.get_hourly_report(rollups, hours=24),
+            'total_customers_last_day': totals['new_user_count'] or 0,
         }
+        stats.update(self.get_catalog_stats())
 
         return stats
 
@@ -31,7 +31,6 @@ from ecommerce.core.constants import (
 from ecommerce.core.url_utils import get_lms_enrollment_api_url, get_lms_entitlement_api_url
 from ecommerce.courses.models import Course
 from ecommerce.courses.utils import get_course_info_from_catalog, mode_for_product
-from ecommerce.enterprise.conditions import BasketAttributeType
 from ecommerce.enterprise.mixins import EnterpriseDiscountMixin
 from ecommerce.enterprise.utils import (
     create_enterprise_customer_user_consent,
@@ -41,14 +40,13 @@ from ecommerce.enterprise.utils import (
 from ecommerce.extensions.analytics.utils import audit_log, parse_tracking_context
 from ecommerce.extensions.api.v2.views.coupons import CouponViewSet
 from ecommerce.extensions.basket.constants import PURCHASER_BEHALF_ATTRIBUTE
-from ecommerce.extensions.basket.models import BasketAttribute
 from ecommerce.extensions.checkout.utils import get_receipt_page_url
+from ecommerce.extensions.fulfillment.signals import course_enrollment_changed, course_entitlement_changed
 from ecommerce.extensions.fulfillment.status import LINE
 from ecommerce.extensions.voucher.models import OrderLineVouchers
 from ecommerce.extensions.voucher.utils import create_vouchers
 from ecommerce.notifications.notifications import send_notification
 
-BasketAttributeType = get_model('basket', 'BasketAttributeType')
 Benefit = get_model('offer', 'Benefit')
 Option = get_model('catalogue', 'Option')
 Product = get_model('catalogue', 'Product')
@@ -309,13 +307,13 @@ class EnrollmentFulfillmentModule(EnterpriseDiscountMixin, BaseFulfillmentModule
         for line in lines:
             try:
                 mode = mode_for_product(line.product)
-                course_key = line.product.attr.course_key
+                course_key = line.product.get_attr('course_key')
             except AttributeError:
                 logger.error("Supported Seat Product does not have required attributes, [certificate_type, course_key]")
                 line.set_status(LINE.FULFILLMENT_CONFIGURATION_ERROR)
                 continue
             try:
-                provider = line.product.attr.credit_provider
+                provider = line.product.get_attr('credit_provider')
             except AttributeError:
                 logger.error("Seat [%d] has no credit_provider attribute. Defaulted to None.", line.product.id)
                 provider = None
@@ -362,6 +360,9 @@ class EnrollmentFulfillmentModule(EnterpriseDiscountMixin, BaseFulfillmentModule
 
                 if response.status_code == status.HTTP_200_OK:
                     line.set_status(LINE.COMPLETE)
+                    course_enrollment_changed.send(
+                        sender=self.__class__, user=order.user, course_run_key=course_key, mode=mode, is_active=True
+                    )
 
                     audit_log(
                         'line_fulfilled',
@@ -406,7 +407,7 @@ class EnrollmentFulfillmentModule(EnterpriseDiscountMixin, BaseFulfillmentModule
             logger.info('Attempting to revoke fulfillment of Line [%d]...', line.id)
 
             mode = mode_for_product(line.product)
-            course_key = line.product.attr.course_key
+            course_key = line.product.get_attr('course_key')
             data = {
                 'user': line.order.user.username,
                 'is_active': False,
@@ -428,6 +429,9 @@ class EnrollmentFulfillmentModule(EnterpriseDiscountMixin, BaseFulfillmentModule
                     certificate_type=getattr(line.product.attr, 'certificate_type', ''),
                     user_id=line.order.user.id
                 )
+                course_enrollment_changed.send(
+                    sender=self.__class__, user=line.order.user, course_run_key=course_key, mode=mode, is_active=False
+                )
 
                 return True
             # check if the error / message are something we can recover from.
@@ -609,18 +613,13 @@ class EnrollmentCodeFulfillmentModule(BaseFulfillmentModule):
                 A boolean reflecting whether or not this purchase was made on behalf of a company or organization driven
                 by the value of the associated attribute for the order/basket in question.
         """
-        enterprise_purchase = False
-        try:
-            # extract basket info needed to determine if purchase was made on behalf of an Enterprise
-            basket_attrib_purchaser = BasketAttribute.objects.get(
-                basket=order.basket,
-                attribute_type=BasketAttributeType.objects.get(name=PURCHASER_BEHALF_ATTRIBUTE))
-            enterprise_purchase = basket_attrib_purchaser.value_text == "True"
-        except (BasketAttribute.DoesNotExist, BasketAttributeType.DoesNotExist):
-            logger.exception("Error occurred attempting to retrieve Basket Attribute '%s' from basket for order [%s]",
-                             PURCHASER_BEHALF_ATTRIBUTE, order.number)
+        # extract basket info needed to determine if purchase was made on behalf of an Enterprise
+        purchaser = order.basket.get_attribute(PURCHASER_BEHALF_ATTRIBUTE)
+        if purchaser is None:
+            logger.error("Error occurred attempting to retrieve Basket Attribute '%s' from basket for order [%s]",
+                         PURCHASER_BEHALF_ATTRIBUTE, order.number)
 
-        return enterprise_purchase
+        return purchaser == "True"
 
     def send_fulfillment_data_to_hubspot(self, order):
         """ Added as part of ENT-2317. Sends fulfillment data to the HubSpot Form API with info about the purchase.
@@ -672,14 +671,11 @@ class EnrollmentCodeFulfillmentModule(BaseFulfillmentModule):
         logger.info("Gathering fulfillment data for submission to HubSpot for order [%s]", order.number)
 
         # need to do this to be able to grab the organization/company name, this isn't available in the order/lines
-        organization = ""
-        try:
-            organization = BasketAttribute.objects.get(
-                basket=order.basket,
-                attribute_type=BasketAttributeType.objects.get(name="organization"))
-        except (BasketAttribute.DoesNotExist, BasketAttributeType.DoesNotExist):
-            logger.exception("Error occurred attempting to retrieve Basket Attribute 'organization' from basket for "
-                             "order [%s]", order.number)
+        organization = order.basket.get_attribute("organization")
+        if organization is None:
+            logger.error("Error occurred attempting to retrieve Basket Attribute 'organization' from basket for "
+                         "order [%s]", order.number)
+            organization = ""
 
         # need to build out the address accordingly
         street_address = order.billing_address.line1
@@ -711,7 +707,7 @@ class EnrollmentCodeFulfillmentModule(BaseFulfillmentModule):
             'city': order.billing_address.line4,
             'state': order.billing_address.state,
             'country': country_name,
-            'company': organization.value_text,
+            'company': organization,
             'deal_value': order.total_incl_tax,
             'ecommerce_course_name': course.name,
             'ecommerce_course_id': course.id,
@@ -820,7 +816,7 @@ class CourseEntitlementFulfillmentModule(EnterpriseDiscountMixin, BaseFulfillmen
         for line in lines:
             try:
                 mode = mode_for_product(line.product)
-                UUID = line.product.attr.UUID
+                UUID = line.product.get_attr('UUID')
             except AttributeError:
                 logger.error('Entitlement Product does not have required attributes, [certificate_type, UUID]')
                 line.set_status(LINE.FULFILLMENT_CONFIGURATION_ERROR)
@@ -848,6 +844,9 @@ class CourseEntitlementFulfillmentModule(EnterpriseDiscountMixin, BaseFulfillmen
                 response = response.json()
                 line.attributes.create(option=entitlement_option, value=response['uuid'])
                 line.set_status(LINE.COMPLETE)
+                course_entitlement_changed.send(
+                    sender=self.__class__, user=order.user, course_uuid=UUID, mode=mode, is_active=True
+                )
 
                 audit_log(
                     'line_fulfilled',
@@ -878,7 +877,7 @@ class CourseEntitlementFulfillmentModule(EnterpriseDiscountMixin, BaseFulfillmen
         try:
             logger.info('Attempting to revoke fulfillment of Line [%d]...', line.id)
 
-            UUID = line.product.attr.UUID
+            UUID = line.product.get_attr('UUID')
             entitlement_option = Option.objects.get(code='course_entitlement')
             course_entitlement_uuid = line.attributes.get(option=entitlement_option).value
 
@@ -900,6 +899,13 @@ class CourseEntitlementFulfillmentModule(EnterpriseDiscountMixin, BaseFulfillmen
                 certificate_type=getattr(line.product.attr, 'certificate_type', ''),
                 user_id=line.order.user.id
             )
+            course_entitlement_changed.send(
+                sender=self.__class__,
+                user=line.order.user,
+                course_uuid=UUID,
+                mode=mode_for_product(line.product),
+                is_active=False,
+            )
 
             return True
         except Exception:  # pylint: disable=broad-except
@@ -1,6 +1,6 @@
 
 
-from django.dispatch import receiver
+from django.dispatch import Signal, receiver
 from oscar.core.loading import get_class, get_model
 
 ShippingEventType = get_model('order', 'ShippingEventType')
@@ -8,6 +8,10 @@ EventHandler = get_class('order.processing', 'EventHandler')
 post_checkout = get_class('checkout.signals', 'post_checkout')
 SHIPPING_EVENT_NAME = 'Shipped'
 
+# These signals are emitted after ecommerce successfully fulfills or revokes a seat or an entitlement on the LMS.
+course_enrollment_changed = Signal(providing_args=['user', 'course_run_key', 'mode', 'is_active'])
+course_entitlement_changed = Signal(providing_args=['user', 'course_uuid', 'mode', 'is_active'])
+
 
 @receiver(post_checkout, dispatch_uid='fulfillment.post_checkout_callback')
 def post_checkout_callback(sender, order=None, **kwargs):  # pylint: disable=unused-argument
@@ -4,12 +4,15 @@ from django.conf import settings
 from ecommerce.courses.tests.factories import CourseFactory
 from ecommerce.extensions.iap.api.v1.utils import (
     AppStoreRequestException,
+    RateLimiter,
     apply_price_of_inapp_purchase,
     create_inapp_purchase,
     create_ios_product,
     get_auth_headers,
     localize_inapp_purchase,
     products_in_basket_already_purchased,
+    request_connect_store,
+    set_app_store_rate_limit,
     set_territories_of_in_app_purchase,
     submit_in_app_purchase_for_review,
     upload_screenshot_of_inapp_purchase
@@ -39,7 +42,8 @@ class TestProductsInBasketPurchased(TestCase):
         """
         Test products in basket already purchased by user
         """
-        with mock.patch.object(UserAlreadyPlacedOrder, 'user_already_placed_order', return_value=True):
+        with mock.patch.object(UserAlreadyPlacedOrder, 'get_already_purchased_products',
+                               side_effect=lambda user, products, site: {product.id for product in products}):
             return_value = products_in_basket_already_purchased(self.user, self.basket, self.site)
             self.assertTrue(return_value)
 
@@ -47,7 +51,7 @@ class TestProductsInBasketPurchased(TestCase):
         """
         Test products in basket not yet purchased by user
         """
-        with mock.patch.object(UserAlreadyPlacedOrder, 'user_already_placed_order', return_value=False):
+        with mock.patch.object(UserAlreadyPlacedOrder, 'get_already_purchased_products', return_value=set()):
             return_value = products_in_basket_already_purchased(self.user, self.basket, self.site)
             self.assertFalse(return_value)
 
@@ -292,3 +296,38 @@ class TestCreateIosProducts(TestCase):
             submit_url = 'https://api.appstoreconnect.apple.com/v1/inAppPurchaseSubmissions'
             self.assertEqual(post_call.call_args[0][0], submit_url)
             self.assertEqual(post_call.call_args[1]['headers'], headers)
+
+
+class TestAppStoreRateLimit(TestCase):
+    """ Tests for the per endpoint rate limiting of App Store Connect requests. """
+
+    def tearDown(self):
+        set_app_store_rate_limit(None)
+        super(TestAppStoreRateLimit, self).tearDown()
+
+    @mock.patch('ecommerce.extensions.iap.api.v1.utils.time.sleep')
+    @mock.patch('ecommerce.extensions.iap.api.v1.utils.time.monotonic', return_value=100.0)
+    def test_rate_limiter_spaces_out_calls(self, _, mock_sleep):
+        """
+        Test calls beyond the allowed rate wait for their turn.
+        """
+        limiter = RateLimiter(rate=2)
+        limiter.wait()
+        limiter.wait()
+        limiter.wait()
+        self.assertEqual([call[0][0] for call in mock_sleep.call_args_list], [0.5, 1.0])
+
+    @mock.patch('ecommerce.extensions.iap.api.v1.utils.RateLimiter.wait')
+    @mock.patch('ecommerce.extensions.iap.api.v1.utils.requests.Session.post')
+    def test_requests_are_limited_per_endpoint(self, _, mock_wait):
+        """
+        Test only App Store Connect requests are limited, once a limit is set.
+        """
+        submit_url = 'https://api.appstoreconnect.apple.com/v1/inAppPurchaseSubmissions'
+        request_connect_store(submit_url, headers={})
+        self.assertFalse(mock_wait.called)
+
+        set_app_store_rate_limit(1)
+        request_connect_store(submit_url, headers={})
+        request_connect_store('https://example.com/upload', headers={})
+        self.assertEqual(mock_wait.call_count, 1)
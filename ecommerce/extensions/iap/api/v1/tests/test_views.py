@@ -168,7 +168,8 @@ class MobileBasketAddItemsViewTests(DiscoveryMockMixin, LmsApiMockMixin, BasketM
         stock_record = StockRecordFactory(product=product2, partner=self.partner)
         catalog.stock_records.add(stock_record)
 
-        with mock.patch.object(UserAlreadyPlacedOrder, 'user_already_placed_order', return_value=True), \
+        with mock.patch.object(UserAlreadyPlacedOrder, 'get_already_purchased_products',
+                               side_effect=lambda user, products, site: {product.id for product in products}), \
                 LogCapture(self.logger_name) as logger:
             response = self._get_response(
                 [product.stockrecords.first().partner_sku for product in [product1, product2]],
@@ -194,7 +195,7 @@ class MobileBasketAddItemsViewTests(DiscoveryMockMixin, LmsApiMockMixin, BasketM
         Test user can purchase products which have not been already purchased
         """
         products = ProductFactory.create_batch(3, stockrecords__partner=self.partner)
-        with mock.patch.object(UserAlreadyPlacedOrder, 'user_already_placed_order', return_value=False):
+        with mock.patch.object(UserAlreadyPlacedOrder, 'get_already_purchased_products', return_value=set()):
             response = self._get_response([product.stockrecords.first().partner_sku for product in products])
             self.assertEqual(response.status_code, 200)
 
@@ -623,7 +624,8 @@ class MobileCoursePurchaseExecutionViewTests(PaymentEventsMixin, TestCase):
                     'orderId': 'orderId.android.test.purchased'
                 }
             }
-            with mock.patch.object(UserAlreadyPlacedOrder, 'user_already_placed_order', return_value=True), \
+            with mock.patch.object(UserAlreadyPlacedOrder, 'get_already_purchased_products',
+                                   side_effect=lambda user, products, site: {product.id for product in products}), \
                     LogCapture(self.logger_name) as logger:
                 create_order(site=self.site, user=self.user, basket=self.basket)
                 response = self.client.post(self.path, data=self.post_data)
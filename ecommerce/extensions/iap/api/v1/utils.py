@@ -1,5 +1,7 @@
 import logging
+import threading
 import time
+from urllib.parse import urlsplit
 
 import jwt
 import requests
@@ -16,17 +18,65 @@ Product = get_model('catalogue', 'Product')
 APP_STORE_BASE_URL = "https://api.appstoreconnect.apple.com"
 logger = logging.getLogger(__name__)
 
+_app_store_rate_limit = None
+_app_store_rate_limiters = {}
+_app_store_rate_limiters_lock = threading.Lock()
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter spacing out calls so that at most `rate` calls are started per second.
+    """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self._next_call_at = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            current_time = time.monotonic()
+            delay = self._next_call_at - current_time
+            self._next_call_at = max(current_time, self._next_call_at) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+def set_app_store_rate_limit(requests_per_second):
+    """
+    Limit the number of requests per second made to each App Store Connect endpoint by this process.
+    Passing None removes the limit.
+    """
+    global _app_store_rate_limit  # pylint: disable=global-statement
+    with _app_store_rate_limiters_lock:
+        _app_store_rate_limit = requests_per_second
+        _app_store_rate_limiters.clear()
+
+
+def _wait_for_app_store_rate_limit(url):
+    """
+    Block until a request to the App Store Connect endpoint of the given url is allowed.
+    Endpoints are identified by their version and resource, e.g. /v1/inAppPurchaseSubmissions.
+    """
+    if not _app_store_rate_limit or not url.startswith(APP_STORE_BASE_URL):
+        return
+    endpoint = '/'.join(urlsplit(url).path.split('/')[:3])
+    with _app_store_rate_limiters_lock:
+        limiter = _app_store_rate_limiters.get(endpoint)
+        if limiter is None:
+            limiter = _app_store_rate_limiters[endpoint] = RateLimiter(_app_store_rate_limit)
+    limiter.wait()
+
 
 def products_in_basket_already_purchased(user, basket, site):
     """
     Check if products in a basket are already purchased by a user.
     """
-    products = Product.objects.filter(line__order__basket=basket)
-    for product in products:
-        if not product.is_enrollment_code_product and \
-                UserAlreadyPlacedOrder.user_already_placed_order(user=user, product=product, site=site):
-            return True
-    return False
+    products = Product.objects.filter(line__order__basket=basket).select_related(
+        'product_class', 'parent__product_class'
+    )
+    products = [product for product in products if not product.is_enrollment_code_product]
+    return bool(UserAlreadyPlacedOrder.get_already_purchased_products(user=user, products=products, site=site))
 
 
 def create_ios_product(course, ios_product, configuration):
@@ -83,6 +133,7 @@ def request_connect_store(url, headers, data=None, method="post"):
     )
     http = Session()
     http.mount('https://', HTTPAdapter(max_retries=retries))
+    _wait_for_app_store_rate_limit(url)
     try:
         if method == "post":
             response = http.post(url, json=data, headers=headers)
@@ -3,10 +3,13 @@ This command fetches new course runs for mobile supported courses and creates se
 """
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 from django.conf import settings
 from django.contrib.sites.models import Site
+from django.core.cache import cache
 from django.core.management import BaseCommand
+from django.db import connection
 from django.db.models import Q
 from django.utils.timezone import now, timedelta
 from oscar.core.loading import get_class
@@ -16,10 +19,12 @@ from ecommerce.courses.constants import CertificateType
 from ecommerce.courses.models import Course
 from ecommerce.courses.utils import get_course_detail, get_course_run_detail
 from ecommerce.extensions.catalogue.models import Product
-from ecommerce.extensions.iap.api.v1.utils import create_ios_product
+from ecommerce.extensions.iap.api.v1.utils import create_ios_product, set_app_store_rate_limit
+from ecommerce.extensions.iap.constants import IOS_SKU_PREFIX
 from ecommerce.extensions.iap.models import IAPProcessorConfiguration
 from ecommerce.extensions.iap.processors.ios_iap import IOSIAP
 from ecommerce.extensions.iap.utils import create_child_products_for_mobile
+from ecommerce.extensions.partner.models import StockRecord
 
 Dispatcher = get_class('communication.utils', 'Dispatcher')
 logger = logging.getLogger(__name__)
@@ -27,6 +32,8 @@ logger = logging.getLogger(__name__)
 ANDROID_SKU_KEY = 'android_sku'
 COURSE_KEY = 'course_key'
 IOS_SKU_KEY = 'ios_sku'
+CHECKPOINT_CACHE_KEY = 'batch_update_mobile_seats.processed_course_runs'
+CHECKPOINT_TIMEOUT = 60 * 60 * 24 * 7
 
 
 class CourseRunFetchException(Exception):
@@ -52,11 +59,47 @@ class Command(BaseCommand):
             type=int,
             default=10,
             help='Sleep time in seconds between update of batches')
+        parser.add_argument(
+            '--discovery-workers',
+            type=int,
+            default=8,
+            help='Maximum number of concurrent requests to Discovery')
+        parser.add_argument(
+            '--app-store-workers',
+            type=int,
+            default=4,
+            help='Maximum number of iOS products created on App Store Connect concurrently')
+        parser.add_argument(
+            '--app-store-rate-limit',
+            type=float,
+            default=1,
+            help='Maximum number of requests per second made to each App Store Connect endpoint')
+        parser.add_argument(
+            '--ignore-checkpoint',
+            action='store_true',
+            help='Process course runs again even if a previous run already completed them')
 
     def handle(self, *args, **options):
+        if options['ignore_checkpoint']:
+            cache.delete(CHECKPOINT_CACHE_KEY)
+        set_app_store_rate_limit(options['app_store_rate_limit'])
+        try:
+            with ThreadPoolExecutor(max_workers=max(options['app_store_workers'], 1)) as app_store_executor:
+                email_contents = self._update_mobile_seats(app_store_executor, options)
+        finally:
+            set_app_store_rate_limit(None)
+        self._send_email_about_expired_courses(*email_contents)
+
+    def _update_mobile_seats(self, app_store_executor, options):
+        """
+        Create mobile seats for the new course runs of expired mobile courses, and their iOS products using
+        app_store_executor. Returns the contents of the email sent to the mobile team.
+        """
         batch_size = options['batch_size']
         sleep_time = options['sleep_time']
-        failed_ios_products = []
+        processed_course_runs = cache.get(CHECKPOINT_CACHE_KEY, set())
+        ios_product_futures = []
+        ios_configuration = None
         expired_courses_keys = []
         all_course_runs_processed = []
         failed_course_runs = []
@@ -64,6 +107,19 @@ class Command(BaseCommand):
         default_site = Site.objects.filter(id=settings.SITE_ID).first()
         batch_counter = 0
 
+        def submit_ios_product(course_run, ios_product):
+            nonlocal ios_configuration
+            if ios_configuration is None:
+                ios_configuration = self._get_ios_configuration(default_site)
+            # App Store Connect calls are slow, so they run in the background while seats
+            # for the remaining course runs are created.
+            ios_product_futures.append((
+                course_run.id,
+                app_store_executor.submit(
+                    self._run_in_worker, self._create_ios_product, course_run, ios_product, ios_configuration
+                )
+            ))
+
         # Fetch products which expired in the last month and had mobile skus.
         expired_products = Product.objects.filter(
             attribute_values__attribute__name="certificate_type",
@@ -79,17 +135,26 @@ class Command(BaseCommand):
         if expired_courses:
             expired_courses_keys = list(expired_courses.values_list('id', flat=True))
 
+        related_course_run_keys = self._get_all_related_course_run_keys(
+            expired_courses, default_site, options['discovery_workers']
+        )
         for expired_course in expired_courses:
-            try:
-                all_course_run_keys = self._get_related_course_run_keys(expired_course, default_site)
-            except CourseRunFetchException:
+            all_course_run_keys = related_course_run_keys.get(expired_course.id)
+            if all_course_run_keys is None:
                 # Logging of exception is already done inside _get_related_course_run_keys
-                continue  # pragma: no cover
+                continue
 
-            all_course_runs = Course.objects.filter(id__in=all_course_run_keys)
+            all_course_runs = Course.objects.filter(id__in=all_course_run_keys).exclude(id__in=processed_course_runs)
             for course_run in all_course_runs:
                 all_course_runs_processed.append(course_run.id)
                 parent_product = self._get_parent_product_to_create_mobile_skus_for(course_run)
+                if parent_product is None:
+                    # The mobile seats may have been created by a previous run which failed to create the iOS
+                    # product, and did not checkpoint the course run.
+                    ios_product = self._get_ios_product_to_retry(course_run)
+                    if ios_product:
+                        submit_ios_product(course_run, ios_product)
+                        continue
 
                 try:
                     mobile_products = create_child_products_for_mobile(parent_product)
@@ -103,18 +168,58 @@ class Command(BaseCommand):
                 ios_product = list(filter(lambda sku: 'ios' in sku.partner_sku, mobile_products))[0]
                 ios_sku = ios_product.partner_sku
                 new_seats_created.append("{},{},{}".format(ios_sku, android_sku, course_run.id))
-
-                error_message = self._create_ios_product(course_run, ios_product, default_site)
-                if error_message:
-                    failed_ios_products.append(error_message)
+                submit_ios_product(course_run, ios_product)
                 course_run.publish_to_lms()
 
             batch_counter += 1
             if batch_counter >= batch_size:
                 time.sleep(sleep_time)
                 batch_counter = 0
-        self._send_email_about_expired_courses(expired_courses_keys, all_course_runs_processed,
-                                               failed_course_runs, new_seats_created, failed_ios_products)
+
+        failed_ios_products = self._collect_ios_products(ios_product_futures, processed_course_runs)
+        return (expired_courses_keys, all_course_runs_processed, failed_course_runs, new_seats_created,
+                failed_ios_products)
+
+    def _collect_ios_products(self, ios_product_futures, processed_course_runs):
+        """
+        Wait for the App Store submissions and checkpoint the course runs that completed.
+        Returns the error messages of the iOS products that failed.
+        """
+        failed_ios_products = []
+        for course_run_id, ios_product_future in ios_product_futures:
+            error_message = ios_product_future.result()
+            if error_message:
+                failed_ios_products.append(error_message)
+            else:
+                processed_course_runs.add(course_run_id)
+                cache.set(CHECKPOINT_CACHE_KEY, processed_course_runs, CHECKPOINT_TIMEOUT)
+        return failed_ios_products
+
+    def _run_in_worker(self, func, *args):
+        """
+        Run func in a worker thread, closing the database connection the thread may have opened.
+        """
+        try:
+            return func(*args)
+        finally:
+            connection.close()
+
+    def _get_all_related_course_run_keys(self, courses, default_site, max_workers):
+        """
+        Concurrently fetch the related course run keys of every given course from Discovery.
+        Returns a dict of course id to course run keys, leaving out courses whose lookup failed.
+        """
+        # Load the site configuration up front so that worker threads only talk to Discovery.
+        default_site.siteconfiguration  # pylint: disable=pointless-statement
+
+        def _get_keys(course):
+            try:
+                return course.id, self._get_related_course_run_keys(course, default_site)
+            except CourseRunFetchException:
+                return course.id, None
+
+        with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as executor:
+            return dict(executor.map(_get_keys, courses))
 
     def _get_related_course_run_keys(self, course, default_site):
         """
@@ -162,10 +267,27 @@ class Command(BaseCommand):
         ).first()
         return product_to_create_mobile_skus_for
 
-    def _create_ios_product(self, course, ios_product, site):
-        # create ios product on appstore
+    def _get_ios_product_to_retry(self, course):
+        """
+        Returns the stock record of the iOS seat of the course run if it has no App Store product yet,
+        and has not expired.
+        """
+        ios_stock_record = StockRecord.objects.filter(
+            product__course=course,
+            product__structure=Product.CHILD,
+            product__expires__gt=now(),
+            partner_sku__startswith='mobile.{}.'.format(IOS_SKU_PREFIX),
+        ).select_related('product').first()
+        if ios_stock_record and not getattr(ios_stock_record.product.attr, 'app_store_id', ''):
+            return ios_stock_record
+        return None
+
+    def _get_ios_configuration(self, site):
         partner_short_code = site.siteconfiguration.partner.short_code
-        configuration = settings.PAYMENT_PROCESSOR_CONFIG[partner_short_code.lower()][IOSIAP.NAME.lower()]
+        return settings.PAYMENT_PROCESSOR_CONFIG[partner_short_code.lower()][IOSIAP.NAME.lower()]
+
+    def _create_ios_product(self, course, ios_product, configuration):
+        # create ios product on appstore
         course_data = {
             'price': ios_product.price_excl_tax,
             'name': course.name,
@@ -1,6 +1,7 @@
 """Tests for the batch_update_mobile_seats command"""
-from unittest.mock import patch
+from unittest.mock import call, patch
 
+from django.core.cache import cache
 from django.core.management import call_command
 from testfixtures import LogCapture
 
@@ -319,3 +320,76 @@ class BatchUpdateMobileSeatsTests(BaseIAPManagementCommandTests):
                 )
             )
             mock_send_email.assert_called_with(mock_mobile_team_mail, mock_email_body)
+
+    @patch('ecommerce.extensions.iap.management.commands.batch_update_mobile_seats.Command._create_ios_product')
+    @patch('ecommerce.extensions.iap.management.commands.batch_update_mobile_seats.get_course_detail')
+    @patch('ecommerce.extensions.iap.management.commands.batch_update_mobile_seats.get_course_run_detail')
+    @patch.object(Course, 'publish_to_lms')
+    @patch.object(mobile_seats_command, '_send_email_about_expired_courses')
+    def test_processed_course_runs_are_checkpointed(
+            self, mock_email, _mock_publish_to_lms, mock_course_run, mock_course_detail, mock_create_ios_product):
+        """Test that course runs completed by a previous run are skipped unless the checkpoint is ignored."""
+        course_with_mobile_seat = self.create_course_and_seats(create_mobile_seats=True, expired_in_past=True)
+        course_run_without_mobile_seat = self.create_course_and_seats()
+        mock_course_run.return_value = {'course': course_with_mobile_seat.id}
+        mock_course_detail.return_value = {'course_run_keys': [course_run_without_mobile_seat.id]}
+        mock_create_ios_product.return_value = None
+        cache.clear()
+
+        call_command(self.command)
+        self.assertEqual(mock_create_ios_product.call_count, 1)
+        all_course_runs_processed = mock_email.call_args[0][1]
+        self.assertEqual(all_course_runs_processed, [course_run_without_mobile_seat.id])
+
+        call_command(self.command)
+        self.assertEqual(mock_create_ios_product.call_count, 1)
+        self.assertEqual(mock_email.call_args[0][1], [])
+
+        call_command(self.command, ignore_checkpoint=True)
+        self.assertEqual(mock_email.call_args[0][1], [course_run_without_mobile_seat.id])
+
+    @patch('ecommerce.extensions.iap.management.commands.batch_update_mobile_seats.Command._create_ios_product')
+    @patch('ecommerce.extensions.iap.management.commands.batch_update_mobile_seats.get_course_detail')
+    @patch('ecommerce.extensions.iap.management.commands.batch_update_mobile_seats.get_course_run_detail')
+    @patch.object(Course, 'publish_to_lms')
+    @patch.object(mobile_seats_command, '_send_email_about_expired_courses')
+    def test_failed_ios_products_are_not_checkpointed(
+            self, mock_email, _mock_publish_to_lms, mock_course_run, mock_course_detail, mock_create_ios_product):
+        """Test that course runs whose iOS product failed are reported and retried by the next run."""
+        course_with_mobile_seat = self.create_course_and_seats(create_mobile_seats=True, expired_in_past=True)
+        course_run_without_mobile_seat = self.create_course_and_seats()
+        mock_course_run.return_value = {'course': course_with_mobile_seat.id}
+        mock_course_detail.return_value = {'course_run_keys': [course_run_without_mobile_seat.id]}
+        mock_create_ios_product.return_value = 'Error creating ios product'
+        cache.clear()
+
+        call_command(self.command, app_store_workers=2, discovery_workers=2)
+        self.assertEqual(mock_create_ios_product.call_count, 1)
+        self.assertEqual(mock_email.call_args[0][4], ['Error creating ios product'])
+
+        # The mobile seats are not created again, but their iOS product is.
+        mock_create_ios_product.return_value = None
+        call_command(self.command)
+        self.assertEqual(mock_create_ios_product.call_count, 2)
+        ios_product = mock_create_ios_product.call_args[0][1]
+        self.assertEqual(ios_product.product.course, course_run_without_mobile_seat)
+        self.assertIn('ios', ios_product.partner_sku)
+        self.assertEqual(mock_email.call_args[0][1], [course_run_without_mobile_seat.id])
+        self.assertEqual(mock_email.call_args[0][2], [])
+        self.assertEqual(mock_email.call_args[0][3], [])
+        self.assertEqual(mock_email.call_args[0][4], [])
+
+        call_command(self.command)
+        self.assertEqual(mock_create_ios_product.call_count, 2)
+        self.assertEqual(mock_email.call_args[0][1], [])
+
+    @patch('ecommerce.extensions.iap.management.commands.batch_update_mobile_seats.set_app_store_rate_limit')
+    @patch('ecommerce.extensions.iap.management.commands.batch_update_mobile_seats.get_course_run_detail')
+    def test_rate_limit_removed_on_failure(self, mock_course_run, mock_set_app_store_rate_limit):
+        """Test that the App Store rate limit is removed when the command fails."""
+        self.create_course_and_seats(create_mobile_seats=True, expired_in_past=True)
+        mock_course_run.side_effect = ValueError
+
+        with self.assertRaises(ValueError):
+            call_command(self.command, app_store_rate_limit=2)
+        self.assertEqual(mock_set_app_store_rate_limit.call_args_list, [call(2), call(None)])
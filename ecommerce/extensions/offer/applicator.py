@@ -112,15 +112,9 @@ class Applicator(OscarApplicator):
         Returns:
             list of Offer: List of all the offers applicable to the program.
         """
-        BasketAttribute = get_model('basket', 'BasketAttribute')
-        BasketAttributeType = get_model('basket', 'BasketAttributeType')
         ConditionalOffer = get_model('offer', 'ConditionalOffer')
 
-        bundle_attributes = BasketAttribute.objects.filter(
-            basket=basket,
-            attribute_type=BasketAttributeType.objects.get(name=BUNDLE)
-        )
-        program_uuid = bundle_id if bundle_attributes.count() == 0 else bundle_attributes.first().value_text
+        program_uuid = basket.get_attribute(BUNDLE, default=bundle_id)
         if program_uuid:
             offers = ConditionalOffer.active.filter(
                 offer_type=ConditionalOffer.SITE, condition__program_uuid=program_uuid
@@ -10,6 +10,7 @@ from dateutil.relativedelta import relativedelta
 from django.conf import settings
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
 from django.db.models.signals import post_delete
@@ -55,6 +56,8 @@ LIMIT = models.Q(app_label='offer', model='offerassignmentemailtemplates') | \
 
 logger = logging.getLogger(__name__)
 
+Catalog = get_model('catalogue', 'Catalog')
+Product = get_model('catalogue', 'Product')
 Voucher = get_model('voucher', 'Voucher')
 
 
@@ -86,8 +89,8 @@ class Benefit(AbstractBenefit):
         return [
             line for line in lines
             if (line.product.is_seat_product or line.product.is_course_entitlement_product) and
-            hasattr(line.product.attr, 'certificate_type') and
-            line.product.attr.certificate_type.lower() in applicable_range.course_seat_types
+            line.product.get_attr('certificate_type', None) is not None and
+            line.product.get_attr('certificate_type').lower() in applicable_range.course_seat_types
         ]
 
     def _identify_uncached_product_identifiers(self, lines, domain, partner_code, query):
@@ -103,7 +106,7 @@ class Benefit(AbstractBenefit):
             if line.product.is_seat_product:
                 product_id = line.product.course.id
             else:  # All lines passed to this method should either have a seat or an entitlement product
-                product_id = line.product.attr.UUID
+                product_id = line.product.get_attr('UUID')
 
             cache_key = get_cache_key(
                 site_domain=domain,
@@ -199,6 +202,16 @@ class Benefit(AbstractBenefit):
                 applicable_lines
             )
             return [(line.product.stockrecords.first().price_excl_tax, line) for line in applicable_lines]
+
+        if applicable_range and applicable_range.course_catalog and applicable_range.course_seat_types:
+            # Check all seats of the basket against the Discovery Service catalog at once, so that the per-line
+            # range checks below are answered from the cache.
+            applicable_range.catalog_contains_course_runs(
+                [line.product.course_id for line in self._filter_for_paid_course_products(
+                    basket.all_lines(), applicable_range
+                ) if line.product.is_seat_product],
+                site=basket.site
+            )
         return super(Benefit, self).get_applicable_lines(offer, basket, range=range)  # pylint: disable=bad-super-call
 
 
@@ -494,47 +507,81 @@ class Range(AbstractRange):
         if self.course_seat_types:
             validate_credit_seat_type(self.course_seat_types)
 
-    def catalog_contains_product(self, product):
-        """
-        Retrieve the results from using the catalog contains endpoint for
-        catalog service for the catalog id contained in field "course_catalog".
+    def catalog_contains_course_runs(self, course_run_ids, site=None):
         """
-        request = get_current_request()
-        partner_code = request.site.siteconfiguration.partner.short_code
-        cache_key = get_cache_key(
-            site_domain=request.site.domain,
-            partner_code=partner_code,
-            resource='catalogs.contains',
-            course_id=product.course_id,
-            catalog_id=self.course_catalog
-        )
-        cached_response = TieredCache.get_cached_response(cache_key)
-        if cached_response.is_found:
-            return cached_response.value
+        Returns whether the Discovery Service catalog in "course_catalog" contains each of the given course runs.
+
+        Cached results are read with a single multi-get, and the remaining course runs are checked with a single
+        call to the catalog contains endpoint.
 
-        api_client = request.site.siteconfiguration.oauth_api_client
+        Arguments:
+            course_run_ids (iterable): IDs of the course runs to check.
+            site (Site): Site whose Discovery Service is called. Defaults to the site of the current request, and
+                must be given when this is called outside of a request, e.g. from a Celery task.
+
+        Returns:
+            dict: Booleans keyed by course run ID.
+        """
+        site = site or get_current_request().site
+        partner_code = site.siteconfiguration.partner.short_code
+        cache_keys = {
+            course_run_id: get_cache_key(
+                site_domain=site.domain,
+                partner_code=partner_code,
+                # Versioned, since entries of the previous resource name hold whole Discovery Service responses.
+                resource='catalogs.contains.v2',
+                course_id=course_run_id,
+                catalog_id=self.course_catalog
+            )
+            for course_run_id in set(course_run_ids)
+        }
+        cached_values = cache.get_many(list(cache_keys.values()))
+        contains = {
+            course_run_id: bool(cached_values[cache_key])
+            for course_run_id, cache_key in cache_keys.items() if cache_key in cached_values
+        }
+
+        uncached_course_run_ids = sorted(set(cache_keys) - set(contains))
+        if not uncached_course_run_ids:
+            return contains
+
+        api_client = site.siteconfiguration.oauth_api_client
         discovery_api_url = urljoin(
-            f"{request.site.siteconfiguration.discovery_api_url}/",
+            f"{site.siteconfiguration.discovery_api_url}/",
             f"catalogs/{self.course_catalog}/contains/"
         )
         try:
             response = api_client.get(
                 discovery_api_url,
                 params={
-                    "course_run_id": product.course_id
+                    "course_run_id": ','.join(uncached_course_run_ids)
                 }
             )
             response.raise_for_status()
-            response = response.json()
-
-            TieredCache.set_all_tiers(cache_key, response, settings.COURSES_API_CACHE_TIMEOUT)
-            return response
+            courses = response.json()['courses']
         except (ReqConnectionError, RequestException, Timeout) as exc:
             logger.exception('[Code Redemption Failure] Unable to connect to the Discovery Service '
                              'for catalog contains endpoint. '
-                             'Product: %s, Message: %s, Range: %s', product.id, exc, self.id)
+                             'Course runs: %s, Message: %s, Range: %s', uncached_course_run_ids, exc, self.id)
             raise Exception('Unable to connect to Discovery Service for catalog contains endpoint.') from exc
 
+        # Memcached returns booleans as integers, so store integers to read back the same value from every cache.
+        uncached_values = {
+            cache_keys[course_run_id]: int(bool(courses.get(course_run_id)))
+            for course_run_id in uncached_course_run_ids
+        }
+        cache.set_many(uncached_values, settings.COURSES_API_CACHE_TIMEOUT)
+        contains.update({
+            course_run_id: bool(uncached_values[cache_keys[course_run_id]]) for course_run_id in uncached_course_run_ids
+        })
+        return contains
+
+    def catalog_contains_product(self, product, site=None):
+        """
+        Returns whether the Discovery Service catalog in "course_catalog" contains the course run of the product.
+        """
+        return self.catalog_contains_course_runs([product.course_id], site=site)[product.course_id]
+
     def contains_product(self, product):
         """
         Assert if the range contains the product.
@@ -544,15 +591,12 @@ class Range(AbstractRange):
         if self.course_catalog and self.course_seat_types:
             # Product certificate type should belongs to range seat types.
             if product.attr.certificate_type.lower() in self.course_seat_types:  # pylint: disable=unsupported-membership-test
-                response = self.catalog_contains_product(product)
                 # Range can have a catalog query and 'regular' products in it,
                 # therefor an OR is used to check for both possibilities.
-                contains_product = ((response['courses'][product.course_id]) or contains_product)
+                contains_product = self.catalog_contains_product(product) or contains_product
 
-        elif self.catalog:
-            contains_product = (
-                product.id in self.catalog.stock_records.values_list('product', flat=True) or contains_product
-            )
+        elif self.catalog_id:
+            contains_product = product.id in Catalog.get_product_ids(self.catalog_id) or contains_product
 
         if not contains_product:
             logger.warning('[Code Redemption Failure] Course catalog for Range does not contain the Product. '
@@ -569,8 +613,8 @@ class Range(AbstractRange):
         if (self.catalog_query or self.course_catalog) and self.course_seat_types:
             # Backbone calls the Voucher Offers API endpoint which gets the products from the Discovery Service
             return []
-        if self.catalog:
-            catalog_products = [record.product for record in self.catalog.stock_records.all()]
+        if self.catalog_id:
+            catalog_products = list(Product.objects.filter(id__in=Catalog.get_product_ids(self.catalog_id)))
             return catalog_products + list(super(Range, self).all_products())  # pylint: disable=bad-super-call
         return super(Range, self).all_products()  # pylint: disable=bad-super-call
 
@@ -607,6 +651,13 @@ class Condition(AbstractCondition):
             models.Index(fields=['enterprise_customer_uuid', 'program_uuid'])
         ]
 
+    def proxy(self):
+        proxy_instance = super(Condition, self).proxy()  # pylint: disable=bad-super-call
+        # Oscar builds the proxy from the field values only, so carry over an already loaded range.
+        if proxy_instance is not self and Condition.range.is_cached(self):
+            Condition.range.field.set_cached_value(proxy_instance, self.range)
+        return proxy_instance
+
 
 class OfferAssignment(TimeStampedModel):
     STATUS_CHOICES = (
@@ -15,7 +15,6 @@ from botocore.exceptions import ClientError
 from django.core.exceptions import ValidationError
 from django.db.models.signals import post_delete
 from django.utils.timezone import now
-from edx_django_utils.cache import TieredCache
 from mock import patch
 from oscar.core.loading import get_model
 from oscar.test import factories
@@ -82,6 +81,20 @@ class RangeTests(CouponMixin, DiscoveryTestMixin, DiscoveryMockMixin, TestCase):
         self.assertFalse(self.range.contains_product(not_in_range_product))
         self.assertFalse(self.range.contains_product(not_in_range_product))
 
+    def test_range_with_catalog_contains_product_query_count(self):
+        """
+        contains_product(product) should not query the catalog's stock records once its product IDs are cached.
+        """
+        self.range_with_catalog.contains_product(self.product)
+        not_in_range_product = factories.create_product()
+
+        with self.assertNumQueries(1):
+            # Only Oscar's own membership check queries the range's products.
+            self.assertTrue(self.range_with_catalog.contains_product(self.product))
+
+        self.catalog.stock_records.add(factories.create_stockrecord(not_in_range_product))
+        self.assertTrue(self.range_with_catalog.contains_product(not_in_range_product))
+
     def test_range_number_of_products(self):
         """
         num_products() should return number of num_of_products
@@ -322,11 +335,7 @@ class RangeTests(CouponMixin, DiscoveryTestMixin, DiscoveryMockMixin, TestCase):
 
     def test_catalog_contains_product(self):
         """
-        Verify that catalog_contains_product is cached
-
-        We expect 2 calls to set_all_tiers due to:
-            - the site_configuration api setup
-            - the result being cached
+        Verify that catalog_contains_product is cached.
         """
         self.mock_access_token_response()
 
@@ -344,14 +353,51 @@ class RangeTests(CouponMixin, DiscoveryTestMixin, DiscoveryMockMixin, TestCase):
             course_run_ids=[course.id]
         )
 
-        with patch.object(TieredCache, 'set_all_tiers', wraps=TieredCache.set_all_tiers) as mocked_set_all_tiers:
-            mocked_set_all_tiers.assert_not_called()
+        self.assertTrue(self.range.catalog_contains_product(self.product))
+        self._assert_num_requests(2)
+
+        self.assertTrue(self.range.catalog_contains_product(self.product))
+        self._assert_num_requests(2)
+
+    def test_catalog_contains_course_runs(self):
+        """
+        Verify that catalog_contains_course_runs checks uncached course runs with a single call, without a request.
+        """
+        self.mock_access_token_response()
+        self.range.catalog_query = None
+        self.range.course_seat_types = 'verified'
+        self.range.course_catalog = 1
+        self.range.save()
+
+        course_run_ids = ['course-v1:test+test+a', 'course-v1:test+test+b', 'course-v1:test+test+c']
+        self.mock_catalog_contains_endpoint(
+            discovery_api_url=self.site_configuration.discovery_api_url, catalog_id=1,
+            course_run_ids=course_run_ids[:1]
+        )
+        self.assertEqual(
+            self.range.catalog_contains_course_runs(course_run_ids[:1], site=self.site),
+            {course_run_ids[0]: True}
+        )
+        self._assert_num_requests(2)
 
-            _ = self.range.catalog_contains_product(self.product)
-            self.assertEqual(mocked_set_all_tiers.call_count, 2)
+        # Only the uncached course runs are sent to the Discovery Service, which omits those not in the catalog.
+        responses.add(
+            responses.GET,
+            '{}catalogs/1/contains/?course_run_id={}'.format(
+                self.site_configuration.discovery_api_url, ','.join(course_run_ids[1:])
+            ).replace('+', '%2B'),
+            json={'courses': {course_run_ids[1]: True}},
+            content_type='application/json',
+            match_querystring=True
+        )
+        with patch('ecommerce.extensions.offer.models.get_current_request') as mock_get_current_request:
+            contains = self.range.catalog_contains_course_runs(course_run_ids, site=self.site)
+        mock_get_current_request.assert_not_called()
+        self.assertEqual(contains, {course_run_ids[0]: True, course_run_ids[1]: True, course_run_ids[2]: False})
+        self._assert_num_requests(3)
 
-            _ = self.range.catalog_contains_product(self.product)
-            self.assertEqual(mocked_set_all_tiers.call_count, 2)
+        self.assertEqual(self.range.catalog_contains_course_runs(course_run_ids, site=self.site), contains)
+        self._assert_num_requests(3)
 
 
 @ddt.ddt
@@ -660,6 +706,31 @@ class BenefitTests(DiscoveryTestMixin, DiscoveryMockMixin, TestCase):
         responses.reset()
         self.assertEqual(self.benefit.get_applicable_lines(self.offer, basket), applicable_lines)
 
+    @responses.activate
+    def test_get_applicable_lines_course_catalog(self):
+        """ Assert that the seats of the basket are checked against a course catalog range with a single call. """
+        self.benefit.range.catalog_query = None
+        self.benefit.range.course_catalog = 1
+        self.benefit.range.course_seat_types = 'verified'
+        self.benefit.range.save()
+
+        basket = factories.BasketFactory(site=self.site, owner=self.user)
+        courses = []
+        for __ in range(3):
+            course, seat = self.create_course_and_seat()
+            basket.add_product(seat)
+            courses.append(course)
+
+        self.mock_access_token_response()
+        self.mock_catalog_contains_endpoint(
+            discovery_api_url=self.site_configuration.discovery_api_url, catalog_id=1,
+            course_run_ids=sorted(course.id for course in courses)
+        )
+
+        applicable_lines = self.benefit.get_applicable_lines(self.offer, basket)
+        self.assertEqual([line for __, line in applicable_lines], list(basket.all_lines()))
+        self.assertEqual(len(responses.calls), 2)
+
 
 @ddt.ddt
 class TestOfferAssignmentEmailSentRecord(TestCase):
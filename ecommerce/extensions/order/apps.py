@@ -5,3 +5,9 @@ from oscar.apps.order import apps
 
 class OrderConfig(apps.OrderConfig):
     name = 'ecommerce.extensions.order'
+
+    def ready(self):
+        super().ready()
+        # Register signal handlers
+        # noinspection PyUnresolvedReferences
+        import ecommerce.extensions.order.signals  # pylint: disable=unused-import, import-outside-toplevel
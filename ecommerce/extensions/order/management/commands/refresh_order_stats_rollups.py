@@ -0,0 +1,50 @@
+"""
+This command rebuilds the hourly order stats rollups read by the staff dashboard.
+"""
+
+
+import logging
+from datetime import timedelta
+from textwrap import dedent
+
+from django.core.management import BaseCommand
+from django.utils.timezone import now
+from oscar.core.loading import get_class
+
+logger = logging.getLogger(__name__)
+
+refresh_order_stats_rollups = get_class('order.utils', 'refresh_order_stats_rollups')
+
+DEFAULT_HOURS = 48
+
+
+class Command(BaseCommand):
+    """
+    Rebuild the hourly order stats rollups from the orders and users tables.
+
+    Rollups are incremented as orders are placed. This command is meant to be run periodically
+    to correct them for orders and users created or changed outside of checkout, and with a large
+    number of hours to backfill history.
+
+    Example:
+        ./manage.py refresh_order_stats_rollups
+        ./manage.py refresh_order_stats_rollups --hours=720
+    """
+
+    help = dedent(__doc__)
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours',
+            action='store',
+            dest='hours',
+            default=DEFAULT_HOURS,
+            help='Number of past hours, including the current one, to rebuild.',
+            type=int,
+        )
+
+    def handle(self, *args, **options):
+        end = now()
+        start = end - timedelta(hours=options['hours'] - 1)
+        count = refresh_order_stats_rollups(start, end)
+        logger.info('Rebuilt [%d] order stats rollups for the last [%d] hours.', count, options['hours'])
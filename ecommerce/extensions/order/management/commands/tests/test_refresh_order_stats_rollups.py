@@ -0,0 +1,28 @@
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.utils.timezone import now
+from oscar.core.loading import get_class, get_model
+
+from ecommerce.extensions.test.factories import create_order
+from ecommerce.tests.testcases import TestCase
+
+OrderStatsRollup = get_model('order', 'OrderStatsRollup')
+get_stats_rollup_hour = get_class('order.utils', 'get_stats_rollup_hour')
+
+
+class RefreshOrderStatsRollupsTests(TestCase):
+    def test_refresh_order_stats_rollups(self):
+        """ Verify the rollups of the given number of hours are rebuilt from the orders table. """
+        order = create_order(site=self.site)
+        OrderStatsRollup.objects.all().delete()
+        old_rollup = OrderStatsRollup.objects.create(
+            site=self.site, hour=get_stats_rollup_hour(now() - timedelta(hours=3)), order_count=1
+        )
+
+        call_command('refresh_order_stats_rollups', '--hours=2')
+
+        rollup = OrderStatsRollup.objects.get(site=self.site, hour=get_stats_rollup_hour(order.date_placed))
+        self.assertEqual(rollup.order_count, 1)
+        self.assertEqual(rollup.revenue, order.total_incl_tax)
+        self.assertTrue(OrderStatsRollup.objects.filter(pk=old_rollup.pk).exists())
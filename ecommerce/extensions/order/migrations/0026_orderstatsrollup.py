@@ -0,0 +1,36 @@
+# Generated by Django 3.2.25 on 2026-10-19 09:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sites', '0002_alter_domain_unique'),
+        ('order', '0025_auto_20210922_1857'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderStatsRollup',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField(help_text='Start of the hour aggregated by this row.')),
+                ('order_count', models.PositiveIntegerField(default=0)),
+                ('paid_order_count', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('paid_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('new_user_count', models.PositiveIntegerField(default=0)),
+                ('site', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='sites.site')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='orderstatsrollup',
+            index=models.Index(fields=['hour'], name='order_order_hour_a83628_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='orderstatsrollup',
+            unique_together={('site', 'hour')},
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 3.2.25 on 2026-10-19 14:02
+
+from django.db import migrations, models
+from django.db.models import Count, F
+
+SUMMED_FIELDS = ('order_count', 'paid_order_count', 'revenue', 'paid_revenue', 'new_user_count')
+
+
+def populate_site_key(apps, schema_editor):
+    """ Sets the site key of existing rollups, merging the rows without a site that share an hour. """
+    OrderStatsRollup = apps.get_model('order', 'OrderStatsRollup')
+    OrderStatsRollup.objects.filter(site__isnull=False).update(site_key=F('site_id'))
+
+    duplicated_hours = OrderStatsRollup.objects.filter(site__isnull=True).values('hour').annotate(
+        count=Count('id')
+    ).filter(count__gt=1).values_list('hour', flat=True)
+    for hour in duplicated_hours:
+        rollup, *duplicates = OrderStatsRollup.objects.filter(site__isnull=True, hour=hour).order_by('id')
+        for duplicate in duplicates:
+            for field in SUMMED_FIELDS:
+                setattr(rollup, field, getattr(rollup, field) + getattr(duplicate, field))
+        rollup.save()
+        OrderStatsRollup.objects.filter(id__in=[duplicate.id for duplicate in duplicates]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0026_orderstatsrollup'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='orderstatsrollup',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='orderstatsrollup',
+            name='site_key',
+            field=models.PositiveIntegerField(default=0, help_text='ID of the site, or 0 for rows without a site.'),
+        ),
+        migrations.RunPython(populate_site_key, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='orderstatsrollup',
+            unique_together={('site_key', 'hour')},
+        ),
+    ]
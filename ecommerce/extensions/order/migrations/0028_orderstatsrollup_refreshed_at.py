@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-19 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0027_orderstatsrollup_site_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderstatsrollup',
+            name='refreshed_at',
+            field=models.DateTimeField(blank=True, help_text='Last time at which this row was rebuilt from the source tables.', null=True),
+        ),
+    ]
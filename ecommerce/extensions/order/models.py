@@ -24,10 +24,36 @@ class Order(AbstractOrder):
         """ Return a boolean if the order contains a Coupon. """
         return any(line.product.is_coupon_product for line in self.basket.all_lines())
 
+    @property
+    def basket_discounts(self):
+        # Filter prefetched discounts in memory rather than querying them again.
+        if 'discounts' in getattr(self, '_prefetched_objects_cache', {}):
+            return [discount for discount in self.discounts.all() if discount.category == OrderDiscount.BASKET]
+        return super().basket_discounts
+
 
 class OrderDiscount(AbstractOrderDiscount):
     history = HistoricalRecords()
 
+    # The offer and voucher are only referenced by ID. They are looked up once per instance,
+    # unless they have been loaded in bulk with `set_offer_and_voucher`.
+    @property
+    def offer(self):
+        if not hasattr(self, '_offer'):
+            self._offer = super().offer  # pylint: disable=attribute-defined-outside-init
+        return self._offer
+
+    @property
+    def voucher(self):
+        if not hasattr(self, '_voucher'):
+            self._voucher = super().voucher  # pylint: disable=attribute-defined-outside-init
+        return self._voucher
+
+    def set_offer_and_voucher(self, offer, voucher):
+        """ Sets the offer and voucher of this discount, to avoid looking them up. """
+        self._offer = offer  # pylint: disable=attribute-defined-outside-init
+        self._voucher = voucher  # pylint: disable=attribute-defined-outside-init
+
 
 class Line(AbstractLine):
     history = HistoricalRecords()
@@ -54,6 +80,42 @@ class MarkOrdersStatusCompleteConfig(ConfigurationModel):
     )
 
 
+class OrderStatsRollup(models.Model):
+    """
+    Hourly aggregates of placed orders and newly joined users, read by the staff dashboard.
+
+    Rows are incremented as orders are placed and users join, and are periodically rebuilt from the
+    source tables by the `refresh_order_stats_rollups` management command. Users are not associated
+    with a site, so new users are counted on rows without a site.
+
+    .. no_pii:
+    """
+    site = models.ForeignKey('sites.Site', null=True, blank=True, on_delete=models.CASCADE)
+    # Unlike the nullable site, this makes rows without a site unique per hour, since MySQL does not enforce the
+    # uniqueness of NULL values.
+    site_key = models.PositiveIntegerField(default=0, help_text=_('ID of the site, or 0 for rows without a site.'))
+    hour = models.DateTimeField(help_text=_('Start of the hour aggregated by this row.'))
+    order_count = models.PositiveIntegerField(default=0)
+    paid_order_count = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    paid_revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    new_user_count = models.PositiveIntegerField(default=0)
+    refreshed_at = models.DateTimeField(
+        null=True, blank=True, help_text=_('Last time at which this row was rebuilt from the source tables.')
+    )
+
+    class Meta:
+        unique_together = ('site_key', 'hour')
+        indexes = [models.Index(fields=['hour'])]
+
+    def __str__(self):
+        return '{site}: {hour}'.format(site=self.site_id, hour=self.hour.isoformat())
+
+    def save(self, *args, **kwargs):
+        self.site_key = self.site_id or 0
+        super().save(*args, **kwargs)
+
+
 # If two models with the same name are declared within an app, Django will only use the first one.
 # noinspection PyUnresolvedReferences
 from oscar.apps.order.models import *  # noqa isort:skip pylint: disable=wildcard-import,unused-wildcard-import,wrong-import-position,wrong-import-order,ungrouped-imports
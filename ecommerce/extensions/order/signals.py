@@ -0,0 +1,33 @@
+
+
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from oscar.apps.order.signals import order_placed
+from oscar.core.loading import get_class
+
+from ecommerce.extensions.analytics.utils import silence_exceptions
+
+record_order_in_stats_rollups = get_class('order.utils', 'record_order_in_stats_rollups')
+record_user_in_stats_rollups = get_class('order.utils', 'record_user_in_stats_rollups')
+User = get_user_model()
+
+
+# Rollups are incremented once the transaction creating the order or user commits. Incrementing them within it would
+# hold the lock of the rollup row, shared by all orders of the site placed in the hour, until fulfillment completes.
+@receiver(order_placed, dispatch_uid='order.update_stats_rollups_on_order_placed')
+def update_stats_rollups_on_order_placed(sender, order=None, **kwargs):  # pylint: disable=unused-argument
+    transaction.on_commit(silence_exceptions('Failed to add placed order to the order stats rollups.')(
+        partial(record_order_in_stats_rollups, order)
+    ))
+
+
+@receiver(post_save, sender=User, dispatch_uid='order.update_stats_rollups_on_user_created')
+def update_stats_rollups_on_user_created(sender, instance=None, created=False, **kwargs):  # pylint: disable=unused-argument
+    if created:
+        transaction.on_commit(silence_exceptions('Failed to add new user to the order stats rollups.')(
+            partial(record_user_in_stats_rollups, instance)
+        ))
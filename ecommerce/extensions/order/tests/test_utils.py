@@ -3,26 +3,30 @@
 
 import datetime
 import logging
+from decimal import Decimal as D
 
 import ddt
 import mock
 import pytz
 import responses
+from django.contrib.auth import get_user_model
 from django.test.client import RequestFactory
+from django.utils.timezone import now
 from edx_django_utils.cache import TieredCache
 from oscar.core.loading import get_class, get_model
+from oscar.core.prices import Price
 from oscar.test.factories import BasketFactory
 from requests import Timeout
 from testfixtures import LogCapture
 
 from ecommerce.core.url_utils import get_lms_entitlement_api_url
 from ecommerce.extensions.fulfillment.status import ORDER
-from ecommerce.extensions.order.utils import UserAlreadyPlacedOrder
+from ecommerce.extensions.order.utils import UserAlreadyPlacedOrder, get_stats_rollup_hour, refresh_order_stats_rollups
 from ecommerce.extensions.refund.tests.factories import RefundFactory
 from ecommerce.extensions.refund.tests.mixins import RefundTestMixin
 from ecommerce.extensions.test.factories import create_basket, create_order
 from ecommerce.referrals.models import Referral
-from ecommerce.tests.factories import PartnerFactory, SiteConfigurationFactory
+from ecommerce.tests.factories import PartnerFactory, SiteConfigurationFactory, UserFactory
 from ecommerce.tests.testcases import TestCase
 
 LOGGER_NAME = 'ecommerce.extensions.order.utils'
@@ -33,10 +37,12 @@ NoShippingRequired = get_class('shipping.methods', 'NoShippingRequired')
 Option = get_model('catalogue', 'Option')
 OrderCreator = get_class('order.utils', 'OrderCreator')
 OrderNumberGenerator = get_class('order.utils', 'OrderNumberGenerator')
+OrderStatsRollup = get_model('order', 'OrderStatsRollup')
 OrderTotalCalculator = get_class('checkout.calculators', 'OrderTotalCalculator')
 OrderLine = get_model('order', 'Line')
 RefundLine = get_model('refund', 'RefundLine')
 ShippingAddress = get_class('order.models', 'ShippingAddress')
+User = get_user_model()
 
 
 class OrderNumberGeneratorTests(TestCase):
@@ -368,3 +374,131 @@ class UserAlreadyPlacedOrderTests(RefundTestMixin, TestCase):
 
             _ = UserAlreadyPlacedOrder.is_entitlement_expired(self.course_entitlement_uuid, site=self.site)
             self.assertEqual(mocked_set_all_tiers.call_count, 2)
+
+    def test_get_already_purchased_products(self):
+        """
+        Test that all products are checked with a constant number of queries.
+        """
+        refund = RefundFactory(user=self.user)
+        refund_line = RefundLine.objects.get(refund=refund)
+        refund_line.status = 'Complete'
+        refund_line.save()
+        refunded_product = self.get_order_product(order=refund.order)
+        not_purchased_product = self.create_order(user=self.create_user()).lines.first().product
+
+        with self.assertNumQueries(3):
+            purchased_product_ids = UserAlreadyPlacedOrder.get_already_purchased_products(
+                user=self.user,
+                products=[self.product, refunded_product, not_purchased_product],
+                site=self.site
+            )
+        self.assertEqual(purchased_product_ids, {self.product.id})
+
+    def test_get_already_purchased_products_without_products(self):
+        """
+        Test that no query is made when there is nothing to check.
+        """
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                UserAlreadyPlacedOrder.get_already_purchased_products(user=self.user, products=[], site=self.site),
+                set()
+            )
+
+    @responses.activate
+    def test_get_entitlements_expiration(self):
+        """
+        Test that entitlements missing from the cache are fetched with a single request and cached.
+        """
+        self.mock_access_token_response()
+        responses.add(
+            responses.GET,
+            get_lms_entitlement_api_url() + 'entitlements/',
+            status=200,
+            json={'results': [
+                {'uuid': '111', 'expired_at': None},
+                {'uuid': '222', 'expired_at': '2017-12-16T21:36:19.279647Z'},
+            ]},
+            content_type='application/json'
+        )
+
+        expirations = UserAlreadyPlacedOrder.get_entitlements_expiration(['111', '222', '333'], site=self.site)
+        self.assertEqual(expirations, {'111': None, '222': '2017-12-16T21:36:19.279647Z'})
+        entitlement_calls = [call for call in responses.calls if 'entitlements/' in call.request.url]
+        self.assertEqual(len(entitlement_calls), 1)
+        self.assertIn('uuid=111%2C222%2C333', entitlement_calls[0].request.url)
+
+        expirations = UserAlreadyPlacedOrder.get_entitlements_expiration(['111', '222'], site=self.site)
+        self.assertEqual(expirations, {'111': None, '222': '2017-12-16T21:36:19.279647Z'})
+        entitlement_calls = [call for call in responses.calls if 'entitlements/' in call.request.url]
+        self.assertEqual(len(entitlement_calls), 1)
+
+
+class OrderStatsRollupTests(TestCase):
+    def assert_rollups_equal(self, expected):
+        actual = {
+            (rollup.site_id, rollup.order_count, rollup.paid_order_count, rollup.revenue, rollup.new_user_count)
+            for rollup in OrderStatsRollup.objects.all()
+        }
+        self.assertEqual(actual, expected)
+
+    def test_rollups_updated_on_order_placed(self):
+        """ Placed orders and new users should be added to the rollup of the current hour once committed. """
+        OrderStatsRollup.objects.all().delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            paid_order = create_order(site=self.site)
+            create_order(site=self.site, total=Price('USD', D('0.00'), D('0.00')))
+        OrderStatsRollup.objects.filter(site__isnull=True).delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            UserFactory()
+            UserFactory()
+            self.assertFalse(OrderStatsRollup.objects.filter(site__isnull=True).exists())
+
+        self.assertTrue(paid_order.total_incl_tax > 0)
+        self.assertEqual(OrderStatsRollup.objects.values('hour').distinct().count(), 1)
+        self.assert_rollups_equal({
+            (self.site.id, 2, 1, paid_order.total_incl_tax, 0),
+            (None, 0, 0, D('0.00'), 2),
+        })
+
+    def test_refresh_order_stats_rollups(self):
+        """ Rollups in the given period should be rebuilt in place from the orders and users tables. """
+        order = create_order(site=self.site)
+        other_order = create_order(site=SiteConfigurationFactory().site)
+        hour = get_stats_rollup_hour(order.date_placed)
+        stale_rollup = OrderStatsRollup.objects.create(
+            site=self.site, hour=get_stats_rollup_hour(now() - datetime.timedelta(hours=2)), order_count=10
+        )
+        rollup = OrderStatsRollup.objects.create(site=self.site, hour=hour, order_count=5)
+        emptied_rollup = OrderStatsRollup.objects.create(
+            site=SiteConfigurationFactory().site, hour=hour, order_count=2, revenue=D('10.00')
+        )
+        user_count = User.objects.count()
+
+        self.assertEqual(refresh_order_stats_rollups(now() - datetime.timedelta(hours=1), now()), 3)
+        self.assertTrue(OrderStatsRollup.objects.filter(pk=stale_rollup.pk).exists())
+        self.assertTrue(OrderStatsRollup.objects.filter(pk=rollup.pk, order_count=1).exists())
+        stale_rollup.delete()
+        self.assert_rollups_equal({
+            (self.site.id, 1, 1, order.total_incl_tax, 0),
+            (other_order.site.id, 1, 1, other_order.total_incl_tax, 0),
+            (emptied_rollup.site.id, 0, 0, D('0.00'), 0),
+            (None, 0, 0, D('0.00'), user_count),
+        })
+
+    def test_refresh_before_increment(self):
+        """ Orders counted by a refresh before their increment runs should not be counted twice. """
+        OrderStatsRollup.objects.all().delete()
+        with self.captureOnCommitCallbacks() as callbacks:
+            order = create_order(site=self.site)
+        refresh_order_stats_rollups(order.date_placed, now())
+        for callback in callbacks:
+            callback()
+        self.assertTrue(OrderStatsRollup.objects.filter(site=self.site, order_count=1).exists())
+
+        # Orders placed long after the last refresh are incremented.
+        OrderStatsRollup.objects.filter(site=self.site).update(
+            order_count=5, refreshed_at=now() - datetime.timedelta(hours=1)
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            create_order(site=self.site)
+        self.assertTrue(OrderStatsRollup.objects.filter(site=self.site, order_count=6).exists())
@@ -1,10 +1,16 @@
 """Order Utility Classes. """
 
 
+import datetime
 import logging
 
 import waffle
 from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Exists, F, OuterRef, Prefetch, Q, Sum
+from django.utils import timezone
 from edx_django_utils.cache import TieredCache
 from oscar.apps.order.utils import OrderCreator as OscarOrderCreator
 from oscar.core.loading import get_model
@@ -18,10 +24,18 @@ from ecommerce.referrals.models import Referral
 
 logger = logging.getLogger(__name__)
 
-Option = get_model('catalogue', 'Option')
 Order = get_model('order', 'Order')
 OrderLine = get_model('order', 'Line')
+OrderStatsRollup = get_model('order', 'OrderStatsRollup')
+LineAttribute = get_model('order', 'LineAttribute')
 RefundLine = get_model('refund', 'RefundLine')
+User = get_user_model()
+
+EMPTY_ORDER_STATS_ROLLUP = {
+    'order_count': 0, 'paid_order_count': 0, 'revenue': 0, 'paid_revenue': 0, 'new_user_count': 0,
+}
+# Margin for the difference between the clocks of the processes counting orders and rebuilding rollups.
+ORDER_STATS_ROLLUP_CLOCK_SKEW = datetime.timedelta(minutes=1)
 
 
 class OrderNumberGenerator:
@@ -161,6 +175,119 @@ class UserAlreadyPlacedOrder:
 
         return expired
 
+    @staticmethod
+    def get_entitlements_expiration(entitlement_uuids, site):
+        """
+        Returns the expiration date of many entitlements at once.
+
+        Cached entitlements are read with a single cache lookup, and all the others
+        are fetched from the LMS in one request and cached individually.
+
+        Args:
+            entitlement_uuids: iterable of UUID
+            site: (Site)
+
+        Returns:
+            dict: Entitlement UUID to its `expired_at` value, None if the entitlement is not expired.
+                Entitlements that could not be retrieved are left out.
+        """
+        partner_short_code = site.siteconfiguration.partner.short_code
+        keys = {
+            str(entitlement_uuid): 'course_entitlement_detail_{}{}'.format(entitlement_uuid, partner_short_code)
+            for entitlement_uuid in entitlement_uuids
+        }
+        cached_entitlements = cache.get_many(list(keys.values()))
+        expirations = {
+            entitlement_uuid: cached_entitlements[key].get('expired_at')
+            for entitlement_uuid, key in keys.items() if key in cached_entitlements
+        }
+        missing_uuids = [entitlement_uuid for entitlement_uuid in keys if entitlement_uuid not in expirations]
+
+        try:
+            if len(missing_uuids) == 1:
+                expirations[missing_uuids[0]] = UserAlreadyPlacedOrder.is_entitlement_expired(missing_uuids[0], site)
+            elif missing_uuids:
+                logger.debug('Trying to get entitlements {%s}', missing_uuids)
+                response = site.siteconfiguration.oauth_api_client.get(
+                    site.siteconfiguration.build_lms_url('api/entitlements/v1/entitlements/'),
+                    params={'uuid': ','.join(missing_uuids), 'page_size': len(missing_uuids)}
+                )
+                response.raise_for_status()
+                for entitlement in response.json().get('results', []):
+                    TieredCache.set_all_tiers(
+                        keys[entitlement['uuid']], entitlement, settings.COURSES_API_CACHE_TIMEOUT
+                    )
+                    expirations[entitlement['uuid']] = entitlement.get('expired_at')
+        except (ConnectTimeout, ReqConnectionError, HTTPError):
+            logger.exception('Unable to get entitlements info %s due to a network problem', missing_uuids)
+
+        return expirations
+
+    @staticmethod
+    def get_already_purchased_products(user, products, site):
+        """
+        Returns the ids of the given products the user has already purchased.
+
+        A product is considered purchased if an OrderLine exists for the product,
+        it has not been refunded and, for course entitlements, the entitlement has not expired.
+        All the products are checked with a single query, and the entitlements
+        with at most one request to the LMS.
+
+        Args:
+            user: (User)
+            products: iterable of Product
+            site: (Site)
+
+        Returns:
+            set: Ids of the purchased products.
+
+        Notes:
+            If the switch with the name `ecommerce.extensions.order.constants.DISABLE_REPEAT_ORDER_SWITCH_NAME`
+            is active this check will be disabled, and this method will always return an empty set.
+        """
+        products = list(products)
+        if not products or waffle.switch_is_active(DISABLE_REPEAT_ORDER_CHECK_SWITCH_NAME):
+            return set()
+
+        order_lines = OrderLine.objects.filter(
+            product__in=products, order__user=user
+        ).annotate(
+            is_refunded=Exists(
+                RefundLine.objects.filter(order_line=OuterRef('pk'), status=REFUND_LINE.COMPLETE)
+            )
+        ).filter(
+            is_refunded=False
+        ).select_related(
+            'product__product_class', 'product__parent__product_class'
+        ).prefetch_related(
+            Prefetch(
+                'attributes',
+                queryset=LineAttribute.objects.filter(option__code='course_entitlement'),
+                to_attr='entitlement_attributes'
+            )
+        )
+
+        purchased_product_ids = set()
+        entitlement_products = {}
+        for order_line in order_lines:
+            if not order_line.product.is_course_entitlement_product:
+                purchased_product_ids.add(order_line.product_id)
+            elif order_line.entitlement_attributes:
+                entitlement_products[order_line.entitlement_attributes[0].value] = order_line.product_id
+
+        entitlement_products = {
+            entitlement_uuid: product_id for entitlement_uuid, product_id in entitlement_products.items()
+            if product_id not in purchased_product_ids
+        }
+        if entitlement_products:
+            expirations = UserAlreadyPlacedOrder.get_entitlements_expiration(entitlement_products, site)
+            purchased_product_ids.update(
+                product_id for entitlement_uuid, product_id in entitlement_products.items()
+                if entitlement_uuid in expirations and not expirations[entitlement_uuid]
+            )
+
+        return purchased_product_ids
+
     @staticmethod
     def user_already_placed_order(user, product, site):
         """
@@ -179,29 +306,9 @@ class UserAlreadyPlacedOrder:
         Notes:
             If the switch with the name `ecommerce.extensions.order.constants.DISABLE_REPEAT_ORDER_SWITCH_NAME`
             is active this check will be disabled, and this method will already return `False`.
+            Use `get_already_purchased_products` to check several products at once.
         """
-        if waffle.switch_is_active(DISABLE_REPEAT_ORDER_CHECK_SWITCH_NAME):
-            return False
-
-        entitlement_option = Option.objects.get(code='course_entitlement')
-
-        orders_lines = OrderLine.objects.filter(product=product, order__user=user)
-        for order_line in orders_lines:
-            if not UserAlreadyPlacedOrder.is_order_line_refunded(order_line):
-                if not order_line.product.is_course_entitlement_product:
-                    return True
-
-                entitlement_uuid = order_line.attributes.get(option=entitlement_option).value
-                try:
-                    if not UserAlreadyPlacedOrder.is_entitlement_expired(entitlement_uuid, site):
-                        return True
-                except (ConnectTimeout, ReqConnectionError, HTTPError):
-                    logger.exception(
-                        'Unable to get entitlement info [%s] due to a network problem',
-                        entitlement_uuid
-                    )
-
-        return False
+        return product.id in UserAlreadyPlacedOrder.get_already_purchased_products(user, [product], site)
 
     @staticmethod
     def is_order_line_refunded(order_line):
@@ -211,3 +318,143 @@ class UserAlreadyPlacedOrder:
             boolean: True if order line is refunded else false
         """
         return RefundLine.objects.filter(order_line=order_line, status=REFUND_LINE.COMPLETE).exists()
+
+
+def get_stats_rollup_hour(value):
+    """ Returns the start of the hour, used as OrderStatsRollup bucket, containing the given datetime. """
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def _get_order_stats(hour, site_key=None):
+    """
+    Returns the values of the rollups of an hour computed from the orders and users tables, by site key, of all sites
+    or of the given site key only. Site keys without orders or users are left out.
+    """
+    end = hour + datetime.timedelta(hours=1)
+    paid = Q(total_incl_tax__gt=0)
+    orders = Order.objects.filter(date_placed__gte=hour, date_placed__lt=end)
+    if site_key is not None:
+        orders = orders.filter(site_id=site_key or None)
+    order_stats = orders.values('site_id').annotate(
+        order_count=Count('id'),
+        paid_order_count=Count('id', filter=paid),
+        revenue=Sum('total_incl_tax'),
+        paid_revenue=Sum('total_incl_tax', filter=paid),
+    ).order_by()
+
+    rollups = {}
+    for stats in order_stats:
+        rollups[stats['site_id'] or 0] = dict(
+            EMPTY_ORDER_STATS_ROLLUP,
+            order_count=stats['order_count'],
+            paid_order_count=stats['paid_order_count'],
+            revenue=stats['revenue'] or 0,
+            paid_revenue=stats['paid_revenue'] or 0,
+        )
+    if not site_key:
+        new_user_count = User.objects.filter(date_joined__gte=hour, date_joined__lt=end).count()
+        if new_user_count:
+            rollups.setdefault(0, dict(EMPTY_ORDER_STATS_ROLLUP))['new_user_count'] = new_user_count
+    return rollups
+
+
+def increment_order_stats_rollup(site, hour, created, **increments):
+    """
+    Atomically adds the given values to the OrderStatsRollup of a site and hour, creating it if needed.
+
+    The rollup is rebuilt instead when it was refreshed after the counted order or user was created, since the refresh
+    may have counted it already.
+
+    Args:
+        site (Site): Site of the rollup, None for user counts.
+        hour (datetime): Start of the hour of the rollup.
+        created (datetime): Time at which the counted order or user was created.
+        **increments: Amount to add to each rollup field.
+    """
+    site_key = site.id if site else 0
+    with transaction.atomic():
+        rollup, __ = OrderStatsRollup.objects.select_for_update().get_or_create(
+            site_key=site_key, hour=hour, defaults={'site': site}
+        )
+        if rollup.refreshed_at and rollup.refreshed_at >= created - ORDER_STATS_ROLLUP_CLOCK_SKEW:
+            values = _get_order_stats(hour, site_key).get(site_key, EMPTY_ORDER_STATS_ROLLUP)
+            OrderStatsRollup.objects.filter(pk=rollup.pk).update(refreshed_at=timezone.now(), **values)
+        else:
+            OrderStatsRollup.objects.filter(pk=rollup.pk).update(
+                **{field: F(field) + value for field, value in increments.items()}
+            )
+
+
+def record_order_in_stats_rollups(order):
+    """ Adds a newly placed order to the hourly rollups of its site. """
+    increments = {'order_count': 1, 'revenue': order.total_incl_tax}
+    if order.total_incl_tax > 0:
+        increments.update({'paid_order_count': 1, 'paid_revenue': order.total_incl_tax})
+    increment_order_stats_rollup(
+        order.site, get_stats_rollup_hour(order.date_placed), order.date_placed, **increments
+    )
+
+
+def record_user_in_stats_rollups(user):
+    """ Adds a newly joined user to the hourly rollups. """
+    increment_order_stats_rollup(
+        None, get_stats_rollup_hour(user.date_joined), user.date_joined, new_user_count=1
+    )
+
+
+def refresh_order_stats_rollup_hour(hour):
+    """
+    Rebuilds the rollups of an hour from the orders and users tables.
+
+    The rows of the hour with orders or users are locked, and created if needed, before the orders and users are
+    counted. Increments of orders and users made meanwhile wait for the rebuilt rows, which they rebuild again rather
+    than increment, see increment_order_stats_rollup. Rows are updated in place, and rows without orders or users
+    left are zeroed, so that readers never see the hour missing.
+
+    Returns:
+        int: Number of rollups written with orders or users.
+    """
+    end = hour + datetime.timedelta(hours=1)
+
+    with transaction.atomic():
+        site_keys = set(OrderStatsRollup.objects.filter(hour=hour).values_list('site_key', flat=True))
+        site_keys.update(
+            site_id or 0 for site_id in Order.objects.filter(
+                date_placed__gte=hour, date_placed__lt=end
+            ).values_list('site_id', flat=True).distinct()
+        )
+        if User.objects.filter(date_joined__gte=hour, date_joined__lt=end).exists():
+            site_keys.add(0)
+        for site_key in sorted(site_keys):
+            OrderStatsRollup.objects.select_for_update().get_or_create(
+                site_key=site_key, hour=hour, defaults={'site_id': site_key or None}
+            )
+
+        rollups = _get_order_stats(hour)
+        refreshed_at = timezone.now()
+        # Rows of sites whose first orders of the hour were placed after the rows were locked are left to the
+        # increments of these orders.
+        for site_key in site_keys:
+            OrderStatsRollup.objects.filter(site_key=site_key, hour=hour).update(
+                refreshed_at=refreshed_at, **rollups.get(site_key, EMPTY_ORDER_STATS_ROLLUP)
+            )
+    return len(site_keys & set(rollups))
+
+
+def refresh_order_stats_rollups(start, end):
+    """
+    Rebuilds the hourly rollups between two datetimes from the orders and users tables, one hour at a time.
+
+    Args:
+        start (datetime): Rollups starting from the hour containing this datetime are rebuilt.
+        end (datetime): Rollups up to, but excluding, this datetime are rebuilt.
+
+    Returns:
+        int: Number of rollups written with orders or users.
+    """
+    count = 0
+    hour = get_stats_rollup_hour(start)
+    while hour < end:
+        count += refresh_order_stats_rollup_hour(hour)
+        hour += datetime.timedelta(hours=1)
+    return count
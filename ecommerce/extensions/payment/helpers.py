@@ -4,6 +4,7 @@
 import base64
 import hashlib
 import hmac
+from functools import lru_cache
 from importlib import import_module
 
 from django.conf import settings
@@ -31,6 +32,22 @@ def get_processor_class(path):
     return processor_class
 
 
+@lru_cache()
+def _get_processor_classes(paths):
+    return tuple(get_processor_class(path) for path in paths)
+
+
+def get_processor_classes():
+    """Return the payment processor classes at the paths specified in the PAYMENT_PROCESSORS setting.
+
+    The classes are imported once per process for each value of the setting.
+
+    Returns:
+        tuple: The payment processor classes, in the order of the setting.
+    """
+    return _get_processor_classes(tuple(settings.PAYMENT_PROCESSORS))
+
+
 def get_default_processor_class():
     """Return the default payment processor class.
 
@@ -41,7 +58,7 @@ def get_default_processor_class():
     Raises:
         IndexError: If the PAYMENT_PROCESSORS setting is empty.
     """
-    processor_class = get_processor_class(settings.PAYMENT_PROCESSORS[0])
+    processor_class = get_processor_classes()[0]
 
     return processor_class
 
@@ -58,9 +75,7 @@ def get_processor_class_by_name(name):
     Raises:
         ProcessorNotFoundError: If no payment processor with the given name exists.
     """
-    for path in settings.PAYMENT_PROCESSORS:
-        processor_class = get_processor_class(path)
-
+    for processor_class in get_processor_classes():
         if name == processor_class.NAME:
             return processor_class
 
@@ -174,20 +174,14 @@ class Stripe(ApplePayMixin, BaseClientSidePaymentProcessor):
                 'client_secret': '',
             }
         else:
-            try:
-                # Check if payment intent is in unexpected state, ie. 'requires_action'.
-                # This check is here for the situation where a BNPL is not finalized in a window,
-                # but another window is opened and the checkout page is loaded.
-                # First need to check for the presence of a Payment Intent in the basket.
-                # We need to do this before creating a Payment Intent, even with the idempotency key
-                # because Stripe will change a 'requires_action' status to 'requires_payment_method' if
-                # we call create on it. To avoid that, we must check the status prior to calling create.
-                payment_intent_id = BasketAttribute.objects.get(
-                    basket=basket,
-                    attribute_type__name=PAYMENT_INTENT_ID_ATTRIBUTE
-                ).value_text
-            except BasketAttribute.DoesNotExist:
-                payment_intent_id = None
+            # Check if payment intent is in unexpected state, ie. 'requires_action'.
+            # This check is here for the situation where a BNPL is not finalized in a window,
+            # but another window is opened and the checkout page is loaded.
+            # First need to check for the presence of a Payment Intent in the basket.
+            # We need to do this before creating a Payment Intent, even with the idempotency key
+            # because Stripe will change a 'requires_action' status to 'requires_payment_method' if
+            # we call create on it. To avoid that, we must check the status prior to calling create.
+            payment_intent_id = basket.get_attribute(PAYMENT_INTENT_ID_ATTRIBUTE)
 
             # If the basket has a Payment Intent, get the status
             if payment_intent_id:
@@ -252,11 +246,12 @@ class Stripe(ApplePayMixin, BaseClientSidePaymentProcessor):
                     # if this PI has been created before, we should be able to retrieve
                     # it from Stripe using the payment_intent_id BasketAttribute.
                     # Note that we update the PI's price in handle_processor_response
-                    # before hitting the confirm endpoint, so we don't need to do that here
-                    payment_intent_id_attribute = BasketAttributeType.objects.get(name=PAYMENT_INTENT_ID_ATTRIBUTE)
+                    # before hitting the confirm endpoint, so we don't need to do that here.
+                    # The attribute is read from the table rather than from the basket, as it may have been set by
+                    # another request since the basket read its attributes.
                     payment_intent_attr = BasketAttribute.objects.get(
                         basket=basket,
-                        attribute_type=payment_intent_id_attribute
+                        attribute_type=BasketAttributeType.get_by_name(PAYMENT_INTENT_ID_ATTRIBUTE)
                     )
                     transaction_id = payment_intent_attr.value_text.strip()
                     logger.info(
@@ -1,12 +1,28 @@
 # -*- coding: utf-8 -*-
 import json
+import time
 from urllib.parse import urljoin
 
+import mock
+import requests
 import responses
+from django.core.cache import cache
+from django.test import override_settings
+from oscar.core.loading import get_model
 
-from ecommerce.extensions.payment.utils import clean_field_value, middle_truncate
+from ecommerce.core.utils import get_cache_key
+from ecommerce.courses.tests.factories import CourseFactory
+from ecommerce.extensions.payment.utils import (
+    clean_field_value,
+    embargo_check,
+    get_basket_program_uuid,
+    middle_truncate
+)
+from ecommerce.extensions.test.factories import create_basket
 from ecommerce.tests.testcases import TestCase
 
+Basket = get_model('basket', 'Basket')
+
 
 class UtilsTests(TestCase):
     def test_truncation(self):
@@ -29,6 +45,16 @@ class UtilsTests(TestCase):
         value = 'Some^text:\'test-value'
         self.assertEqual(clean_field_value(value), 'Sometexttest-value')
 
+    def test_get_basket_program_uuid(self):
+        """ Verify the program UUID is read from the attributes of the basket, including ones not yet saved. """
+        basket = create_basket(site=self.site, empty=True)
+        self.assertIsNone(get_basket_program_uuid(basket))
+
+        basket.set_attribute('bundle_identifier', 'program-uuid')
+        self.assertEqual(get_basket_program_uuid(basket), 'program-uuid')
+        basket.save_attributes()
+        self.assertEqual(get_basket_program_uuid(Basket.objects.get(id=basket.id)), 'program-uuid')
+
 
 class EmbargoCheckTests(TestCase):
     """ Tests for the Embargo check function. """
@@ -64,3 +90,82 @@ class EmbargoCheckTests(TestCase):
         api_url = urljoin(f"{self.site.siteconfiguration.embargo_api_url}/", "course_access/")
         response = client.get(api_url, params=self.params).json()
         self.assertEqual(response, embargo_response)
+
+
+class EmbargoDecisionCacheTests(TestCase):
+    """ Tests for the caching of embargo decisions. """
+
+    def setUp(self):
+        super(EmbargoDecisionCacheTests, self).setUp()
+        self.user = self.create_user()
+        self.seat = CourseFactory(partner=self.partner).create_or_update_seat('verified', False, 10)
+
+    def mock_embargo_response(self, body):
+        responses.add(
+            responses.GET,
+            self.site_configuration.build_lms_url('/api/embargo/v1/course_access/'),
+            body=body,
+            content_type='application/json'
+        )
+
+    def embargo_check_seat(self):
+        """ Checks access to a verified seat, returning the decision and the number of embargo API calls made. """
+        embargo_calls = len([call for call in responses.calls if '/api/embargo/' in call.request.url])
+        access = embargo_check(self.user, self.site, [self.seat], ip='0.0.0.0')
+        return access, len([call for call in responses.calls if '/api/embargo/' in call.request.url]) - embargo_calls
+
+    @responses.activate
+    def test_embargo_check_caches_decision(self):
+        """ Verify embargo decisions are cached, and only refreshed by one request once they are stale. """
+        self.mock_access_token_response()
+        self.mock_embargo_response(json.dumps({'access': False}))
+
+        self.assertEqual(self.embargo_check_seat(), (False, 1))
+        self.assertEqual(self.embargo_check_seat(), (False, 0))
+
+        with override_settings(EMBARGO_DECISION_REFRESH_INTERVAL=0):
+            cache.clear()
+            self.assertEqual(self.embargo_check_seat(), (False, 1))
+
+            # Another request is refreshing the decision.
+            with mock.patch.object(cache, 'add', return_value=False):
+                self.assertEqual(self.embargo_check_seat(), (False, 0))
+
+            self.assertEqual(self.embargo_check_seat(), (False, 1))
+
+    @responses.activate
+    def test_embargo_check_waits_for_concurrent_fetch(self):
+        """ Verify a missing decision being fetched by another request is waited for rather than fetched again. """
+        self.mock_access_token_response()
+        self.mock_embargo_response(json.dumps({'access': False}))
+        cache_key = get_cache_key(
+            site_domain=self.site.domain,
+            resource='embargo_decision',
+            username=self.user.username,
+            ip_address='0.0.0.0',
+            course_ids=[self.seat.course.id],
+        )
+        lock_key = '{}_fetching'.format(cache_key)
+
+        # The other request caches the decision while this one waits.
+        cache.add(lock_key, True)
+        with mock.patch('time.sleep', side_effect=lambda __: cache.set(
+                cache_key, {'access': True, 'refresh_at': time.time() + 60}, 60)):
+            self.assertEqual(self.embargo_check_seat(), (True, 0))
+
+        # The other request fails to fetch the decision, so this one fetches it once the lock is released.
+        cache.clear()
+        cache.add(lock_key, True)
+        with mock.patch('time.sleep', side_effect=lambda __: cache.delete(lock_key)):
+            self.assertEqual(self.embargo_check_seat(), (False, 1))
+        self.assertIsNone(cache.get(lock_key))
+
+    @responses.activate
+    def test_embargo_check_does_not_cache_failures(self):
+        """ Verify access is allowed, and not cached, when the embargo API is unreachable. """
+        self.mock_access_token_response()
+        self.mock_embargo_response(requests.exceptions.Timeout)
+        self.mock_embargo_response(json.dumps({'access': False}))
+
+        self.assertEqual(self.embargo_check_seat(), (True, 1))
+        self.assertEqual(self.embargo_check_seat(), (False, 1))
@@ -1,20 +1,27 @@
 import logging
 import re
+import time
 from urllib.parse import urljoin
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.utils.translation import ugettext_lazy as _
 from oscar.core.loading import get_model
 
 from ecommerce.core.constants import SEAT_PRODUCT_CLASS_NAME
+from ecommerce.core.utils import get_cache_key
 from ecommerce.extensions.analytics.utils import parse_tracking_context
 
 logger = logging.getLogger(__name__)
 Basket = get_model('basket', 'Basket')
-BasketAttribute = get_model('basket', 'BasketAttribute')
-BasketAttributeType = get_model('basket', 'BasketAttributeType')
 User = get_user_model()
 
+# Time after which a fetch of a missing or stale embargo decision is assumed to have failed, and may be retried.
+EMBARGO_DECISION_FETCH_LOCK_TIMEOUT = 30  # Value is in seconds.
+# Interval at which requests waiting for a decision fetched by another request check the cache.
+EMBARGO_DECISION_MISS_POLL_INTERVAL = 0.05  # Value is in seconds.
+
 
 def get_basket_program_uuid(basket):
     """
@@ -24,16 +31,17 @@ def get_basket_program_uuid(basket):
     Returns:
         string: The program UUID if the basket is associated with a bundled purchase, otherwise None.
     """
-    try:
-        attribute_type = BasketAttributeType.objects.get(name='bundle_identifier')
-    except BasketAttributeType.DoesNotExist:
-        return None
-    bundle_attributes = BasketAttribute.objects.filter(
-        basket=basket,
-        attribute_type=attribute_type
-    )
-    bundle_attribute = bundle_attributes.first()
-    return bundle_attribute.value_text if bundle_attribute else None
+    if 'basketattribute_set' in getattr(basket, '_prefetched_objects_cache', {}):
+        bundle_attribute = next(
+            (
+                attribute for attribute in basket.basketattribute_set.all()
+                if attribute.attribute_type.name == 'bundle_identifier'
+            ),
+            None
+        )
+        return bundle_attribute.value_text if bundle_attribute else None
+
+    return basket.get_attribute('bundle_identifier')
 
 
 def get_program_uuid(order):
@@ -123,19 +131,74 @@ def embargo_check(user, site, products, ip=None):
             courses.append(product.course.id)
 
     if courses:
-        params = {
-            'user': user,
-            'ip_address': ip,
-            'course_ids': courses
-        }
-
-        try:
-            api_client = site.siteconfiguration.oauth_api_client
-            api_url = urljoin(f"{site.siteconfiguration.embargo_api_url}/", "course_access/")
-            response = api_client.get(api_url, params=params).json()
-            return response.get('access', True)
-        except:  # pylint: disable=bare-except
-            # We are going to allow purchase if the API is un-reachable.
-            pass
+        return _get_embargo_decision(user, site, courses, ip)
 
     return True
+
+
+def _get_embargo_decision(user, site, course_ids, ip):
+    """
+    Returns whether the user may access the courses from the IP address, as decided by the LMS embargo API.
+
+    Decisions are cached, denials for less time than grants. Once a cached decision is older than
+    EMBARGO_DECISION_REFRESH_INTERVAL, a single request refreshes it while concurrent requests keep using it.
+    Concurrent misses are coalesced: one request fetches the decision, while the others wait up to
+    EMBARGO_DECISION_MISS_WAIT for it before fetching it themselves.
+    If the API is unreachable, the cached decision is kept, or access is allowed when there is none.
+    """
+    cache_key = get_cache_key(
+        site_domain=site.domain,
+        resource='embargo_decision',
+        username=getattr(user, 'username', user),
+        ip_address=ip,
+        course_ids=sorted(course_ids),
+    )
+    lock_key = '{}_fetching'.format(cache_key)
+    decision = cache.get(cache_key)
+    if decision is not None and time.time() < decision['refresh_at']:
+        return decision['access']
+
+    locked = cache.add(lock_key, True, EMBARGO_DECISION_FETCH_LOCK_TIMEOUT)
+    if not locked and decision is not None:
+        # Another request is refreshing the decision.
+        return decision['access']
+
+    if not locked:
+        # Another request is fetching the decision. Stop waiting once it has released the lock without caching the
+        # decision, since its fetch failed.
+        deadline = time.monotonic() + settings.EMBARGO_DECISION_MISS_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(EMBARGO_DECISION_MISS_POLL_INTERVAL)
+            cached = cache.get_many([cache_key, lock_key])
+            if cache_key in cached:
+                return cached[cache_key]['access']
+            if lock_key not in cached:
+                break
+
+    params = {
+        'user': user,
+        'ip_address': ip,
+        'course_ids': course_ids
+    }
+
+    try:
+        api_client = site.siteconfiguration.oauth_api_client
+        api_url = urljoin(f"{site.siteconfiguration.embargo_api_url}/", "course_access/")
+        response = api_client.get(api_url, params=params).json()
+        access = response.get('access', True)
+    except:  # pylint: disable=bare-except
+        if locked:
+            cache.delete(lock_key)
+        # We are going to allow purchase if the API is un-reachable.
+        return decision['access'] if decision is not None else True
+
+    timeout = settings.EMBARGO_DECISION_CACHE_TIMEOUT if access else settings.EMBARGO_DENIED_DECISION_CACHE_TIMEOUT
+    cache.set(
+        cache_key,
+        {'access': access, 'refresh_at': time.time() + min(settings.EMBARGO_DECISION_REFRESH_INTERVAL, timeout)},
+        timeout
+    )
+    # The lock is released once the decision is cached, so that waiting requests do not fetch it again.
+    if locked:
+        cache.delete(lock_key)
+    return access
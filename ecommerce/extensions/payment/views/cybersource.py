@@ -42,8 +42,6 @@ logger = logging.getLogger(__name__)
 
 Applicator = get_class('offer.applicator', 'Applicator')
 Basket = get_model('basket', 'Basket')
-BasketAttribute = get_model('basket', 'BasketAttribute')
-BasketAttributeType = get_model('basket', 'BasketAttributeType')
 BillingAddress = get_model('order', 'BillingAddress')
 BUNDLE = 'bundle_identifier'
 Country = get_model('address', 'Country')
@@ -323,11 +321,7 @@ class CybersourceOrderCompletionView(EdxOrderPlacementMixin):
         old_basket_id = OrderNumberGenerator().basket_id(self.order_number)
         old_basket = Basket.objects.get(id=old_basket_id)
 
-        bundle_attributes = BasketAttribute.objects.filter(
-            basket=old_basket,
-            attribute_type=BasketAttributeType.objects.get(name=BUNDLE)
-        )
-        bundle = bundle_attributes.first().value_text if bundle_attributes.count() > 0 else None
+        bundle = old_basket.get_attribute(BUNDLE)
 
         new_basket = Basket.objects.create(owner=old_basket.owner, site=self.request.site)
 
@@ -335,11 +329,8 @@ class CybersourceOrderCompletionView(EdxOrderPlacementMixin):
         # numbers from being reused. For more, refer to commit a1efc68.
         new_basket.merge(old_basket, add_quantities=False)
         if bundle:
-            BasketAttribute.objects.update_or_create(
-                basket=new_basket,
-                attribute_type=BasketAttributeType.objects.get(name=BUNDLE),
-                defaults={'value_text': bundle}
-            )
+            new_basket.set_attribute(BUNDLE, bundle)
+            new_basket.save_attributes()
 
         logger.info(
             'Created new basket [%d] from old basket [%d] for declined transaction with bundle [%s].',
@@ -3,7 +3,7 @@
 from mock import patch
 
 from ecommerce.core.constants import SEAT_PRODUCT_CLASS_NAME
-from ecommerce.core.models import SegmentClient
+from ecommerce.extensions.analytics.clients import SegmentClient
 from ecommerce.extensions.analytics.utils import ECOM_TRACKING_ID_FMT
 from ecommerce.extensions.refund.api import create_refunds
 from ecommerce.extensions.refund.tests.mixins import RefundTestMixin
@@ -12,3 +12,6 @@ class VoucherConfig(apps.VoucherConfig):
         super().ready()
         if settings.VOUCHER_CODE_LENGTH < 1:
             raise ImproperlyConfigured("VOUCHER_CODE_LENGTH must be a positive number.")
+
+        # noinspection PyUnresolvedReferences
+        import ecommerce.extensions.voucher.signals  # pylint: disable=unused-import, import-outside-toplevel
@@ -103,6 +103,11 @@ class Voucher(AbstractVoucher):
 
     @property
     def original_offer(self):
+        if 'offers' in getattr(self, '_prefetched_objects_cache', {}):
+            # Select the offer from the prefetched offers, in the same order as the queries below.
+            offers = self.offers.all()
+            range_offers = [offer for offer in offers if offer.condition.range_id is not None]
+            return (range_offers or sorted(offers, key=lambda offer: offer.date_created))[0]
         try:
             return self.offers.filter(condition__range__isnull=False)[0]
         except (IndexError, ObjectDoesNotExist):
@@ -0,0 +1,146 @@
+"""
+Invalidation of the cached voucher graphs, see ecommerce.extensions.voucher.utils.get_cached_voucher_graph.
+"""
+
+
+from django.apps import apps
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save
+from django.dispatch import receiver
+from oscar.core.loading import get_model
+
+from ecommerce.extensions.voucher.utils import invalidate_cached_offer_graphs, invalidate_cached_voucher_graphs
+
+Benefit = get_model('offer', 'Benefit')
+Catalog = get_model('catalogue', 'Catalog')
+Condition = get_model('offer', 'Condition')
+ConditionalOffer = get_model('offer', 'ConditionalOffer')
+Product = get_model('catalogue', 'Product')
+Range = get_model('offer', 'Range')
+RangeProduct = get_model('offer', 'RangeProduct')
+Voucher = get_model('voucher', 'Voucher')
+
+
+def _invalidate_range_offers(range_ids):
+    offer_ids = ConditionalOffer.objects.filter(
+        Q(condition__range_id__in=range_ids) | Q(benefit__range_id__in=range_ids)
+    ).values_list('id', flat=True)
+    invalidate_cached_offer_graphs(offer_ids)
+
+
+def _connect_to_changes(receiver_function, model):
+    """
+    Connects the receiver to saves and deletions of the model and of its proxy models. Offer models are often proxied
+    (e.g. enterprise and program conditions and benefits), and signals of proxy models are sent by the proxy class.
+    """
+    # pylint: disable=protected-access
+    for sender in [model] + [other for other in apps.get_models() if other._meta.proxy and issubclass(other, model)]:
+        for signal in (post_save, post_delete):
+            signal.connect(
+                receiver_function,
+                sender=sender,
+                dispatch_uid='voucher.{}.{}'.format(receiver_function.__name__, sender._meta.label_lower)
+            )
+
+
+@receiver(post_init, sender=Voucher, dispatch_uid='voucher.track_original_voucher_code')
+def track_original_voucher_code(sender, instance=None, **kwargs):  # pylint: disable=unused-argument
+    """Keeps the code a voucher was loaded with, so that the graph cached for that code can be invalidated."""
+    instance.original_code = instance.code
+
+
+def invalidate_on_voucher_change(sender, instance=None, **kwargs):  # pylint: disable=unused-argument
+    if not kwargs.get('raw'):
+        invalidate_cached_voucher_graphs({instance.code, getattr(instance, 'original_code', instance.code)})
+        instance.original_code = instance.code
+
+
+def invalidate_on_offer_change(sender, instance=None, **kwargs):  # pylint: disable=unused-argument
+    if not kwargs.get('raw'):
+        invalidate_cached_offer_graphs([instance.id])
+
+
+def invalidate_on_condition_change(sender, instance=None, **kwargs):  # pylint: disable=unused-argument
+    if not kwargs.get('raw'):
+        offer_ids = ConditionalOffer.objects.filter(condition=instance).values_list('id', flat=True)
+        invalidate_cached_offer_graphs(offer_ids)
+
+
+def invalidate_on_benefit_change(sender, instance=None, **kwargs):  # pylint: disable=unused-argument
+    if not kwargs.get('raw'):
+        offer_ids = ConditionalOffer.objects.filter(benefit=instance).values_list('id', flat=True)
+        invalidate_cached_offer_graphs(offer_ids)
+
+
+def invalidate_on_range_change(sender, instance=None, **kwargs):  # pylint: disable=unused-argument
+    if not kwargs.get('raw'):
+        _invalidate_range_offers([instance.id])
+
+
+def invalidate_on_range_product_change(sender, instance=None, **kwargs):  # pylint: disable=unused-argument
+    if not kwargs.get('raw'):
+        _invalidate_range_offers([instance.range_id])
+
+
+def invalidate_on_product_change(sender, instance=None, **kwargs):  # pylint: disable=unused-argument
+    if not kwargs.get('raw'):
+        _invalidate_range_offers(RangeProduct.objects.filter(product=instance).values_list('range_id', flat=True))
+
+
+_connect_to_changes(invalidate_on_voucher_change, Voucher)
+_connect_to_changes(invalidate_on_offer_change, ConditionalOffer)
+_connect_to_changes(invalidate_on_condition_change, Condition)
+_connect_to_changes(invalidate_on_benefit_change, Benefit)
+_connect_to_changes(invalidate_on_range_change, Range)
+_connect_to_changes(invalidate_on_range_product_change, RangeProduct)
+_connect_to_changes(invalidate_on_product_change, Product)
+
+
+@receiver(m2m_changed, sender=Voucher.offers.through, dispatch_uid='voucher.invalidate_on_voucher_offers_changed')
+def invalidate_cached_voucher_graphs_on_offers_changed(
+        sender, instance=None, action=None, reverse=False, pk_set=None, **kwargs
+):  # pylint: disable=unused-argument
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+
+    if not reverse:
+        invalidate_cached_voucher_graphs([instance.code])
+    elif action == 'pre_clear':
+        invalidate_cached_voucher_graphs(instance.vouchers.values_list('code', flat=True))
+    else:
+        invalidate_cached_voucher_graphs(Voucher.objects.filter(pk__in=pk_set).values_list('code', flat=True))
+
+
+@receiver(m2m_changed, sender=Range.excluded_products.through, dispatch_uid='voucher.invalidate_on_excluded_products')
+@receiver(m2m_changed, sender=Range.classes.through, dispatch_uid='voucher.invalidate_on_range_classes')
+@receiver(m2m_changed, sender=Range.included_categories.through, dispatch_uid='voucher.invalidate_on_range_categories')
+def invalidate_on_range_changed(
+        sender, instance=None, action=None, reverse=False, pk_set=None, **kwargs
+):  # pylint: disable=unused-argument
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+
+    if not reverse:
+        _invalidate_range_offers([instance.id])
+    elif action == 'pre_clear':
+        # The automatic through models link ranges to the model named after it.
+        model_name = instance._meta.model_name  # pylint: disable=protected-access
+        _invalidate_range_offers(sender.objects.filter(**{model_name: instance}).values_list('range_id', flat=True))
+    else:
+        _invalidate_range_offers(pk_set)
+
+
+@receiver(m2m_changed, sender=Catalog.stock_records.through, dispatch_uid='voucher.invalidate_on_catalog_changed')
+def invalidate_cached_voucher_graphs_on_catalog_changed(
+        sender, instance=None, action=None, reverse=False, pk_set=None, **kwargs
+):  # pylint: disable=unused-argument
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+
+    if not reverse:
+        catalog_ids = [instance.id]
+    elif action == 'pre_clear':
+        catalog_ids = instance.catalogs.values_list('id', flat=True)
+    else:
+        catalog_ids = pk_set
+    _invalidate_range_offers(Range.objects.filter(catalog_id__in=catalog_ids).values_list('id', flat=True))
@@ -16,6 +16,7 @@ from oscar.test.factories import (
     ConditionalOfferFactory,
     OrderFactory,
     OrderLineFactory,
+    ProductFactory,
     RangeFactory,
     VoucherFactory,
     datetime,
@@ -732,6 +733,73 @@ class UtilTests(CouponMixin, DiscoveryMockMixin, DiscoveryTestMixin, LmsApiMockM
         self.assertEqual(len(products), 1)
         self.assertEqual(products[0], original_product)
 
+    def assert_voucher_graph_cached(self, code):
+        """ Asserts the voucher graph for the given code is served from the cache, and returns it. """
+        with self.assertNumQueries(0):
+            voucher, products = get_voucher_and_products_from_code(code=code)
+            self.assertIsNotNone(voucher.best_offer.benefit.range)
+            self.assertIsNotNone(voucher.best_offer.condition.range)
+        return voucher, products
+
+    def test_get_voucher_and_products_from_code_cached(self):
+        """ Verify the voucher graph is cached, and invalidated when the voucher or what it depends on changes. """
+        voucher, product = prepare_voucher(code=VOUCHER_CODE)
+        get_voucher_and_products_from_code(code=VOUCHER_CODE)
+        self.assert_voucher_graph_cached(VOUCHER_CODE)
+
+        voucher.name = 'Updated voucher'
+        voucher.save()
+        self.assertEqual(get_voucher_and_products_from_code(code=VOUCHER_CODE)[0].name, 'Updated voucher')
+        self.assert_voucher_graph_cached(VOUCHER_CODE)
+
+        benefit = voucher.best_offer.benefit
+        benefit.value = 42
+        benefit.save()
+        self.assertEqual(get_voucher_and_products_from_code(code=VOUCHER_CODE)[0].best_offer.benefit.value, 42)
+        self.assert_voucher_graph_cached(VOUCHER_CODE)
+
+        other_product = ProductFactory(categories=[], stockrecords__partner=self.partner)
+        benefit.range.add_product(other_product)
+        __, products = get_voucher_and_products_from_code(code=VOUCHER_CODE)
+        self.assertEqual(set(products), {product, other_product})
+        self.assert_voucher_graph_cached(VOUCHER_CODE)
+
+        offer = voucher.best_offer
+        offer.num_applications = 1
+        offer.save()
+        self.assertEqual(get_voucher_and_products_from_code(code=VOUCHER_CODE)[0].best_offer.num_applications, 1)
+
+    def test_cached_voucher_graph_of_all_products_range(self):
+        """ Verify the products of ranges including all products are not cached with the voucher graph. """
+        prepare_voucher(code=VOUCHER_CODE, _range=RangeFactory(includes_all_products=True))
+        get_voucher_and_products_from_code(code=VOUCHER_CODE)
+
+        product = ProductFactory(categories=[], stockrecords__partner=self.partner)
+        self.assertIn(product, get_voucher_and_products_from_code(code=VOUCHER_CODE)[1])
+
+    def test_cached_voucher_graph_invalidated_after_commit(self):
+        """ Verify graphs cached before the transaction changing a voucher commits are invalidated. """
+        voucher, __ = prepare_voucher(code=VOUCHER_CODE)
+        get_voucher_and_products_from_code(code=VOUCHER_CODE)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            voucher.name = 'Updated voucher'
+            voucher.save()
+            Voucher.objects.filter(pk=voucher.pk).update(name='Concurrently read voucher')
+            get_voucher_and_products_from_code(code=VOUCHER_CODE)
+            Voucher.objects.filter(pk=voucher.pk).update(name='Updated voucher')
+        self.assertEqual(get_voucher_and_products_from_code(code=VOUCHER_CODE)[0].name, 'Updated voucher')
+
+    def test_cached_voucher_graph_invalidated_on_code_change(self):
+        """ Verify the graph cached for the previous code of a voucher is invalidated when the code changes. """
+        voucher, __ = prepare_voucher(code=VOUCHER_CODE)
+        get_voucher_and_products_from_code(code=VOUCHER_CODE)
+
+        voucher.code = 'NEWC0DE'
+        voucher.save()
+        with self.assertRaises(Voucher.DoesNotExist):
+            get_voucher_and_products_from_code(code=VOUCHER_CODE)
+
     def test_no_product(self):
         """ Verify that an exception is raised if there is no product. """
         voucher = VoucherFactory()
@@ -7,10 +7,13 @@ import hashlib
 import logging
 import uuid
 from decimal import Decimal, DecimalException
+from functools import partial
 
 import dateutil.parser
 import pytz
 from django.conf import settings
+from django.db import transaction
+from django.db.models import Prefetch
 from django.urls import reverse
 from django.utils.translation import ugettext_lazy as _
 from edx_django_utils.cache import TieredCache
@@ -19,7 +22,11 @@ from oscar.core.loading import get_model
 from oscar.templatetags.currency_filters import currency
 
 from ecommerce.core.url_utils import get_ecommerce_url
-from ecommerce.core.utils import log_message_and_raise_validation_error
+from ecommerce.core.utils import (
+    get_cache_versions,
+    invalidate_cache_versions,
+    log_message_and_raise_validation_error
+)
 from ecommerce.enterprise.benefits import BENEFIT_MAP as ENTERPRISE_BENEFIT_MAP
 from ecommerce.enterprise.conditions import AssignableEnterpriseCustomerCondition
 from ecommerce.enterprise.utils import get_enterprise_customer
@@ -958,29 +965,112 @@ def update_voucher_offer(offer, benefit_value, benefit_type=None, max_uses=None,
     )
 
 
-def get_cached_voucher(code):
+def _get_voucher_graph_cache_key(code):
+    voucher_code = 'voucher_{code}'.format(code=code)
+    return hashlib.md5(voucher_code.encode('utf-8')).hexdigest()
+
+
+def _get_offer_version_cache_key(offer_id):
+    return 'voucher_graph_offer_version_{offer_id}'.format(offer_id=offer_id)
+
+
+def _get_offer_versions(offer_ids):
+    """ Returns the current version of the cached graphs of the given offers, by offer ID. """
+    cache_keys = {offer_id: _get_offer_version_cache_key(offer_id) for offer_id in offer_ids}
+    versions = get_cache_versions(list(cache_keys.values()))
+    return {offer_id: versions[cache_key] for offer_id, cache_key in cache_keys.items()}
+
+
+def invalidate_cached_offer_graphs(offer_ids):
+    """ Invalidates the cached graphs of all vouchers of the given offers, see invalidate_cache_versions. """
+    invalidate_cache_versions(_get_offer_version_cache_key(offer_id) for offer_id in offer_ids)
+
+
+def _delete_cached_voucher_graphs(cache_keys):
+    for cache_key in cache_keys:
+        TieredCache.delete_all_tiers(cache_key)
+
+
+def invalidate_cached_voucher_graphs(codes):
     """
-    Returns a voucher from cache if one is stored to cache, if not the voucher
-    is retrieved from database and stored to cache.
+    Invalidates the cached graphs of the vouchers with the given codes, right away and again once the current
+    transaction commits, like invalidate_cache_versions.
+    """
+    cache_keys = [_get_voucher_graph_cache_key(code) for code in codes]
+    _delete_cached_voucher_graphs(cache_keys)
+    transaction.on_commit(partial(_delete_cached_voucher_graphs, cache_keys))
+
+
+def _cache_range_products(voucher_range):
+    """
+    Returns whether the products of the range are cached with voucher graphs. Ranges matching products by class or
+    category, or all products, are not, since changes to products and categories do not invalidate the graphs.
+    """
+    return not (
+        voucher_range.includes_all_products or voucher_range.classes.exists()
+        or voucher_range.included_categories.exists()
+    )
+
+
+def get_cached_voucher_graph(code):
+    """
+    Returns a voucher, with its offers, conditions, benefits and ranges loaded, along with the products of the
+    range of its best offer, from cache if they are stored to cache. If not they are retrieved from database and
+    stored to cache. Products of ranges matching them by class or category, or matching all products, are not cached.
+
+    The cache is invalidated by model signals (see ecommerce.extensions.voucher.signals): changes to a voucher
+    invalidate its own graph, and changes to offers and to what they are built from invalidate the graphs of
+    all vouchers of those offers.
 
     Arguments:
         code (str): The code of a coupon voucher.
 
     Returns:
         voucher (Voucher): The Voucher for the passed code.
+        products (list): List of Products in the range of the voucher's best offer.
 
     Raises:
         Voucher.DoesNotExist: When no vouchers with provided code exist.
     """
-    voucher_code = 'voucher_{code}'.format(code=code)
-    cache_key = hashlib.md5(voucher_code.encode('utf-8')).hexdigest()
+    cache_key = _get_voucher_graph_cache_key(code)
     voucher_cached_response = TieredCache.get_cached_response(cache_key)
     if voucher_cached_response.is_found:
-        return voucher_cached_response.value
+        graph = voucher_cached_response.value
+        if _get_offer_versions(graph['offer_versions']) == graph['offer_versions']:
+            products = graph['products']
+            if products is None:
+                products = list(graph['voucher'].best_offer.benefit.range.all_products())
+            return graph['voucher'], products
+
+    voucher = Voucher.objects.prefetch_related(
+        Prefetch('offers', queryset=ConditionalOffer.objects.select_related('condition__range', 'benefit__range'))
+    ).get(code=code)
+    offer_versions = _get_offer_versions([offer.id for offer in voucher.offers.all()])
+
+    voucher_range = voucher.best_offer.benefit.range if offer_versions else None
+    products = list(voucher_range.all_products()) if voucher_range else []
 
-    voucher = Voucher.objects.get(code=code)
+    cached_products = products if not voucher_range or _cache_range_products(voucher_range) else None
+    graph = {'voucher': voucher, 'products': cached_products, 'offer_versions': offer_versions}
+    TieredCache.set_all_tiers(cache_key, graph, settings.VOUCHER_CACHE_TIMEOUT)
+    return voucher, products
 
-    TieredCache.set_all_tiers(cache_key, voucher, settings.VOUCHER_CACHE_TIMEOUT)
+
+def get_cached_voucher(code):
+    """
+    Returns a voucher from cache if one is stored to cache, if not the voucher
+    is retrieved from database and stored to cache.
+
+    Arguments:
+        code (str): The code of a coupon voucher.
+
+    Returns:
+        voucher (Voucher): The Voucher for the passed code.
+
+    Raises:
+        Voucher.DoesNotExist: When no vouchers with provided code exist.
+    """
+    voucher, __ = get_cached_voucher_graph(code)
     return voucher
 
 
@@ -999,13 +1089,12 @@ def get_voucher_and_products_from_code(code):
         Voucher.DoesNotExist: When no vouchers with provided code exist.
         ProductNotFoundError: When no products are associated with the voucher.
     """
-    voucher = get_cached_voucher(code)
+    voucher, products = get_cached_voucher_graph(code)
     voucher_range = voucher.best_offer.benefit.range
     has_catalog_configuration = voucher_range and (voucher_range.catalog_query or voucher_range.course_catalog)
     # pylint: disable=consider-using-ternary
     is_enterprise = ((voucher_range and voucher_range.enterprise_customer) or
                      voucher.best_offer.condition.enterprise_customer_uuid)
-    products = voucher_range.all_products() if voucher_range else []
 
     if products or has_catalog_configuration or is_enterprise:
         # List of products is empty in case of Multi-course coupon
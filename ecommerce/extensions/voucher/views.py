@@ -22,6 +22,7 @@ StockRecord = get_model('partner', 'StockRecord')
 
 class CouponReportCSVView(StaffOnlyMixin, View):
     """Generates coupon report and returns it in CSV format."""
+    use_read_replica = True
 
     def get(self, request, coupon_id):  # pylint: disable=unused-argument
         """
@@ -5,4 +5,10 @@ from django.apps import AppConfig
 
 
 class ProgramsConfig(AppConfig):
-    name = 'programs'
+    name = 'ecommerce.programs'
+
+    def ready(self):
+        super().ready()
+
+        # noinspection PyUnresolvedReferences
+        import ecommerce.programs.signals  # pylint: disable=import-outside-toplevel,unused-import
@@ -1,9 +1,15 @@
 
 
+import datetime
 import logging
 import operator
+from functools import partial
 
+import waffle
 from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
 from edx_django_utils.cache import TieredCache
 from oscar.apps.offer import utils as oscar_utils
 from oscar.core.loading import get_model
@@ -13,12 +19,24 @@ from requests.exceptions import HTTPError, RequestException, Timeout
 from ecommerce.core.utils import deprecated_traverse_pagination, get_cache_key
 from ecommerce.extensions.offer.decorators import check_condition_applicability
 from ecommerce.extensions.offer.mixins import SingleItemConsumptionConditionMixin
-from ecommerce.programs.utils import get_program
+from ecommerce.programs.constants import ENABLE_LEARNER_OWNERSHIP_STORE
+from ecommerce.programs.models import LearnerOwnership, LearnerOwnershipReconciliation
+from ecommerce.programs.tasks import reconcile_learner_ownership_task
+from ecommerce.programs.utils import get_program, reconcile_learner_ownership
 
 Condition = get_model('offer', 'Condition')
 logger = logging.getLogger(__name__)
 
 
+def _schedule_learner_ownership_reconciliation(user_id, site_id, lock_key):
+    """ Sends the background reconciliation task, logging rather than raising errors sending it. """
+    try:
+        reconcile_learner_ownership_task.delay(user_id, site_id)
+    except Exception:  # pylint: disable=broad-except
+        logger.exception('Failed to schedule the reconciliation of learner ownership for user [%s].', user_id)
+        cache.delete(lock_key)
+
+
 class ProgramCourseRunSeatsCondition(SingleItemConsumptionConditionMixin, Condition):
     class Meta:
         app_label = 'programs'
@@ -97,6 +115,65 @@ class ProgramCourseRunSeatsCondition(SingleItemConsumptionConditionMixin, Condit
                     entitlements = response
         return enrollments, entitlements
 
+    def _get_learner_ownership(self, basket):
+        """
+        Retrieves existing enrollments and entitlements for a user from the local ownership store.
+
+        The store is reconciled against LMS synchronously the first time a user is seen, and in the
+        background once it is older than ``settings.LEARNER_OWNERSHIP_RECONCILIATION_INTERVAL`` seconds.
+
+        Returns:
+            tuple: Set of (course run key, mode) the user is enrolled in, and set of (course UUID, mode)
+                the user holds an entitlement for. None if the store could not be reconciled.
+        """
+        user = basket.owner
+        reconciliation = LearnerOwnershipReconciliation.objects.filter(user=user).first()
+        if reconciliation is None:
+            try:
+                reconcile_learner_ownership(user, basket.site)
+            except (ReqConnectionError, HTTPError, Timeout, IntegrityError) as exc:
+                logger.warning('Failed to reconcile learner ownership for user [%s]: %s', user.id, exc)
+                return None
+        elif reconciliation.reconciled_at < timezone.now() - datetime.timedelta(
+                seconds=settings.LEARNER_OWNERSHIP_RECONCILIATION_INTERVAL):
+            # Only schedule one reconciliation per user at a time.
+            lock_key = 'learner_ownership_reconciliation_{}'.format(user.id)
+            if cache.add(lock_key, True, settings.LMS_API_CACHE_TIMEOUT):
+                # The task is sent once the transaction commits, so that it reads the ownership written by it.
+                transaction.on_commit(partial(_schedule_learner_ownership_reconciliation, user.id, basket.site.id,
+                                              lock_key))
+
+        enrollments = set()
+        entitlements = set()
+        for ownership_type, key, mode in LearnerOwnership.objects.filter(user=user).values_list(
+                'ownership_type', 'key', 'mode'):
+            if ownership_type == LearnerOwnership.ENROLLMENT:
+                enrollments.add((key, mode))
+            else:
+                entitlements.add((key, mode))
+        return enrollments, entitlements
+
+    def _get_user_ownership_keys(self, basket, retrieve_entitlements=False):
+        """
+        Returns the (course run key, mode) pairs the user is enrolled in and the (course UUID, mode)
+        pairs the user holds an entitlement for.
+
+        When the learner ownership store is enabled, these are read locally and the LMS is only
+        consulted if the store cannot be reconciled.
+        """
+        site_configuration = basket.site.siteconfiguration
+        if (site_configuration.enable_partial_program and basket.owner and
+                waffle.switch_is_active(ENABLE_LEARNER_OWNERSHIP_STORE)):
+            ownership = self._get_learner_ownership(basket)
+            if ownership is not None:
+                return ownership
+
+        enrollments, entitlements = self._get_user_ownership_data(basket, retrieve_entitlements)
+        return (
+            {(enrollment['course_details']['course_id'], enrollment['mode']) for enrollment in enrollments},
+            {(str(entitlement['course_uuid']), entitlement['mode']) for entitlement in entitlements},
+        )
+
     def _has_entitlements(self, program):
         """
         Determines whether an entitlement product exists for any course in the program.
@@ -130,15 +207,15 @@ class ProgramCourseRunSeatsCondition(SingleItemConsumptionConditionMixin, Condit
             return False
 
         retrieve_entitlements = self._has_entitlements(program)
-        enrollments, entitlements = self._get_user_ownership_data(basket, retrieve_entitlements)
+        enrollments, entitlements = self._get_user_ownership_keys(basket, retrieve_entitlements)
+        enrolled_course_runs = {course_run_key for course_run_key, mode in enrollments if mode in applicable_seat_types}
+        entitled_courses = {course_uuid for course_uuid, mode in entitlements if mode in applicable_seat_types}
 
         for course in program['courses']:
             # If the user is already enrolled in a course, we do not need to check their basket for it
-            if any(enrollment['course_details']['course_id'] in [run['key'] for run in course['course_runs']] and
-                   enrollment['mode'] in applicable_seat_types for enrollment in enrollments):
+            if enrolled_course_runs.intersection(run['key'] for run in course['course_runs']):
                 continue
-            if any(course['uuid'] == entitlement['course_uuid'] and
-                   entitlement['mode'] in applicable_seat_types for entitlement in entitlements):
+            if str(course['uuid']) in entitled_courses:
                 continue
 
             # If the  basket has no SKUs left, but we still have courses over which
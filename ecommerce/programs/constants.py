@@ -15,3 +15,7 @@ BENEFIT_TYPE_CHOICES = (
     (Benefit.PERCENTAGE, _('Percentage')),
     (Benefit.FIXED, _('Absolute')),
 )
+
+# Waffle switch used to read learner enrollments and entitlements from the local ownership store
+# instead of the LMS when evaluating program offers.
+ENABLE_LEARNER_OWNERSHIP_STORE = 'enable_learner_ownership_store'
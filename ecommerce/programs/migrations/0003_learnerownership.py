@@ -0,0 +1,40 @@
+# Generated by Django 3.2.25 on 2026-10-19 09:03
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django_extensions.db.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('programs', '0002_add_basket_attribute_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LearnerOwnershipReconciliation',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reconciled_at', models.DateTimeField()),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='learner_ownership_reconciliation', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='LearnerOwnership',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', django_extensions.db.fields.CreationDateTimeField(auto_now_add=True, verbose_name='created')),
+                ('modified', django_extensions.db.fields.ModificationDateTimeField(auto_now=True, verbose_name='modified')),
+                ('ownership_type', models.CharField(choices=[('enrollment', 'Enrollment'), ('entitlement', 'Entitlement')], max_length=32)),
+                ('key', models.CharField(help_text='Course run key of an enrollment, or course UUID of an entitlement.', max_length=255)),
+                ('mode', models.CharField(max_length=64)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='learner_ownerships', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'ownership_type', 'key', 'mode')},
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+
+
+from django.conf import settings
+from django.db import models
+from django.utils.translation import ugettext_lazy as _
+from django_extensions.db.models import TimeStampedModel
+
+
+class LearnerOwnership(TimeStampedModel):
+    """
+    A course run enrollment or a course entitlement held by a learner.
+
+    Rows are written when ecommerce fulfills or revokes an order line, and are replaced
+    whenever the learner's ownership is reconciled against the LMS.
+     .. no_pii:
+    """
+    ENROLLMENT = 'enrollment'
+    ENTITLEMENT = 'entitlement'
+    OWNERSHIP_TYPE_CHOICES = (
+        (ENROLLMENT, _('Enrollment')),
+        (ENTITLEMENT, _('Entitlement')),
+    )
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='learner_ownerships', on_delete=models.CASCADE)
+    ownership_type = models.CharField(max_length=32, choices=OWNERSHIP_TYPE_CHOICES)
+    key = models.CharField(
+        max_length=255,
+        help_text=_('Course run key of an enrollment, or course UUID of an entitlement.')
+    )
+    mode = models.CharField(max_length=64)
+
+    class Meta:
+        unique_together = ('user', 'ownership_type', 'key', 'mode')
+
+    def __str__(self):
+        return '{user}: {ownership_type} {key} ({mode})'.format(
+            user=self.user_id, ownership_type=self.ownership_type, key=self.key, mode=self.mode
+        )
+
+
+class LearnerOwnershipReconciliation(models.Model):
+    """
+    Last time a learner's LearnerOwnership rows were reconciled against the LMS.
+     .. no_pii:
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL, related_name='learner_ownership_reconciliation', on_delete=models.CASCADE
+    )
+    reconciled_at = models.DateTimeField()
+
+    def __str__(self):
+        return '{user}: {reconciled_at}'.format(user=self.user_id, reconciled_at=self.reconciled_at)
@@ -0,0 +1,19 @@
+
+
+from django.dispatch import receiver
+
+from ecommerce.extensions.fulfillment.signals import course_enrollment_changed, course_entitlement_changed
+from ecommerce.programs.models import LearnerOwnership
+from ecommerce.programs.utils import record_learner_ownership
+
+
+@receiver(course_enrollment_changed, dispatch_uid='programs.course_enrollment_changed_callback')
+def course_enrollment_changed_callback(sender, user=None, course_run_key=None, mode=None, is_active=True,
+                                       **kwargs):  # pylint: disable=unused-argument
+    record_learner_ownership(user, LearnerOwnership.ENROLLMENT, course_run_key, mode, is_active)
+
+
+@receiver(course_entitlement_changed, dispatch_uid='programs.course_entitlement_changed_callback')
+def course_entitlement_changed_callback(sender, user=None, course_uuid=None, mode=None, is_active=True,
+                                        **kwargs):  # pylint: disable=unused-argument
+    record_learner_ownership(user, LearnerOwnership.ENTITLEMENT, course_uuid, mode, is_active)
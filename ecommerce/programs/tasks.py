@@ -0,0 +1,25 @@
+import logging
+
+from celery import shared_task
+from django.contrib.auth import get_user_model
+from django.contrib.sites.models import Site
+from requests.exceptions import ConnectionError as ReqConnectionError
+from requests.exceptions import HTTPError, Timeout
+
+from ecommerce.programs.utils import reconcile_learner_ownership
+
+logger = logging.getLogger(__name__)
+User = get_user_model()
+
+
+@shared_task(bind=True, ignore_result=True)
+def reconcile_learner_ownership_task(self, user_id, site_id):  # pylint: disable=unused-argument
+    """
+    Reconcile a learner's local enrollments and entitlements against the LMS in the background.
+    """
+    user = User.objects.get(id=user_id)
+    site = Site.objects.get(id=site_id)
+    try:
+        reconcile_learner_ownership(user, site)
+    except (ReqConnectionError, HTTPError, Timeout) as exc:
+        logger.warning('Failed to reconcile learner ownership for user [%s]: %s', user_id, exc)
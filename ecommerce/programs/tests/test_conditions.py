@@ -1,15 +1,22 @@
-
+import datetime
 
 import ddt
 import mock
 import responses
+from django.conf import settings
+from django.db import IntegrityError
+from django.utils.timezone import now
 from oscar.core.loading import get_model
 from oscar.test.factories import BasketFactory
 from requests import HTTPError, RequestException, Timeout
 
 from ecommerce.core.constants import COURSE_ENTITLEMENT_PRODUCT_CLASS_NAME
+from ecommerce.core.tests import toggle_switch
 from ecommerce.courses.models import Course
+from ecommerce.extensions.fulfillment.signals import course_enrollment_changed
 from ecommerce.extensions.test import factories
+from ecommerce.programs.constants import ENABLE_LEARNER_OWNERSHIP_STORE
+from ecommerce.programs.models import LearnerOwnershipReconciliation
 from ecommerce.programs.tests.mixins import ProgramTestMixin
 from ecommerce.tests.factories import ProductFactory, SiteConfigurationFactory, UserFactory
 from ecommerce.tests.testcases import TestCase
@@ -317,3 +324,107 @@ class ProgramCourseRunSeatsConditionTests(ProgramTestMixin, TestCase):
                     break
 
         self.assertFalse(self.condition.is_satisfied(offer, basket))
+
+    @responses.activate
+    def test_is_satisfied_with_learner_ownership_store(self):
+        """ With the learner ownership store enabled, enrollments should be read locally instead of from the LMS. """
+        offer = factories.ProgramOfferFactory(partner=self.partner, condition=self.condition)
+        basket = BasketFactory(site=self.site, owner=UserFactory())
+        program = self.mock_program_detail_endpoint(
+            self.condition.program_uuid, self.site_configuration.discovery_api_url
+        )
+        verified_seats = []
+        for course in program['courses']:
+            course_run = Course.objects.get(id=course['course_runs'][0]['key'])
+            verified_seats += [seat for seat in course_run.seat_products if seat.attr.id_verification_required]
+
+        LearnerOwnershipReconciliation.objects.create(user=basket.owner, reconciled_at=now())
+        course_enrollment_changed.send(
+            sender=None,
+            user=basket.owner,
+            course_run_key=program['courses'][0]['course_runs'][0]['key'],
+            mode='verified',
+            is_active=True,
+        )
+        for seat in verified_seats[1:]:
+            basket.add_product(seat)
+
+        toggle_switch(ENABLE_LEARNER_OWNERSHIP_STORE, True)
+        with mock.patch.object(self.condition, '_get_user_ownership_data') as mock_get_user_ownership_data:
+            self.assertTrue(self.condition.is_satisfied(offer, basket))
+            mock_get_user_ownership_data.assert_not_called()
+
+            # Revoking the enrollment removes it from the store.
+            course_enrollment_changed.send(
+                sender=None,
+                user=basket.owner,
+                course_run_key=program['courses'][0]['course_runs'][0]['key'],
+                mode='verified',
+                is_active=False,
+            )
+            self.assertFalse(self.condition.is_satisfied(offer, basket))
+            mock_get_user_ownership_data.assert_not_called()
+
+    @responses.activate
+    def test_get_learner_ownership_reconciles_new_user(self):
+        """ The store should be reconciled against LMS the first time a user is seen. """
+        basket = BasketFactory(site=self.site, owner=UserFactory())
+        enrollments = [{'mode': 'verified', 'course_details': {'course_id': 'course-v1:a+b+c'}}]
+        self.mock_user_data(basket.owner.username, owned_products=enrollments)
+        self.mock_user_data(basket.owner.username, mocked_api='entitlements')
+
+        expected = ({('course-v1:a+b+c', 'verified')}, set())
+        get_learner_ownership = self.condition._get_learner_ownership  # pylint: disable=protected-access
+        self.assertEqual(get_learner_ownership(basket), expected)
+
+        # Reconciled users are served from the store.
+        responses.reset()
+        with mock.patch('ecommerce.programs.conditions.reconcile_learner_ownership_task.delay') as mock_delay:
+            self.assertEqual(get_learner_ownership(basket), expected)
+            mock_delay.assert_not_called()
+
+    @responses.activate
+    def test_get_learner_ownership_reconciliation_failure(self):
+        """ None should be returned if a new user's ownership cannot be retrieved from LMS. """
+        basket = BasketFactory(site=self.site, owner=UserFactory())
+        self.mock_user_data(basket.owner.username, response_code=500)
+        self.assertIsNone(self.condition._get_learner_ownership(basket))  # pylint: disable=protected-access
+        self.assertFalse(LearnerOwnershipReconciliation.objects.filter(user=basket.owner).exists())
+
+    def test_get_learner_ownership_stale(self):
+        """ A stale store should be served while a single reconciliation is scheduled in the background. """
+        basket = BasketFactory(site=self.site, owner=UserFactory())
+        reconciled_at = now() - datetime.timedelta(seconds=settings.LEARNER_OWNERSHIP_RECONCILIATION_INTERVAL + 1)
+        LearnerOwnershipReconciliation.objects.create(user=basket.owner, reconciled_at=reconciled_at)
+        course_enrollment_changed.send(
+            sender=None, user=basket.owner, course_run_key='course-v1:a+b+c', mode='verified', is_active=True
+        )
+
+        expected = ({('course-v1:a+b+c', 'verified')}, set())
+        get_learner_ownership = self.condition._get_learner_ownership  # pylint: disable=protected-access
+        with mock.patch('ecommerce.programs.conditions.reconcile_learner_ownership_task.delay') as mock_delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(get_learner_ownership(basket), expected)
+                self.assertEqual(get_learner_ownership(basket), expected)
+                mock_delay.assert_not_called()
+            mock_delay.assert_called_once_with(basket.owner.id, self.site.id)
+
+    def test_get_learner_ownership_stale_scheduling_failure(self):
+        """ Errors sending the background reconciliation should be logged, and the reconciliation retried later. """
+        basket = BasketFactory(site=self.site, owner=UserFactory())
+        reconciled_at = now() - datetime.timedelta(seconds=settings.LEARNER_OWNERSHIP_RECONCILIATION_INTERVAL + 1)
+        LearnerOwnershipReconciliation.objects.create(user=basket.owner, reconciled_at=reconciled_at)
+
+        get_learner_ownership = self.condition._get_learner_ownership  # pylint: disable=protected-access
+        with mock.patch('ecommerce.programs.conditions.reconcile_learner_ownership_task.delay',
+                        side_effect=Exception) as mock_delay:
+            for __ in range(2):
+                with self.captureOnCommitCallbacks(execute=True):
+                    self.assertEqual(get_learner_ownership(basket), (set(), set()))
+        self.assertEqual(mock_delay.call_count, 2)
+
+    def test_get_learner_ownership_reconciliation_conflict(self):
+        """ None should be returned if a new user's ownership cannot be written to the store. """
+        basket = BasketFactory(site=self.site, owner=UserFactory())
+        with mock.patch('ecommerce.programs.conditions.reconcile_learner_ownership', side_effect=IntegrityError):
+            self.assertIsNone(self.condition._get_learner_ownership(basket))  # pylint: disable=protected-access
@@ -10,8 +10,10 @@ from requests.exceptions import HTTPError, Timeout
 from testfixtures import LogCapture
 
 from ecommerce.programs.api import ProgramsApiClient
+from ecommerce.programs.models import LearnerOwnership, LearnerOwnershipReconciliation
 from ecommerce.programs.tests.mixins import ProgramTestMixin
-from ecommerce.programs.utils import get_program
+from ecommerce.programs.utils import get_program, reconcile_learner_ownership, record_learner_ownership
+from ecommerce.tests.factories import UserFactory
 from ecommerce.tests.testcases import TestCase
 
 LOGGER_NAME = 'ecommerce.programs.utils'
@@ -50,3 +52,60 @@ class UtilTests(ProgramTestMixin, TestCase):
                 self.assertIsNone(response)
                 msg = 'Failed to retrieve program details for {}'.format(self.program_uuid)
                 logger.check((LOGGER_NAME, 'DEBUG', msg))
+
+
+class LearnerOwnershipTests(ProgramTestMixin, TestCase):
+    def setUp(self):
+        super(LearnerOwnershipTests, self).setUp()
+        self.user = UserFactory()
+        self.course_uuid = str(uuid.uuid4())
+
+    def mock_ownership_data(self):
+        enrollments = [
+            {'mode': 'verified', 'is_active': True, 'course_details': {'course_id': 'course-v1:a+b+c'}},
+            {'mode': 'audit', 'is_active': False, 'course_details': {'course_id': 'course-v1:d+e+f'}},
+        ]
+        entitlements = [{'mode': 'verified', 'course_uuid': self.course_uuid}]
+        self.mock_user_data(self.user.username, owned_products=enrollments)
+        self.mock_user_data(self.user.username, mocked_api='entitlements', owned_products=entitlements)
+
+    def test_record_learner_ownership(self):
+        """ Enrollments should be recorded in a single mode per course run, and removed when revoked. """
+        record_learner_ownership(self.user, LearnerOwnership.ENROLLMENT, 'course-v1:a+b+c', 'audit')
+        record_learner_ownership(self.user, LearnerOwnership.ENROLLMENT, 'course-v1:a+b+c', 'verified')
+        record_learner_ownership(self.user, LearnerOwnership.ENROLLMENT, 'course-v1:a+b+c', 'verified')
+        record_learner_ownership(self.user, LearnerOwnership.ENTITLEMENT, self.course_uuid, 'verified')
+        self.assertEqual(
+            set(self.user.learner_ownerships.values_list('ownership_type', 'key', 'mode')),
+            {
+                (LearnerOwnership.ENROLLMENT, 'course-v1:a+b+c', 'verified'),
+                (LearnerOwnership.ENTITLEMENT, self.course_uuid, 'verified'),
+            }
+        )
+
+        record_learner_ownership(self.user, LearnerOwnership.ENTITLEMENT, self.course_uuid, 'verified', False)
+        self.assertEqual(
+            list(self.user.learner_ownerships.values_list('key', flat=True)), ['course-v1:a+b+c']
+        )
+
+    @responses.activate
+    def test_reconcile_learner_ownership(self):
+        """ Stored ownership should be replaced by the active enrollments and the entitlements known to LMS. """
+        record_learner_ownership(self.user, LearnerOwnership.ENROLLMENT, 'course-v1:x+y+z', 'audit')
+        self.mock_ownership_data()
+
+        reconcile_learner_ownership(self.user, self.site)
+        self.assertEqual(
+            set(self.user.learner_ownerships.values_list('ownership_type', 'key', 'mode')),
+            {
+                (LearnerOwnership.ENROLLMENT, 'course-v1:a+b+c', 'verified'),
+                (LearnerOwnership.ENTITLEMENT, self.course_uuid, 'verified'),
+            }
+        )
+        self.assertTrue(LearnerOwnershipReconciliation.objects.filter(user=self.user).exists())
+
+        # Reconciling again, e.g. concurrently with fulfillment recording the same ownership, is idempotent.
+        record_learner_ownership(self.user, LearnerOwnership.ENROLLMENT, 'course-v1:a+b+c', 'verified')
+        reconcile_learner_ownership(self.user, self.site)
+        self.assertEqual(self.user.learner_ownerships.count(), 2)
+        self.assertEqual(LearnerOwnershipReconciliation.objects.filter(user=self.user).count(), 1)
@@ -2,10 +2,14 @@
 
 import logging
 
+from django.db import IntegrityError, transaction
+from django.utils import timezone
 from requests.exceptions import ConnectionError as ReqConnectionError
 from requests.exceptions import HTTPError, Timeout
 
+from ecommerce.core.utils import deprecated_traverse_pagination
 from ecommerce.programs.api import ProgramsApiClient
+from ecommerce.programs.models import LearnerOwnership, LearnerOwnershipReconciliation
 
 log = logging.getLogger(__name__)
 
@@ -34,3 +38,74 @@ def get_program(program_uuid, siteconfiguration):
         log.debug("Failed to retrieve program details for %s", program_uuid)
 
     return response
+
+
+def record_learner_ownership(user, ownership_type, key, mode, is_active=True):
+    """
+    Adds or removes a single enrollment or entitlement in the learner's local ownership store.
+
+    Args:
+        user (User): Learner owning the course run or course.
+        ownership_type (str): LearnerOwnership.ENROLLMENT or LearnerOwnership.ENTITLEMENT.
+        key (str): Course run key of an enrollment, or course UUID of an entitlement.
+        mode (str): Enrollment or entitlement mode.
+        is_active (bool): False if the enrollment or entitlement was revoked.
+    """
+    key = str(key)
+    ownerships = LearnerOwnership.objects.filter(user=user, ownership_type=ownership_type, key=key)
+    if not is_active:
+        ownerships.filter(mode=mode).delete()
+        return
+
+    if ownership_type == LearnerOwnership.ENROLLMENT:
+        # A learner is enrolled in a course run in a single mode at a time.
+        ownerships.exclude(mode=mode).delete()
+    try:
+        with transaction.atomic():
+            LearnerOwnership.objects.get_or_create(user=user, ownership_type=ownership_type, key=key, mode=mode)
+    except IntegrityError:
+        # Created concurrently by another fulfillment or reconciliation.
+        pass
+
+
+def reconcile_learner_ownership(user, site):
+    """
+    Replaces the learner's local ownership store with the enrollments and entitlements known to the LMS.
+
+    Raises:
+        ConnectionError, HTTPError, Timeout: if the LMS could not be reached.
+        IntegrityError: if the store could not be written, e.g. because the learner was deleted meanwhile.
+    """
+    site_configuration = site.siteconfiguration
+    client = site_configuration.oauth_api_client
+
+    response = client.get(site_configuration.enrollments_api_url, params={'user': user.username})
+    response.raise_for_status()
+    enrollments = response.json() or []
+
+    response = client.get(site_configuration.entitlements_api_url, params={'user': user.username})
+    response.raise_for_status()
+    entitlements = response.json() or []
+    if isinstance(entitlements, dict):
+        entitlements = deprecated_traverse_pagination(entitlements, client, site_configuration.entitlements_api_url)
+
+    ownerships = {
+        (LearnerOwnership.ENROLLMENT, enrollment['course_details']['course_id'], enrollment['mode'])
+        for enrollment in enrollments if enrollment.get('is_active', True)
+    }
+    ownerships.update(
+        (LearnerOwnership.ENTITLEMENT, str(entitlement['course_uuid']), entitlement['mode'])
+        for entitlement in entitlements
+    )
+    with transaction.atomic():
+        # Concurrent reconciliations of the learner are serialized by locking its reconciliation row. Conflicts with
+        # ownership recorded by fulfillment meanwhile are ignored, since the rows are identical.
+        LearnerOwnershipReconciliation.objects.get_or_create(user=user, defaults={'reconciled_at': timezone.now()})
+        reconciliation = LearnerOwnershipReconciliation.objects.select_for_update().get(user=user)
+        LearnerOwnership.objects.filter(user=user).delete()
+        LearnerOwnership.objects.bulk_create([
+            LearnerOwnership(user=user, ownership_type=ownership_type, key=key, mode=mode)
+            for ownership_type, key, mode in ownerships
+        ], ignore_conflicts=True)
+        reconciliation.reconciled_at = timezone.now()
+        reconciliation.save(update_fields=['reconciled_at'])
@@ -73,6 +73,15 @@ DATABASES = {
         'CONN_MAX_AGE': 60,
     }
 }
+
+# Safe requests to views with a use_read_replica attribute read from the database called 'read_replica', if there is
+# one. See ecommerce.core.middleware.ReadReplicaMiddleware.
+DATABASE_ROUTERS = ['ecommerce.core.db_routers.ReadReplicaRouter']
+# Clients which wrote read from the primary for this long, so that they read their own writes.
+READ_REPLICA_PIN_SECONDS = 15  # Value is in seconds.
+# Reads go to the primary while the read replica lags behind it by more than this.
+READ_REPLICA_MAX_LAG = 5  # Value is in seconds.
+READ_REPLICA_LAG_CHECK_INTERVAL = 5  # Value is in seconds.
 # END DATABASE CONFIGURATION
 
 
@@ -222,6 +231,9 @@ TEMPLATES = [
 MIDDLEWARE = (
     'corsheaders.middleware.CorsMiddleware',
     'edx_django_utils.monitoring.DeploymentMonitoringMiddleware',
+    'ecommerce.core.middleware.RequestBudgetMiddleware',
+    # NOTE: ReadReplicaMiddleware must wrap SessionMiddleware, so that saving the session counts as a write.
+    'ecommerce.core.middleware.ReadReplicaMiddleware',
     'edx_django_utils.cache.middleware.RequestCacheMiddleware',
     'edx_django_utils.monitoring.CachedCustomMonitoringMiddleware',
     'edx_django_utils.monitoring.CookieMonitoringMiddleware',
@@ -232,8 +244,10 @@ MIDDLEWARE = (
     'edx_rest_framework_extensions.auth.jwt.middleware.JwtAuthCookieMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # NOTE: RequestProfilingMiddleware relies on request.user to allow staff to profile their requests.
+    'ecommerce.core.middleware.RequestProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
-    'django.contrib.sites.middleware.CurrentSiteMiddleware',
+    'ecommerce.core.middleware.CurrentSiteMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'waffle.middleware.WaffleMiddleware',
     'ecommerce.extensions.analytics.middleware.TrackingMiddleware',
@@ -251,6 +265,26 @@ MIDDLEWARE = (
     'edx_rest_framework_extensions.auth.jwt.middleware.EnsureJWTAuthSettingsMiddleware',
     'crum.CurrentRequestUserMiddleware',
 )
+
+# Maximum numbers of SQL queries, cache calls and outbound HTTP calls of requests to a view, keyed by view name.
+# See ecommerce.core.middleware.
+REQUEST_BUDGETS = {
+    'api:v2:baskets:calculate': {'sql': 100, 'cache': 20, 'http': 5},
+    'api:v2:checkout:process': {'sql': 40, 'cache': 15, 'http': 3},
+    'basket:summary': {'sql': 80, 'cache': 20, 'http': 6},
+    'bff:payment:v0:payment': {'sql': 80, 'cache': 25, 'http': 6},
+}
+# Raise instead of logging when a request exceeds its budget.
+REQUEST_BUDGETS_ENFORCED = False
+
+# Profiling of requests, see ecommerce.core.middleware.RequestProfilingMiddleware. Profiles hold the SQL queries and
+# URLs of the calls made by requests, so they are saved to a dedicated storage, which must not be publicly served.
+REQUEST_PROFILING_SAMPLE_RATE = 0.0
+REQUEST_PROFILING_INTERVAL = 0.005  # Value is in seconds.
+REQUEST_PROFILES_STORAGE = {
+    'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    'OPTIONS': {'location': normpath(join(SITE_ROOT, 'request_profiles'))},
+}
 # END MIDDLEWARE CONFIGURATION
 
 
@@ -281,6 +315,9 @@ ANONYMOUS_BASKET_CALCULATE_CACHE_TIMEOUT = 3600  # Value is in seconds.
 # LMS API settings used for fetching information from LMS
 LMS_API_CACHE_TIMEOUT = 30  # Value is in seconds.
 
+# Age after which a learner's locally stored enrollments and entitlements are reconciled against the LMS.
+LEARNER_OWNERSHIP_RECONCILIATION_INTERVAL = 24 * 60 * 60  # Value is in seconds.
+
 # Add here custom payment processor urls. For instance:
 # EXTRA_PAYMENT_PROCESSOR_URLS = {
 #   "mycustompaymentprocessor": "ecommerce.payment.processors.mycustompaymentprocessor.urls"
@@ -288,7 +325,32 @@ LMS_API_CACHE_TIMEOUT = 30  # Value is in seconds.
 EXTRA_PAYMENT_PROCESSOR_URLS = {}
 # END URL CONFIGURATION
 
-VOUCHER_CACHE_TIMEOUT = 10  # Value is in seconds.
+# Cached vouchers are invalidated when they or their offers change, see ecommerce.extensions.voucher.signals.
+VOUCHER_CACHE_TIMEOUT = 24 * 60 * 60  # Value is in seconds.
+
+# Cache timeout for the rendered pages of offers of the coupon offers preview.
+VOUCHER_OFFERS_CACHE_TIMEOUT = 60  # Value is in seconds.
+
+# Cached catalog product IDs are versioned and invalidated when the stock records of the catalog change.
+CATALOG_PRODUCT_IDS_CACHE_TIMEOUT = 24 * 60 * 60  # Value is in seconds.
+
+# Cached basket attribute types are invalidated when they change.
+BASKET_ATTRIBUTE_TYPE_CACHE_TIMEOUT = 24 * 60 * 60  # Value is in seconds.
+
+# Age after which a basket prepared by an earlier request with the same products, voucher and bundle is rebuilt
+# rather than reused, so that embargo and ownership checks are repeated.
+PREPARED_BASKET_REUSE_TIMEOUT = 5 * 60  # Value is in seconds.
+
+# Cache timeouts of the embargo decisions of the LMS. Denials are cached for less time, so that lifted restrictions
+# take effect sooner. Decisions older than the refresh interval are refreshed by a single request.
+EMBARGO_DECISION_CACHE_TIMEOUT = 60 * 60  # Value is in seconds.
+EMBARGO_DENIED_DECISION_CACHE_TIMEOUT = 10 * 60  # Value is in seconds.
+EMBARGO_DECISION_REFRESH_INTERVAL = 15 * 60  # Value is in seconds.
+# Maximum time a request waits for an embargo decision being fetched by another request, before fetching it itself.
+EMBARGO_DECISION_MISS_WAIT = 2  # Value is in seconds.
+
+# Cache timeout for the product and voucher counts shown on the staff dashboard.
+DASHBOARD_STATS_CACHE_TIMEOUT = 300  # Value is in seconds.
 
 SDN_CHECK_REQUEST_TIMEOUT = 5  # Value is in seconds.
 
@@ -582,6 +644,7 @@ BROKER_HEARTBEAT_CHECKRATE = 2
 # See http://celery.readthedocs.io/en/latest/userguide/configuration.html#imports.
 CELERY_IMPORTS = (
     'ecommerce_worker.fulfillment.v1.tasks',
+    'ecommerce.enterprise.tasks',
 )
 
 DEFAULT_PRIORITY_QUEUE = 'ecommerce.default'
@@ -676,6 +739,12 @@ CRISPY_TEMPLATE_PACK = 'bootstrap3'
 ENTERPRISE_SERVICE_URL = 'http://localhost:8000/enterprise/'
 # Cache enterprise response from Enterprise API.
 ENTERPRISE_API_CACHE_TIMEOUT = 300  # Value is in seconds
+# Time for which cached enterprise responses are still returned after they expire, while they are refreshed in the
+# background by a pool of ENTERPRISE_API_CACHE_REFRESH_WORKERS threads. Without workers, the request refreshes them.
+ENTERPRISE_API_STALE_CACHE_TIMEOUT = 60 * 60  # Value is in seconds.
+ENTERPRISE_API_CACHE_REFRESH_WORKERS = 2
+# Maximum time a request waits for an enterprise response being fetched by another request, before fetching it itself.
+ENTERPRISE_API_CACHE_MISS_WAIT = 2  # Value is in seconds.
 
 ENTERPRISE_CATALOG_SERVICE_URL = 'http://enterprise.catalog.app:18160/'
 
@@ -726,6 +795,12 @@ if os.environ.get('ENABLE_DJANGO_TOOLBAR', False):
 # Determines if events are actually sent to Segment. This should only be set to False for testing purposes.
 SEND_SEGMENT_EVENTS = True
 
+# Segment clients are shared by the whole process, one per Segment key. Events tracked while the queue of a client is
+# full are dropped.
+SEGMENT_MAX_QUEUE_SIZE = 10000
+SEGMENT_UPLOAD_SIZE = 100
+SEGMENT_UPLOAD_INTERVAL = 0.5  # Value is in seconds.
+
 NEW_CODES_EMAIL_CONFIG = {
     'email_subject': 'New edX codes available',
     'from_email': 'customersuccess@edx.org',
@@ -188,9 +188,15 @@ ENTERPRISE_API_URL = urljoin(f"{ENTERPRISE_SERVICE_URL}/", 'api/v1/')
 
 ENTERPRISE_CATALOG_API_URL = urljoin(f"{ENTERPRISE_CATALOG_SERVICE_URL}/", 'api/v1/')
 
+# Refresh stale enterprise responses in the request, so that tests do not depend on background threads.
+ENTERPRISE_API_CACHE_REFRESH_WORKERS = 0
+
 # Don't bother sending fake events to Segment. Doing so creates unnecessary threads.
 SEND_SEGMENT_EVENTS = False
 
+# Fail tests making more calls than their view's budget allows.
+REQUEST_BUDGETS_ENFORCED = True
+
 # SPEED
 DEBUG = False
 TEMPLATE_DEBUG = False
@@ -0,0 +1,15 @@
+"""
+Offline performance benchmarks for the commerce hot paths.
+
+The benchmarks build large datasets in the test database, stub the LMS, Discovery and Enterprise services, and record
+throughput, latency percentiles and SQL, cache and HTTP call counts to a JSON file. They are excluded from the unit
+test run; run them with `make benchmark`.
+
+Configuration, from the environment:
+    BENCHMARK_SCALE: Multiplier of the dataset sizes. Defaults to 1.
+    BENCHMARK_ITERATIONS: Number of measured iterations of each benchmark. Defaults to 20.
+    BENCHMARK_STUB_LATENCY_MS: Latency of every stubbed service call, in milliseconds. Defaults to 0.
+    BENCHMARK_RESULTS_PATH: File the results are written to. Defaults to benchmark_results.json.
+    BENCHMARK_BASELINE_PATH: Results of an earlier run to compare with. Regressions fail the run.
+    BENCHMARK_LATENCY_TOLERANCE: Allowed relative increase of the median latency over the baseline. Defaults to 0.25.
+"""
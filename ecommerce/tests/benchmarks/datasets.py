@@ -0,0 +1,58 @@
+"""
+Builders of realistically sized datasets for the benchmarks.
+"""
+
+
+import datetime
+
+from oscar.core.loading import get_model
+from oscar.test import factories
+
+from ecommerce.extensions.test.factories import create_order
+
+Benefit = get_model('offer', 'Benefit')
+Condition = get_model('offer', 'Condition')
+ConditionalOffer = get_model('offer', 'ConditionalOffer')
+RangeProduct = get_model('offer', 'RangeProduct')
+
+
+def scaled(count, scale):
+    """ Returns the count multiplied by the scale, and at least 1. """
+    return max(int(count * scale), 1)
+
+
+def create_products(partner, count):
+    """ Creates products with stock records of the partner. """
+    return factories.ProductFactory.create_batch(count, stockrecords__partner=partner, categories=[])
+
+
+def create_site_offers(products, count, products_per_range=10):
+    """
+    Creates site offers, each discounting a different slice of the products.
+
+    Returns:
+        list: The offers.
+    """
+    now = datetime.datetime.now()
+    offers = []
+    for index in range(count):
+        offer_range = factories.RangeFactory()
+        start = (index * products_per_range) % len(products)
+        RangeProduct.objects.bulk_create([
+            RangeProduct(range=offer_range, product=product, display_order=order)
+            for order, product in enumerate(products[start:start + products_per_range])
+        ])
+        offers.append(factories.ConditionalOfferFactory(
+            name='Benchmark offer {}'.format(index),
+            offer_type=ConditionalOffer.SITE,
+            benefit=factories.BenefitFactory(type=Benefit.PERCENTAGE, range=offer_range, value=10),
+            condition=factories.ConditionFactory(type=Condition.COUNT, range=offer_range, value=1),
+            start_datetime=now - datetime.timedelta(days=1),
+            end_datetime=now + datetime.timedelta(days=30),
+        ))
+    return offers
+
+
+def create_order_history(user, site, count):
+    """ Creates orders placed by the user. """
+    return [create_order(user=user, site=site) for __ in range(count)]
@@ -0,0 +1,97 @@
+"""
+Stubs of the services called by the benchmarked code paths, answering every call after a configurable latency.
+"""
+
+
+import json
+import re
+import time
+from urllib.parse import unquote
+
+import responses
+from django.conf import settings
+from edx_rest_api_client.client import _get_oauth_url
+
+JSON = 'application/json'
+EMPTY_PAGE = {'count': 0, 'num_pages': 1, 'next': None, 'previous': None, 'results': []}
+
+
+class StubServices:
+    """
+    Stubs the OAuth provider, Discovery Service, LMS and Enterprise services of a site.
+
+    Calls to the services are answered with generic but well-formed responses, so that the benchmarks measure
+    this service rather than the stubs.
+
+    Example:
+        with StubServices(site_configuration, latency_ms=50) as stubs:
+            response = client.get(path)
+        print(len(stubs.calls))
+    """
+
+    def __init__(self, site_configuration, latency_ms=0):
+        self.site_configuration = site_configuration
+        self.latency = latency_ms / 1000.0
+        self.mock = responses.RequestsMock(assert_all_requests_are_fired=False)
+
+    @property
+    def calls(self):
+        return self.mock.calls
+
+    def __enter__(self):
+        self.mock.start()
+        self._add(responses.POST, _get_oauth_url(settings.BACKEND_SERVICE_EDX_OAUTH2_PROVIDER_URL), self.access_token)
+        self._add(
+            responses.GET,
+            '{}course_runs/(?P<key>[^/?]+)/'.format(re.escape(self.site_configuration.discovery_api_url)),
+            self.course_run
+        )
+        self._add(
+            responses.GET,
+            '{}/api/user/v1/accounts/'.format(re.escape(self.site_configuration.lms_url_root)),
+            {'is_active': True}
+        )
+        self._add(responses.POST, '{}/api/enrollment/'.format(re.escape(self.site_configuration.lms_url_root)), {})
+
+        # Anything else is answered with an empty page of results.
+        for url_root in (
+                self.site_configuration.discovery_api_url,
+                self.site_configuration.lms_url_root,
+                settings.ENTERPRISE_API_URL,
+                settings.ENTERPRISE_CATALOG_API_URL,
+        ):
+            for method in (responses.GET, responses.POST):
+                self._add(method, re.escape(url_root), EMPTY_PAGE)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.mock.stop()
+        self.mock.reset()
+
+    def _add(self, method, url_pattern, body):
+        """ Registers a stub answering calls to URLs starting with the pattern with the body, or its return value. """
+        pattern = re.compile(url_pattern)
+
+        def callback(request):
+            time.sleep(self.latency)
+            data = body(pattern.match(request.url)) if callable(body) else body
+            return 200, {}, json.dumps(data)
+
+        self.mock.add_callback(method, pattern, callback=callback, content_type=JSON)
+
+    @staticmethod
+    def access_token(match):  # pylint: disable=unused-argument
+        return {'access_token': 'benchmark-token', 'expires_in': 3600}
+
+    @staticmethod
+    def course_run(match):
+        key = unquote(match.group('key'))
+        return {
+            'course': key.split(':')[-1].rsplit('+', 1)[0],
+            'key': key,
+            'title': 'Benchmark course run {}'.format(key),
+            'short_description': 'Benchmark',
+            'start': '2013-02-05T05:00:00Z',
+            'image': {'src': '/path/to/image.jpg'},
+            'enrollment_end': None,
+        }
@@ -0,0 +1,138 @@
+import json
+import os
+import urllib.parse
+import uuid
+
+import pytest
+from django.test import override_settings
+from django.urls import reverse
+from oscar.core.loading import get_model
+from oscar.test import factories
+
+from ecommerce.coupons.tests.mixins import CouponMixin
+from ecommerce.extensions.catalogue.tests.mixins import DiscoveryTestMixin
+from ecommerce.extensions.fulfillment.api import fulfill_order
+from ecommerce.extensions.test.factories import create_order, prepare_voucher
+from ecommerce.tests.benchmarks.datasets import create_order_history, create_products, create_site_offers, scaled
+from ecommerce.tests.benchmarks.stubs import StubServices
+from ecommerce.tests.benchmarks.utils import compare_with_baseline, get_config, run_benchmark, write_results
+from ecommerce.tests.testcases import TestCase
+
+Benefit = get_model('offer', 'Benefit')
+Catalog = get_model('catalogue', 'Catalog')
+Voucher = get_model('voucher', 'Voucher')
+
+
+@pytest.mark.benchmark
+@override_settings(REQUEST_BUDGETS_ENFORCED=False)
+class CommerceBenchmarks(CouponMixin, DiscoveryTestMixin, TestCase):
+    """
+    Benchmarks of the commerce hot paths.
+
+    Each benchmark adds its summary to the results file, and fails if it regressed from the baseline.
+    """
+    results = {}
+
+    def setUp(self):
+        super(CommerceBenchmarks, self).setUp()
+        self.config = get_config()
+        self.user = self.create_user(is_staff=True)
+        self.client.login(username=self.user.username, password=self.password)
+
+        self.stubs = StubServices(self.site_configuration, latency_ms=self.config['stub_latency_ms'])
+        self.stubs.__enter__()
+        self.addCleanup(self.stubs.__exit__, None, None, None)
+
+    def scaled(self, count):
+        return scaled(count, self.config['scale'])
+
+    def benchmark(self, name, func, setup=None, iterations=None):
+        """ Runs a benchmark, then records its summary and compares it with the baseline. """
+        summary = run_benchmark(func, iterations or self.config['iterations'], setup=setup)
+        self.results[name] = summary
+        write_results(self.config['results_path'], self.config, self.results)
+
+        if self.config['baseline_path'] and os.path.exists(self.config['baseline_path']):
+            with open(self.config['baseline_path'], encoding='utf-8') as baseline_file:
+                baseline = json.load(baseline_file)
+            regressions = compare_with_baseline({name: summary}, baseline, self.config['latency_tolerance'])
+            self.assertFalse(regressions, 'Regressions: {}'.format('; '.join(regressions)))
+
+    def assert_status(self, response, status_code=200):
+        self.assertEqual(response.status_code, status_code, response.content)
+        return response
+
+    def create_seat_basket(self, seats):
+        basket = factories.BasketFactory(owner=self.user, site=self.site)
+        for seat in seats:
+            basket.add_product(seat)
+        return basket
+
+    def create_seats(self, count):
+        return [self.create_course_and_seat(partner=self.partner, price=100)[1] for __ in range(count)]
+
+    def test_basket_calculate(self):
+        products = create_products(self.partner, self.scaled(1000))
+        create_site_offers(products, self.scaled(100))
+        skus = [product.stockrecords.first().partner_sku for product in products[:10]]
+        url = '{path}?{qs}'.format(
+            path=reverse('api:v2:baskets:calculate'),
+            qs=urllib.parse.urlencode({'sku': skus, 'username': self.user.username}, True)
+        )
+
+        self.benchmark('basket_calculate', lambda: self.assert_status(self.client.get(url)))
+
+    def test_payment_api(self):
+        seats = self.create_seats(5)
+        create_site_offers(seats, self.scaled(100), products_per_range=1)
+        self.create_seat_basket(seats)
+        path = reverse('bff:payment:v0:payment')
+
+        self.benchmark('payment_api', lambda: self.assert_status(self.client.get(path)))
+
+    def test_voucher_redemption(self):
+        seats = self.create_seats(3)
+        offer_range = factories.RangeFactory(products=seats)
+        voucher, __ = prepare_voucher(code='BENCHMARK', _range=offer_range, usage=Voucher.MULTI_USE, site=self.site)
+        basket = self.create_seat_basket(seats)
+        path = reverse('bff:payment:v0:addvoucher')
+
+        def remove_voucher():
+            basket.vouchers.remove(voucher)
+
+        self.benchmark(
+            'voucher_redemption',
+            lambda __: self.assert_status(self.client.post(path, {'code': voucher.code})),
+            setup=remove_voucher
+        )
+
+    def test_enterprise_coupon_creation(self):
+        catalog = Catalog.objects.create(partner=self.partner)
+
+        self.benchmark(
+            'enterprise_coupon_creation',
+            lambda: self.create_coupon(
+                benefit_type=Benefit.PERCENTAGE,
+                catalog=catalog,
+                enterprise_customer=str(uuid.uuid4()),
+                enterprise_customer_catalog=str(uuid.uuid4()),
+                partner=self.partner,
+                quantity=self.scaled(500),
+                voucher_type=Voucher.MULTI_USE,
+            ),
+            iterations=max(self.config['iterations'] // 10, 1)
+        )
+
+    def test_order_listing(self):
+        create_order_history(self.user, self.site, self.scaled(200))
+        path = reverse('api:v2:order-list')
+
+        self.benchmark('order_listing', lambda: self.assert_status(self.client.get(path)))
+
+    def test_fulfillment(self):
+        seats = self.create_seats(5)
+
+        def place_order():
+            return create_order(basket=self.create_seat_basket(seats), user=self.user)
+
+        self.benchmark('fulfillment', lambda order: fulfill_order(order, order.lines.all()), setup=place_order)
@@ -0,0 +1,58 @@
+from django.contrib.sites.models import Site
+from django.test import SimpleTestCase
+
+from ecommerce.tests.benchmarks.utils import compare_with_baseline, percentile, run_benchmark
+from ecommerce.tests.testcases import TestCase
+
+
+class PercentileTests(SimpleTestCase):
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([3, 1, 2], 100), 3)
+        self.assertEqual(percentile([5], 1), 5)
+
+
+class RunBenchmarkTests(TestCase):
+    def test_run_benchmark(self):
+        """ Verify the calls of each measured iteration are summarized, and warm-up iterations are not measured. """
+        calls = []
+
+        def func(value):
+            calls.append(value)
+            list(Site.objects.all())
+
+        summary = run_benchmark(func, 3, setup=lambda: len(calls), warmup=2)
+
+        self.assertEqual(calls, [0, 1, 2, 3, 4])
+        self.assertEqual(summary['iterations'], 3)
+        self.assertEqual(summary['sql'], {'mean': 1, 'max': 1})
+        self.assertEqual(summary['http'], {'mean': 0, 'max': 0})
+        self.assertGreater(summary['throughput_per_second'], 0)
+        self.assertLessEqual(summary['latency_ms']['p50'], summary['latency_ms']['p99'])
+
+
+class CompareWithBaselineTests(SimpleTestCase):
+    @staticmethod
+    def _summary(sql=10, p50=100.0):
+        return {
+            'latency_ms': {'p50': p50, 'p99': p50 * 2, 'mean': p50},
+            'sql': {'mean': sql, 'max': sql},
+            'cache': {'mean': 1, 'max': 1},
+            'http': {'mean': 0, 'max': 0},
+        }
+
+    def test_compare_with_baseline(self):
+        baseline = {'benchmarks': {'calculate': self._summary(), 'listing': self._summary()}}
+        benchmarks = {
+            'calculate': self._summary(sql=11, p50=120.0),
+            'listing': self._summary(sql=9, p50=130.0),
+            'new': self._summary(sql=1000),
+        }
+
+        self.assertEqual(compare_with_baseline(benchmarks, baseline, 0.25), [
+            'calculate: 11 sql calls, baseline 10',
+            'listing: median latency 130.0ms, baseline 100.0ms',
+        ])
+        self.assertEqual(compare_with_baseline({'calculate': self._summary()}, baseline, 0.25), [])
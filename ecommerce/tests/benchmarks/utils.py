@@ -0,0 +1,142 @@
+"""
+Running benchmarks, summarizing their measurements, and comparing them with a baseline.
+"""
+
+
+import json
+import math
+import os
+import platform
+import time
+
+import django
+
+from ecommerce.core.request_metrics import RequestMetrics, record_request_metrics
+
+
+def get_config():
+    """ Returns the benchmark configuration, read from the environment. """
+    return {
+        'scale': float(os.environ.get('BENCHMARK_SCALE', 1)),
+        'iterations': int(os.environ.get('BENCHMARK_ITERATIONS', 20)),
+        'stub_latency_ms': float(os.environ.get('BENCHMARK_STUB_LATENCY_MS', 0)),
+        'results_path': os.environ.get('BENCHMARK_RESULTS_PATH', 'benchmark_results.json'),
+        'baseline_path': os.environ.get('BENCHMARK_BASELINE_PATH'),
+        'latency_tolerance': float(os.environ.get('BENCHMARK_LATENCY_TOLERANCE', 0.25)),
+    }
+
+
+def percentile(values, percent):
+    """ Returns the given percentile of the values, using the nearest-rank method. """
+    ordered = sorted(values)
+    rank = max(int(math.ceil(percent / 100.0 * len(ordered))), 1)
+    return ordered[rank - 1]
+
+
+def summarize(latencies, metrics):
+    """
+    Summarizes the measurements of the iterations of a benchmark.
+
+    Arguments:
+        latencies (list): Duration of each iteration, in seconds.
+        metrics (list): RequestMetrics of each iteration.
+
+    Returns:
+        dict
+    """
+    summary = {
+        'iterations': len(latencies),
+        'throughput_per_second': round(len(latencies) / sum(latencies), 3) if sum(latencies) else None,
+        'latency_ms': {
+            'p50': round(percentile(latencies, 50) * 1000, 3),
+            'p99': round(percentile(latencies, 99) * 1000, 3),
+            'mean': round(sum(latencies) / len(latencies) * 1000, 3),
+        },
+    }
+    for kind in RequestMetrics.KINDS:
+        counts = [iteration_metrics.counts[kind] for iteration_metrics in metrics]
+        summary[kind] = {
+            'mean': round(sum(counts) / len(counts), 3),
+            'max': max(counts),
+        }
+    return summary
+
+
+def run_benchmark(func, iterations, setup=None, warmup=1):
+    """
+    Calls func repeatedly, measuring the duration and the SQL, cache and HTTP calls of each call.
+
+    Arguments:
+        func (callable): Called with the return value of setup, if any.
+        iterations (int): Number of measured calls.
+        setup (callable): Called before each call, outside of the measurements.
+        warmup (int): Number of unmeasured calls made first, to fill caches.
+
+    Returns:
+        dict: Summary of the measurements.
+    """
+    latencies = []
+    metrics = []
+    for iteration in range(warmup + iterations):
+        args = (setup(),) if setup else ()
+        with record_request_metrics() as iteration_metrics:
+            started = time.perf_counter()
+            func(*args)
+            duration = time.perf_counter() - started
+
+        if iteration >= warmup:
+            latencies.append(duration)
+            metrics.append(iteration_metrics)
+
+    return summarize(latencies, metrics)
+
+
+def write_results(path, config, benchmarks):
+    """ Writes the results of a run, with the configuration and environment they were measured in. """
+    results = {
+        'environment': {
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'platform': platform.platform(),
+        },
+        'config': {key: config[key] for key in ('scale', 'iterations', 'stub_latency_ms')},
+        'benchmarks': benchmarks,
+    }
+    with open(path, 'w', encoding='utf-8') as results_file:
+        json.dump(results, results_file, indent=2, sort_keys=True)
+    return results
+
+
+def compare_with_baseline(benchmarks, baseline, latency_tolerance):
+    """
+    Returns the regressions of the benchmarks from the baseline.
+
+    Call counts are deterministic, so any increase of the maximum count is a regression. Latencies are noisy, so only
+    increases of the median latency beyond the tolerance are.
+
+    Arguments:
+        benchmarks (dict): Summaries by benchmark name.
+        baseline (dict): Results of an earlier run, as written by write_results.
+        latency_tolerance (float): Allowed relative increase of the median latency.
+
+    Returns:
+        list: Descriptions of the regressions.
+    """
+    regressions = []
+    for name, summary in sorted(benchmarks.items()):
+        expected = baseline['benchmarks'].get(name)
+        if not expected:
+            continue
+
+        for kind in RequestMetrics.KINDS:
+            if summary[kind]['max'] > expected[kind]['max']:
+                regressions.append('{name}: {count} {kind} calls, baseline {expected}'.format(
+                    name=name, kind=kind, count=summary[kind]['max'], expected=expected[kind]['max']
+                ))
+
+        latency, expected_latency = summary['latency_ms']['p50'], expected['latency_ms']['p50']
+        if latency > expected_latency * (1 + latency_tolerance):
+            regressions.append('{name}: median latency {latency}ms, baseline {expected}ms'.format(
+                name=name, latency=latency, expected=expected_latency
+            ))
+    return regressions
@@ -4,6 +4,7 @@
 
 import datetime
 import json
+from contextlib import contextmanager
 from decimal import Decimal
 from unittest.mock import Mock
 
@@ -31,6 +32,7 @@ from threadlocals.threadlocals import set_thread_variable
 from waffle.models import Flag
 
 from ecommerce.core.constants import ALL_ACCESS_CONTEXT, SYSTEM_ENTERPRISE_ADMIN_ROLE, SYSTEM_ENTERPRISE_OPERATOR_ROLE
+from ecommerce.core.request_metrics import record_request_metrics
 from ecommerce.core.url_utils import get_lms_url
 from ecommerce.courses.models import Course
 from ecommerce.courses.utils import mode_for_product
@@ -101,6 +103,25 @@ class ThrottlingMixin:
         self.addCleanup(TieredCache.dangerous_clear_all_tiers)
 
 
+class RequestBudgetMixin:
+    """Provides an assertion on the numbers of SQL queries, cache calls and outbound HTTP calls of a block."""
+
+    @contextmanager
+    def assertWithinBudget(self, sql=None, cache=None, http=None):
+        """Fails if the block makes more calls of a kind than allowed. Kinds with no limit given are not checked."""
+        with record_request_metrics() as metrics:
+            yield metrics
+
+        exceeded = metrics.exceeded({'sql': sql, 'cache': cache, 'http': http})
+        self.assertFalse(
+            exceeded,
+            'Budget exceeded: {}'.format(', '.join(
+                '{count} {kind} calls, allowed {limit}'.format(kind=kind, count=count, limit=limit)
+                for kind, (count, limit) in sorted(exceeded.items())
+            ))
+        )
+
+
 class JwtMixin:
     """ Mixin with JWT-related helper functions. """
     JWT_SECRET_KEY = settings.JWT_AUTH['JWT_ISSUERS'][0]['SECRET_KEY']